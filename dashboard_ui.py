@@ -3,10 +3,10 @@ import pandas as pd
 import sqlite3
 import os
 import time
-import threading
 from datetime import datetime
-from src.core import config, database
-from src.api.api_monitor import start_monitoring
+from src.core import config, database, pages_resultats
+from src.api.monitor_worker import lire_battement
+from src.zeus import registry
 
 # Configuration de la page
 st.set_page_config(
@@ -58,18 +58,25 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- LOGIQUE DE DONNÉES ---
-# Note: Utilisation directe de get_db_connection dans load_all_data pour meilleure gestion
+# Note: load_all_data lit via get_read_connection (lecture seule, un seul instantané pour
+# toutes les requêtes : jamais de journée à moitié ingérée par le worker)
 
 @st.cache_data(ttl=5)
-def load_all_data():
-    from src.core.database import get_db_connection
-    with get_db_connection() as conn:
-        # Performance
-        df_perf = pd.read_sql_query("SELECT SUM(points_gagnes) as score, COUNT(*) as total FROM predictions WHERE succes IS NOT NULL", conn)
-        df_wins = pd.read_sql_query("SELECT COUNT(*) as wins FROM predictions WHERE succes = 1", conn)
+def load_all_data(league_id):
+    from src.core.database import get_read_connection, lire_session
+    with get_read_connection() as conn:
+        # Toutes les requêtes sont limitées à la ligue choisie et à sa session courante
+        partition = (league_id, lire_session(conn.cursor(), league_id))
         
-        # Score IA global
-        df_score_ia = pd.read_sql_query("SELECT score, predictions_total, predictions_reussies, pause_until FROM score_ia WHERE id = 1", conn)
+        # Performance : cumuls de la dernière journée validée (agrégats tenus à l'écriture, cf src/core/agregats.py)
+        df_perf = pd.read_sql_query("""
+            SELECT score_cumule as score, predictions_cumulees as total, reussies_cumulees as wins
+            FROM agregats_journee WHERE league_id = ? AND session_id = ?
+            ORDER BY journee DESC LIMIT 1
+        """, conn, params=partition)
+        
+        # Score IA de la ligue
+        df_score_ia = pd.read_sql_query("SELECT score, predictions_total, predictions_reussies, pause_until FROM score_ia WHERE league_id = ?", conn, params=(league_id,))
         
         # Prédictions
         df_preds = pd.read_sql_query("""
@@ -77,34 +84,27 @@ def load_all_data():
             FROM predictions p
             JOIN equipes e1 ON p.equipe_dom_id = e1.id
             JOIN equipes e2 ON p.equipe_ext_id = e2.id
+            WHERE p.league_id = ? AND p.session_id = ?
             ORDER BY p.id DESC LIMIT 15
-        """, conn)
+        """, conn, params=partition)
         
-        # Résultats réels (tous les matchs pour pagination)
-        df_results = pd.read_sql_query("""
-            SELECT 
-                r.journee as J, 
-                e1.nom as Domicile, 
-                COALESCE(r.score_dom, '?') || ' - ' || COALESCE(r.score_ext, '?') as Score, 
-                e2.nom as Exterieur
-            FROM resultats r
-            JOIN equipes e1 ON r.equipe_dom_id = e1.id
-            JOIN equipes e2 ON r.equipe_ext_id = e2.id
-            ORDER BY r.journee DESC, r.id DESC
-        """, conn)
+        # Résultats réels : version et sessions seulement, les pages sont lues à la demande (load_results_page)
+        version_results = pages_resultats.version_resultats(conn, *partition)
+        sessions = pages_resultats.lister_sessions(conn, league_id) or [partition[1]]
         
         # Classement
         df_ranking = pd.read_sql_query("""
             SELECT e.nom as Equipe, c.points as Pts, c.forme as Forme
             FROM classement c
             JOIN equipes e ON c.equipe_id = e.id
+            WHERE c.league_id = ? AND c.session_id = ?
             ORDER BY c.points DESC
-        """, conn)
+        """, conn, params=partition)
         
-        # Trend
-        df_trend = pd.read_sql_query("SELECT id, points_gagnes FROM predictions WHERE succes IS NOT NULL ORDER BY id", conn)
+        # Trend : score cumulé par journée
+        df_trend = pd.read_sql_query("SELECT journee as J, score_cumule FROM agregats_journee WHERE league_id = ? AND session_id = ? ORDER BY journee", conn, params=partition)
         
-        # ZEUS Data (Active Mode) - Avec Join Résultats pour calcul succès
+        # ZEUS Data (Active Mode) - Succès réglé par mettre_a_jour_scoring
         df_zeus = pd.read_sql_query("""
             SELECT 
                 z.journee as J, 
@@ -113,55 +113,65 @@ def load_all_data():
                 z.prediction as RawPred, 
                 z.confiance, 
                 z.timestamp,
+                z.succes as ZeusSuccess,
                 r.score_dom, 
                 r.score_ext
             FROM zeus_predictions z
             JOIN equipes e1 ON z.equipe_dom_id = e1.id
             JOIN equipes e2 ON z.equipe_ext_id = e2.id
-            LEFT JOIN resultats r ON z.journee = r.journee AND z.equipe_dom_id = r.equipe_dom_id
+            LEFT JOIN resultats r ON r.league_id = z.league_id AND r.session_id = z.session_id
+                AND z.journee = r.journee AND z.equipe_dom_id = r.equipe_dom_id
+            WHERE z.league_id = ? AND z.session_id = ?
             ORDER BY z.id DESC LIMIT 1000
-        """, conn)
-
-        return df_perf, df_wins, df_preds, df_results, df_ranking, df_trend, df_score_ia, df_zeus
+        """, conn, params=partition)
+        
+        # ZEUS : réussite par tranche de confiance (prédictions réglées)
+        df_zeus_tranches = pd.read_sql_query("SELECT tranche, essais, reussites, skips FROM agregats_zeus WHERE league_id = ? AND session_id = ? ORDER BY tranche", conn, params=partition)
+
+        return df_perf, df_preds, df_ranking, df_trend, df_score_ia, df_zeus, df_zeus_tranches, partition[1], sessions, version_results
+
+@st.cache_data(ttl=60)
+def load_results_filters(league_id, session_id, version):
+    """Journées de la session et équipes de la ligue (filtres de l'onglet Résultats)."""
+    from src.core.database import get_read_connection
+    with get_read_connection() as conn:
+        return pages_resultats.lister_journees(conn, league_id, session_id), pages_resultats.lister_equipes(conn, league_id)
+
+@st.cache_data(ttl=300, max_entries=200)
+def load_results_page(league_id, session_id, journee, equipe_id, apres, version):
+    """Une page de résultats, en cache par filtres + curseur + version des résultats."""
+    from src.core.database import get_read_connection
+    with get_read_connection() as conn:
+        lignes, suivant = pages_resultats.lire_page(conn, league_id, session_id, journee, equipe_id, apres)
+    return pd.DataFrame(lignes, columns=pages_resultats.COLONNES), suivant
 
 # --- INTERFACE ---
 st.title("⚡ GODMOD V2 | Intelligence Center")
 st.markdown(f"*Dernière mise à jour : {datetime.now().strftime('%H:%M:%S')}*")
 
-# --- INITIALISATION ET BACKGROUND MONITOR ---
-
-def run_monitor():
-    """Fonction pour lancer le monitor en arrière-plan."""
-    try:
-        from main import callback_predictions_ia
-        print("[BACKGROUND] Démarrage du monitor API...")
-        start_monitoring(
-            callback_on_new_journee=callback_predictions_ia,
-            verbose=False
-        )
-    except Exception as e:
-        print(f"[BACKGROUND ERROR] {e}")
-
-# Initialisation de la BDD au démarrage (AVANT de charger les données)
-if 'db_initialized' not in st.session_state:
-    try:
-        database.initialiser_db()
-        st.session_state.db_initialized = True
-        print("[INIT] Base de données initialisée.")
-    except Exception as e:
-        st.error(f"Erreur initialisation BDD : {e}")
-
-# Lancement du thread monitor s'il n'existe pas encore (singleton global)
-if 'monitor_thread' not in st.session_state:
-    # On utilise un flag global pour éviter les doubles lancements lors des reruns
-    if not any(t.name == "GODMOD_Monitor" for t in threading.enumerate()):
-        thread = threading.Thread(target=run_monitor, name="GODMOD_Monitor", daemon=True)
-        thread.start()
-        st.session_state.monitor_thread = True
-        print("[INIT] Monitor thread lancé.")
+# --- ÉTAT DU WORKER ---
+# Le moniteur (collecte, prédictions, entraînements) tourne dans son propre processus
+# (main_web.py / src.api.monitor_worker) : le dashboard ne fait que lire.
+battement = lire_battement()
+if battement is None:
+    st.sidebar.warning("⚙️ Worker : aucun battement (lancer `python main_web.py`)")
+elif battement["statut"] == "actif":
+    phase = battement.get("phase") or "surveillance"
+    journee = f" J{battement['journee']}" if battement.get("journee") else ""
+    st.sidebar.caption(f"⚙️ Worker actif — {phase}{journee} (battement il y a {battement['age']:.0f}s)")
+else:
+    st.sidebar.error(f"⚙️ Worker {battement['statut']} (dernier battement il y a {battement['age']:.0f}s)")
 
 # --- CHARGEMENT DES DONNÉES ---
-df_perf, df_wins, df_preds, df_results, df_ranking, df_trend, df_score_ia, df_zeus = load_all_data()
+try:
+    ligues = database.lister_ligues() or [config.LEAGUE_ID]
+except FileNotFoundError as e:
+    # Base créée par le worker (main_web.py) : rien à lire tant qu'il n'a pas démarré
+    st.error(f"Base de données indisponible : {e}")
+    st.stop()
+ligue = st.sidebar.selectbox("🏆 Ligue", ligues, index=ligues.index(config.LEAGUE_ID) if config.LEAGUE_ID in ligues else 0)
+(df_perf, df_preds, df_ranking, df_trend, df_score_ia, df_zeus, df_zeus_tranches,
+ session_courante, sessions, version_results) = load_all_data(ligue)
 
 score_ia = df_score_ia['score'].iloc[0] if not df_score_ia.empty else 100
 ia_total = df_score_ia['predictions_total'].iloc[0] if not df_score_ia.empty else 0
@@ -169,13 +179,12 @@ ia_wins = df_score_ia['predictions_reussies'].iloc[0] if not df_score_ia.empty e
 pause_until = df_score_ia['pause_until'].iloc[0] if not df_score_ia.empty and 'pause_until' in df_score_ia.columns else 0
 
 score = df_perf['score'].iloc[0] if not df_perf.empty else 0
-wins = df_wins['wins'].iloc[0] if not df_wins.empty else 0
+wins = df_perf['wins'].iloc[0] if not df_perf.empty else 0
 total_history = df_perf['total'].iloc[0] if not df_perf.empty else 0
 win_rate = (wins / total_history * 100) if total_history > 0 else 0
 
-# Détermination de la journée actuelle
-current_journee = df_results['J'].max() if not df_results.empty else 0
-current_journee += 1
+# Détermination de la journée actuelle (dernière journée enregistrée + 1)
+current_journee = (version_results[0] or 0) + 1
 
 # Extraction de ia_reussies avant utilisation
 ia_reussies = df_score_ia['predictions_reussies'].iloc[0] if not df_score_ia.empty else 0
@@ -200,10 +209,6 @@ with col_left:
     tab_preds, tab_zeus, tab_results = st.tabs(["🎯 Prédictions", "⚡ SUPER-INTELLIGENCE (Zeus v2)", "📜 Derniers Résultats"])
     
     with tab_preds:
-        # Détermination de la journée actuelle (Max des résultats + 1)
-        current_journee = df_results['J'].max() if not df_results.empty else 0
-        current_journee += 1
-        
         if current_journee < 2:
             st.warning("Pronostic pas encore disponible : pas encore assez de données (J < 2).")
         elif current_journee < 10:
@@ -246,26 +251,22 @@ with col_left:
     with tab_zeus:
         if not df_zeus.empty:
             # --- GLOBAL STATS (Avant Filtrage) ---
-            # 1. Calcul du succès sur TOUT l'historique
-            stats_zeus = df_zeus.copy()
-            
-            def check_zeus_success(row):
-                if pd.isna(row['score_dom']): return None
-                res_reel = 0
-                if row['score_dom'] > row['score_ext']: res_reel = 0 # 1
-                elif row['score_dom'] == row['score_ext']: res_reel = 1 # N
-                else: res_reel = 2 # 2
-                
-                if row['RawPred'] == 3: return None # Skip
-                return 1 if row['RawPred'] == res_reel else 0
-            
-            stats_zeus['ZeusSuccess'] = stats_zeus.apply(check_zeus_success, axis=1)
-            
-            global_wins = stats_zeus['ZeusSuccess'].sum()
-            global_attempts = stats_zeus['ZeusSuccess'].count()
-            global_skips = len(stats_zeus[stats_zeus['RawPred']==3])
+            # Prédictions réglées de la session, agrégées par tranche de confiance
+            global_wins = int(df_zeus_tranches['reussites'].sum())
+            global_attempts = int(df_zeus_tranches['essais'].sum())
+            global_skips = int(df_zeus_tranches['skips'].sum())
             global_rate = (global_wins / global_attempts * 100) if global_attempts > 0 else 0
             
+            # Modèle servi : version active du registre, sinon modèle historique
+            version_active = registry.get_version_active()
+            meta_active = registry.lire_meta(version_active) if version_active else None
+            if meta_active:
+                label_modele = version_active
+                details_modele = f"Version : {meta_active.get('nom')} | Entraînement : {meta_active.get('steps', '?')} steps | Score validation : {meta_active.get('score_validation', 'n/a')}"
+            else:
+                label_modele = registry.REGISTRY_CONFIG["LEGACY_MODEL"]
+                details_modele = "Version : Profit-Driven | Entraînement : 30 000 steps"
+            
             # --- HEADER + CIRCULAR PROGRESS ---
             # CSS pour le cercle de progression
             st.markdown(f"""
@@ -325,9 +326,9 @@ with col_left:
             <div class="zeus-header-container">
                 <div style="font-size: 40px; margin-right: 20px;">⚡</div>
                 <div class="zeus-info">
-                    <h3 style="margin: 0; color: #3fb950; font-family: 'Orbitron', sans-serif;">MODÈLE ACTIF : zeus_v3</h3>
+                    <h3 style="margin: 0; color: #3fb950; font-family: 'Orbitron', sans-serif;">MODÈLE ACTIF : {label_modele}</h3>
                     <div style="margin-top: 5px; color: #8b949e;">
-                        Version : Profit-Driven | Entraînement : 30 000 steps
+                        {details_modele}
                     </div>
                     <div style="display: flex; gap: 15px; margin-top: 15px;">
                         <div class="metric-box">
@@ -360,9 +361,6 @@ with col_left:
             # Filtrage pour le tableau
             df_zeus_filtered = df_zeus[df_zeus['J'] == journee_sel_z].copy()
             
-            # Recalcul local pour la colonne succès dans le tableau uniquement
-            df_zeus_filtered['ZeusSuccess'] = df_zeus_filtered.apply(check_zeus_success, axis=1)
-            
             # Mapping des actions et Visualisation Confiance
             def map_action_simple(x):
                 if x == 0: return "1"
@@ -409,23 +407,55 @@ with col_left:
                     "Outcome": st.column_config.TextColumn("Succès")
                 }
             )
+            
+            # --- RÉUSSITE PAR TRANCHE DE CONFIANCE ---
+            if global_attempts > 0:
+                st.markdown("### 🎚️ Réussite par tranche de confiance")
+                df_tranches = df_zeus_tranches[df_zeus_tranches['essais'] > 0].copy()
+                df_tranches['Confiance'] = df_tranches['tranche'].apply(lambda t: f"{t * 10}-{t * 10 + 10}%")
+                df_tranches['Réussite'] = (df_tranches['reussites'] / df_tranches['essais'] * 100).round(1)
+                st.bar_chart(df_tranches.set_index('Confiance')['Réussite'], height=200)
         else:
             st.warning("Aucune donnée Zeus pour l'instant.")
 
     with tab_results:
         st.subheader("Résultats Officiels")
-        if not df_results.empty:
-            # Liste des journées disponibles (de la plus récente à la plus ancienne)
-            journees = sorted(df_results['J'].unique().tolist(), reverse=True)
-            journee_selectionnee = st.selectbox(
+        f_session, f_journee, f_equipe = st.columns(3)
+        session_selectionnee = f_session.selectbox("🗂️ Session", sessions, index=0, key="session_selector")
+        # Sessions passées figées : version constante, leurs pages restent en cache
+        version_session = version_results if session_selectionnee == session_courante else None
+        journees, equipes = load_results_filters(ligue, session_selectionnee, version_session)
+        if journees:
+            # Filtres appliqués en SQL (pages_resultats) : seule la page affichée est lue
+            choix_journee = f_journee.selectbox(
                 "📅 Sélectionner la journée", 
-                journees, 
-                index=0,
+                ["Toutes"] + journees, 
+                index=1,
                 key="journee_selector"
             )
-            # Filtrer les résultats pour la journée sélectionnée
-            df_filtered = df_results[df_results['J'] == journee_selectionnee]
-            st.dataframe(df_filtered, use_container_width=True, hide_index=True)
+            journee_selectionnee = None if choix_journee == "Toutes" else choix_journee
+            ids_equipes = {nom: equipe_id for equipe_id, nom in equipes}
+            choix_equipe = f_equipe.selectbox("⚽ Équipe", ["Toutes"] + list(ids_equipes), key="equipe_selector")
+            equipe_selectionnee = ids_equipes.get(choix_equipe)
+            
+            # Curseurs des pages visitées (pagination par clé), remis à zéro si un filtre change
+            filtres = (ligue, session_selectionnee, journee_selectionnee, equipe_selectionnee)
+            if st.session_state.get("resultats_filtres") != filtres:
+                st.session_state["resultats_filtres"] = filtres
+                st.session_state["resultats_curseurs"] = [None]
+            curseurs = st.session_state["resultats_curseurs"]
+            df_page, suivant = load_results_page(ligue, session_selectionnee, journee_selectionnee,
+                                                 equipe_selectionnee, curseurs[-1], version_session)
+            st.dataframe(df_page, use_container_width=True, hide_index=True)
+            
+            p_prec, p_num, p_suiv = st.columns([1, 2, 1])
+            if p_prec.button("◀ Précédent", disabled=len(curseurs) == 1, key="resultats_precedent"):
+                curseurs.pop()
+                st.rerun()
+            p_num.caption(f"Page {len(curseurs)}")
+            if p_suiv.button("Suivant ▶", disabled=suivant is None, key="resultats_suivant"):
+                curseurs.append(suivant)
+                st.rerun()
         else:
             st.info("Aucun résultat enregistré.")
 
@@ -435,8 +465,7 @@ with col_right:
     
     st.subheader("📈 Courbe de Profit")
     if not df_trend.empty:
-        df_trend['Cumulative'] = df_trend['points_gagnes'].cumsum()
-        st.line_chart(df_trend.set_index('id')['Cumulative'], height=200)
+        st.line_chart(df_trend.set_index('J')['score_cumule'], height=200)
 
 # --- SIDEBAR ---
 st.sidebar.title("🛠️ Paramètres")
@@ -109,7 +109,7 @@ def main():
     # 1. Initialisation BDD
     print("[INIT] Verification de la base de donnees...")
     try:
-        database.initialiser_db()
+        database.initialiser_db(migrations_en_ligne=True)
         print("   [OK] Base de donnees connectee et a jour\n")
     except Exception as e:
         logger.error(f"Erreur initialisation BDD : {e}", exc_info=True)
@@ -156,7 +156,7 @@ if __name__ == "__main__":
             3. Cherchez **Start Command**.
             4. Remplacez `streamlit run main.py` par :
             """)
-            st.code("streamlit run dashboard_ui.py --server.port $PORT")
+            st.code("python main_web.py")
             st.info("Une fois cette modification faite, l'interface GODMOD s'affichera correctement.")
             st.stop()
         except ImportError:
@@ -112,7 +112,7 @@ def main():
     # Initialiser la base de donnees
     print("[INIT] Initialisation de la base de donnees...")
     try:
-        database.initialiser_db()
+        database.initialiser_db(migrations_en_ligne=True)
         print("   [OK] Base de donnees prete\n")
     except Exception as e:
         logger.error(f"Erreur initialisation BDD : {e}", exc_info=True)
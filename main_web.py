@@ -0,0 +1,25 @@
+"""
+Point d'entree du deploiement web (un seul dyno, cf Procfile)
+Lance le worker du moniteur dans son propre processus, supervise (battement,
+relance automatique), puis le dashboard Streamlit qui ne fait que lire la base.
+
+Usage :
+    python main_web.py            # port $PORT, sinon 8501
+    python main_web.py 8080
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import logging
+import sys
+
+from src.api.monitor_worker import lancer_tout
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+if __name__ == "__main__":
+    sys.exit(lancer_tout(int(sys.argv[1]) if len(sys.argv) > 1 else None))
@@ -0,0 +1,54 @@
+"""
+Rattrapage des resultats de la saison en cours depuis l'API (cf src/api/backfill.py).
+A lancer apres un arret du moniteur : les journees manquees sont inserees, puis le
+classement et les snapshots ZEUS sont reconstruits une seule fois.
+
+Usage :
+    python scripts/backfill_results.py
+    python scripts/backfill_results.py --ligue 8036 --paralleles 2 --debit 2
+"""
+import argparse
+import logging
+import os
+import sys
+
+# Ajouter le dossier parent au path pour importer les modules du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import config, database
+from src.api.backfill import BACKFILL_CONFIG, rattraper_saison
+from src.api.db_integration import insert_api_teams
+from src.api.league_monitor import SourceLigue, chemin_base_ligue
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rattrapage des resultats de la saison")
+    parser.add_argument("--ligue", type=int, default=config.LEAGUE_ID, help=f"ID de la ligue (defaut: {config.LEAGUE_ID})")
+    parser.add_argument("--lot", type=int, default=BACKFILL_CONFIG["TAILLE_PAGE"], help="Journees par requete")
+    parser.add_argument("--paralleles", type=int, default=BACKFILL_CONFIG["PARALLELES"], help="Requetes simultanees")
+    parser.add_argument("--debit", type=float, default=BACKFILL_CONFIG["REQUETES_PAR_SECONDE"],
+                        help="Requetes par seconde au plus")
+    args = parser.parse_args()
+
+    source = SourceLigue(args.ligue)
+    chemin = chemin_base_ligue(args.ligue)
+    with database.utiliser_base(chemin), database.utiliser_ligue(args.ligue):
+        if chemin is not None:
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        if args.ligue == config.LEAGUE_ID:
+            database.initialiser_db()
+        else:
+            # Equipes d'une autre ligue prises du classement API (cf league_monitor)
+            database.initialiser_db(equipes=[])
+            insert_api_teams(source.get_ranking())
+        bilan = rattraper_saison(source, taille_page=args.lot, paralleles=args.paralleles,
+                                 requetes_par_seconde=args.debit)
+
+    print(f"\n[BACKFILL] Derniere journee jouee : J{bilan['derniere']}")
+    print(f"   Journees inserees : {bilan['journees_inserees'] or 'aucune (base a jour)'}")
+    print(f"   Snapshots ZEUS : {bilan['snapshots_zeus']}")
+    print(f"   {bilan['requetes']} requetes en {bilan['duree']}s")
+    if bilan["manquantes"]:
+        print(f"   [WARN] Journees introuvables : {bilan['manquantes']}")
+    sys.exit(1 if bilan["manquantes"] else 0)
@@ -1,4 +1,12 @@
-import sqlite3
+"""
+Migration des données entre la base SQLite locale et Turso (dans les deux sens).
+Transfert par lots avec reprise et vérification finale (cf src/core/transfert_bases.py).
+
+Usage :
+    python scripts/migrate_to_turso.py                  # locale -> Turso
+    python scripts/migrate_to_turso.py --depuis-turso   # Turso -> locale
+"""
+import argparse
 import os
 import sys
 import logging
@@ -6,87 +14,62 @@ import logging
 # Ajouter le dossier parent au path pour importer les modules du projet
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.core import config, database
+from src.core import config
+from src.core.transfert_bases import TURSO, TRANSFERT_CONFIG, transferer
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def migrate_to_turso():
+def migrate_to_turso(depuis_turso=False, base_locale=None, taille_lot=None, paralleles=None):
     """
-    Migre les données de la base SQLite locale vers Turso.
+    Migre les données de la base SQLite locale vers Turso (ou l'inverse).
+    Relancer la commande après une interruption reprend au dernier lot copié.
+
+    Args:
+        depuis_turso: True pour copier Turso vers la base locale
+        base_locale: Base SQLite locale (config.DB_NAME par défaut)
+        taille_lot: Lignes par lot
+        paralleles: Tables copiées simultanément
+
+    Returns:
+        True si le transfert est complet et vérifié
     """
     if not config.TURSO_URL or not config.TURSO_TOKEN:
         logger.error("TURSO_URL et TURSO_TOKEN doivent être définis dans les variables d'environnement.")
         print("\nERREUR : Variables d'environnement manquantes.")
         print("Assurez-vous d'avoir TURSO_URL (ex: libsql://...) et TURSO_TOKEN.")
-        return
+        return False
 
-    local_db_path = config.DB_NAME
-    if not os.path.exists(local_db_path):
-        logger.error(f"Base de données locale non trouvée : {local_db_path}")
-        return
+    base_locale = base_locale or config.DB_NAME
+    source, destination = (TURSO, base_locale) if depuis_turso else (base_locale, TURSO)
+    reprise = f"{base_locale}.transfert_{'depuis' if depuis_turso else 'vers'}_turso.json"
 
-    logger.info("Début de la migration vers Turso...")
-    
-    # 1. Initialiser la structure sur Turso (si nécessaire)
-    logger.info("Initialisation de la structure sur Turso...")
-    database.initialiser_db()
-
-    # 2. Se connecter aux deux bases
+    logger.info(f"Début de la migration : {source} -> {destination}")
     try:
-        # Note: database.get_db_connection() utilisera Turso si les variables sont là
-        # On a besoin d'une connexion locale explicite
-        local_conn = sqlite3.connect(local_db_path)
-        local_conn.row_factory = sqlite3.Row
-        local_cursor = local_conn.cursor()
-
-        # On utilise libsql directement pour la destination
-        import libsql
-        remote_conn = libsql.connect(config.TURSO_URL, auth_token=config.TURSO_TOKEN)
-        remote_cursor = remote_conn.cursor()
-
-        tables = [
-            "equipes", "resultats", "cotes", "classement", 
-            "predictions", "score_ia", "zeus_predictions", "zeus_classement_archive"
-        ]
-
-        for table in tables:
-            logger.info(f"Migration de la table : {table}...")
-            
-            # Lire les données locales
-            local_cursor.execute(f"SELECT * FROM {table}")
-            rows = local_cursor.fetchall()
-            
-            if not rows:
-                logger.info(f"Table {table} vide, passage à la suivante.")
-                continue
-
-            # Préparer l'insertion sur Turso
-            columns = rows[0].keys()
-            placeholders = ", ".join(["?"] * len(columns))
-            cols_str = ", ".join(columns)
-            
-            # Nettoyer la table destination avant (optionnel, mais plus sûr pour une fresh migration)
-            # remote_cursor.execute(f"DELETE FROM {table}")
-            
-            # Insérer par lots
-            insert_sql = f"INSERT OR IGNORE INTO {table} ({cols_str}) VALUES ({placeholders})"
-            
-            data_to_insert = [tuple(row) for row in rows]
-            remote_cursor.executemany(insert_sql, data_to_insert)
-            
-            remote_conn.commit()
-            logger.info(f"Table {table} : {len(rows)} lignes migrées.")
-
-        logger.info("Migration terminée avec succès !")
-        print("\nFélicitations ! Vos données sont maintenant sur Turso.")
-
+        bilan = transferer(source, destination, fichier_reprise=reprise,
+                           taille_lot=taille_lot, paralleles=paralleles)
     except Exception as e:
-        logger.error(f"Erreur durant la migration : {e}", exc_info=True)
-    finally:
-        if 'local_conn' in locals(): local_conn.close()
-        if 'remote_conn' in locals(): remote_conn.close()
+        logger.error(f"Erreur durant la migration (relancer pour reprendre) : {e}", exc_info=True)
+        return False
+
+    for table, r in bilan["verification"].items():
+        statut = "OK" if r["ok"] else "ECART"
+        print(f"   [{statut}] {table} : {r['source'][0]} -> {r['destination'][0]} lignes")
+    if bilan["ok"]:
+        logger.info("Migration terminée et vérifiée avec succès !")
+        print("\nFélicitations ! Vos données ont été migrées.")
+    else:
+        logger.error(f"Vérification en échec : fichier de reprise conservé ({reprise})")
+    return bilan["ok"]
 
 if __name__ == "__main__":
-    migrate_to_turso()
+    parser = argparse.ArgumentParser(description="Migration SQLite <-> Turso")
+    parser.add_argument("--depuis-turso", action="store_true", help="Copier Turso vers la base locale")
+    parser.add_argument("--base", help=f"Base SQLite locale (defaut: {config.DB_NAME})")
+    parser.add_argument("--lot", type=int, default=TRANSFERT_CONFIG["TAILLE_LOT"], help="Lignes par lot")
+    parser.add_argument("--paralleles", type=int, default=TRANSFERT_CONFIG["PARALLELES"],
+                        help="Tables copiees simultanement")
+    args = parser.parse_args()
+    ok = migrate_to_turso(args.depuis_turso, args.base, args.lot, args.paralleles)
+    sys.exit(0 if ok else 1)
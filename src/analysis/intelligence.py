@@ -1,12 +1,25 @@
 import logging
 import importlib
+import hashlib
 import sys
-from ..core import config
-from ..core.database import get_db_connection
+from collections import OrderedDict
+from ..core import config, utils, confrontations, agregats
+from ..core.database import (get_db_connection, get_read_connection, get_contexte, get_ligue_active,
+                             get_partition, lire_session)
+from ..core.forme import analyser_forme
 from ..zeus import inference as zeus_inference # Module ZEUS
+from ..zeus.etat_ligue import EtatMatch
 
 logger = logging.getLogger(__name__)
 
+PREDICTIONS_CACHE_CONFIG = {
+    "MAX_JOURNEES": 128,  # Sélections gardées en mémoire (les moins récemment servies évincées)
+}
+
+# Cache des sélections par journée : {((base, ligue), session, journee): (empreinte_entrees, selections)},
+# ordonné du moins au plus récemment servi
+_PREDICTIONS_CACHE = OrderedDict()
+
 def _reload_config():
     """Recharge le module config pour prendre en compte les changements depuis le dashboard."""
     if 'src.core.config' in sys.modules:
@@ -48,10 +61,11 @@ def calculer_probabilite(equipe_dom_id, equipe_ext_id):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            cursor.execute("SELECT points, forme FROM classement WHERE equipe_id = ?", (equipe_dom_id,))
+            partition = get_partition(conn)
+            cursor.execute("SELECT points, forme FROM classement WHERE league_id = ? AND session_id = ? AND equipe_id = ?", partition + (equipe_dom_id,))
             stats_dom = cursor.fetchone()
             
-            cursor.execute("SELECT points, forme FROM classement WHERE equipe_id = ?", (equipe_ext_id,))
+            cursor.execute("SELECT points, forme FROM classement WHERE league_id = ? AND session_id = ? AND equipe_id = ?", partition + (equipe_ext_id,))
             stats_ext = cursor.fetchone()
     except Exception as e:
         logger.error(f"Erreur lors du calcul de probabilité : {e}", exc_info=True)
@@ -66,8 +80,7 @@ def calculer_probabilite(equipe_dom_id, equipe_ext_id):
     score_pts = (pts_dom - pts_ext) * 0.5
     
     def pondere_forme(f):
-        valeurs = {'V': 3, 'N': 1, 'D': 0}
-        return sum(valeurs.get(c, 0) for c in (f[-5:] if f else "")) 
+        return analyser_forme(f).points
     
     score_forme = pondere_forme(forme_dom) - pondere_forme(forme_ext)
     score_total = score_pts + score_forme
@@ -116,10 +129,11 @@ def calculer_probabilite_amelioree(equipe_dom_id, equipe_ext_id, cote_1, cote_x,
             # === RÉCUPÉRATION DES DONNÉES ===
             
             # Stats de base (classement et forme)
-            cursor.execute("SELECT points, forme FROM classement WHERE equipe_id = ?", (equipe_dom_id,))
+            partition = get_partition(conn)
+            cursor.execute("SELECT points, forme FROM classement WHERE league_id = ? AND session_id = ? AND equipe_id = ?", partition + (equipe_dom_id,))
             stats_dom = cursor.fetchone()
             
-            cursor.execute("SELECT points, forme FROM classement WHERE equipe_id = ?", (equipe_ext_id,))
+            cursor.execute("SELECT points, forme FROM classement WHERE league_id = ? AND session_id = ? AND equipe_id = ?", partition + (equipe_ext_id,))
             stats_ext = cursor.fetchone()
             
             if not stats_dom or not stats_ext:
@@ -129,8 +143,8 @@ def calculer_probabilite_amelioree(equipe_dom_id, equipe_ext_id, cote_1, cote_x,
             pts_ext, forme_ext = stats_ext
             
             # Buts récents (analyse attaque/défense)
-            buts_dom = analyser_buts_recents_internal(cursor, equipe_dom_id)
-            buts_ext = analyser_buts_recents_internal(cursor, equipe_ext_id)
+            buts_dom = analyser_buts_recents_internal(cursor, equipe_dom_id, partition)
+            buts_ext = analyser_buts_recents_internal(cursor, equipe_ext_id, partition)
     
     except Exception as e:
         logger.error(f"Erreur lors du calcul de probabilité améliorée : {e}", exc_info=True)
@@ -228,7 +242,11 @@ def analyser_performances_recentes():
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT succes FROM predictions WHERE succes IS NOT NULL ORDER BY id DESC LIMIT 9")
+            cursor.execute("""
+                SELECT succes FROM predictions
+                WHERE league_id = ? AND session_id = ? AND succes IS NOT NULL
+                ORDER BY id DESC LIMIT 9
+            """, get_partition(conn))
             resultats = cursor.fetchall()
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse des performances : {e}", exc_info=True)
@@ -260,7 +278,7 @@ def selectionner_meilleurs_matchs(journee):
             cursor = conn.cursor()
             
             # --- VÉRIFICATION PAUSE / RENFORCEMENT ---
-            cursor.execute("SELECT score, pause_until FROM score_ia WHERE id = 1")
+            cursor.execute("SELECT score, pause_until FROM score_ia WHERE league_id = ?", (get_ligue_active(),))
             row_ia = cursor.fetchone()
             score_ia = row_ia[0] if row_ia else 100
             pause_until = row_ia[1] if row_ia and len(row_ia) > 1 else 0
@@ -286,13 +304,20 @@ def selectionner_meilleurs_matchs(journee):
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE score_ia SET pause_until = ? WHERE id = 1", (pause_until_new,))
+                cursor.execute("UPDATE score_ia SET pause_until = ? WHERE league_id = ?", (pause_until_new, get_ligue_active()))
+                utils.marquer_donnees_modifiees(cursor, "scoring")
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour de la pause : {e}", exc_info=True)
         return []
     elif score_ia < 60 and in_immunity:
         print(f"[IMMUNITE] MODE IMMUNITÉ (J{journee}). Le score est critique ({score_ia}) mais on tente de se refaire (Fin pause J{pause_until}).")
     
+    # Index des confrontations à jour une fois pour la journée, lu ensuite en mémoire par chaque match
+    try:
+        confrontations.get_index_confrontations()
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement des confrontations : {e}")
+    
     predictions = []
     
     # 2. Cas 2 <= J < 10 : Mode "Prise de risque"
@@ -304,7 +329,10 @@ def selectionner_meilleurs_matchs(journee):
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2 FROM cotes WHERE journee = ?", (journee,))
+                cursor.execute("""
+                    SELECT equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2 FROM cotes
+                    WHERE league_id = ? AND session_id = ? AND journee = ?
+                """, get_partition(conn) + (journee,))
                 matchs = cursor.fetchall()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des matchs : {e}", exc_info=True)
@@ -362,7 +390,10 @@ def selectionner_meilleurs_matchs(journee):
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2 FROM cotes WHERE journee = ?", (journee,))
+                cursor.execute("""
+                    SELECT equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2 FROM cotes
+                    WHERE league_id = ? AND session_id = ? AND journee = ?
+                """, get_partition(conn) + (journee,))
                 matchs = cursor.fetchall()
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des matchs : {e}", exc_info=True)
@@ -395,18 +426,9 @@ def selectionner_meilleurs_matchs(journee):
     
     predictions.sort(key=lambda x: x['confiance'], reverse=True)
     
-    # Enregistrement en DB (batch)
+    # Enregistrement en DB (batch, sans doublon)
     if predictions[:config.MAX_PREDICTIONS_PAR_JOURNEE]:
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                for p in predictions[:config.MAX_PREDICTIONS_PAR_JOURNEE]:
-                    cursor.execute('''
-                        INSERT INTO predictions (journee, equipe_dom_id, equipe_ext_id, prediction)
-                        VALUES (?, ?, ?, ?)
-                    ''', (journee, p['equipe_dom_id'], p['equipe_ext_id'], p['prediction']))
-        except Exception as e:
-            logger.error(f"Erreur lors de l'enregistrement des prédictions : {e}", exc_info=True)
+        _enregistrer_predictions(journee, predictions[:config.MAX_PREDICTIONS_PAR_JOURNEE])
     
     return predictions[:config.MAX_PREDICTIONS_PAR_JOURNEE]
 
@@ -441,12 +463,20 @@ def selectionner_meilleurs_matchs_ameliore(journee):
         print(f"Info : Journée {journee} < 4. Pas assez de données pour pronostic.")
         return []
     
+    # Entrées inchangées depuis la dernière sélection : résultat en cache, sans analyse ni écriture
+    cle, empreinte, versions = _empreinte_journee(journee)
+    en_cache = _PREDICTIONS_CACHE.get(cle)
+    if en_cache and en_cache[0] == empreinte:
+        _PREDICTIONS_CACHE.move_to_end(cle)
+        print(f"[CACHE] J{journee} : entrées inchangées, {len(en_cache[1])} sélection(s) réutilisée(s).")
+        return [dict(p) for p in en_cache[1]]
+    
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
             # --- VÉRIFICATION PAUSE / RENFORCEMENT ---
-            cursor.execute("SELECT score, pause_until FROM score_ia WHERE id = 1")
+            cursor.execute("SELECT score, pause_until FROM score_ia WHERE league_id = ?", (get_ligue_active(),))
             row_ia = cursor.fetchone()
             score_ia = row_ia[0] if row_ia else 100
             pause_until = row_ia[1] if row_ia and len(row_ia) > 1 else 0
@@ -458,7 +488,7 @@ def selectionner_meilleurs_matchs_ameliore(journee):
     if pause_until >= journee:
         print(f"[STOP] MODE RENFORCEMENT ACTIF (J{journee}). Pause jusqu'à la journée {pause_until + 1}.")
         print("   -> Le programme continue de scanner les données sans faire de pronostics.")
-        return []
+        return _memoriser_selection(cle, empreinte, [])
 
     # Si le score est trop faible -> Activation de la pause
     # MAIS : On vérifie si on vient de sortir d'une pause (Immunité de 3 journées)
@@ -472,7 +502,8 @@ def selectionner_meilleurs_matchs_ameliore(journee):
         try:
             with get_db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE score_ia SET pause_until = ? WHERE id = 1", (pause_until_new,))
+                cursor.execute("UPDATE score_ia SET pause_until = ? WHERE league_id = ?", (pause_until_new, get_ligue_active()))
+                utils.marquer_donnees_modifiees(cursor, "scoring")
         except Exception as e:
             logger.error(f"Erreur lors de la mise à jour de la pause : {e}", exc_info=True)
         return []
@@ -508,7 +539,10 @@ def selectionner_meilleurs_matchs_ameliore(journee):
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2 FROM cotes WHERE journee = ?", (journee,))
+            cursor.execute("""
+                SELECT equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2 FROM cotes
+                WHERE league_id = ? AND session_id = ? AND journee = ?
+            """, get_partition(conn) + (journee,))
             matchs = cursor.fetchall()
     except Exception as e:
         logger.error(f"Erreur lors de la récupération des matchs : {e}", exc_info=True)
@@ -517,12 +551,19 @@ def selectionner_meilleurs_matchs_ameliore(journee):
     # 4. Analyse de chaque match avec le nouveau système complet
     print(f"[INFO] Phase 3 : Analyse avec système amélioré multi-facteurs")
     
+    # Index des confrontations à jour une fois pour la journée (versions lues avec l'empreinte) :
+    # chaque match le lit ensuite en mémoire, sans connexion
+    try:
+        confrontations.get_index_confrontations(versions[2:4] + versions[-1:])
+    except Exception as e:
+        logger.error(f"Erreur lors du chargement des confrontations : {e}")
+    
     # Récupérer les noms des équipes une seule fois pour optimiser
     equipes_noms = {}
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, nom FROM equipes")
+            cursor.execute("SELECT id, nom FROM equipes WHERE league_id = ?", (get_ligue_active(),))
             for row in cursor.fetchall():
                 equipes_noms[row[0]] = row[1]
     except Exception as e:
@@ -563,15 +604,16 @@ def selectionner_meilleurs_matchs_ameliore(journee):
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
+            partition = get_partition(conn)
             for m in matchs:
                 dom_id, ext_id, c1, cx, c2 = m
                 
                 # Récup info manquante pour vecteur (classement/forme)
                 # Note: On utilise le dernier classement disponible pour que Zeus puisse prédire les matchs futurs
                 # On recupere aussi la JOURNEE du classement pour normaliser les buts (Moyenne par match)
-                cursor.execute("SELECT position, forme, points, buts_pour, buts_contre, journee FROM classement WHERE equipe_id = ? ORDER BY journee DESC LIMIT 1", (dom_id,))
+                cursor.execute("SELECT position, forme, points, buts_pour, buts_contre, journee FROM classement WHERE league_id = ? AND session_id = ? AND equipe_id = ? ORDER BY journee DESC LIMIT 1", partition + (dom_id,))
                 d_info = cursor.fetchone()
-                cursor.execute("SELECT position, forme, points, buts_pour, buts_contre, journee FROM classement WHERE equipe_id = ? ORDER BY journee DESC LIMIT 1", (ext_id,))
+                cursor.execute("SELECT position, forme, points, buts_pour, buts_contre, journee FROM classement WHERE league_id = ? AND session_id = ? AND equipe_id = ? ORDER BY journee DESC LIMIT 1", partition + (ext_id,))
                 e_info = cursor.fetchone()
 
                 if d_info and e_info:
@@ -585,15 +627,15 @@ def selectionner_meilleurs_matchs_ameliore(journee):
                      bc_ext_avg = e_info[4] / j_e
 
                      # On construit l'objet data pour Zeus
-                     match_data = {
-                         'pos_dom': d_info[0], 'pos_ext': e_info[0],
-                         'forme_dom': d_info[1], 'forme_ext': e_info[1],
-                         'pts_dom': d_info[2], 'pts_ext': e_info[2],
-                         'bp_dom': bp_dom_avg, 'bc_dom': bc_dom_avg,
-                         'bp_ext': bp_ext_avg, 'bc_ext': bc_ext_avg,
-                         'cote_1': c1, 'cote_x': cx, 'cote_2': c2,
-                         'journee': journee,
-                     }
+                     match_data = EtatMatch(
+                         pos_dom=d_info[0], pos_ext=e_info[0],
+                         forme_dom=d_info[1], forme_ext=e_info[1],
+                         pts_dom=d_info[2], pts_ext=e_info[2],
+                         bp_dom=bp_dom_avg, bc_dom=bc_dom_avg,
+                         bp_ext=bp_ext_avg, bc_ext=bc_ext_avg,
+                         cote_1=c1, cote_x=cx, cote_2=c2,
+                         journee=journee,
+                     )
                      
                      # Appel avec recuperation de la CONFIANCE
                      action, confidence = zeus_inference.predire_match(match_data)
@@ -612,10 +654,16 @@ def selectionner_meilleurs_matchs_ameliore(journee):
                          from datetime import datetime
                          ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                          
+                         # Une prédiction déjà réglée (comptée dans agregats_zeus) n'est pas réécrite
                          conn.execute('''
-                            INSERT OR REPLACE INTO zeus_predictions (journee, equipe_dom_id, equipe_ext_id, prediction, confiance, timestamp)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                         ''', (journee, dom_id, ext_id, action, confidence, ts))
+                            INSERT INTO zeus_predictions (journee, equipe_dom_id, equipe_ext_id, prediction, confiance, timestamp, league_id, session_id)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT(league_id, session_id, journee, equipe_dom_id, equipe_ext_id) DO UPDATE SET
+                                prediction = excluded.prediction,
+                                confiance = excluded.confiance,
+                                timestamp = excluded.timestamp
+                            WHERE resultat IS NULL
+                         ''', (journee, dom_id, ext_id, action, confidence, ts) + partition)
                      except Exception as sub_e:
                          pass # Ignorer doublons unique
     except Exception as e:
@@ -626,20 +674,82 @@ def selectionner_meilleurs_matchs_ameliore(journee):
     predictions.sort(key=lambda x: x['confiance'], reverse=True)
     
     # 6. Enregistrement en DB (top 2-3 selon MAX_PREDICTIONS_PAR_JOURNEE)
-    if predictions[:config.MAX_PREDICTIONS_PAR_JOURNEE]:
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                for p in predictions[:config.MAX_PREDICTIONS_PAR_JOURNEE]:
-                    cursor.execute('''
-                        INSERT INTO predictions (journee, equipe_dom_id, equipe_ext_id, prediction)
-                        VALUES (?, ?, ?, ?)
-                    ''', (journee, p['equipe_dom_id'], p['equipe_ext_id'], p['prediction']))
-                # Pas de commit ici - le context manager s'en charge automatiquement
-        except Exception as e:
-            logger.error(f"Erreur lors de l'enregistrement des prédictions : {e}", exc_info=True)
+    selections = predictions[:config.MAX_PREDICTIONS_PAR_JOURNEE]
+    if selections and not _enregistrer_predictions(journee, selections):
+        return selections  # Écriture échouée : pas de cache, la prochaine exécution réessaiera
     
-    return predictions[:config.MAX_PREDICTIONS_PAR_JOURNEE]
+    return _memoriser_selection(cle, empreinte, selections)
+
+
+def _empreinte_journee(journee):
+    """
+    Clé de cache et empreinte des entrées d'une journée : session courante, versions des cotes
+    de la journée, du classement, des résultats, des confrontations et du scoring
+    (cf utils.marquer_donnees_modifiees), modèle ZEUS servi et paramètres de config.
+    Session et versions sont lues en une requête dans un instantané de la base : les écritures
+    des autres processus (worker, dashboard) invalident aussi le cache.
+    
+    Returns:
+        tuple: (cle_cache, empreinte, versions) ; versions : cotes, classement, résultats,
+            confrontations, scoring puis version globale (cf utils.lire_versions_donnees)
+    """
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        session = lire_session(cursor, get_ligue_active())
+        versions = utils.lire_versions_donnees(
+            cursor, [("cotes", journee), "classement", "resultats", "confrontations", "scoring"])
+    parametres = sorted((k, repr(v)) for k, v in vars(config).items() if k.isupper())
+    entrees = (versions, zeus_inference.get_empreinte_modele(), parametres)
+    cle = (get_contexte(), session, journee)
+    return cle, hashlib.sha1(repr((cle, entrees)).encode("utf-8")).hexdigest(), versions
+
+
+def _memoriser_selection(cle, empreinte, selections):
+    """Mémorise les sélections d'une journée sous l'empreinte de ses entrées (LRU borné)."""
+    _PREDICTIONS_CACHE[cle] = (empreinte, [dict(p) for p in selections])
+    _PREDICTIONS_CACHE.move_to_end(cle)
+    while len(_PREDICTIONS_CACHE) > PREDICTIONS_CACHE_CONFIG["MAX_JOURNEES"]:
+        _PREDICTIONS_CACHE.popitem(last=False)
+    return selections
+
+
+def invalidate_predictions_cache():
+    """Vide le cache des sélections (ex: changement de base active, tests)."""
+    _PREDICTIONS_CACHE.clear()
+
+
+def _enregistrer_predictions(journee, predictions):
+    """
+    Enregistre les prédictions sélectionnées sans doublon : un match déjà pronostiqué
+    pour la journée et pas encore validé est mis à jour, sinon inséré.
+    
+    Returns:
+        True si l'enregistrement a réussi
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            partition = get_partition(conn)
+            for p in predictions:
+                params = partition + (journee, p['equipe_dom_id'], p['equipe_ext_id'])
+                cursor.execute('''
+                    UPDATE predictions SET prediction = ?
+                    WHERE league_id = ? AND session_id = ? AND journee = ? AND equipe_dom_id = ? AND equipe_ext_id = ?
+                    AND succes IS NULL
+                ''', (p['prediction'],) + params)
+                cursor.execute('''
+                    INSERT INTO predictions (league_id, session_id, journee, equipe_dom_id, equipe_ext_id, prediction)
+                    SELECT ?, ?, ?, ?, ?, ?
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM predictions
+                        WHERE league_id = ? AND session_id = ? AND journee = ? AND equipe_dom_id = ? AND equipe_ext_id = ?
+                    )
+                ''', params + (p['prediction'],) + params)
+                # Pas de commit ici - le context manager s'en charge automatiquement
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors de l'enregistrement des prédictions : {e}", exc_info=True)
+        return False
 
 
 # ============================================
@@ -657,21 +767,8 @@ def pondere_forme_amelioree(f):
     Returns:
         Score pondéré de la forme (float)
     """
-    valeurs = {'V': 3, 'N': 1, 'D': 0}
-    
-    if not f or len(f) < 5:
-        # Si pas assez de données, utiliser la méthode classique
-        return sum(valeurs.get(c, 0) for c in (f[-5:] if f else ""))
-    
-    forme_recente = f[-5:]  # 5 derniers matchs
-    total = 0
-    
-    for i, resultat in enumerate(forme_recente):
-        # Les 2 derniers matchs (indices 3 et 4) comptent 1.5× plus
-        multiplicateur = 1.5 if i >= 3 else 1.0
-        total += valeurs.get(resultat, 0) * multiplicateur
-    
-    return total
+    # Précalculé dans la table des formes (méthode classique si moins de 5 matchs)
+    return analyser_forme(f).points_ponderes
 
 
 def detecter_instabilite(forme):
@@ -685,24 +782,8 @@ def detecter_instabilite(forme):
     Returns:
         True si instabilité détectée, False sinon
     """
-    if not forme or len(forme) < 3:
-        return False
-    
-    # Patterns d'instabilité à éviter (optimisation roadmap)
-    patterns_instables = [
-        'VDV',   # Victoire-Défaite-Victoire
-        'DVD',   # Défaite-Victoire-Défaite
-        'VNV',   # Victoire-Nul-Victoire avec nul instable
-        'DND',   # Défaite-Nul-Défaite
-        'VDVD',  # Pattern long d'alternance
-        'DVDV'   # Pattern long d'alternance
-    ]
-    
-    for pattern in patterns_instables:
-        if forme.endswith(pattern):
-            return True
-    
-    return False
+    # Patterns VDV, DVD, VNV, DND, VDVD, DVDV : cf forme.PATTERNS_INSTABLES
+    return analyser_forme(forme).instabilite
 
 
 def calculer_momentum_internal(forme):
@@ -712,22 +793,8 @@ def calculer_momentum_internal(forme):
     
     Note: Cette fonction ne détecte plus l'instabilité (gérée par detecter_instabilite)
     """
-    if not forme or len(forme) < 3:
-        return 0
-    
-    # Séries de victoires (priorité à la plus longue)
-    if forme.endswith('VVV'):
-        return 3.0
-    elif forme.endswith('VV'):
-        return 1.5
-    
-    # Séries de défaites
-    elif forme.endswith('DDD'):
-        return -3.0
-    elif forme.endswith('DD'):
-        return -1.5
-    
-    return 0
+    # VVV: +3, VV: +1.5, DDD: -3, DD: -1.5 (au moins 3 matchs), lu dans la table des formes
+    return analyser_forme(forme).momentum
 
 
 def detecter_match_equilibre(cote_1, cote_x, cote_2):
@@ -809,7 +876,7 @@ def analyser_cotes_suspectes(cote_1, cote_x, cote_2):
 # PHASE 2 : FONCTIONS AVEC REQUÊTES SQL
 # ============================================
 
-def analyser_buts_recents_internal(cursor, equipe_id):
+def analyser_buts_recents_internal(cursor, equipe_id, partition=None):
     """
     Analyse les buts marqués et encaissés sur les 5 derniers matchs joués.
     Nécessite que les scores soient non NULL dans la table resultats.
@@ -817,6 +884,7 @@ def analyser_buts_recents_internal(cursor, equipe_id):
     Args:
         cursor: Curseur DB (doit être dans une transaction active)
         equipe_id: ID de l'équipe à analyser
+        partition: (league_id, session_id), par défaut ceux du contexte courant
     
     Returns:
         Tuple (buts_pour, buts_contre) ou None si pas assez de données
@@ -828,12 +896,13 @@ def analyser_buts_recents_internal(cursor, equipe_id):
                 CASE WHEN equipe_dom_id = ? THEN score_dom ELSE score_ext END as buts_pour,
                 CASE WHEN equipe_dom_id = ? THEN score_ext ELSE score_dom END as buts_contre
             FROM resultats 
-            WHERE (equipe_dom_id = ? OR equipe_ext_id = ?)
+            WHERE league_id = ? AND session_id = ?
+            AND (equipe_dom_id = ? OR equipe_ext_id = ?)
             AND score_dom IS NOT NULL
             AND score_ext IS NOT NULL
             ORDER BY journee DESC
             LIMIT 5
-        """, (equipe_id, equipe_id, equipe_id, equipe_id))
+        """, (equipe_id, equipe_id) + (partition or get_partition()) + (equipe_id, equipe_id))
         
         results = cursor.fetchall()
         
@@ -852,7 +921,8 @@ def analyser_buts_recents_internal(cursor, equipe_id):
 
 def analyser_confrontations_directes(equipe_dom_id, equipe_ext_id):
     """
-    Analyse l'historique des 5 dernières confrontations directes entre deux équipes.
+    Analyse l'historique des 5 dernières confrontations directes entre deux équipes,
+    toutes saisons confondues (index des confrontations, cf core/confrontations.py).
     Détecte les patterns répétitifs (certaines équipes battent toujours les mêmes adversaires).
     
     Args:
@@ -863,29 +933,15 @@ def analyser_confrontations_directes(equipe_dom_id, equipe_ext_id):
         Bonus/malus selon les patterns détectés (-3.0 à +3.0)
     """
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Récupérer les 5 dernières confrontations (domicile de equipe_dom_id)
-            cursor.execute("""
-                SELECT score_dom, score_ext 
-                FROM resultats 
-                WHERE equipe_dom_id = ? AND equipe_ext_id = ?
-                AND score_dom IS NOT NULL AND score_ext IS NOT NULL
-                ORDER BY journee DESC 
-                LIMIT 5
-            """, (equipe_dom_id, equipe_ext_id))
-            
-            historique = cursor.fetchall()
+        # Résumé des dernières confrontations (domicile de equipe_dom_id), index en mémoire
+        resume = confrontations.get_confrontation(equipe_dom_id, equipe_ext_id)
         
-        if not historique or len(historique) < 3:
+        if not resume or resume[0] < 3:
             # Pas assez de données pour détecter un pattern
             return 0
         
-        # Compter les victoires domicile, nuls et défaites
-        victoires_dom = sum(1 for h in historique if h[0] > h[1])
-        nuls = sum(1 for h in historique if h[0] == h[1])
-        total = len(historique)
+        # Victoires domicile et nuls sur les dernières rencontres
+        total, victoires_dom, nuls = resume
         
         taux_victoire_dom = victoires_dom / total
         taux_nul = nuls / total
@@ -907,25 +963,35 @@ def analyser_confrontations_directes(equipe_dom_id, equipe_ext_id):
 
 
 def mettre_a_jour_scoring():
-    """Valide les prédictions passées via IDs."""
+    """
+    Valide les prédictions passées via IDs et règle les prédictions ZEUS jouées.
+    Les agrégats du dashboard (cf core/agregats.py) suivent dans la même transaction.
+    """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            cursor.execute("SELECT id, journee, equipe_dom_id, equipe_ext_id, prediction FROM predictions WHERE succes IS NULL")
+            partition = get_partition(conn)
+            cursor.execute("""
+                SELECT id, journee, equipe_dom_id, equipe_ext_id, prediction FROM predictions
+                WHERE league_id = ? AND session_id = ? AND succes IS NULL
+            """, partition)
             en_attente = cursor.fetchall()
             
+            valides = 0
+            journees = {}  # journee -> [prédictions, réussites, points]
             for p in en_attente:
                 pid, j, dom_id, ext_id, pred = p
                 
                 cursor.execute('''
                     SELECT score_dom, score_ext FROM resultats 
-                    WHERE journee = ? AND equipe_dom_id = ? AND equipe_ext_id = ?
-                ''', (j, dom_id, ext_id))
+                    WHERE league_id = ? AND session_id = ? AND journee = ? AND equipe_dom_id = ? AND equipe_ext_id = ?
+                ''', partition + (j, dom_id, ext_id))
                 res = cursor.fetchone()
                 
-                if res:
+                if res and res[0] is not None and res[1] is not None:
                     sd, se = res
+                    valides += 1
                     resultat_reel = "1" if sd > se else ("2" if se > sd else "X")
                     succes = 1 if resultat_reel == pred else 0
                     points = config.POINTS_VICTOIRE if succes else config.POINTS_DEFAITE
@@ -935,6 +1001,10 @@ def mettre_a_jour_scoring():
                         SET resultat = ?, succes = ?, points_gagnes = ?
                         WHERE id = ?
                     ''', (resultat_reel, succes, points, pid))
+                    compteurs = journees.setdefault(j, [0, 0, 0])
+                    compteurs[0] += 1
+                    compteurs[1] += succes
+                    compteurs[2] += points
                     
                     # Mise à jour du score IA global
                     if succes:
@@ -944,16 +1014,22 @@ def mettre_a_jour_scoring():
                                 predictions_reussies = predictions_reussies + 1, 
                                 predictions_total = predictions_total + 1, 
                                 derniere_maj = datetime("now") 
-                            WHERE id = 1
-                        ''', (points,))
+                            WHERE league_id = ?
+                        ''', (points, partition[0]))
                     else:
                         cursor.execute('''
                             UPDATE score_ia 
                             SET score = score + ?, 
                                 predictions_total = predictions_total + 1, 
                                 derniere_maj = datetime("now") 
-                            WHERE id = 1
-                        ''', (points,))
+                            WHERE league_id = ?
+                        ''', (points, partition[0]))
+            
+            for j, (nb, reussies, points) in sorted(journees.items()):
+                agregats.enregistrer_journee(cursor, partition, j, nb, reussies, points)
+            valides += agregats.regler_predictions_zeus(cursor, partition)
+            if valides:
+                utils.marquer_donnees_modifiees(cursor, "scoring")
     except Exception as e:
         logger.error(f"Erreur lors de la mise à jour du scoring : {e}", exc_info=True)
         print(f"❌ Erreur lors de la mise à jour du scoring : {e}")
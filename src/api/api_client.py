@@ -8,8 +8,13 @@ Date: Janvier 2025
 
 import requests
 import json
+import threading
+import time
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Optional
 
+from src.core import config
+
 # ==================== CONFIGURATION ====================
 
 # Headers HTTP cruciaux pour ne pas être bloqué (Erreur 403)
@@ -23,7 +28,101 @@ HEADERS = {
 }
 
 BASE_URL = "https://hg-event-api-prod.sporty-tech.net/api"
-LEAGUE_ID = 8035  # ID de la ligue par défaut
+LEAGUE_ID = config.LEAGUE_ID  # ID de la ligue par défaut
+
+# Journal de capture des réponses brutes (cf capture_log), désactivé par défaut
+_journal_capture = None
+
+# ==================== HTTP PARTAGÉ ====================
+
+class LimiteurDebit:
+    """
+    Seau à jetons partagé entre threads : au plus `par_seconde` requêtes par seconde
+    en régime établi, avec des rafales jusqu'à `rafale` requêtes.
+    """
+    def __init__(self, par_seconde: float, rafale: Optional[int] = None):
+        self.par_seconde = par_seconde
+        self.rafale = rafale or max(1, int(par_seconde))
+        self._jetons = float(self.rafale)
+        self._dernier = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquerir(self):
+        """Bloque jusqu'à obtenir un jeton."""
+        while True:
+            with self._lock:
+                maintenant = time.monotonic()
+                self._jetons = min(self.rafale, self._jetons + (maintenant - self._dernier) * self.par_seconde)
+                self._dernier = maintenant
+                if self._jetons >= 1:
+                    self._jetons -= 1
+                    return
+                attente = (1 - self._jetons) / self.par_seconde
+            time.sleep(attente)
+
+_session = None          # Pool de connexions HTTP (keep-alive), partagé par toutes les ligues
+_limiteur = None         # LimiteurDebit optionnel
+_session_lock = threading.RLock()
+
+def configurer_http(taille_pool: int = 10, requetes_par_seconde: Optional[float] = None):
+    """
+    Configure le pool HTTP partagé et le limiteur de débit (ex: surveillance multi-ligues).
+    
+    Args:
+        taille_pool: Connexions conservées par hôte
+        requetes_par_seconde: Débit maximum toutes ligues confondues (None = illimité)
+    """
+    global _session, _limiteur
+    session = requests.Session()
+    adaptateur = HTTPAdapter(pool_connections=taille_pool, pool_maxsize=taille_pool)
+    session.mount("https://", adaptateur)
+    session.mount("http://", adaptateur)
+    with _session_lock:
+        ancienne, _session = _session, session
+        _limiteur = LimiteurDebit(requetes_par_seconde) if requetes_par_seconde else None
+    if ancienne is not None:
+        ancienne.close()
+
+def _get(url: str, **kwargs):
+    """GET via le pool partagé, après passage par le limiteur de débit."""
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                configurer_http()
+    if _limiteur is not None:
+        _limiteur.acquerir()
+    return _session.get(url, headers=HEADERS, **kwargs)
+
+# ==================== CAPTURE ====================
+
+def activer_capture(dossier: str):
+    """
+    Active l'enregistrement de chaque réponse brute dans un journal compressé.
+    
+    Args:
+        dossier: Dossier du journal (segments gzip + index)
+    """
+    global _journal_capture
+    from src.api.capture_log import JournalCapture
+    desactiver_capture()
+    _journal_capture = JournalCapture(dossier)
+    print(f"[CAPTURE] Réponses API enregistrées dans {dossier}")
+
+def desactiver_capture():
+    """Ferme le journal de capture s'il est actif."""
+    global _journal_capture
+    if _journal_capture is not None:
+        _journal_capture.fermer()
+        _journal_capture = None
+
+def _capturer(endpoint: str, params: Optional[Dict], data):
+    journal = _journal_capture
+    if journal is not None:
+        try:
+            journal.ajouter(endpoint, params, data)
+        except Exception as e:
+            # La capture ne doit jamais interrompre la collecte
+            print(f"⚠️ Capture {endpoint} impossible : {e}")
 
 # ==================== FONCTIONS API ====================
 
@@ -34,7 +133,7 @@ def get_ranking(league_id: int = LEAGUE_ID) -> List[Dict]:
     url = f"{BASE_URL}/instantleagues/{league_id}/ranking"
     
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
+        response = _get(url, timeout=15)
         
         # Gestion specifique 502/503 (Maintenance)
         if response.status_code in [502, 503, 504]:
@@ -43,6 +142,7 @@ def get_ranking(league_id: int = LEAGUE_ID) -> List[Dict]:
             
         response.raise_for_status() 
         data = response.json()
+        _capturer("ranking", {"league_id": league_id}, data)
         return data.get("teams", [])
     
     except requests.exceptions.Timeout:
@@ -60,13 +160,15 @@ def get_recent_results(league_id: int = LEAGUE_ID, skip: int = 0, take: int = 5)
     params = {"skip": skip, "take": take}
     
     try:
-        response = requests.get(url, headers=HEADERS, params=params, timeout=15)
+        response = _get(url, params=params, timeout=15)
         
         if response.status_code in [502, 503, 504]:
             return {"rounds": []}
             
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        _capturer("results", {"league_id": league_id, **params}, data)
+        return data
     
     except requests.exceptions.RequestException as e:
         print(f"❌ Erreur API Results : {e}")
@@ -79,13 +181,15 @@ def get_upcoming_matches(league_id: int = LEAGUE_ID) -> Dict:
     url = f"{BASE_URL}/instantleagues/{league_id}/matches"
     
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
+        response = _get(url, timeout=15)
         
         if response.status_code in [502, 503, 504]:
             return {"rounds": []}
             
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        _capturer("matches", {"league_id": league_id}, data)
+        return data
     
     except requests.exceptions.RequestException as e:
         print(f"❌ Erreur API Matches : {e}")
@@ -10,23 +10,21 @@ import time
 import logging
 import sys
 import os
+from contextlib import nullcontext
 from typing import Optional, Dict
 from datetime import datetime
 
 # Ajouter le chemin du projet
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from src.api.api_client import get_recent_results, get_ranking, get_upcoming_matches
-from src.api.results_filter import extract_results_minimal
-from src.api.matches_filter import extract_matches_with_local_ids
-from src.api.db_integration import insert_api_ranking, insert_api_results, insert_api_matches
-from src.core.database import get_db_connection
+from src.api import api_client, payload_dedup, reconciliation, season_rollover
+from src.api.results_filter import extract_results_minimal, iter_result_rows
+from src.api.matches_filter import extract_matches_with_local_ids, iter_match_rows
+from src.api.db_integration import insert_api_ranking, insert_match_rows, insert_result_rows
+from src.core import config
+from src.core.database import get_db_connection, get_partition
 from src.core.archive import archiver_session, reinitialiser_tables_session
 
-# ZEUS Imports
-from src.zeus import archive_manager, inference
-from src.zeus.agent import ZeusAgent
-
 logger = logging.getLogger(__name__)
 
 # ==================== CONFIGURATION ====================
@@ -36,10 +34,49 @@ MONITOR_CONFIG = {
     "MAX_RETRIES": 3,              # Nombre de tentatives si erreur
     "RETRY_DELAY": 10,             # Delai entre tentatives (secondes)
     "LOG_ACTIVITY": True,          # Logger l'activite
+    "CAPTURE_DIR": os.getenv("GODMOD_CAPTURE_DIR"),  # Journal des reponses brutes (desactive si vide)
 }
 
 # ==================== FONCTIONS HELPER ====================
 
+def _phase(recorder, nom: str, journee: int):
+    """
+    Contexte de mesure d'une phase du pipeline (latence, memoire)
+    
+    Args:
+        recorder: Objet exposant phase(nom, journee) ou None
+        nom: Nom de la phase (collecte, callback, archivage...)
+        journee: Journee concernee
+    """
+    if recorder is None:
+        return nullcontext()
+    return recorder.phase(nom, journee)
+
+
+def _traiter_matchs(matches_raw) -> tuple:
+    """
+    Filtre et insere les cotes d'une reponse "matches", sauf si elle est identique
+    a la derniere reponse inseree (cf payload_dedup).
+    
+    Args:
+        matches_raw: Reponse brute de get_upcoming_matches
+    
+    Returns:
+        (nombre de matchs inseres ou None si aucun match, True si reponse inchangee)
+    """
+    verification = payload_dedup.verifier("matches", "limit=2", matches_raw)
+    if verification.inchange:
+        return verification.valeur, True
+    
+    # Reponse brute -> lignes typees en une passe
+    lignes = list(iter_match_rows(matches_raw, limit=2))
+    if not lignes:
+        return None, False
+    count = insert_match_rows(lignes)
+    payload_dedup.confirmer("matches", "limit=2", verification, lignes=count, valeur=count)
+    return count, False
+
+
 def get_max_journee_in_db() -> int:
     """
     Recupere la derniere journee presente en base de donnees
@@ -50,7 +87,7 @@ def get_max_journee_in_db() -> int:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT MAX(journee) FROM resultats")
+            cursor.execute("SELECT MAX(journee) FROM resultats WHERE league_id = ? AND session_id = ?", get_partition(conn))
             result = cursor.fetchone()[0]
             return result if result else 0
     except Exception as e:
@@ -58,21 +95,51 @@ def get_max_journee_in_db() -> int:
         return 0
 
 
-def get_max_journee_from_api() -> Optional[int]:
+def get_derniere_journee_saison() -> int:
+    """
+    Derniere journee d'une saison de la ligue active : championnat aller-retour,
+    2 * (nb_equipes - 1) journees (equipes enregistrees en base, cf validation.py).
+    
+    Returns:
+        Numero de la derniere journee (d'apres config.EQUIPES si aucune equipe en base)
+    """
+    nb_equipes = 0
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM equipes WHERE league_id = ?", (get_partition(conn)[0],))
+            nb_equipes = cursor.fetchone()[0]
+    except Exception as e:
+        logger.error(f"Erreur lors du comptage des equipes : {e}")
+    return 2 * ((nb_equipes or len(config.EQUIPES)) - 1)
+
+
+def get_max_journee_from_api(source=None) -> Optional[int]:
     """
     Recupere la derniere journee disponible sur l'API via les resultats
     
+    Args:
+        source: Source de donnees (par defaut le module api_client)
+    
     Returns:
         Numero de la derniere journee ou None si erreur
     """
+    source = source or api_client
     try:
         # Recuperer les 2 dernieres journees pour etre sur
-        results_raw = get_recent_results(skip=0, take=2)
+        results_raw = source.get_recent_results(skip=0, take=2)
+        
+        # Reponse identique au cycle precedent : meme journee, sans re-filtrage
+        verification = payload_dedup.verifier("results", "take=2", results_raw)
+        if verification.inchange:
+            return verification.valeur
+        
         results_filtered = extract_results_minimal(results_raw)
         
         if results_filtered:
             # Trouver la journee max
             max_journee = max(r["roundNumber"] for r in results_filtered)
+            payload_dedup.confirmer("results", "take=2", verification, valeur=max_journee)
             return max_journee
         
         return None
@@ -81,15 +148,19 @@ def get_max_journee_from_api() -> Optional[int]:
         return None
 
 
-def get_journee_from_cotes() -> Optional[int]:
+def get_journee_from_cotes(source=None) -> Optional[int]:
     """
     Recupere la premiere journee disponible dans les cotes (pour detecter nouvelle saison)
     
+    Args:
+        source: Source de donnees (par defaut le module api_client)
+    
     Returns:
         Numero de la journee dans les cotes ou None si erreur
     """
+    source = source or api_client
     try:
-        matches_raw = get_upcoming_matches()
+        matches_raw = source.get_upcoming_matches()
         matches_filtered = extract_matches_with_local_ids(matches_raw, limit=1)
         
         if matches_filtered and len(matches_filtered) > 0:
@@ -104,16 +175,18 @@ def get_journee_from_cotes() -> Optional[int]:
         return None
 
 
-def collect_full_data(journee: int) -> bool:
+def collect_full_data(journee: int, source=None) -> bool:
     """
     Collecte complete des donnees pour une nouvelle journee detectee
     
     Args:
         journee: Numero de la journee detectee
+        source: Source de donnees (par defaut le module api_client)
         
     Returns:
         True si succes, False sinon
     """
+    source = source or api_client
     logger.info(f"[COLLECTE] Demarrage collecte complete pour journee {journee}")
     print(f"\n{'='*60}")
     print(f"   [NEW] NOUVELLE JOURNEE DETECTEE : J{journee}")
@@ -124,11 +197,17 @@ def collect_full_data(journee: int) -> bool:
     # 1. Recuperer les resultats
     print(f"\n[1/3] Recuperation des resultats...")
     try:
-        results_raw = get_recent_results(skip=0, take=4)
-        results_filtered = extract_results_minimal(results_raw)
+        results_raw = source.get_recent_results(skip=0, take=4)
+        verification = payload_dedup.verifier("results", "take=4", results_raw)
+        lignes = None if verification.inchange else list(iter_result_rows(results_raw))
         
-        if results_filtered:
-            count = insert_api_results(results_filtered)
+        if verification.inchange:
+            print(f"   [OK] Resultats inchanges, insertion ignoree")
+        elif lignes:
+            count = insert_result_rows(lignes)
+            payload_dedup.confirmer("results", "take=4", verification, lignes=count)
+            # Les buts du classement sont recalcules depuis les resultats
+            payload_dedup.oublier("ranking")
             print(f"   [OK] {count} resultats inseres")
             logger.info(f"[COLLECTE] Resultats inseres : {count}")
         else:
@@ -142,10 +221,14 @@ def collect_full_data(journee: int) -> bool:
     # 2. Recuperer le classement
     print(f"\n[2/3] Recuperation du classement...")
     try:
-        ranking_data = get_ranking()
+        ranking_data = source.get_ranking()
+        verification = payload_dedup.verifier("ranking", "classement", ranking_data)
         
-        if ranking_data:
+        if verification.inchange:
+            print(f"   [OK] Classement inchange, insertion ignoree")
+        elif ranking_data:
             count = insert_api_ranking(ranking_data)
+            payload_dedup.confirmer("ranking", "classement", verification, lignes=count)
             print(f"   [OK] {count} equipes inserees")
             logger.info(f"[COLLECTE] Classement insere : {count} equipes")
         else:
@@ -160,11 +243,11 @@ def collect_full_data(journee: int) -> bool:
     journee_cotes = journee + 1
     print(f"\n[3/3] Recuperation des cotes pour J{journee_cotes}...")
     try:
-        matches_raw = get_upcoming_matches()
-        matches_filtered = extract_matches_with_local_ids(matches_raw, limit=2)
+        count, inchange = _traiter_matchs(source.get_upcoming_matches())
         
-        if matches_filtered:
-            count = insert_api_matches(matches_filtered)
+        if inchange:
+            print(f"   [OK] Cotes inchangees, insertion ignoree")
+        elif count is not None:
             print(f"   [OK] {count} matchs avec cotes inseres")
             logger.info(f"[COLLECTE] Cotes inserees : {count} matchs")
         else:
@@ -174,6 +257,7 @@ def collect_full_data(journee: int) -> bool:
         logger.error(f"[COLLECTE] Erreur cotes : {e}")
         # Les cotes ne sont pas critiques, on ne met pas success=False
     
+    logger.info(f"[DEDUP] {payload_dedup.get_statistiques()}")
     print(f"\n{'='*60}")
     if success:
         print(f"   [OK] COLLECTE TERMINEE AVEC SUCCES")
@@ -186,13 +270,19 @@ def collect_full_data(journee: int) -> bool:
 
 # ==================== BOUCLE DE SURVEILLANCE ====================
 
-def start_monitoring(callback_on_new_journee=None, verbose=True):
+def start_monitoring(callback_on_new_journee=None, verbose=True, clock=None, source=None,
+                     stop_event=None, recorder=None):
     """
     Demarre la surveillance continue de l'API
     
     Args:
         callback_on_new_journee: Fonction optionnelle a appeler apres collecte
         verbose: Afficher les messages de surveillance
+        clock: Horloge injectable exposant sleep(s) et now() (par defaut: temps reel)
+        source: Source de donnees exposant get_recent_results/get_ranking/get_upcoming_matches
+                (par defaut le module api_client)
+        stop_event: threading.Event optionnel pour arreter la boucle proprement
+        recorder: Objet optionnel exposant phase(nom, journee) pour mesurer chaque phase
         
     Example:
         def my_callback(journee):
@@ -201,6 +291,10 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
         
         start_monitoring(callback_on_new_journee=my_callback)
     """
+    source = source or api_client
+    sleep = clock.sleep if clock else time.sleep
+    now = clock.now if clock else datetime.now
+    
     logger.info("[MONITOR] Demarrage de la surveillance API")
     print("\n" + "="*60)
     print("   [INFO] SURVEILLANCE API ACTIVEE")
@@ -209,23 +303,32 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
     print(f"   Mode: Detection automatique nouvelles journees")
     print("="*60 + "\n")
     
+    # Worker de transition de saison (reprend les jobs interrompus)
+    season_rollover.demarrer_worker(recorder)
+    
+    # Capture optionnelle des reponses brutes (rejouables via capture_log.rejouer)
+    if MONITOR_CONFIG["CAPTURE_DIR"] and source is api_client:
+        api_client.activer_capture(MONITOR_CONFIG["CAPTURE_DIR"])
+    
     last_journee_db = get_max_journee_in_db()
-    logger.info(f"[MONITOR] Journee initiale en BDD : J{last_journee_db}")
+    derniere_journee = get_derniere_journee_saison()
+    logger.info(f"[MONITOR] Journee initiale en BDD : J{last_journee_db} (saison en {derniere_journee} journees)")
     print(f"[INFO] Journee actuelle en BDD : J{last_journee_db}")
     print(f"[INFO] Surveillance en cours... (CTRL+C pour arreter)\n")
     
     consecutive_errors = 0
+    derniere_reconciliation = None
     
     try:
-        while True:
+        while not (stop_event and stop_event.is_set()):
             try:
                 # Verifier l'API
-                api_journee = get_max_journee_from_api()
+                api_journee = get_max_journee_from_api(source)
                 
                 # Si les resultats sont vides (fin de saison), verifier les cotes pour J1
                 journee_cotes = None
                 if api_journee is None:
-                    journee_cotes = get_journee_from_cotes()
+                    journee_cotes = get_journee_from_cotes(source)
                     logger.info(f"[MONITOR] Resultats vides, verification cotes -> J{journee_cotes}")
                 
                 if api_journee is None and journee_cotes is None:
@@ -238,7 +341,7 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
                     print(f"[RETRY] Erreur connexion API ({consecutive_errors}). Attente {wait_time}s...")
                     
                     # On ne break plus jamais la boucle, on attend juste plus longtemps
-                    time.sleep(wait_time)
+                    sleep(wait_time)
                     continue
 
                 
@@ -247,18 +350,18 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
                 
                 # --- LOGIQUE DE TRANSITION DE SAISON ---
                 
-                # 1. Fin de Saison (J37 -> J38)
-                # Si on est a J37 et que l'API annonce J38, on ignore J38 pour preparer la transition
-                if last_journee_db == 37 and api_journee == 38:
+                # 1. Fin de Saison (J37 -> J38 pour 20 equipes)
+                # Si on est a l'avant-derniere journee et que l'API annonce la derniere, on l'ignore pour preparer la transition
+                if last_journee_db == derniere_journee - 1 and api_journee == derniere_journee:
                     if verbose and MONITOR_CONFIG["LOG_ACTIVITY"]:
-                        timestamp = datetime.now().strftime("%H:%M:%S")
-                        print(f"[{timestamp}] [INFO] Fin de saison (J38) detectee. En attente de J1...", end='\r')
-                    time.sleep(MONITOR_CONFIG['POLL_INTERVAL'])
+                        timestamp = now().strftime("%H:%M:%S")
+                        print(f"[{timestamp}] [INFO] Fin de saison (J{derniere_journee}) detectee. En attente de J1...", end='\r')
+                    sleep(MONITOR_CONFIG['POLL_INTERVAL'])
                     continue
 
                 # 2. Nouvelle Saison (Detection J1 via cotes)
-                # Si on etait en fin de saison (>=37) OU si la BDD est vide et qu'on voit J1 dans les cotes -> RESET
-                if journee_cotes == 1 and (last_journee_db >= 37 or last_journee_db == 0):
+                # Si on etait en fin de saison (>= avant-derniere journee) OU si la BDD est vide et qu'on voit J1 dans les cotes -> RESET
+                if journee_cotes == 1 and (last_journee_db >= derniere_journee - 1 or last_journee_db == 0):
                     logger.info(f"[MONITOR] Nouvelle saison detectee via cotes : J1 (Ancienne: J{last_journee_db})")
                     print(f"\n" + "="*60)
                     print(f"   [NEW] NOUVELLE SAISON DETECTEE (J1) !")
@@ -266,59 +369,46 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
                     print(f"   [INFO] Detection via les cotes (resultats vides)")
                     print("="*60)
                     
-
-
-                    # A. Archiver
-                    print("\n[AUTO] Archivage de la saison terminee...")
-                    fichier = archiver_session()
-                    if fichier:
-                        print(f"   [OK] Archive creee : {fichier}")
-
-                    # --- ZEUS AUTO-UPDATE START ---
-                    print("\n⚡ [ZEUS] Auto-Amelioration en cours...")
-                    try:
-                        # 1. Consolidation Mémoire
-                        print("   1. Consolidation de la memoire...")
-                        count = archive_manager.rebuild_history_from_db()
-                        print(f"      -> {count} souvenirs enregistres.")
-                        
-                        # 2. Entraînement Flash (10k steps)
-                        print("   2. Entrainement Flash (10k steps)...")
-                        agent = ZeusAgent(model_name="zeus_v2") # Toujours sur v2
-                        agent.train(total_timesteps=10000)
-                        print("      -> Cerveau mis a jour.")
+                    # A. Figer la session et planifier archivage + auto-amelioration ZEUS en arriere-plan
+                    # (archivage CSV, memoire, entrainement flash, hot reload : cf season_rollover)
+                    print("\n[AUTO] Snapshot de la saison terminee...")
+                    if last_journee_db > 0:
+                        with _phase(recorder, "snapshot", last_journee_db):
+                            job_id = season_rollover.planifier_transition(last_journee_db)
                         
-                        # 3. Hot Reload
-                        print("   3. Hot Reload...")
-                        inference.reload_model()
-                        print("      -> Nouveau modele charge en memoire.")
-                        
-                    except Exception as e:
-                        print(f"   ❌ Erreur Auto-Update Zeus : {e}")
-                        logger.error(f"Zeus Auto-Update Failed: {e}", exc_info=True)
-                    # --- ZEUS AUTO-UPDATE END ---
+                        if job_id:
+                            print(f"   [OK] Transition planifiee en arriere-plan (job {job_id})")
+                        else:
+                            # Sans snapshot, on archive la base avant de la reinitialiser (sans re-entrainement)
+                            print("   [WARN] Snapshot impossible, archivage synchrone de secours...")
+                            with _phase(recorder, "archivage", last_journee_db):
+                                fichier = archiver_session()
+                            if fichier:
+                                print(f"   [OK] Archive creee : {fichier}")
                     
                     # B. Reinitialiser
                     print("\n[AUTO] Reinitialisation de la base de donnees...")
-                    reinitialiser_tables_session()
+                    with _phase(recorder, "reinitialisation", last_journee_db):
+                        reinitialiser_tables_session()
+                        payload_dedup.oublier()  # Nouvelle session vide : plus aucune reponse n'y est deja
                     last_journee_db = 0
                     print("   [OK] Tables reinitialisees")
                     
                     # C. Collecter J1 (cotes seulement, resultats vides)
                     print("[INFO] Collecte des cotes pour J1 (resultats non disponibles)...")
                     try:
-                        matches_raw = get_upcoming_matches()
-                        matches_filtered = extract_matches_with_local_ids(matches_raw, limit=2)
+                        with _phase(recorder, "collecte", 1):
+                            count, _ = _traiter_matchs(source.get_upcoming_matches())
                         
-                        if matches_filtered:
-                            count = insert_api_matches(matches_filtered)
+                        if count is not None:
                             print(f"   [OK] {count} matchs avec cotes inseres pour J1")
                             logger.info(f"[COLLECTE] Cotes J1 inserees : {count} matchs")
                             last_journee_db = 1
                             
                             # Callback IA (optionnel pour J1)
                             if callback_on_new_journee:
-                                callback_on_new_journee(1)
+                                with _phase(recorder, "callback", 1):
+                                    callback_on_new_journee(1)
                         else:
                             print(f"   [WARN] Aucune cote recuperee pour J1")
                     except Exception as e:
@@ -337,7 +427,8 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
                     print(f"   BDD : J{last_journee_db} -> API : J{api_journee}")
                     
                     # Collecte complete
-                    success = collect_full_data(api_journee)
+                    with _phase(recorder, "collecte", api_journee):
+                        success = collect_full_data(api_journee, source)
                     
                     if success:
                         # Mettre a jour notre reference
@@ -348,7 +439,8 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
                         if callback_on_new_journee:
                             try:
                                 logger.info(f"[MONITOR] Appel callback utilisateur pour J{api_journee}")
-                                callback_on_new_journee(api_journee)
+                                with _phase(recorder, "callback", api_journee):
+                                    callback_on_new_journee(api_journee)
                             except Exception as e:
                                 logger.error(f"[MONITOR] Erreur dans callback utilisateur : {e}")
                                 print(f"⚠️ Erreur dans callback : {e}")
@@ -358,7 +450,7 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
                 
                 elif verbose and MONITOR_CONFIG["LOG_ACTIVITY"]:
                     # Message de surveillance
-                    timestamp = datetime.now().strftime("%H:%M:%S")
+                    timestamp = now().strftime("%H:%M:%S")
                     print(f"[{timestamp}] [INFO] Surveillance... (BDD: J{last_journee_db}, API: J{api_journee})", end='\r')
                 
                 # --- NOUVEAU : VERIFICATION PROACTIVE DES COTES ---
@@ -367,23 +459,36 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
                     next_j = api_journee + 1
                     with get_db_connection() as conn:
                         cursor = conn.cursor()
-                        cursor.execute("SELECT COUNT(*) FROM cotes WHERE journee = ?", (next_j,))
+                        cursor.execute("SELECT COUNT(*) FROM cotes WHERE league_id = ? AND session_id = ? AND journee = ?",
+                                       get_partition(conn) + (next_j,))
                         has_cotes = cursor.fetchone()[0] > 0
                         
                     if not has_cotes:
                         # On tente de recuperer les cotes sans attendre la prochaine journee
                         try:
-                            matches_raw = get_upcoming_matches()
-                            matches_filtered = extract_matches_with_local_ids(matches_raw, limit=2)
-                            if matches_filtered:
-                                count = insert_api_matches(matches_filtered)
-                                if count > 0:
-                                    logger.info(f"[MONITOR] Cotes pour J{next_j} recuperees proactivement")
+                            # Reponse inchangee : cotes de J+1 toujours absentes, rien a reecrire
+                            count, inchange = _traiter_matchs(source.get_upcoming_matches())
+                            if count and not inchange:
+                                logger.info(f"[MONITOR] Cotes pour J{next_j} recuperees proactivement")
                         except Exception as e:
                             pass # On reessayera au prochain tour
                 
+                # --- RECONCILIATION PERIODIQUE BASE / API ---
+                # Repare les journees manquees ou partiellement collectees (budget de requetes borne)
+                intervalle = reconciliation.RECONCILIATION_CONFIG["INTERVALLE"]
+                if intervalle and api_journee and (derniere_reconciliation is None or
+                        (now() - derniere_reconciliation).total_seconds() >= intervalle):
+                    derniere_reconciliation = now()
+                    try:
+                        with _phase(recorder, "reconciliation", api_journee):
+                            bilan = reconciliation.reconcilier(source)
+                        if bilan["journees_reparees"]:
+                            print(f"\n[RECONCILIATION] Journees reparees : {bilan['journees_reparees']}")
+                    except Exception as e:
+                        logger.warning(f"[MONITOR] Reconciliation impossible : {e}")
+                
                 # Attendre avant prochain check
-                time.sleep(MONITOR_CONFIG['POLL_INTERVAL'])
+                sleep(MONITOR_CONFIG['POLL_INTERVAL'])
                 
             except KeyboardInterrupt:
                 raise  # Propager pour sortir proprement
@@ -396,7 +501,7 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
                     logger.error("[MONITOR] Trop d'erreurs, arret surveillance")
                     break
                 
-                time.sleep(MONITOR_CONFIG['RETRY_DELAY'])
+                sleep(MONITOR_CONFIG['RETRY_DELAY'])
     
     except KeyboardInterrupt:
         print("\n\n" + "="*60)
@@ -405,6 +510,8 @@ def start_monitoring(callback_on_new_journee=None, verbose=True):
         logger.info("[MONITOR] Arret surveillance par utilisateur")
     
     finally:
+        if source is api_client:
+            api_client.desactiver_capture()
         logger.info(f"[MONITOR] Fin surveillance - Derniere journee: J{last_journee_db}")
 
 
@@ -0,0 +1,166 @@
+"""
+Rattrapage de l'historique des resultats d'une saison
+Recupere toutes les journees jouees (get_recent_results pagine), y compris celles
+manquees pendant un arret du moniteur, puis reconstruit une seule fois le classement
+et les snapshots ZEUS.
+
+- La premiere page donne la derniere journee jouee : les pages suivantes sont connues
+  d'avance et recuperees en parallele (PARALLELES requetes au plus en vol), sous un
+  limiteur de debit propre au rattrapage (en plus de celui de api_client).
+- Une page vide avant la journee 1 est une erreur (maintenance, 5xx) : reessayee avec
+  un delai croissant.
+- Seules les journees absentes ou differentes de la base (empreintes, cf reconciliation)
+  sont ecrites, en une transaction.
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.api import api_client, payload_dedup
+from src.api.api_client import LimiteurDebit
+from src.api.data_comparator import normalize_score
+from src.api.db_integration import insert_api_ranking, insert_api_results
+from src.api.reconciliation import empreintes_api, empreintes_base
+from src.api.results_filter import extract_results_minimal
+from src.core import database
+
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURATION ====================
+
+BACKFILL_CONFIG = {
+    "TAILLE_PAGE": 10,             # Journees par requete
+    "PARALLELES": 3,               # Requetes simultanees au plus
+    "REQUETES_PAR_SECONDE": 4.0,   # Debit maximum du rattrapage
+    "TENTATIVES": 3,               # Essais par page (page vide = erreur API)
+    "DELAI_TENTATIVE": 1.0,        # Secondes avant le 1er nouvel essai (double ensuite)
+}
+
+# ==================== COLLECTE ====================
+
+def _recuperer_page(source, limiteur: LimiteurDebit, skip: int, take: int, tentatives: int,
+                    delai: float, sleep=time.sleep) -> Tuple[List[Dict], int]:
+    """
+    Une page de resultats filtree, reessayee si l'API la renvoie vide.
+
+    Returns:
+        (journees de la page, requetes effectuees)
+    """
+    for essai in range(tentatives):
+        if essai:
+            sleep(delai * 2 ** (essai - 1))
+        limiteur.acquerir()
+        rounds = extract_results_minimal(source.get_recent_results(skip=skip, take=take))
+        if rounds:
+            return rounds, essai + 1
+        logger.warning(f"[BACKFILL] Page skip={skip} vide (essai {essai + 1}/{tentatives})")
+    return [], tentatives
+
+
+def recuperer_saison(source=None, taille_page: Optional[int] = None, paralleles: Optional[int] = None,
+                     requetes_par_seconde: Optional[float] = None, sleep=time.sleep) -> Dict:
+    """
+    Recupere toutes les journees jouees de la saison en cours.
+
+    Args:
+        source: Source de donnees (par defaut le module api_client)
+        taille_page: Journees par requete
+        paralleles: Requetes simultanees au plus
+        requetes_par_seconde: Debit maximum
+
+    Returns:
+        {"journees": {numero: round}, "derniere": derniere journee jouee (0 si aucune),
+         "manquantes": journees introuvables, "requetes": nombre de requetes}
+    """
+    source = source or api_client
+    taille_page = taille_page or BACKFILL_CONFIG["TAILLE_PAGE"]
+    paralleles = paralleles or BACKFILL_CONFIG["PARALLELES"]
+    limiteur = LimiteurDebit(requetes_par_seconde or BACKFILL_CONFIG["REQUETES_PAR_SECONDE"], rafale=paralleles)
+    tentatives, delai = BACKFILL_CONFIG["TENTATIVES"], BACKFILL_CONFIG["DELAI_TENTATIVE"]
+    compteur = {"requetes": 0}
+    verrou = threading.Lock()
+
+    def page(skip):
+        rounds, requetes = _recuperer_page(source, limiteur, skip, taille_page, tentatives, delai, sleep)
+        with verrou:
+            compteur["requetes"] += requetes
+        return rounds
+
+    # 1. Page la plus recente : derniere journee jouee, donc nombre de pages
+    premiere = page(0)
+    journees = {r["roundNumber"]: r for r in premiere if r.get("roundNumber") is not None}
+    derniere = max(journees, default=0)
+
+    # 2. Pages plus anciennes en parallele (l'API renvoie les journees de la plus recente a la plus ancienne)
+    skips = list(range(taille_page, derniere, taille_page))
+    if skips:
+        with ThreadPoolExecutor(max_workers=paralleles, thread_name_prefix="backfill") as executor:
+            for rounds in executor.map(page, skips):
+                for r in rounds:
+                    if r.get("roundNumber") is not None:
+                        journees.setdefault(r["roundNumber"], r)
+
+    manquantes = [j for j in range(1, derniere + 1) if j not in journees]
+    if manquantes:
+        logger.warning(f"[BACKFILL] Journees introuvables sur l'API : {manquantes}")
+    return {"journees": journees, "derniere": derniere, "manquantes": manquantes,
+            "requetes": compteur["requetes"]}
+
+# ==================== RATTRAPAGE ====================
+
+def rattraper_saison(source=None, reconstruire: bool = True, **options) -> Dict:
+    """
+    Rattrape la saison en cours dans la partition active : collecte parallele, insertion
+    groupee des journees absentes ou differentes, puis classement et snapshots ZEUS
+    reconstruits une seule fois.
+
+    Args:
+        source: Source de donnees (par defaut le module api_client)
+        reconstruire: Reconstruire classement et snapshots ZEUS apres insertion
+        **options: taille_page, paralleles, requetes_par_seconde (cf recuperer_saison)
+
+    Returns:
+        Bilan : journees recuperees, inserees, manquantes, requetes, duree
+    """
+    source = source or api_client
+    debut = time.monotonic()
+    collecte = recuperer_saison(source, **options)
+    journees = collecte["journees"]
+
+    # Journees deja identiques en base ignorees
+    api = empreintes_api(journees.values(), lambda m: normalize_score(m) or (None, None))
+    base = empreintes_base("resultats", api)
+    a_inserer = [journees[j] for j in sorted(journees) if api[j] != base.get(j)]
+
+    inseres = insert_api_results(a_inserer) if a_inserer else 0
+    bilan = {
+        "derniere": collecte["derniere"],
+        "journees_recuperees": len(journees),
+        "journees_inserees": [r["roundNumber"] for r in a_inserer],
+        "matchs_inseres": inseres,
+        "manquantes": collecte["manquantes"],
+        "requetes": collecte["requetes"],
+        "snapshots_zeus": 0,
+    }
+
+    if a_inserer and reconstruire:
+        # Les reponses memorisees ne decrivent plus la base
+        payload_dedup.oublier("results")
+        payload_dedup.oublier("ranking")
+        classement = source.get_ranking()
+        bilan["requetes"] += 1
+        if classement:
+            insert_api_ranking(classement)
+        from src.zeus.archive_manager import rebuild_history_from_db
+        bilan["snapshots_zeus"] = rebuild_history_from_db()
+
+    bilan["duree"] = round(time.monotonic() - debut, 3)
+    logger.info(f"[BACKFILL] Ligue {database.get_ligue_active()} : {len(a_inserer)} journees inserees "
+                f"sur {len(journees)} ({bilan['requetes']} requetes, {bilan['duree']}s)")
+    return bilan
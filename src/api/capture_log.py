@@ -0,0 +1,326 @@
+"""
+Journal de capture des reponses brutes de l'API (optionnel)
+Chaque reponse de get_ranking / get_recent_results / get_upcoming_matches est
+ajoutee a des segments JSONL compresses (gzip), avec rotation et un index par
+endpoint et horodatage, puis peut etre rejouee dans le pipeline
+results_filter / matches_filter / db_integration (backfill, benchmarks reproductibles).
+
+Format :
+    <dossier>/segment_000001.jsonl.gz   Une ligne JSON compacte par reponse
+    <dossier>/index.jsonl               Une ligne par reponse : {t, e, s, l, m}
+Une reponse identique a la precedente pour le meme endpoint et les memes
+parametres n'est pas recopiee (m=1 : "meme contenu"), dans la limite du segment
+courant : le premier enregistrement d'un segment est toujours complet.
+
+Le segment n'est vide (flush gzip, qui coupe la fenetre de compression) que tous
+les FLUSH_ENREGISTREMENTS enregistrements ou FLUSH_INTERVALLE secondes, a la
+rotation et a la fermeture ; l'index n'est ecrit qu'apres le segment. Un arret
+brutal perd au plus les enregistrements depuis le dernier vidage (cf lire).
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURATION ====================
+
+CAPTURE_CONFIG = {
+    "SEGMENT_MAX_OCTETS": 8 * 1024 * 1024,   # Rotation apres 8 Mo de JSON (non compresse)
+    "NIVEAU_COMPRESSION": 5,                 # gzip 1-9 : bon compromis taille / CPU
+    "FLUSH_ENREGISTREMENTS": 50,             # Vidage du segment (puis de l'index) tous les N enregistrements
+    "FLUSH_INTERVALLE": 60,                  # ... ou des qu'un enregistrement arrive N secondes apres le dernier vidage
+}
+
+ENDPOINTS = ("ranking", "results", "matches")
+
+FICHIER_INDEX = "index.jsonl"
+_MOTIF_SEGMENT = re.compile(r"^segment_(\d+)\.jsonl\.gz$")
+
+
+def _nom_segment(numero: int) -> str:
+    return f"segment_{numero:06d}.jsonl.gz"
+
+
+def _cle(endpoint: str, params: Optional[Dict]) -> str:
+    return f"{endpoint}:{json.dumps(params or {}, sort_keys=True)}"
+
+# ==================== ECRITURE ====================
+
+class JournalCapture:
+    """
+    Journal append-only des reponses brutes.
+    Un segment n'est jamais rouvert en ecriture : a chaque ouverture du journal
+    (ou rotation), un nouveau segment est cree.
+    """
+
+    def __init__(self, dossier: str):
+        self.dossier = dossier
+        os.makedirs(dossier, exist_ok=True)
+        self._lock = threading.Lock()
+        self._segment = None       # Fichier gzip ouvert
+        self._nom = None
+        self._numero = max((int(m.group(1)) for m in map(_MOTIF_SEGMENT.match, os.listdir(dossier)) if m),
+                           default=0)
+        self._ligne = 0
+        self._octets = 0
+        self._empreintes = {}      # {cle: sha1} des derniers contenus du segment courant
+        self._index = open(os.path.join(dossier, FICHIER_INDEX), "a", encoding="utf-8")
+        self._index_en_attente = []  # Lignes d'index des enregistrements pas encore vides
+        self._dernier_vidage = time.monotonic()
+        self.nb_enregistres = 0
+        self.nb_identiques = 0
+
+    def _ouvrir_segment(self):
+        self._numero += 1
+        self._nom = _nom_segment(self._numero)
+        self._segment = gzip.open(os.path.join(self.dossier, self._nom), "wb",
+                                  compresslevel=CAPTURE_CONFIG["NIVEAU_COMPRESSION"])
+        self._ligne = 0
+        self._octets = 0
+        self._empreintes.clear()
+
+    def _ecrire_index(self):
+        # Apres le segment : l'index ne designe jamais une ligne non encore ecrite
+        if self._index_en_attente:
+            self._index.write("".join(self._index_en_attente))
+            self._index.flush()
+            self._index_en_attente.clear()
+        self._dernier_vidage = time.monotonic()
+
+    def _vider(self):
+        if self._segment is not None:
+            self._segment.flush()
+        self._ecrire_index()
+
+    def _fermer_segment(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        self._ecrire_index()
+
+    def ajouter(self, endpoint: str, params: Optional[Dict], payload, horodatage: Optional[float] = None):
+        """
+        Ajoute une reponse brute au journal.
+
+        Args:
+            endpoint: "ranking", "results" ou "matches"
+            params: Parametres de la requete (ex: {"skip": 0, "take": 2})
+            payload: JSON decode de la reponse
+            horodatage: Secondes Unix (maintenant par defaut)
+        """
+        t = round(horodatage if horodatage is not None else time.time(), 3)
+        donnees = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+        empreinte = hashlib.sha1(donnees.encode("utf-8")).hexdigest()
+        cle = _cle(endpoint, params)
+
+        with self._lock:
+            if self._segment is None or self._octets >= CAPTURE_CONFIG["SEGMENT_MAX_OCTETS"]:
+                self._fermer_segment()
+                self._ouvrir_segment()
+
+            identique = self._empreintes.get(cle) == empreinte
+            enregistrement = {"t": t, "e": endpoint, "p": params or {}}
+            if identique:
+                enregistrement["m"] = 1
+                self.nb_identiques += 1
+            else:
+                self._empreintes[cle] = empreinte
+            ligne = json.dumps(enregistrement, separators=(",", ":"), ensure_ascii=False)
+            if not identique:
+                ligne = f'{ligne[:-1]},"d":{donnees}}}'
+            brut = (ligne + "\n").encode("utf-8")
+
+            self._segment.write(brut)
+            self._index_en_attente.append(json.dumps(
+                {"t": t, "e": endpoint, "s": self._nom, "l": self._ligne, "m": int(identique)},
+                separators=(",", ":")) + "\n")
+
+            self._ligne += 1
+            self._octets += len(brut)
+            self.nb_enregistres += 1
+            if (len(self._index_en_attente) >= CAPTURE_CONFIG["FLUSH_ENREGISTREMENTS"]
+                    or time.monotonic() - self._dernier_vidage >= CAPTURE_CONFIG["FLUSH_INTERVALLE"]):
+                self._vider()
+
+    def vider(self):
+        """Rend lisibles (segment puis index) tous les enregistrements deja ajoutes."""
+        with self._lock:
+            self._vider()
+
+    def fermer(self):
+        """Ferme le segment courant et l'index."""
+        with self._lock:
+            self._fermer_segment()
+            self._index.close()
+
+# ==================== LECTURE ====================
+
+def lister(dossier: str, endpoint: Optional[str] = None,
+           depuis: Optional[float] = None, jusqu_a: Optional[float] = None) -> List[Dict]:
+    """
+    Interroge l'index sans decompresser les segments.
+
+    Args:
+        dossier: Dossier du journal
+        endpoint: Filtre sur l'endpoint (optionnel)
+        depuis, jusqu_a: Bornes d'horodatage incluses (optionnel)
+
+    Returns:
+        list: Entrees d'index {t, e, s, l, m} dans l'ordre d'enregistrement
+    """
+    chemin = os.path.join(dossier, FICHIER_INDEX)
+    if not os.path.exists(chemin):
+        return []
+    entrees = []
+    with open(chemin, encoding="utf-8") as f:
+        for ligne in f:
+            try:
+                entree = json.loads(ligne)
+            except ValueError:
+                break  # Derniere ligne tronquee (arret brutal)
+            if endpoint and entree["e"] != endpoint:
+                continue
+            if (depuis is not None and entree["t"] < depuis) or (jusqu_a is not None and entree["t"] > jusqu_a):
+                continue
+            entrees.append(entree)
+    return entrees
+
+
+def _lire_segment(chemin: str) -> Iterator[Dict]:
+    """Lit un segment en flux ; un segment non ferme (arret brutal) est lu jusqu'a la derniere ligne complete."""
+    try:
+        with gzip.open(chemin, "rb") as f:
+            for ligne in f:
+                if not ligne.endswith(b"\n"):
+                    return
+                yield json.loads(ligne)
+    except EOFError:
+        return
+
+
+def lire(dossier: str, endpoint: Optional[str] = None,
+         depuis: Optional[float] = None, jusqu_a: Optional[float] = None) -> Iterator[Dict]:
+    """
+    Relit les reponses capturees, dans l'ordre d'enregistrement.
+    Seuls les segments contenant des entrees selectionnees sont decompresses.
+
+    Reprise apres un arret brutal : le segment non ferme (sans fin de flux gzip) est lu
+    jusqu'a sa derniere ligne complete, et l'index, ecrit apres chaque vidage du segment,
+    ne designe que des lignes videes. Les reponses ajoutees depuis le dernier vidage
+    (au plus FLUSH_ENREGISTREMENTS, ou FLUSH_INTERVALLE secondes) sont perdues ; une
+    ligne du segment videe sans son entree d'index est ignoree. Une nouvelle ouverture
+    du journal ecrit dans un nouveau segment, sans toucher aux precedents.
+
+    Yields:
+        dict: {"t": horodatage, "e": endpoint, "p": params, "d": payload}
+    """
+    selection = {}
+    for entree in lister(dossier, endpoint, depuis, jusqu_a):
+        selection.setdefault(entree["s"], set()).add(entree["l"])
+
+    for nom in sorted(selection):
+        lignes = selection[nom]
+        derniers = {}  # Contenu courant par endpoint+params (resolution des m=1)
+        for numero, enregistrement in enumerate(_lire_segment(os.path.join(dossier, nom))):
+            cle = _cle(enregistrement["e"], enregistrement["p"])
+            if "d" in enregistrement:
+                derniers[cle] = enregistrement["d"]
+            if numero in lignes:
+                yield {"t": enregistrement["t"], "e": enregistrement["e"],
+                       "p": enregistrement["p"], "d": derniers.get(cle)}
+
+# ==================== REJEU ====================
+
+def rejouer(dossier: str, depuis: Optional[float] = None, jusqu_a: Optional[float] = None,
+            limite_journees_cotes: int = 2) -> Dict:
+    """
+    Rejoue les reponses capturees dans le pipeline de collecte
+    (results_filter / matches_filter / db_integration), dans l'ordre d'origine.
+
+    Args:
+        dossier: Dossier du journal
+        depuis, jusqu_a: Bornes d'horodatage incluses (optionnel)
+        limite_journees_cotes: Journees de cotes extraites par reponse "matches"
+
+    Returns:
+        dict: Nombre de reponses rejouees et de lignes inserees par endpoint
+    """
+    from src.api.results_filter import iter_result_rows
+    from src.api.matches_filter import iter_match_rows
+    from src.api import db_integration
+
+    rapport = {e: {"reponses": 0, "lignes": 0} for e in ENDPOINTS}
+    for enregistrement in lire(dossier, depuis=depuis, jusqu_a=jusqu_a):
+        endpoint, payload = enregistrement["e"], enregistrement["d"] or {}
+        if endpoint == "ranking":
+            lignes = db_integration.insert_api_ranking(payload.get("teams", []))
+        elif endpoint == "results":
+            resultats = list(iter_result_rows(payload))
+            lignes = db_integration.insert_result_rows(resultats) if resultats else 0
+        elif endpoint == "matches":
+            matchs = list(iter_match_rows(payload, limit=limite_journees_cotes))
+            lignes = db_integration.insert_match_rows(matchs) if matchs else 0
+        else:
+            continue
+        rapport[endpoint]["reponses"] += 1
+        rapport[endpoint]["lignes"] += lignes
+    logger.info(f"[CAPTURE] Rejeu termine : {rapport}")
+    return rapport
+
+
+class SourceRejouee:
+    """
+    Source de donnees pour start_monitoring servant les reponses capturees,
+    endpoint par endpoint, dans l'ordre d'origine (vide une fois epuisee).
+    """
+
+    def __init__(self, dossier: str, depuis: Optional[float] = None, jusqu_a: Optional[float] = None):
+        self._files = {e: [] for e in ENDPOINTS}
+        for enregistrement in lire(dossier, depuis=depuis, jusqu_a=jusqu_a):
+            self._files[enregistrement["e"]].append(enregistrement["d"])
+        self._positions = {e: 0 for e in ENDPOINTS}
+
+    def _suivant(self, endpoint: str):
+        position = self._positions[endpoint]
+        if position >= len(self._files[endpoint]):
+            return None
+        self._positions[endpoint] += 1
+        return self._files[endpoint][position]
+
+    def get_ranking(self, *args, **kwargs) -> List[Dict]:
+        payload = self._suivant("ranking")
+        return payload.get("teams", []) if payload else []
+
+    def get_recent_results(self, *args, **kwargs) -> Dict:
+        return self._suivant("results") or {"rounds": []}
+
+    def get_upcoming_matches(self, *args, **kwargs) -> Dict:
+        return self._suivant("matches") or {"rounds": []}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rejeu d'un journal de capture API dans la base")
+    parser.add_argument("dossier", help="Dossier du journal de capture")
+    parser.add_argument("--depuis", type=float, default=None, help="Horodatage Unix minimal")
+    parser.add_argument("--jusqu-a", type=float, default=None, help="Horodatage Unix maximal")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    print(rejouer(args.dossier, args.depuis, args.jusqu_a))
@@ -1,50 +1,302 @@
 """
-Module de comparaison des donnees entre API et Scraper
+Module de comparaison des donnees entre deux sources (API, Scraper, base, archive CSV)
 Detecte les ecarts et genere des rapports
 
-Version: 2.1
+Chaque source est indexee une fois par cle (journee, domicile, exterieur) : la
+comparaison est une jointure sur ces index, en O(n + m) quel que soit le nombre
+de journees. Les ecarts sont produits au fil de l'eau (iter_comparison) et tous
+conserves dans les statistiques (plus de troncature).
+
+Formats de source acceptes (melangeables) :
+- journees : [{"roundNumber"|"journee": 1, "matches": [...]}, ...] (API, Scraper)
+- matchs a plat : [{"homeTeam"|"equipe_dom"|"Equipe_Dom": ..., "journee": ...}, ...]
+  (cotes Scraper, lignes de base via rows_from_db, archive via rows_from_archive_csv)
+Scores : "2:1", "2-1" ou score_dom/score_ext ; cotes : "odds" [{type, odds}] ou cote_1/cote_x/cote_2.
+
+Version: 2.2
 Date: Janvier 2025
 """
 
+import csv
 import logging
-from typing import List, Dict, Tuple
+import math
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime
 import json
 
 logger = logging.getLogger(__name__)
 
+NOT_FOUND = "NOT_FOUND"
+
+# Tolerance par defaut sur les cotes (ecart absolu)
+ODDS_TOLERANCE = 0.01
+
+_SCORE = re.compile(r"^\s*(\d+)\s*\D\s*(\d+)\s*$")
+
+# ==================== NORMALISATION DES SOURCES ====================
+
+def _first(data: Dict, *keys):
+    for key in keys:
+        value = data.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_score(match: Dict) -> Optional[Tuple[int, int]]:
+    """Score normalise (dom, ext), None si absent ou illisible."""
+    dom = _as_int(_first(match, "score_dom", "Score_Dom"))
+    ext = _as_int(_first(match, "score_ext", "Score_Ext"))
+    if dom is not None and ext is not None:
+        return dom, ext
+    found = _SCORE.match(str(match.get("score") or ""))
+    return (int(found.group(1)), int(found.group(2))) if found else None
+
+
+def normalize_odds(match: Dict) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """Cotes normalisees (1, X, 2)."""
+    if match.get("odds"):
+        by_type = {o.get("type"): o.get("odds") for o in match["odds"]}
+        return tuple(_as_float(by_type.get(t)) for t in ("1", "X", "2"))
+    return tuple(_as_float(match.get(k)) for k in ("cote_1", "cote_x", "cote_2"))
+
+
+def iter_matches(source: Iterable[Dict]) -> Iterator[Tuple[Optional[int], str, str, Dict]]:
+    """
+    Parcourt une source (journees ou matchs a plat) en une passe.
+
+    Yields:
+        (journee, domicile, exterieur, match) ; journee None si la source ne la donne pas
+    """
+    for item in source or []:
+        item = item if isinstance(item, dict) else dict(item)
+        journee = _as_int(_first(item, "roundNumber", "journee", "Journee"))
+        matches = item.get("matches")
+        for match in (matches if matches is not None else [item]):
+            home = _first(match, "homeTeam", "equipe_dom", "Equipe_Dom")
+            away = _first(match, "awayTeam", "equipe_ext", "Equipe_Ext")
+            if home is None or away is None:
+                continue
+            match_journee = _as_int(_first(match, "roundNumber", "journee", "Journee"))
+            yield (journee if match_journee is None else match_journee), home, away, match
+
+
+def build_index(source: Iterable[Dict], extract) -> Tuple[Dict[Tuple, object], bool]:
+    """
+    Index d'une source : {(journee, domicile, exterieur): extract(match)}.
+
+    Returns:
+        (index, True si toutes les entrees ont une journee)
+    """
+    index = {}
+    with_rounds = True
+    for journee, home, away, match in iter_matches(source):
+        with_rounds = with_rounds and journee is not None
+        index[(journee, home, away)] = extract(match)
+    return index, with_rounds
+
+
+def _without_rounds(index: Dict) -> Dict:
+    # Sans journee d'un cote, la cle se reduit a (domicile, exterieur) : la derniere occurrence l'emporte
+    return {(None, home, away): value for (_, home, away), value in index.items()}
+
+
+def _equal(a, b, tolerance: float) -> bool:
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(_equal(x, y, tolerance) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=0.0, abs_tol=tolerance)
+    return a == b
+
+
+def _sort_key(key: Tuple) -> Tuple:
+    journee, home, away = key
+    return (journee is not None, journee or 0, str(home), str(away))
+
+# ==================== COMPARAISON GENERIQUE ====================
+
+def iter_comparison(source_a: Iterable[Dict], source_b: Iterable[Dict], extract,
+                    tolerance: float = 0.0, common_rounds_only: bool = False) -> Iterator[Dict]:
+    """
+    Compare deux sources en une passe sur leurs index (O(n + m)).
+    Les entrees sont produites au fil de l'eau, par journee puis par match.
+
+    Args:
+        source_a: Source de reference
+        source_b: Source comparee
+        extract: match -> valeur comparee (ex: score normalise, tuple de cotes)
+        tolerance: Ecart absolu admis entre flottants
+        common_rounds_only: Ignorer les journees absentes de l'une des sources
+
+    Yields:
+        {"journee", "home", "away", "status": "ok"|"different"|"missing_a"|"missing_b", "a", "b"}
+    """
+    index_a, rounds_a = build_index(source_a, extract)
+    index_b, rounds_b = build_index(source_b, extract)
+    if not (rounds_a and rounds_b):
+        index_a, index_b = _without_rounds(index_a), _without_rounds(index_b)
+    if common_rounds_only:
+        communes = {k[0] for k in index_a} & {k[0] for k in index_b}
+        index_a = {k: v for k, v in index_a.items() if k[0] in communes}
+        index_b = {k: v for k, v in index_b.items() if k[0] in communes}
+
+    for key in sorted(index_a.keys() | index_b.keys(), key=_sort_key):
+        journee, home, away = key
+        if key not in index_b:
+            status = "missing_b"
+        elif key not in index_a:
+            status = "missing_a"
+        else:
+            status = "ok" if _equal(index_a[key], index_b[key], tolerance) else "different"
+        yield {"journee": journee, "home": home, "away": away, "status": status,
+               "a": index_a.get(key, NOT_FOUND), "b": index_b.get(key, NOT_FOUND)}
+
+
+def compare_sources(source_a: Iterable[Dict], source_b: Iterable[Dict], extract,
+                    tolerance: float = 0.0, labels: Tuple[str, str] = ("api", "scraper"),
+                    formatter=str, common_rounds_only: bool = False, on_difference=None) -> Dict:
+    """
+    Statistiques de comparaison de deux sources (tous les ecarts sont conserves).
+
+    Args:
+        labels: Noms des sources dans les ecarts
+        formatter: Mise en forme des valeurs dans les ecarts
+        on_difference: Appelee sur chaque ecart des qu'il est detecte (rapport en flux)
+
+    Returns:
+        Dictionnaire avec coherence, total_matches (source A), matching et differences
+    """
+    differences = []
+    total_matches = 0
+    matching = 0
+    for entry in iter_comparison(source_a, source_b, extract, tolerance, common_rounds_only):
+        if entry["status"] != "missing_a":
+            total_matches += 1
+        if entry["status"] == "ok":
+            matching += 1
+            continue
+        difference = {
+            "journee": entry["journee"],
+            "match": f"{entry['home']} vs {entry['away']}",
+            labels[0]: NOT_FOUND if entry["a"] == NOT_FOUND else formatter(entry["a"]),
+            labels[1]: NOT_FOUND if entry["b"] == NOT_FOUND else formatter(entry["b"]),
+        }
+        differences.append(difference)
+        if on_difference:
+            on_difference(difference)
+
+    coherence = (matching / total_matches * 100) if total_matches > 0 else 0
+    return {
+        "coherence": round(coherence, 2),
+        "total_matches": total_matches,
+        "matching": matching,
+        "differences_count": len(differences),
+        "differences": differences
+    }
+
+
+def _format_score(score) -> str:
+    return "?" if score is None else f"{score[0]}:{score[1]}"
+
+
+def _format_odds(odds) -> str:
+    return f"1={odds[0]}, X={odds[1]}, 2={odds[2]}"
+
+# ==================== SOURCES BASE / ARCHIVE ====================
+
+def rows_from_db(table: str = "resultats", journees: Optional[Iterable[int]] = None) -> List[Dict]:
+    """
+    Matchs de la partition active (resultats ou cotes) au format a plat, noms d'equipes resolus.
+
+    Args:
+        table: "resultats" ou "cotes"
+        journees: Journees a lire (toutes par defaut)
+    """
+    from src.core.database import get_db_connection, get_partition, row_to_dict
+
+    colonnes = {"resultats": "t.score_dom, t.score_ext", "cotes": "t.cote_1, t.cote_x, t.cote_2"}[table]
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        params = list(get_partition(conn))
+        filtre = ""
+        if journees is not None:
+            journees = list(journees)
+            filtre = f" AND t.journee IN ({','.join('?' * len(journees))})"
+            params += journees
+        cursor.execute(f"""
+            SELECT t.journee, e1.nom AS equipe_dom, e2.nom AS equipe_ext, {colonnes}
+            FROM {table} t
+            JOIN equipes e1 ON t.equipe_dom_id = e1.id
+            JOIN equipes e2 ON t.equipe_ext_id = e2.id
+            WHERE t.league_id = ? AND t.session_id = ?{filtre}
+        """, params)
+        return [row_to_dict(row, cursor) for row in cursor.fetchall()]
+
+
+def rows_from_archive_csv(filepath: str) -> Iterator[Dict]:
+    """Resultats d'une archive de session (section === RESULTATS === de archives_session_X.csv), lus en flux."""
+    with open(filepath, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = None
+        in_results = False
+        for row in reader:
+            if row and row[0].startswith("==="):
+                in_results = row[0] == "=== RESULTATS ==="
+                header = None
+            elif in_results and row:
+                if header is None:
+                    header = row
+                else:
+                    yield dict(zip(header, row))
+
 # ==================== COMPARAISON CLASSEMENT ====================
 
 def compare_rankings(api_data: List[Dict], scraper_data: List[Dict]) -> Dict:
     """
     Compare les classements de l'API et du Scraper
-    
+
     Args:
         api_data: Donnees de classement depuis l'API
         scraper_data: Donnees de classement depuis le Scraper
-        
+
     Returns:
         Dictionnaire avec statistiques de comparaison
     """
     if not api_data or not scraper_data:
         return {"coherence": 0.0, "differences": [], "error": "Donnees manquantes"}
-    
+
     differences = []
     total_teams = len(api_data)
     matching = 0
-    
+
     # Creer des dictionnaires pour faciliter la comparaison
     api_dict = {team["name"]: team for team in api_data}
     scraper_dict = {team.get("name", team.get("nom", "")): team for team in scraper_data}
-    
+
     for team_name, api_team in api_dict.items():
         if team_name in scraper_dict:
             scraper_team = scraper_dict[team_name]
-            
+
             # Comparer les points
             api_points = api_team.get("points")
             scraper_points = scraper_team.get("points")
-            
+
             if api_points == scraper_points:
                 matching += 1
             else:
@@ -61,184 +313,83 @@ def compare_rankings(api_data: List[Dict], scraper_data: List[Dict]) -> Dict:
                 "api": "present",
                 "scraper": "absent"
             })
-    
+
     coherence = (matching / total_teams * 100) if total_teams > 0 else 0
-    
+
     return {
         "coherence": round(coherence, 2),
         "total_teams": total_teams,
         "matching": matching,
         "differences_count": len(differences),
-        "differences": differences[:10]  # Limiter a 10 pour la lisibilite
+        "differences": differences
     }
 
 
 # ==================== COMPARAISON RESULTATS ====================
 
-def compare_results(api_data: List[Dict], scraper_data: List[Dict]) -> Dict:
+def compare_results(api_data: List[Dict], scraper_data: List[Dict],
+                    labels: Tuple[str, str] = ("api", "scraper"), on_difference=None) -> Dict:
     """
-    Compare les resultats de matchs entre API et Scraper
-    
+    Compare les resultats de matchs entre deux sources (API, Scraper, base, archive)
+    sur les journees presentes dans les deux
+
     Args:
-        api_data: Resultats depuis l'API (filtre)
-        scraper_data: Resultats depuis le Scraper
-        
+        api_data: Resultats de reference (ex: API filtree)
+        scraper_data: Resultats compares (ex: Scraper)
+        labels: Noms des sources dans les ecarts
+        on_difference: Appelee sur chaque ecart des qu'il est detecte
+
     Returns:
         Dictionnaire avec statistiques de comparaison
     """
     if not api_data or not scraper_data:
         return {"coherence": 0.0, "differences": [], "error": "Donnees manquantes"}
-    
-    differences = []
-    total_matches = 0
-    matching = 0
-    
-    for api_round in api_data:
-        journee = api_round.get("roundNumber")
-        
-        # Trouver la journee correspondante dans scraper_data
-        scraper_round = next((r for r in scraper_data if r.get("journee") == journee), None)
-        
-        if not scraper_round:
-            continue
-        
-        for api_match in api_round.get("matches", []):
-            total_matches += 1
-            
-            home = api_match.get("homeTeam")
-            away = api_match.get("awayTeam")
-            api_score = api_match.get("score")
-            
-            # Chercher le match correspondant dans scraper
-            scraper_match = next(
-                (m for m in scraper_round.get("matches", [])
-                 if m.get("homeTeam") == home and m.get("awayTeam") == away),
-                None
-            )
-            
-            if scraper_match:
-                scraper_score = scraper_match.get("score")
-                
-                if api_score == scraper_score:
-                    matching += 1
-                else:
-                    differences.append({
-                        "journee": journee,
-                        "match": f"{home} vs {away}",
-                        "api_score": api_score,
-                        "scraper_score": scraper_score
-                    })
-            else:
-                differences.append({
-                    "journee": journee,
-                    "match": f"{home} vs {away}",
-                    "api_score": api_score,
-                    "scraper_score": "NOT_FOUND"
-                })
-    
-    coherence = (matching / total_matches * 100) if total_matches > 0 else 0
-    
-    return {
-        "coherence": round(coherence, 2),
-        "total_matches": total_matches,
-        "matching": matching,
-        "differences_count": len(differences),
-        "differences": differences[:10]
-    }
+
+    return compare_sources(api_data, scraper_data, normalize_score, labels=labels, formatter=_format_score,
+                           common_rounds_only=True, on_difference=on_difference)
 
 
 # ==================== COMPARAISON COTES ====================
 
-def compare_odds(api_data: List[Dict], scraper_data: List[Dict]) -> Dict:
+def compare_odds(api_data: List[Dict], scraper_data: List[Dict], tolerance: float = ODDS_TOLERANCE,
+                 labels: Tuple[str, str] = ("api", "scraper"), on_difference=None) -> Dict:
     """
-    Compare les cotes entre API et Scraper
-    
+    Compare les cotes entre deux sources
+
     Args:
-        api_data: Matchs a venir depuis l'API (filtre)
-        scraper_data: Cotes depuis le Scraper
-        
+        api_data: Matchs a venir de reference (ex: API filtree)
+        scraper_data: Cotes comparees (ex: Scraper)
+        tolerance: Ecart absolu admis par cote
+        labels: Noms des sources dans les ecarts
+        on_difference: Appelee sur chaque ecart des qu'il est detecte
+
     Returns:
         Dictionnaire avec statistiques de comparaison
     """
     if not api_data or not scraper_data:
         return {"coherence": 0.0, "differences": [], "error": "Donnees manquantes"}
-    
-    differences = []
-    total_matches = 0
-    matching = 0
-    
-    for api_round in api_data:
-        for api_match in api_round.get("matches", []):
-            total_matches += 1
-            
-            home = api_match.get("homeTeam")
-            away = api_match.get("awayTeam")
-            api_odds = api_match.get("odds", [])
-            
-            # Extraire les cotes API
-            api_1 = next((o["odds"] for o in api_odds if o["type"] == "1"), None)
-            api_x = next((o["odds"] for o in api_odds if o["type"] == "X"), None)
-            api_2 = next((o["odds"] for o in api_odds if o["type"] == "2"), None)
-            
-            # Chercher dans scraper_data
-            scraper_match = next(
-                (m for m in scraper_data
-                 if m.get("homeTeam") == home and m.get("awayTeam") == away),
-                None
-            )
-            
-            if scraper_match:
-                scraper_1 = scraper_match.get("cote_1")
-                scraper_x = scraper_match.get("cote_x")
-                scraper_2 = scraper_match.get("cote_2")
-                
-                # Tolerance de 0.01 pour les differences de cotes
-                tolerance = 0.01
-                if (abs(api_1 - scraper_1) < tolerance and
-                    abs(api_x - scraper_x) < tolerance and
-                    abs(api_2 - scraper_2) < tolerance):
-                    matching += 1
-                else:
-                    differences.append({
-                        "match": f"{home} vs {away}",
-                        "api": f"1={api_1}, X={api_x}, 2={api_2}",
-                        "scraper": f"1={scraper_1}, X={scraper_x}, 2={scraper_2}"
-                    })
-            else:
-                differences.append({
-                    "match": f"{home} vs {away}",
-                    "api": f"1={api_1}, X={api_x}, 2={api_2}",
-                    "scraper": "NOT_FOUND"
-                })
-    
-    coherence = (matching / total_matches * 100) if total_matches > 0 else 0
-    
-    return {
-        "coherence": round(coherence, 2),
-        "total_matches": total_matches,
-        "matching": matching,
-        "differences_count": len(differences),
-        "differences": differences[:10]
-    }
+
+    return compare_sources(api_data, scraper_data, normalize_odds, tolerance=tolerance, labels=labels,
+                           formatter=_format_odds, on_difference=on_difference)
 
 
 # ==================== RAPPORT GLOBAL ====================
 
-def generate_comparison_report(ranking_comp: Dict, results_comp: Dict, odds_comp: Dict) -> str:
+def iter_report_lines(ranking_comp: Dict, results_comp: Dict, odds_comp: Dict) -> Iterator[str]:
     """
-    Genere un rapport complet de comparaison
-    
+    Rapport complet de comparaison, ligne par ligne (tous les ecarts)
+
     Args:
         ranking_comp: Comparaison classement
         results_comp: Comparaison resultats
         odds_comp: Comparaison cotes
-        
-    Returns:
-        Rapport formate en texte
+
+    Yields:
+        Lignes du rapport (terminees par un saut de ligne)
     """
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    report = f"""
+
+    yield f"""
 {'='*60}
 RAPPORT DE COMPARAISON API vs SCRAPER
 Date: {timestamp}
@@ -264,70 +415,89 @@ Date: {timestamp}
 
 {'='*60}
 """
-    
+
     # Ajouter les differences si elles existent
-    if ranking_comp.get('differences'):
-        report += "\n[DETAILS - CLASSEMENT]\n"
-        for diff in ranking_comp['differences'][:5]:
-            report += f"  {diff}\n"
-    
-    if results_comp.get('differences'):
-        report += "\n[DETAILS - RESULTATS]\n"
-        for diff in results_comp['differences'][:5]:
-            report += f"  {diff}\n"
-    
-    if odds_comp.get('differences'):
-        report += "\n[DETAILS - COTES]\n"
-        for diff in odds_comp['differences'][:5]:
-            report += f"  {diff}\n"
-    
-    return report
-
-
-def save_comparison_log(report: str, filepath: str = "logs/dual_mode_comparison.log"):
+    for title, comp in (("CLASSEMENT", ranking_comp), ("RESULTATS", results_comp), ("COTES", odds_comp)):
+        if comp.get('differences'):
+            yield f"\n[DETAILS - {title}]\n"
+            for diff in comp['differences']:
+                yield f"  {diff}\n"
+
+
+def generate_comparison_report(ranking_comp: Dict, results_comp: Dict, odds_comp: Dict) -> str:
+    """
+    Genere un rapport complet de comparaison
+
+    Args:
+        ranking_comp: Comparaison classement
+        results_comp: Comparaison resultats
+        odds_comp: Comparaison cotes
+
+    Returns:
+        Rapport formate en texte
+    """
+    return "".join(iter_report_lines(ranking_comp, results_comp, odds_comp))
+
+
+def save_comparison_log(report: Union[str, Iterable[str]], filepath: str = "logs/dual_mode_comparison.log"):
     """
     Sauvegarde le rapport dans un fichier log
-    
+
     Args:
-        report: Rapport a sauvegarder
+        report: Rapport a sauvegarder (texte, ou lignes ecrites au fil de l'eau)
         filepath: Chemin du fichier log
     """
-    import os
-    
     # Creer le dossier logs si necessaire
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+
     with open(filepath, 'a', encoding='utf-8') as f:
-        f.write(report)
+        for chunk in ([report] if isinstance(report, str) else report):
+            f.write(chunk)
         f.write("\n\n")
-    
+
     logger.info(f"Rapport sauvegarde dans {filepath}")
 
 
+def save_differences(differences: Iterable[Dict], filepath: str) -> int:
+    """
+    Ecrit des ecarts en JSON Lines au fil de l'eau (ex: iter_comparison sur une saison complete)
+
+    Returns:
+        Nombre d'ecarts ecrits
+    """
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    count = 0
+    with open(filepath, 'a', encoding='utf-8') as f:
+        for diff in differences:
+            f.write(json.dumps(diff, ensure_ascii=False, default=str) + "\n")
+            count += 1
+    return count
+
+
 # ==================== TEST ====================
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    
+
     print("[TEST] Module Data Comparator")
     print("=" * 60)
-    
+
     # Donnees de test
     api_ranking = [
         {"name": "Manchester Blue", "points": 43, "position": 1},
         {"name": "Newcastle", "points": 41, "position": 2}
     ]
-    
+
     scraper_ranking = [
         {"name": "Manchester Blue", "points": 43, "position": 1},
         {"name": "Newcastle", "points": 41, "position": 2}
     ]
-    
+
     # Test comparaison
     result = compare_rankings(api_ranking, scraper_ranking)
     print(f"\n[TEST] Comparaison classement:")
     print(f"  Coherence: {result['coherence']}%")
     print(f"  Matching: {result['matching']}/{result['total_teams']}")
-    
+
     print("\n" + "=" * 60)
     print("[SUCCESS] Test termine")
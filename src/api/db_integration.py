@@ -8,7 +8,7 @@ Date: Janvier 2025
 
 import sqlite3
 import logging
-from typing import List, Dict
+from typing import List, Dict, Iterable, Tuple
 from datetime import datetime
 import sys
 import os
@@ -16,8 +16,10 @@ import os
 # Ajouter le chemin du projet
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from src.core.database import get_db_connection
-from src.core import config
+from src.core.database import get_db_connection, get_ligue_active, get_partition
+from src.core import config, utils, historique_cotes, confrontations
+from src.api.results_filter import rows_from_results
+from src.api.matches_filter import rows_from_matches
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +69,34 @@ def normalize_form_history(history: List[str]) -> str:
 
 # ==================== FONCTIONS D'INSERTION ====================
 
+def insert_api_teams(ranking_data: List[Dict]) -> int:
+    """
+    Enregistre pour la ligue active les equipes du classement API absentes de la table 'equipes'
+    (ligues autres que la ligue par defaut, dont les equipes ne sont pas dans config.EQUIPES)
+    
+    Args:
+        ranking_data: Liste des equipes du classement
+        
+    Returns:
+        Nombre d'equipes ajoutees
+    """
+    noms = [normalize_team_name(team.get("name")) for team in ranking_data if team.get("name")]
+    if not noms:
+        return 0
+    ligue = get_ligue_active()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM equipes WHERE league_id = ?", (ligue,))
+        avant = cursor.fetchone()[0]
+        cursor.executemany("INSERT OR IGNORE INTO equipes (nom, league_id) VALUES (?, ?)", [(nom, ligue) for nom in noms])
+        cursor.execute("SELECT COUNT(*) FROM equipes WHERE league_id = ?", (ligue,))
+        ajoutees = cursor.fetchone()[0] - avant
+    if ajoutees:
+        utils.invalidate_equipe_cache()
+        logger.info(f"{ajoutees} equipes enregistrees")
+    return ajoutees
+
+
 def insert_api_ranking(ranking_data: List[Dict]) -> int:
     """
     Insere le classement depuis l'API dans la table 'classement'
@@ -86,11 +116,20 @@ def insert_api_ranking(ranking_data: List[Dict]) -> int:
     journee = ranking_data[0].get("won", 0) + ranking_data[0].get("lost", 0) + ranking_data[0].get("draw", 0)
     
     count = 0
+    lignes = {}
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        # Nettoyage avant insertion (comme dans le scraper)
-        cursor.execute("DELETE FROM classement")
+        # Classement en place, compare au nouveau pour la version des donnees
+        partition = get_partition(conn)
+        cursor.execute("""
+            SELECT equipe_id, journee, position, points, forme, buts_pour, buts_contre FROM classement
+            WHERE league_id = ? AND session_id = ?
+        """, partition)
+        precedentes = {row[0]: tuple(row)[1:] for row in cursor.fetchall()}
+        
+        # Nettoyage avant insertion (comme dans le scraper), limite a la ligue et a la session
+        cursor.execute("DELETE FROM classement WHERE league_id = ? AND session_id = ?", partition)
         
         for team in ranking_data:
             team_name = normalize_team_name(team.get("name"))
@@ -103,7 +142,7 @@ def insert_api_ranking(ranking_data: List[Dict]) -> int:
             forme = normalize_form_history(history)
             
             # Verifier si l'equipe existe dans la table equipes
-            cursor.execute("SELECT id FROM equipes WHERE nom = ?", (team_name,))
+            cursor.execute("SELECT id FROM equipes WHERE league_id = ? AND nom = ?", (partition[0], team_name))
             result = cursor.fetchone()
             
             if result:
@@ -115,21 +154,27 @@ def insert_api_ranking(ranking_data: List[Dict]) -> int:
                         SUM(CASE WHEN equipe_dom_id = ? THEN score_dom ELSE score_ext END) as bp,
                         SUM(CASE WHEN equipe_dom_id = ? THEN score_ext ELSE score_dom END) as bc
                     FROM resultats 
-                    WHERE (equipe_dom_id = ? OR equipe_ext_id = ?) AND score_dom IS NOT NULL
-                """, (equipe_id, equipe_id, equipe_id, equipe_id))
+                    WHERE league_id = ? AND session_id = ?
+                    AND (equipe_dom_id = ? OR equipe_ext_id = ?) AND score_dom IS NOT NULL
+                """, (equipe_id, equipe_id) + partition + (equipe_id, equipe_id))
                 stats_buts = cursor.fetchone()
                 buts_pour = stats_buts[0] if stats_buts and stats_buts[0] is not None else 0
                 buts_contre = stats_buts[1] if stats_buts and stats_buts[1] is not None else 0
                 
                 # Inserer le classement avec les stats de buts
                 cursor.execute("""
-                    INSERT INTO classement (journee, equipe_id, position, points, forme, buts_pour, buts_contre)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (journee, equipe_id, position, points, forme, buts_pour, buts_contre))
+                    INSERT INTO classement (journee, equipe_id, position, points, forme, buts_pour, buts_contre, league_id, session_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (journee, equipe_id, position, points, forme, buts_pour, buts_contre) + partition)
+                lignes[equipe_id] = (journee, position, points, forme, buts_pour, buts_contre)
                 
                 count += 1
             else:
                 logger.warning(f"Equipe '{team_name}' non trouvee dans la BDD")
+        
+        # Version du classement (invalide les caches derives si le contenu a change)
+        if lignes != precedentes:
+            utils.marquer_donnees_modifiees(cursor, "classement")
     
     logger.info(f"{count} equipes inserees dans le classement (journee {journee}) avec stats buts")
     return count
@@ -140,7 +185,7 @@ def insert_api_results(results_data: List[Dict]) -> int:
     Insere les resultats depuis l'API dans la table 'resultats'
     
     Args:
-        results_data: Liste des journees avec leurs matchs
+        results_data: Liste des journees avec leurs matchs (format extract_results_minimal)
         
     Returns:
         Nombre de matchs inseres
@@ -148,57 +193,55 @@ def insert_api_results(results_data: List[Dict]) -> int:
     if not results_data:
         logger.warning("Aucun resultat a inserer")
         return 0
+    return insert_result_rows(rows_from_results(results_data))
+
+
+def insert_result_rows(rows: Iterable[Tuple]) -> int:
+    """
+    Insere des lignes de resultats deja typees (cf results_filter.iter_result_rows)
     
-    count = 0
+    Args:
+        rows: (journee, equipe_dom, equipe_ext, score_dom, score_ext), noms normalises
+        
+    Returns:
+        Nombre de matchs inseres
+    """
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        partition = get_partition(conn)
+        
+        # IDs des equipes de la ligue lus une fois (une saison complete = 380 matchs)
+        cursor.execute("SELECT nom, id FROM equipes WHERE league_id = ?", (partition[0],))
+        ids_equipes = {row[0]: row[1] for row in cursor.fetchall()}
         
-        for round_data in results_data:
-            journee = round_data.get("roundNumber")
+        valeurs = []
+        for journee, home_team, away_team, score_dom, score_ext in rows:
+            home_id = ids_equipes.get(home_team)
+            away_id = ids_equipes.get(away_team)
+            if home_id and away_id:
+                valeurs.append(partition + (journee, home_id, away_id, score_dom, score_ext))
+            else:
+                logger.warning(f"Equipes non trouvees: {home_team} vs {away_team}")
+        
+        if valeurs:
+            # Inserer ou mettre a jour les resultats (une ligne identique n'est pas reecrite)
+            cursor.executemany("""
+                INSERT INTO resultats (league_id, session_id, journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(league_id, session_id, journee, equipe_dom_id, equipe_ext_id) DO UPDATE SET
+                    score_dom = excluded.score_dom,
+                    score_ext = excluded.score_ext
+                WHERE score_dom IS NOT excluded.score_dom OR score_ext IS NOT excluded.score_ext
+            """, valeurs)
+            if cursor.rowcount > 0:
+                utils.marquer_donnees_modifiees(cursor, "resultats")
             
-            for match in round_data.get("matches", []):
-                home_team = normalize_team_name(match.get("homeTeam"))
-                away_team = normalize_team_name(match.get("awayTeam"))
-                score = match.get("score", "")
-                
-                # Parser le score (format "2:1" ou "2-1")
-                score_dom, score_ext = None, None
-                if score:
-                    # Remplacement flexible du séparateur
-                    s_clean = score.replace(':', '-').replace(' ', '')
-                    if '-' in s_clean:
-                        try:
-                            parts = s_clean.split("-")
-                            score_dom = int(parts[0])
-                            score_ext = int(parts[1])
-                        except (ValueError, IndexError):
-                            logger.warning(f"Format de score invalide : {score}")
-                
-                # Recuperer les IDs des equipes
-                cursor.execute("SELECT id FROM equipes WHERE nom = ?", (home_team,))
-                home_result = cursor.fetchone()
-                cursor.execute("SELECT id FROM equipes WHERE nom = ?", (away_team,))
-                away_result = cursor.fetchone()
-                
-                if home_result and away_result:
-                    home_id = home_result[0]
-                    away_id = away_result[0]
-                    
-                    # Inserer ou mettre a jour le resultat
-                    cursor.execute("""
-                        INSERT INTO resultats (journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext)
-                        VALUES (?, ?, ?, ?, ?)
-                        ON CONFLICT(journee, equipe_dom_id, equipe_ext_id) DO UPDATE SET
-                            score_dom = excluded.score_dom,
-                            score_ext = excluded.score_ext
-                    """, (journee, home_id, away_id, score_dom, score_ext))
-                    
-                    count += 1
-                else:
-                    logger.warning(f"Equipes non trouvees: {home_team} vs {away_team}")
+            # Resume des confrontations de chaque paire (toutes sessions)
+            for v in valeurs:
+                confrontations.enregistrer_confrontation(cursor, *v)
     
-    logger.info(f"{count} resultats inseres")
-    return count
+    logger.info(f"{len(valeurs)} resultats inseres")
+    return len(valeurs)
 
 
 def insert_api_matches(matches_data: List[Dict]) -> int:
@@ -206,7 +249,7 @@ def insert_api_matches(matches_data: List[Dict]) -> int:
     Insere les matchs a venir depuis l'API dans les tables 'resultats' et 'cotes'
     
     Args:
-        matches_data: Liste des journees avec leurs matchs et cotes
+        matches_data: Liste des journees avec leurs matchs et cotes (format extract_matches_with_local_ids)
         
     Returns:
         Nombre de matchs inseres
@@ -214,73 +257,95 @@ def insert_api_matches(matches_data: List[Dict]) -> int:
     if not matches_data:
         logger.warning("Aucun match a venir a inserer")
         return 0
+    return insert_match_rows(rows_from_matches(matches_data))
+
+
+def insert_match_rows(rows: Iterable[Tuple]) -> int:
+    """
+    Insere des lignes de matchs a venir deja typees (cf matches_filter.iter_match_rows)
+    dans les tables 'resultats' et 'cotes'
     
-    count = 0
+    Args:
+        rows: (journee, equipe_dom, equipe_ext, cote_1, cote_x, cote_2), noms normalises
+        
+    Returns:
+        Nombre de matchs inseres
+    """
+    captures = 0
+    horodatage = historique_cotes.horodatage_actuel()
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        partition = get_partition(conn)
+        
+        cursor.execute("SELECT nom, id FROM equipes WHERE league_id = ?", (partition[0],))
+        ids_equipes = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        valeurs = []
+        for journee, home_team, away_team, cote_1, cote_x, cote_2 in rows:
+            home_id = ids_equipes.get(home_team)
+            away_id = ids_equipes.get(away_team)
+            if home_id and away_id:
+                valeurs.append(partition + (journee, home_id, away_id, cote_1, cote_x, cote_2))
+            else:
+                logger.warning(f"Equipes non trouvees: '{home_team}' ou '{away_team}'")
+                print(f"   [WARN] Equipes non trouvees dans BDD: '{home_team}' ou '{away_team}'")
         
-        for round_data in matches_data:
-            journee = round_data.get("roundNumber")
+        if valeurs:
+            # 1. Matchs dans 'resultats' (scores NULL car pas encore joues)
+            cursor.executemany("""
+                INSERT INTO resultats (league_id, session_id, journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext)
+                VALUES (?, ?, ?, ?, ?, NULL, NULL)
+                ON CONFLICT(league_id, session_id, journee, equipe_dom_id, equipe_ext_id) DO NOTHING
+            """, [v[:5] for v in valeurs])
             
-            for match in round_data.get("matches", []):
-                home_team = normalize_team_name(match.get("homeTeam"))
-                away_team = normalize_team_name(match.get("awayTeam"))
-                odds = match.get("odds", [])
-                
-                # Extraire les cotes 1X2
-                cote_1 = next((o["odds"] for o in odds if o["type"] == "1"), None)
-                cote_x = next((o["odds"] for o in odds if o["type"] == "X"), None)
-                cote_2 = next((o["odds"] for o in odds if o["type"] == "2"), None)
-                
-                # Recuperer les IDs des equipes
-                cursor.execute("SELECT id FROM equipes WHERE nom = ?", (home_team,))
-                home_result = cursor.fetchone()
-                cursor.execute("SELECT id FROM equipes WHERE nom = ?", (away_team,))
-                away_result = cursor.fetchone()
-                
-                if home_result and away_result:
-                    home_id = home_result[0]
-                    away_id = away_result[0]
-                    
-                    # 1. Inserer le match dans 'resultats' (scores NULL car pas encore joue)
-                    cursor.execute("""
-                        INSERT INTO resultats (journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext)
-                        VALUES (?, ?, ?, NULL, NULL)
-                        ON CONFLICT(journee, equipe_dom_id, equipe_ext_id) DO NOTHING
-                    """, (journee, home_id, away_id))
-                    
-                    # 2. Inserer les cotes dans 'cotes'
-                    cursor.execute("""
-                        INSERT INTO cotes (journee, equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2)
-                        VALUES (?, ?, ?, ?, ?, ?)
-                        ON CONFLICT(journee, equipe_dom_id, equipe_ext_id) DO UPDATE SET
-                            cote_1 = excluded.cote_1,
-                            cote_x = excluded.cote_x,
-                            cote_2 = excluded.cote_2
-                    """, (journee, home_id, away_id, cote_1, cote_x, cote_2))
-                    
-                    count += 1
-                else:
-                    logger.warning(f"Equipes non trouvees: '{home_team}' ou '{away_team}'")
-                    print(f"   [WARN] Equipes non trouvees dans BDD: '{home_team}' ou '{away_team}'")
+            # 2. Cotes dans 'cotes', par journee : version de la journee changee seulement si
+            # une cote a change (une reecriture identique ne modifie aucune ligne)
+            par_journee = {}
+            for v in valeurs:
+                par_journee.setdefault(v[2], []).append(v)
+            for journee, lignes in par_journee.items():
+                cursor.executemany("""
+                    INSERT INTO cotes (league_id, session_id, journee, equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(league_id, session_id, journee, equipe_dom_id, equipe_ext_id) DO UPDATE SET
+                        cote_1 = excluded.cote_1,
+                        cote_x = excluded.cote_x,
+                        cote_2 = excluded.cote_2
+                    WHERE cote_1 IS NOT excluded.cote_1 OR cote_x IS NOT excluded.cote_x OR cote_2 IS NOT excluded.cote_2
+                """, lignes)
+                if cursor.rowcount > 0:
+                    utils.marquer_donnees_modifiees(cursor, ("cotes", journee))
+            
+            # 3. Historique : nouvelle ligne seulement si une cote a bouge
+            for v in valeurs:
+                captures += historique_cotes.enregistrer_cotes(
+                    cursor, *v[2:], horodatage, session_id=partition[1]
+                )
     
-    logger.info(f"{count} matchs a venir inseres avec leurs cotes")
-    return count
+    logger.info(f"{len(valeurs)} matchs a venir inseres avec leurs cotes ({captures} mouvement(s) de cotes historise(s))")
+    return len(valeurs)
 
 
 # ==================== FONCTION DE NETTOYAGE ====================
 
 def clean_old_odds(journee_min: int):
     """
-    Supprime les cotes des journees passees pour eviter l'accumulation
+    Supprime les cotes des journees passees (ligue et session actives) pour eviter l'accumulation
     
     Args:
         journee_min: Conserver uniquement les cotes >= a cette journee
     """
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM cotes WHERE journee < ?", (journee_min,))
+        parametres = get_partition(conn) + (journee_min,)
+        cursor.execute("SELECT DISTINCT journee FROM cotes WHERE league_id = ? AND session_id = ? AND journee < ?",
+                       parametres)
+        purgees = [row[0] for row in cursor.fetchall()]
+        cursor.execute("DELETE FROM cotes WHERE league_id = ? AND session_id = ? AND journee < ?", parametres)
         deleted = cursor.rowcount
+        # Seules les journees purgees changent de version (les caches de la journee courante restent valides)
+        for journee in purgees:
+            utils.marquer_donnees_modifiees(cursor, ("cotes", journee))
         logger.info(f"{deleted} cotes anciennes supprimees (journee < {journee_min})")
 
 
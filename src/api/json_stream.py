@@ -0,0 +1,43 @@
+"""
+Lecture des journees ("rounds") d'une reponse API, deja decodee ou brute
+Une reponse brute (bytes, str, fichier) est parcourue au fil de l'eau avec ijson
+s'il est installe : une seule journee est materialisee a la fois au lieu de
+l'arbre JSON complet (pages d'historique volumineuses). Sans ijson, repli sur json.
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import io
+import json
+from typing import Dict, Iterator
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+
+def iter_rounds(data) -> Iterator[Dict]:
+    """
+    Parcourt les journees d'une reponse results/matches.
+
+    Args:
+        data: Reponse decodee (dict) ou JSON brut (bytes, str, objet fichier binaire)
+
+    Yields:
+        Chaque journee brute ({"roundNumber", "matches": [...], ...})
+    """
+    if data is None:
+        return
+    if isinstance(data, dict):
+        yield from data.get("rounds") or []
+        return
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    flux = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    if HAS_IJSON:
+        yield from ijson.items(flux, "rounds.item", use_float=True)
+    else:
+        yield from json.load(flux).get("rounds") or []
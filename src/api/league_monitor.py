@@ -0,0 +1,178 @@
+"""
+Surveillance simultanee de plusieurs ligues
+Chaque ligue a sa propre boucle start_monitoring, executee dans un pool de
+threads : une ligue lente ou en erreur ne retarde pas les autres, et le callback
+(scoring + predictions) de chaque ligue s'execute dans son propre thread.
+
+Les ligues partagent la base principale, partitionnee par league_id (cf
+database.utiliser_ligue) ; BASE_PAR_LIGUE donne a chaque ligue autre que la
+ligue par defaut sa propre base SQLite.
+
+Les ligues partagent le pool de connexions HTTP et le limiteur de debit de
+api_client, le worker de transition de saison et le modele ZEUS.
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core import config, database
+from src.api import api_client
+from src.api.api_monitor import start_monitoring
+from src.api.db_integration import insert_api_teams
+
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURATION ====================
+
+def _ligues_env() -> List[int]:
+    """Ligues surveillees : GODMOD_LEAGUES="8035,8036" (par defaut la ligue de api_client)."""
+    valeur = os.getenv("GODMOD_LEAGUES", "")
+    ligues = [int(l) for l in valeur.replace(";", ",").split(",") if l.strip()]
+    return ligues or [api_client.LEAGUE_ID]
+
+
+MULTI_LEAGUE_CONFIG = {
+    "LEAGUE_IDS": _ligues_env(),
+    "BASE_PAR_LIGUE": os.getenv("GODMOD_BASE_PAR_LIGUE", "0") == "1",
+    "DATA_DIR": os.path.join(os.path.dirname(os.path.abspath(config.DB_NAME)), "leagues"),
+    "MAX_REQUETES_PAR_SECONDE": 5,   # Toutes ligues confondues
+    "TAILLE_POOL_HTTP": 16,          # Connexions keep-alive partagees
+}
+
+# ==================== SOURCE PAR LIGUE ====================
+
+def chemin_base_ligue(league_id: int) -> Optional[str]:
+    """
+    Base d'une ligue : None (base principale, partitionnee par ligue), sauf avec
+    BASE_PAR_LIGUE pour les ligues autres que la ligue par defaut : <DATA_DIR>/league_<id>.db.
+    """
+    if league_id == api_client.LEAGUE_ID or not MULTI_LEAGUE_CONFIG["BASE_PAR_LIGUE"]:
+        return None
+    return os.path.join(MULTI_LEAGUE_CONFIG["DATA_DIR"], f"league_{league_id}.db")
+
+
+class SourceLigue:
+    """
+    Source de donnees pour start_monitoring, liee a une ligue de l'API.
+
+    Avec enregistrer_equipes (ligues autres que la ligue par defaut), chaque classement
+    recu enregistre ses equipes dans la ligue active, et tant qu'aucune equipe n'est
+    connue les resultats et les cotes sont precedes d'un appel au classement : un
+    classement vide au demarrage (maintenance, timeout) ne fait plus ignorer toutes
+    les lignes comme equipes inconnues. A appeler dans le contexte de la ligue.
+    """
+
+    def __init__(self, league_id: int, enregistrer_equipes: bool = False):
+        self.league_id = league_id
+        self.enregistrer_equipes = enregistrer_equipes
+        self.equipes_connues = False
+
+    def get_ranking(self) -> List[Dict]:
+        ranking = api_client.get_ranking(self.league_id)
+        if self.enregistrer_equipes and ranking:
+            ajoutees = insert_api_teams(ranking)
+            if not self.equipes_connues:
+                logger.info(f"[LIGUES] Ligue {self.league_id} : {ajoutees} equipes ajoutees")
+            self.equipes_connues = True
+        return ranking
+
+    def _assurer_equipes(self):
+        if self.enregistrer_equipes and not self.equipes_connues:
+            self.get_ranking()
+
+    def get_recent_results(self, skip: int = 0, take: int = 5) -> Dict:
+        self._assurer_equipes()
+        return api_client.get_recent_results(self.league_id, skip=skip, take=take)
+
+    def get_upcoming_matches(self) -> Dict:
+        self._assurer_equipes()
+        return api_client.get_upcoming_matches(self.league_id)
+
+# ==================== SURVEILLANCE ====================
+
+def _surveiller_ligue(league_id: int, callback: Optional[Callable[[int], None]],
+                      stop_event: threading.Event, verbose: bool):
+    """Boucle de surveillance d'une ligue, dans le contexte de sa base et de sa partition."""
+    threading.current_thread().name = f"ligue-{league_id}"
+    chemin = chemin_base_ligue(league_id)
+    # Les equipes d'une autre ligue ne sont pas dans config.EQUIPES : prises du classement API
+    source = SourceLigue(league_id, enregistrer_equipes=league_id != config.LEAGUE_ID)
+
+    with database.utiliser_base(chemin), database.utiliser_ligue(league_id):
+        if chemin is not None:
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        if league_id == config.LEAGUE_ID:
+            database.initialiser_db(migrations_en_ligne=True)
+        else:
+            database.initialiser_db(equipes=[], migrations_en_ligne=True)
+            logger.info(f"[LIGUES] Ligue {league_id} : base {chemin or config.DB_NAME}")
+            # Si le classement est vide, nouvel essai avant chaque appel de la boucle
+            if not source.get_ranking():
+                logger.warning(f"[LIGUES] Ligue {league_id} : classement vide, equipes enregistrees plus tard")
+
+        start_monitoring(callback_on_new_journee=callback, verbose=verbose,
+                         source=source, stop_event=stop_event)
+
+
+def demarrer_multi_ligues(league_ids: Optional[List[int]] = None,
+                          callback: Optional[Callable[[int], None]] = None,
+                          stop_event: Optional[threading.Event] = None,
+                          verbose: bool = False) -> Dict[int, Optional[BaseException]]:
+    """
+    Surveille plusieurs ligues en parallele jusqu'a stop_event (ou CTRL+C).
+
+    Args:
+        league_ids: Ligues a surveiller (par defaut MULTI_LEAGUE_CONFIG["LEAGUE_IDS"])
+        callback: Appele avec la journee collectee, dans le thread (et la base) de la ligue
+        stop_event: threading.Event pour arreter toutes les boucles
+        verbose: Afficher l'activite de chaque boucle
+
+    Returns:
+        dict: {league_id: exception ayant arrete la boucle, ou None}
+    """
+    league_ids = league_ids or MULTI_LEAGUE_CONFIG["LEAGUE_IDS"]
+    stop_event = stop_event or threading.Event()
+    api_client.configurer_http(MULTI_LEAGUE_CONFIG["TAILLE_POOL_HTTP"],
+                               MULTI_LEAGUE_CONFIG["MAX_REQUETES_PAR_SECONDE"])
+
+    logger.info(f"[LIGUES] Surveillance de {len(league_ids)} ligues : {league_ids}")
+    print(f"[INFO] Surveillance multi-ligues : {', '.join(str(l) for l in league_ids)}")
+
+    executeur = ThreadPoolExecutor(max_workers=len(league_ids), thread_name_prefix="ligue")
+    taches = {league_id: executeur.submit(_surveiller_ligue, league_id, callback, stop_event, verbose)
+              for league_id in league_ids}
+    erreurs = {}
+    try:
+        for league_id, tache in taches.items():
+            erreurs[league_id] = tache.exception()
+            if erreurs[league_id]:
+                logger.error(f"[LIGUES] Ligue {league_id} arretee : {erreurs[league_id]}")
+    except KeyboardInterrupt:
+        print("\n[STOP] Arret de la surveillance multi-ligues...")
+        stop_event.set()
+    finally:
+        stop_event.set()
+        executeur.shutdown(wait=True)
+    return erreurs
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Surveillance simultanee de plusieurs ligues")
+    parser.add_argument("ligues", nargs="*", type=int, help="IDs des ligues (defaut: GODMOD_LEAGUES)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    from main_api_monitor import callback_predictions_ia
+    demarrer_multi_ligues(args.ligues or None, callback=callback_predictions_ia)
@@ -6,9 +6,13 @@ Version: 2.1
 Date: Janvier 2025
 """
 
+import heapq
 import requests
 import json
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Tuple
+
+from src.core import config
+from src.api.json_stream import iter_rounds
 
 # ==================== CONFIG ====================
 
@@ -25,6 +29,9 @@ HEADERS = {
 
 ROUND_LIMIT = 1  # Nombre de journées à récupérer par défaut
 
+# Noms possibles du marché 1X2
+BET_TYPES_1X2 = ("1X2", "Winner", "Match Winner", "Match Result")
+
 # ==================== FONCTION D'EXTRACTION ====================
 
 def extract_matches_with_local_ids(data: Dict, limit: int = 1) -> List[Dict]:
@@ -82,7 +89,7 @@ def extract_matches_with_local_ids(data: Dict, limit: int = 1) -> List[Dict]:
             # Extraction des cotes 1X2 (Noms possibles: 1X2, Winner, Match Winner, Match Result)
             for bet_type in m.get("eventBetTypes", []):
                 bt_name = bet_type.get("name")
-                if bt_name in ["1X2", "Winner", "Match Winner", "Match Result"]:
+                if bt_name in BET_TYPES_1X2:
                     for item in bet_type.get("eventBetTypeItems", []):
                         odds.append({
                             "type": item.get("shortName"),
@@ -106,6 +113,62 @@ def extract_matches_with_local_ids(data: Dict, limit: int = 1) -> List[Dict]:
     return output
 
 
+def _cotes_1x2(match: Dict) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """Cotes (1, X, 2) du premier marché 1X2 non vide d'un match brut."""
+    for bet_type in match.get("eventBetTypes") or []:
+        if bet_type.get("name") in BET_TYPES_1X2:
+            cotes = {item.get("shortName"): item.get("odds") for item in bet_type.get("eventBetTypeItems") or []}
+            if cotes:
+                return cotes.get("1"), cotes.get("X"), cotes.get("2")
+    return None, None, None
+
+
+def iter_match_rows(data, limit: int = ROUND_LIMIT) -> Iterator[Tuple]:
+    """
+    Transforme une réponse brute "matches" en lignes prêtes pour `cotes`, en une passe
+    (sans la structure intermédiaire de extract_matches_with_local_ids).
+    Seules les `limit` premières journées (par numéro) sont gardées, comme le filtre.
+    
+    Args:
+        data: Réponse décodée ou JSON brut (cf json_stream.iter_rounds)
+        limit: Nombre de journées à extraire
+    
+    Yields:
+        (journee, equipe_dom, equipe_ext, cote_1, cote_x, cote_2) : noms normalisés (config.TEAM_ALIASES)
+    """
+    alias = config.TEAM_ALIASES
+    # Les `limit` plus petites journées, lignes comprises (une journée = quelques matchs)
+    retenues = []
+    for ordre, r in enumerate(iter_rounds(data)):
+        journee = r.get("roundNumber")
+        lignes = []
+        for m in r.get("matches") or []:
+            home = (m.get("homeTeam") or {}).get("name")
+            away = (m.get("awayTeam") or {}).get("name")
+            lignes.append((journee, alias.get(home, home), alias.get(away, away)) + _cotes_1x2(m))
+        entree = (-(journee or 0), -ordre, lignes)
+        if len(retenues) < limit:
+            heapq.heappush(retenues, entree)
+        elif limit > 0 and entree > retenues[0]:
+            heapq.heapreplace(retenues, entree)
+    for _, _, lignes in sorted(retenues, reverse=True):
+        yield from lignes
+
+
+def rows_from_matches(matches_data: List[Dict]) -> Iterator[Tuple]:
+    """Lignes `cotes` depuis le format filtré (extract_matches_with_local_ids), cf iter_match_rows."""
+    alias = config.TEAM_ALIASES
+    for round_data in matches_data or []:
+        journee = round_data.get("roundNumber")
+        for match in round_data.get("matches", []):
+            odds = match.get("odds", [])
+            home, away = match.get("homeTeam"), match.get("awayTeam")
+            yield (journee, alias.get(home, home), alias.get(away, away),
+                   next((o["odds"] for o in odds if o["type"] == "1"), None),
+                   next((o["odds"] for o in odds if o["type"] == "X"), None),
+                   next((o["odds"] for o in odds if o["type"] == "2"), None))
+
+
 def get_filtered_matches(limit: int = 1) -> List[Dict]:
     """
     Récupère et filtre les matchs à venir en une seule fonction
@@ -0,0 +1,391 @@
+"""
+Worker du moniteur dans son propre processus, sous supervision
+Le moniteur (collecte API, ecritures SQLite, predictions, entrainements ZEUS) ne
+tourne plus dans un thread du serveur Streamlit : il ne dispute plus le GIL au
+rendu du dashboard, qui ne fait que lire la base.
+
+- Worker (`python -m src.api.monitor_worker`) : initialise la base puis lance
+  start_monitoring ; un battement (fichier JSON a cote de la base) est ecrit toutes
+  les INTERVALLE_BATTEMENT secondes avec les phases en cours et l'heure du dernier
+  progres (debut ou fin de phase, tour de la boucle de surveillance).
+- Superviseur : relance le worker s'il s'arrete, si son battement est perime
+  (processus fige) ou s'il ne progresse plus (boucle bloquee alors que le thread de
+  battement tourne encore), avec un delai croissant ; le delai repart de zero apres
+  une execution stable.
+- lancer_tout (main_web.py) : superviseur + dashboard dans un seul processus parent,
+  pour le deploiement sur un seul dyno (Procfile).
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core import config
+
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURATION ====================
+
+WORKER_CONFIG = {
+    "INTERVALLE_BATTEMENT": 10,    # Secondes entre deux battements du worker
+    "BATTEMENT_PERIME": 120,       # Sans battement ni progres depuis N secondes : worker fige, relance
+    "PROGRES_ENTRAINEMENT": 1800,  # Sans progres pendant un entrainement ZEUS : limite elargie
+    "DELAI_REDEMARRAGE": 5,        # Premier delai avant relance (double a chaque echec)
+    "DELAI_MAX": 300,              # Plafond du delai de relance
+    "EXECUTION_STABLE": 600,       # Une execution plus longue remet le delai a zero
+    "DELAI_ARRET": 20,             # Secondes laissees au worker pour s'arreter avant kill
+    "FICHIER_BATTEMENT": "worker_heartbeat.json",
+}
+
+# Phase longue sans progres intermediaire (cf season_rollover._etape_entrainement)
+PHASE_ENTRAINEMENT = "entrainement_zeus"
+
+# ==================== BATTEMENT ====================
+
+def chemin_battement() -> str:
+    """Fichier de battement, dans le dossier de la base principale."""
+    return os.path.join(os.path.dirname(config.DB_NAME), WORKER_CONFIG["FICHIER_BATTEMENT"])
+
+
+def ecrire_battement(etat: Dict, chemin: Optional[str] = None):
+    """Ecrit le battement de facon atomique (jamais lu a moitie par le dashboard)."""
+    chemin = chemin or chemin_battement()
+    os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        json.dump(etat, f)
+    os.replace(temporaire, chemin)
+
+
+def lire_battement(chemin: Optional[str] = None) -> Optional[Dict]:
+    """
+    Dernier battement du worker, complete de son age et de son statut.
+
+    Returns:
+        dict (pid, phase, phases, journee, demarre, battement, progres, attente, age, statut)
+        ou None si aucun worker n'a jamais battu. statut : cf statut_battement().
+    """
+    try:
+        with open(chemin or chemin_battement(), encoding="utf-8") as f:
+            etat = json.load(f)
+    except (OSError, ValueError):
+        return None
+    etat["age"] = round(time.time() - etat.get("battement", 0), 1)
+    etat["statut"] = statut_battement(etat)
+    return etat
+
+
+def statut_battement(etat: Dict, limites: Optional[Dict] = None) -> str:
+    """
+    Statut d'un worker d'apres son dernier battement.
+
+    Args:
+        etat: Battement lu (cf lire_battement)
+        limites: Surcharges de WORKER_CONFIG (BATTEMENT_PERIME, PROGRES_ENTRAINEMENT)
+
+    Returns:
+        "arrete" (arret propre), "perime" (plus de battement : processus fige),
+        "fige" (battement sans progres : boucle bloquee) ou "actif"
+    """
+    limites = {**WORKER_CONFIG, **(limites or {})}
+    maintenant = time.time()
+    if etat.get("arrete"):
+        return "arrete"
+    if maintenant - etat.get("battement", 0) > limites["BATTEMENT_PERIME"]:
+        return "perime"
+    # Progres attendu a la fin de l'attente annoncee (sommeil entre deux tours de boucle)
+    progres = etat.get("progres", etat.get("battement", 0)) + etat.get("attente", 0)
+    limite = limites["PROGRES_ENTRAINEMENT"] if PHASE_ENTRAINEMENT in etat.get("phases", ()) \
+        else limites["BATTEMENT_PERIME"]
+    return "fige" if maintenant - progres > limite else "actif"
+
+
+class Battement:
+    """
+    Battement du worker : un thread ecrit l'etat toutes les INTERVALLE_BATTEMENT secondes.
+    Compatible avec le parametre recorder de start_monitoring (phases en cours, du
+    moniteur comme du worker de transition de saison).
+
+    Le battement prouve que le processus vit ; l'heure du dernier progres, que la
+    surveillance avance. Elle est mise a jour au debut et a la fin de chaque phase et a
+    chaque tour de boucle (progres(), appele par l'horloge du worker avant de dormir).
+    """
+
+    def __init__(self, chemin: Optional[str] = None, intervalle: Optional[float] = None):
+        self.chemin = chemin or chemin_battement()
+        self.intervalle = intervalle or WORKER_CONFIG["INTERVALLE_BATTEMENT"]
+        maintenant = time.time()
+        self.etat = {"pid": os.getpid(), "phase": "demarrage", "phases": [], "journee": None,
+                     "demarre": maintenant, "battement": maintenant, "progres": maintenant,
+                     "attente": 0, "arrete": False}
+        self._arret = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @contextmanager
+    def phase(self, nom: str, journee: int):
+        with self._lock:
+            self.etat["phases"] = self.etat["phases"] + [nom]
+            self.etat.update(phase=nom, journee=journee, progres=time.time(), attente=0)
+        try:
+            yield
+        finally:
+            with self._lock:
+                phases = list(self.etat["phases"])
+                phases.remove(nom)
+                self.etat.update(phases=phases, phase=phases[-1] if phases else "surveillance",
+                                 progres=time.time(), attente=0)
+
+    def progres(self, attente: float = 0):
+        """
+        Signale un progres de la surveillance.
+
+        Args:
+            attente: Secondes d'attente annoncees avant le prochain progres (sommeil de la boucle)
+        """
+        with self._lock:
+            self.etat.update(progres=time.time(), attente=attente)
+
+    def battre(self):
+        with self._lock:
+            self.etat["battement"] = time.time()
+            etat = dict(self.etat)
+        try:
+            ecrire_battement(etat, self.chemin)
+        except OSError as e:
+            logger.warning(f"[WORKER] Battement non ecrit : {e}")
+
+    def _boucle(self):
+        while not self._arret.wait(self.intervalle):
+            self.battre()
+
+    def demarrer(self):
+        self.battre()
+        self._thread = threading.Thread(target=self._boucle, name="worker-heartbeat", daemon=True)
+        self._thread.start()
+
+    def arreter(self):
+        self._arret.set()
+        with self._lock:
+            self.etat.update(arrete=True, phase="arret")
+        self.battre()
+
+
+class _HorlogeInterruptible:
+    """
+    Horloge du moniteur dont les attentes se terminent des la demande d'arret.
+    Chaque tour de la boucle de surveillance se termine par une attente : elle est
+    signalee au battement comme un progres (avec sa duree).
+    """
+
+    def __init__(self, arret: threading.Event, battement: Optional[Battement] = None):
+        self.arret = arret
+        self.battement = battement
+
+    def sleep(self, secondes: float):
+        if self.battement is not None:
+            self.battement.progres(secondes)
+        self.arret.wait(secondes)
+
+    def now(self):
+        return datetime.now()
+
+# ==================== WORKER ====================
+
+def executer_worker(callback=None, source=None, arret: Optional[threading.Event] = None) -> int:
+    """
+    Corps du processus worker : initialisation de la base, battement, surveillance.
+    SIGTERM demande un arret propre (fin de la phase en cours).
+
+    Args:
+        callback: Appele a chaque nouvelle journee (par defaut main.callback_predictions_ia)
+        source: Source de donnees (par defaut le module api_client)
+        arret: Evenement d'arret (cree si None)
+
+    Returns:
+        Code de sortie (0 = arret demande)
+    """
+    from src.core import database
+    from src.api import season_rollover
+    from src.api.api_monitor import start_monitoring
+
+    arret = arret or threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: arret.set())
+
+    battement = Battement()
+    battement.demarrer()
+    try:
+        database.initialiser_db(migrations_en_ligne=True)
+        if callback is None:
+            from main import callback_predictions_ia as callback
+        start_monitoring(callback_on_new_journee=callback, verbose=False, source=source,
+                         clock=_HorlogeInterruptible(arret, battement), stop_event=arret, recorder=battement)
+    finally:
+        # Transition de saison en cours : reprise par le prochain worker
+        season_rollover.arreter_worker(WORKER_CONFIG["DELAI_ARRET"])
+        battement.arreter()
+    # Sortie de la boucle sans arret demande (trop d'erreurs) : le superviseur relance
+    return 0 if arret.is_set() else 1
+
+# ==================== SUPERVISION ====================
+
+def commande_worker() -> List[str]:
+    """Commande du processus worker."""
+    return [sys.executable, "-m", "src.api.monitor_worker"]
+
+
+class Superviseur:
+    """
+    Lance et surveille le processus worker : relance s'il s'arrete, si son battement
+    est perime ou s'il ne progresse plus (cf statut_battement), avec un delai croissant
+    (DELAI_REDEMARRAGE, double, plafonne a DELAI_MAX).
+    """
+
+    def __init__(self, commande: Optional[List[str]] = None, chemin_battement_worker: Optional[str] = None,
+                 verification: float = 1.0, **options):
+        """
+        Args:
+            commande: Commande du worker (par defaut commande_worker())
+            chemin_battement_worker: Fichier de battement surveille
+            verification: Secondes entre deux verifications du worker
+            **options: Surcharges de WORKER_CONFIG (BATTEMENT_PERIME, PROGRES_ENTRAINEMENT,
+                DELAI_REDEMARRAGE...)
+        """
+        self.commande = commande or commande_worker()
+        self.chemin = chemin_battement_worker or chemin_battement()
+        self.verification = verification
+        self.config = {**WORKER_CONFIG, **options}
+        self.arret = threading.Event()
+        self.processus = None
+        self.redemarrages = 0
+        self._thread = None
+
+    def _lancer(self):
+        # Un battement restant d'un ancien worker ne doit pas valider le nouveau
+        try:
+            os.remove(self.chemin)
+        except OSError:
+            pass
+        racine = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+        self.processus = subprocess.Popen(self.commande, cwd=racine)
+        logger.info(f"[SUPERVISEUR] Worker demarre (pid {self.processus.pid})")
+        return time.monotonic()
+
+    def _arreter_processus(self):
+        if self.processus is None or self.processus.poll() is not None:
+            return
+        self.processus.terminate()
+        try:
+            self.processus.wait(self.config["DELAI_ARRET"])
+        except subprocess.TimeoutExpired:
+            logger.warning(f"[SUPERVISEUR] Worker {self.processus.pid} force (kill)")
+            self.processus.kill()
+            self.processus.wait()
+
+    def _fige(self, lancement: float) -> Optional[str]:
+        """
+        Worker fige : battement jamais ecrit ou perime, ou aucun progres depuis
+        BATTEMENT_PERIME secondes (PROGRES_ENTRAINEMENT pendant un entrainement ZEUS).
+
+        Returns:
+            Motif ("perime", "fige") ou None si le worker est actif
+        """
+        etat = lire_battement(self.chemin)
+        if etat is None:
+            return "perime" if time.monotonic() - lancement > self.config["BATTEMENT_PERIME"] else None
+        statut = statut_battement(etat, self.config)
+        return statut if statut in ("perime", "fige") else None
+
+    def superviser(self):
+        """Boucle de supervision, jusqu'a arreter()."""
+        delai = self.config["DELAI_REDEMARRAGE"]
+        while not self.arret.is_set():
+            lancement = self._lancer()
+            while not self.arret.wait(self.verification):
+                code = self.processus.poll()
+                if code is not None:
+                    logger.warning(f"[SUPERVISEUR] Worker arrete (code {code})")
+                    break
+                motif = self._fige(lancement)
+                if motif:
+                    cause = "battement perime" if motif == "perime" else "aucun progres"
+                    logger.error(f"[SUPERVISEUR] Worker {self.processus.pid} fige ({cause}), relance")
+                    self._arreter_processus()
+                    break
+            if self.arret.is_set():
+                break
+
+            # Delai de relance : remis a zero apres une execution stable
+            if time.monotonic() - lancement >= self.config["EXECUTION_STABLE"]:
+                delai = self.config["DELAI_REDEMARRAGE"]
+            self.redemarrages += 1
+            logger.warning(f"[SUPERVISEUR] Relance du worker dans {delai}s (relance {self.redemarrages})")
+            self.arret.wait(delai)
+            delai = min(delai * 2, self.config["DELAI_MAX"])
+        self._arreter_processus()
+
+    def demarrer(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self.superviser, name="worker-supervisor", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def arreter(self):
+        self.arret.set()
+        if self._thread is not None:
+            self._thread.join()
+        else:
+            self._arreter_processus()
+
+
+def lancer_tout(port: Optional[int] = None) -> int:
+    """
+    Point d'entree du deploiement a un seul dyno : base initialisee, worker supervise,
+    puis dashboard Streamlit au premier plan. L'arret du dashboard arrete le worker.
+
+    Args:
+        port: Port du dashboard (par defaut $PORT, sinon 8501)
+
+    Returns:
+        Code de sortie du dashboard
+    """
+    from src.core import database
+
+    # Schema a jour avant que le dashboard ne lise (migrations longues : dans le worker)
+    database.initialiser_db()
+
+    superviseur = Superviseur()
+    superviseur.demarrer()
+    port = port or int(os.environ.get("PORT", 8501))
+    racine = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+    dashboard = subprocess.Popen([sys.executable, "-m", "streamlit", "run", "dashboard_ui.py",
+                                  "--server.port", str(port)], cwd=racine)
+    signal.signal(signal.SIGTERM, lambda *_: dashboard.terminate())
+    try:
+        return dashboard.wait()
+    except KeyboardInterrupt:
+        dashboard.terminate()
+        return dashboard.wait()
+    finally:
+        superviseur.arreter()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    sys.exit(executer_worker())
@@ -0,0 +1,105 @@
+"""
+Deduplication des reponses API avant filtrage et ecriture en base
+Memorise l'empreinte (SHA-1) du dernier contenu traite par endpoint et cle de
+requete : une reponse identique est court-circuitee avant results_filter /
+matches_filter / db_integration, et les ecritures evitees sont comptabilisees.
+
+Une empreinte n'est memorisee qu'apres un traitement reussi (confirmer) : un
+echec d'insertion ne peut donc jamais masquer la reponse suivante.
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+from src.core.database import get_contexte
+
+logger = logging.getLogger(__name__)
+
+# {((base, ligue), endpoint, cle): (empreinte, lignes_ecrites, valeur_derivee)}
+_DERNIERS = {}
+_STATS = {}
+_lock = threading.Lock()
+
+
+class Verification(NamedTuple):
+    """Resultat de verifier() : empreinte de la reponse et valeur memorisee si inchangee."""
+    empreinte: str
+    inchange: bool
+    valeur: Any
+
+
+def empreinte(payload) -> str:
+    """Empreinte stable d'une reponse JSON (independante de l'ordre des cles)."""
+    contenu = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha1(contenu.encode("utf-8")).hexdigest()
+
+
+def _stats(endpoint: str) -> Dict:
+    return _STATS.setdefault(endpoint, {"recues": 0, "inchangees": 0, "ecritures_evitees": 0})
+
+
+def verifier(endpoint: str, cle: str, payload) -> Verification:
+    """
+    Compare une reponse a la derniere reponse traitee pour (endpoint, cle).
+
+    Args:
+        endpoint: "results", "ranking" ou "matches"
+        cle: Parametres de la requete ou usage (ex: "take=4")
+        payload: Reponse brute de l'API
+
+    Returns:
+        Verification(empreinte, inchange, valeur memorisee lors du dernier traitement)
+    """
+    e = empreinte(payload)
+    with _lock:
+        precedent = _DERNIERS.get((get_contexte(), endpoint, cle))
+        stats = _stats(endpoint)
+        stats["recues"] += 1
+        if precedent and precedent[0] == e:
+            stats["inchangees"] += 1
+            stats["ecritures_evitees"] += precedent[1]
+            return Verification(e, True, precedent[2])
+    return Verification(e, False, None)
+
+
+def confirmer(endpoint: str, cle: str, verification: Verification, lignes: int = 0, valeur: Any = None):
+    """
+    Memorise une reponse apres traitement reussi.
+
+    Args:
+        verification: Resultat de verifier() pour cette reponse
+        lignes: Lignes ecrites en base (comptees comme evitees aux prochains doublons)
+        valeur: Resultat derive a restituer aux prochains doublons (ex: journee max)
+    """
+    with _lock:
+        _DERNIERS[(get_contexte(), endpoint, cle)] = (verification.empreinte, lignes, valeur)
+
+
+def oublier(endpoint: Optional[str] = None):
+    """
+    Oublie les empreintes memorisees pour la base et la ligue actives (toutes, ou celles d'un endpoint).
+    A appeler quand la base est modifiee hors de ce flux (ex: reinitialisation de session).
+    """
+    contexte = get_contexte()
+    with _lock:
+        for cle in [c for c in _DERNIERS if c[0] == contexte and (endpoint is None or c[1] == endpoint)]:
+            del _DERNIERS[cle]
+
+
+def get_statistiques() -> Dict:
+    """Compteurs par endpoint : reponses recues, inchangees et lignes d'ecriture evitees."""
+    with _lock:
+        return {endpoint: dict(stats) for endpoint, stats in _STATS.items()}
+
+
+def reinitialiser():
+    """Oublie toutes les empreintes et remet les compteurs a zero."""
+    with _lock:
+        _DERNIERS.clear()
+        _STATS.clear()
@@ -0,0 +1,192 @@
+"""
+Reconciliation base / API
+Verifie que `resultats` et `cotes` correspondent toujours a l'API (polls manques,
+collecte partielle) et ne reecrit que les journees qui different.
+
+Chaque journee est resumee par une empreinte (SHA-1 des matchs tries) calculee
+des deux cotes : la base en une requete par page, l'API depuis la page de
+resultats deja recue. Une journee conforme ne coute aucune ecriture, une journee
+divergente est reinseree depuis cette meme page (upsert), sans requete de plus.
+Le parcours de l'historique (get_recent_results(skip, take)) va jusqu'a la
+journee 1 tant que la session n'a pas ete verifiee en entier, puis s'arrete sur
+la premiere page entierement conforme. Le budget de requetes borne chaque
+passage : une journee entiere de polls manques est reparee en quelques requetes,
+un historique plus long sur plusieurs passages.
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import hashlib
+import logging
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.api import api_client, payload_dedup
+from src.api.data_comparator import normalize_odds, normalize_score
+from src.api.db_integration import insert_api_matches, insert_api_results, normalize_team_name
+from src.api.matches_filter import extract_matches_with_local_ids
+from src.api.results_filter import extract_results_minimal
+from src.core.database import get_base_active, get_db_connection, get_partition
+
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURATION ====================
+
+RECONCILIATION_CONFIG = {
+    "TAILLE_PAGE": 10,        # Journees par requete get_recent_results
+    "BUDGET_REQUETES": 6,     # Requetes maximum par passage (resultats + cotes) : une saison de 38 journees
+    "INTERVALLE": 600,        # Secondes entre deux passages dans la boucle de surveillance
+    "COTES": True,            # Verifier aussi les cotes des journees a venir
+}
+
+# Partitions (base, ligue, session) dont tout l'historique a ete verifie au moins une fois
+_HISTORIQUE_VERIFIE = set()
+
+# ==================== EMPREINTES ====================
+
+def empreinte_journee(matchs: Iterable[Tuple]) -> str:
+    """
+    Empreinte d'une journee, independante de l'ordre des matchs.
+
+    Args:
+        matchs: Tuples (domicile, exterieur, valeurs...) ; nombres arrondis a 2 decimales
+            (SQLite rend une cote 4.0 en entier 4)
+    """
+    lignes = sorted(
+        "|".join("" if v is None else (f"{v:.2f}" if isinstance(v, (int, float)) else str(v)) for v in m)
+        for m in matchs
+    )
+    return hashlib.sha1("\n".join(lignes).encode("utf-8")).hexdigest()
+
+
+def empreintes_api(rounds: Iterable[Dict], valeurs) -> Dict[int, str]:
+    """
+    Empreinte de chaque journee d'une reponse filtree (noms normalises comme a l'insertion).
+
+    Args:
+        rounds: Journees au format results_filter / matches_filter
+        valeurs: match -> valeurs comparees (ex: score normalise)
+    """
+    return {
+        r["roundNumber"]: empreinte_journee(
+            (normalize_team_name(m.get("homeTeam")), normalize_team_name(m.get("awayTeam"))) + tuple(valeurs(m))
+            for m in r.get("matches", [])
+        )
+        for r in rounds if r.get("roundNumber") is not None
+    }
+
+
+def empreintes_base(table: str, journees: Iterable[int]) -> Dict[int, str]:
+    """
+    Empreinte par journee de `resultats` (scores) ou `cotes` (1X2) dans la partition active,
+    en une requete pour toutes les journees demandees.
+    """
+    colonnes = {"resultats": "t.score_dom, t.score_ext", "cotes": "t.cote_1, t.cote_x, t.cote_2"}[table]
+    journees = list(journees)
+    if not journees:
+        return {}
+    par_journee = {j: [] for j in journees}
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT t.journee, e1.nom, e2.nom, {colonnes}
+            FROM {table} t
+            JOIN equipes e1 ON t.equipe_dom_id = e1.id
+            JOIN equipes e2 ON t.equipe_ext_id = e2.id
+            WHERE t.league_id = ? AND t.session_id = ? AND t.journee IN ({','.join('?' * len(journees))})
+        """, get_partition(conn) + tuple(journees))
+        for row in cursor.fetchall():
+            par_journee[row[0]].append(tuple(row[1:]))
+    return {j: empreinte_journee(matchs) for j, matchs in par_journee.items()}
+
+# ==================== RECONCILIATION ====================
+
+def _valeurs_cotes(match: Dict) -> Tuple:
+    return tuple(None if c is None else float(c) for c in normalize_odds(match))
+
+
+def _reconcilier_cotes(source, bilan: Dict):
+    """Cotes des journees a venir : une requete, upsert des journees divergentes."""
+    matches = extract_matches_with_local_ids(source.get_upcoming_matches(), limit=2)
+    bilan["requetes"] += 1
+    api = empreintes_api(matches, _valeurs_cotes)
+    base = empreintes_base("cotes", api)
+    divergentes = [r for r in matches if api.get(r["roundNumber"]) != base.get(r["roundNumber"])]
+    if divergentes:
+        insert_api_matches(divergentes)
+        # La prochaine reponse "matches" doit etre traitee meme si identique a la precedente
+        payload_dedup.oublier("matches")
+        bilan["cotes_reparees"] = sorted(r["roundNumber"] for r in divergentes)
+
+
+def reconcilier(source=None, budget: Optional[int] = None, taille_page: Optional[int] = None) -> Dict:
+    """
+    Compare la base a l'API journee par journee et repare les journees divergentes.
+
+    Args:
+        source: Source de donnees (par defaut le module api_client)
+        budget: Requetes maximum (RECONCILIATION_CONFIG["BUDGET_REQUETES"] par defaut)
+        taille_page: Journees par requete de resultats
+
+    Returns:
+        Bilan : requetes, journees verifiees, journees reparees (resultats et cotes),
+        budget_epuise (True si l'historique n'a pas pu etre parcouru jusqu'au bout)
+    """
+    source = source or api_client
+    budget = budget or RECONCILIATION_CONFIG["BUDGET_REQUETES"]
+    taille_page = taille_page or RECONCILIATION_CONFIG["TAILLE_PAGE"]
+    debut = time.monotonic()
+    bilan = {"requetes": 0, "journees_verifiees": 0, "journees_reparees": [], "cotes_reparees": [],
+             "budget_epuise": False}
+
+    # Une requete reservee aux cotes si le budget le permet
+    budget_resultats = budget - 1 if RECONCILIATION_CONFIG["COTES"] and budget > 1 else budget
+    partition = (get_base_active(),) + get_partition()
+    skip = 0
+    while True:
+        if bilan["requetes"] >= budget_resultats:
+            bilan["budget_epuise"] = True
+            _HISTORIQUE_VERIFIE.discard(partition)
+            break
+        rounds = extract_results_minimal(source.get_recent_results(skip=skip, take=taille_page))
+        bilan["requetes"] += 1
+        if not rounds:
+            _HISTORIQUE_VERIFIE.add(partition)
+            break
+
+        api = empreintes_api(rounds, lambda m: normalize_score(m) or (None, None))
+        base = empreintes_base("resultats", api)
+        divergentes = [r for r in rounds if api.get(r["roundNumber"]) != base.get(r["roundNumber"])]
+        bilan["journees_verifiees"] += len(api)
+        if divergentes:
+            insert_api_results(divergentes)
+            bilan["journees_reparees"] += [r["roundNumber"] for r in divergentes]
+
+        # Debut de saison atteint, ou page conforme alors que l'historique plus ancien est deja verifie
+        if len(rounds) < taille_page or min(api, default=1) <= 1:
+            _HISTORIQUE_VERIFIE.add(partition)
+            break
+        if not divergentes and partition in _HISTORIQUE_VERIFIE:
+            break
+        skip += taille_page
+
+    if bilan["journees_reparees"]:
+        bilan["journees_reparees"].sort()
+        # Les buts du classement sont recalcules depuis les resultats
+        payload_dedup.oublier("ranking")
+
+    if RECONCILIATION_CONFIG["COTES"] and bilan["requetes"] < budget:
+        try:
+            _reconcilier_cotes(source, bilan)
+        except Exception as e:
+            logger.warning(f"[RECONCILIATION] Cotes non verifiees : {e}")
+
+    bilan["duree"] = round(time.monotonic() - debut, 3)
+    if bilan["journees_reparees"] or bilan["cotes_reparees"]:
+        logger.warning(f"[RECONCILIATION] Derive corrigee : resultats {bilan['journees_reparees']}, "
+                       f"cotes {bilan['cotes_reparees']} ({bilan['requetes']} requetes, {bilan['duree']}s)")
+    else:
+        logger.info(f"[RECONCILIATION] Base conforme ({bilan['journees_verifiees']} journees, "
+                    f"{bilan['requetes']} requetes)")
+    return bilan
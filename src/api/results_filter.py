@@ -6,9 +6,15 @@ Version: 2.1
 Date: Janvier 2025
 """
 
+import logging
 import requests
 import json
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Tuple
+
+from src.core import config
+from src.api.json_stream import iter_rounds
+
+logger = logging.getLogger(__name__)
 
 # ==================== CONFIG ====================
 
@@ -74,6 +80,54 @@ def extract_results_minimal(data: Dict) -> List[Dict]:
     return output
 
 
+def parse_score(score) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parse un score "2:1", "2-1" ou "2 - 1"
+    
+    Returns:
+        (score_dom, score_ext), (None, None) si absent ou invalide
+    """
+    if not score:
+        return None, None
+    parts = str(score).replace(':', '-').replace(' ', '').split('-')
+    try:
+        return int(parts[0]), int(parts[1])
+    except (ValueError, IndexError):
+        logger.warning(f"Format de score invalide : {score}")
+        return None, None
+
+
+def iter_result_rows(data) -> Iterator[Tuple]:
+    """
+    Transforme une reponse brute de l'API en lignes pretes pour `resultats`, en une passe
+    (sans la structure intermediaire de extract_results_minimal)
+    
+    Args:
+        data: Reponse decodee ou JSON brut (cf json_stream.iter_rounds)
+    
+    Yields:
+        (journee, equipe_dom, equipe_ext, score_dom, score_ext) : noms normalises
+        (config.TEAM_ALIASES), scores entiers ou None
+    """
+    alias = config.TEAM_ALIASES
+    for round_item in iter_rounds(data):
+        journee = round_item.get("roundNumber")
+        for match in round_item.get("matches") or []:
+            home = (match.get("homeTeam") or {}).get("name")
+            away = (match.get("awayTeam") or {}).get("name")
+            yield (journee, alias.get(home, home), alias.get(away, away)) + parse_score(match.get("score"))
+
+
+def rows_from_results(results_data: List[Dict]) -> Iterator[Tuple]:
+    """Lignes `resultats` depuis le format filtre (extract_results_minimal), cf iter_result_rows."""
+    alias = config.TEAM_ALIASES
+    for round_data in results_data or []:
+        journee = round_data.get("roundNumber")
+        for match in round_data.get("matches", []):
+            home, away = match.get("homeTeam"), match.get("awayTeam")
+            yield (journee, alias.get(home, home), alias.get(away, away)) + parse_score(match.get("score"))
+
+
 def get_filtered_results(skip: int = 0, take: int = 5) -> List[Dict]:
     """
     Récupère et filtre les résultats en une seule fonction
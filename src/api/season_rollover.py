@@ -0,0 +1,366 @@
+"""
+Transition de saison en arriere-plan
+Archivage, consolidation de la memoire ZEUS, entrainement flash, validation
+et hot-swap du modele executes par un worker dedie, hors de la boucle de surveillance.
+
+Le monitor se contente de figer la session terminee (snapshot SQLite) et de
+planifier un job ; il reinitialise ensuite les tables et collecte J1 sans attendre.
+Chaque job est persiste dans la table jobs_saison (statut, etape, progression)
+et reprend a sa derniere etape terminee apres un redemarrage. Un job en erreur
+est retente au plus MAX_TENTATIVES fois, puis marque en echec definitif.
+
+A chaque reveil, le worker deplace aussi les sessions au-dela de la retention
+(config.SESSIONS_CONSERVEES) vers la base d'archive (archive.compacter_sessions).
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core.database import (get_db_connection, row_to_dict, get_base_active, utiliser_base,
+                               get_ligue_active, utiliser_ligue)
+from src.core.archive import creer_snapshot_session, archiver_session, compacter_sessions
+from src.zeus import archive_manager, inference, registry
+
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURATION ====================
+
+ROLLOVER_CONFIG = {
+    "RETRAIN_STEPS": 10000,        # Steps de l'entrainement flash de fin de saison
+    "MODEL_NAME": "zeus_v2",       # Modele re-entraine en fin de saison
+    "MAX_TENTATIVES": 3,           # Executions au plus par job, puis echec definitif
+    "POLL_INTERVAL": 60,           # Reveil periodique du worker (secondes)
+}
+
+# Etapes d'un job, dans l'ordre, avec la progression atteinte a la fin de chacune
+ETAPES = (
+    ("archivage", 5.0),
+    ("memoire_zeus", 15.0),
+    ("entrainement_zeus", 90.0),
+    ("validation_zeus", 97.0),
+    ("hot_reload", 100.0),
+)
+
+STATUTS_A_TRAITER = ("en_attente", "en_cours")
+# Jobs encore a executer : en attente, interrompus, ou en erreur avec des tentatives restantes
+_A_TRAITER_SQL = "(statut IN (?, ?) OR (statut = 'erreur' AND tentatives < ?))"
+
+
+def _parametres_a_traiter():
+    return (*STATUTS_A_TRAITER, ROLLOVER_CONFIG["MAX_TENTATIVES"])
+
+# ==================== TABLE DES JOBS ====================
+
+def _maj_job(job_id: int, **champs):
+    """Met a jour les champs d'un job (et son horodatage)."""
+    assignations = ", ".join(f"{nom} = ?" for nom in champs)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"UPDATE jobs_saison SET {assignations}, maj_le = CURRENT_TIMESTAMP WHERE id = ?",
+            (*champs.values(), job_id)
+        )
+
+
+def get_job(job_id: int) -> Optional[Dict]:
+    """
+    Recupere l'etat d'un job de transition
+
+    Args:
+        job_id: Identifiant du job
+
+    Returns:
+        Dictionnaire du job ou None s'il n'existe pas
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM jobs_saison WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        return row_to_dict(row, cursor) if row else None
+
+
+def lister_jobs_a_traiter() -> List[Dict]:
+    """
+    Liste les jobs de la ligue active en attente, interrompus (en_cours au demarrage)
+    ou en erreur avec des tentatives restantes, du plus ancien au plus recent.
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT * FROM jobs_saison
+            WHERE league_id = ? AND {_A_TRAITER_SQL}
+            ORDER BY id ASC
+        """, (get_ligue_active(), *_parametres_a_traiter()))
+        return [row_to_dict(row, cursor) for row in cursor.fetchall()]
+
+
+def planifier_transition(journee_fin: int, modele: Optional[str] = None) -> Optional[int]:
+    """
+    Fige la session terminee et planifie sa transition en arriere-plan.
+    Seule etape synchrone : le snapshot, necessaire avant le reset des tables.
+
+    Args:
+        journee_fin: Derniere journee de la session terminee
+        modele: Nom du modele ZEUS a re-entrainer (ROLLOVER_CONFIG par defaut)
+
+    Returns:
+        Identifiant du job cree ou None si le snapshot a echoue
+    """
+    snapshot = creer_snapshot_session()
+    if not snapshot:
+        return None
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO jobs_saison (statut, progression, journee_fin, snapshot, modele, league_id)
+            VALUES ('en_attente', 0, ?, ?, ?, ?)
+        """, (journee_fin, snapshot, modele or ROLLOVER_CONFIG["MODEL_NAME"], get_ligue_active()))
+        job_id = cursor.lastrowid
+
+    logger.info(f"[ROLLOVER] Job {job_id} planifie (J{journee_fin}, snapshot {snapshot})")
+    _reveil.set()
+    return job_id
+
+# ==================== ETAPES ====================
+
+def _etape_archivage(job: Dict):
+    fichier = archiver_session(db_path=job["snapshot"])
+    if not fichier:
+        raise RuntimeError("Archivage CSV de la session impossible")
+    print(f"   [OK] Archive creee : {fichier}")
+
+
+def _etape_memoire(job: Dict):
+    count = archive_manager.rebuild_history_from_db(source_db=job["snapshot"])
+    print(f"   [ZEUS] {count} souvenirs enregistres.")
+
+
+def _etape_entrainement(job: Dict):
+    from stable_baselines3.common.callbacks import BaseCallback
+    from src.zeus.agent import ZeusAgent
+
+    steps = ROLLOVER_CONFIG["RETRAIN_STEPS"]
+    debut, fin = ETAPES[1][1], ETAPES[2][1]
+
+    class _SuiviProgression(BaseCallback):
+        """Reporte la progression de l'entrainement dans la table jobs_saison."""
+        def __init__(self):
+            super().__init__()
+            self.palier = 0
+
+        def _on_step(self) -> bool:
+            palier = int(10 * self.num_timesteps / max(steps, 1))
+            if palier > self.palier:
+                self.palier = palier
+                _maj_job(job["id"], progression=round(debut + (fin - debut) * min(palier, 10) / 10, 2))
+            return True
+
+    print(f"   [ZEUS] Entrainement flash ({steps} steps) sur la session J1-J{job['journee_fin']}...")
+    agent = ZeusAgent(model_name=job["modele"], db_path=job["snapshot"])
+    agent.train(total_timesteps=steps, callback=_SuiviProgression())
+
+
+def _etape_validation(job: Dict):
+    from src.zeus.agent import MODELS_DIR
+
+    # Idempotent : a la reprise, la version deja enregistree est reutilisee
+    version = job.get("version")
+    if not version:
+        version = registry.enregistrer_version(
+            os.path.join(MODELS_DIR, f"{job['modele']}.zip"),
+            job["modele"],
+            steps=ROLLOVER_CONFIG["RETRAIN_STEPS"],
+            journee_fin=job["journee_fin"],
+            job_id=job["id"],
+        )
+        _maj_job(job["id"], version=version)
+        job["version"] = version
+
+    if registry.promouvoir_si_meilleure(version, db_path=job["snapshot"]):
+        print(f"   [ZEUS] Version {version} validee et activee.")
+    else:
+        print(f"   [ZEUS] Version {version} enregistree, version active conservee.")
+
+
+def _etape_hot_reload(job: Dict):
+    active = registry.get_version_active()
+    # Rien a recharger : aucune version active, ou deja servie (un rechargement
+    # invaliderait le cache des predictions sans changer le modele)
+    if active is None or active == inference.get_version_chargee():
+        return
+    # Non bloquant : en cas d'echec, l'inference garde le modele deja charge
+    if inference.reload_model(active):
+        print("   [ZEUS] Nouveau modele charge en memoire.")
+    else:
+        logger.warning(f"[ROLLOVER] Job {job['id']} : hot reload ZEUS impossible, modele precedent conserve")
+
+
+_FONCTIONS_ETAPES = {
+    "archivage": _etape_archivage,
+    "memoire_zeus": _etape_memoire,
+    "entrainement_zeus": _etape_entrainement,
+    "validation_zeus": _etape_validation,
+    "hot_reload": _etape_hot_reload,
+}
+
+# ==================== EXECUTION ====================
+
+def executer_job(job_id: int, recorder=None) -> bool:
+    """
+    Execute les etapes restantes d'un job (reprise apres la derniere etape terminee)
+
+    Args:
+        job_id: Identifiant du job
+        recorder: Objet optionnel exposant phase(nom, journee) pour mesurer chaque etape
+
+    Returns:
+        True si le job est termine, False sinon
+    """
+    job = get_job(job_id)
+    if not job or job["statut"] in ("termine", "echec"):
+        return bool(job) and job["statut"] == "termine"
+
+    noms = [nom for nom, _ in ETAPES]
+    reprise = noms.index(job["etape"]) + 1 if job["etape"] in noms else 0
+    tentatives = (job["tentatives"] or 0) + 1
+    _maj_job(job_id, statut="en_cours", tentatives=tentatives, erreur=None)
+    logger.info(f"[ROLLOVER] Job {job_id} : execution a partir de l'etape {noms[reprise] if reprise < len(noms) else 'fin'}")
+
+    etape = None
+    try:
+        for etape, progression in ETAPES[reprise:]:
+            contexte = recorder.phase(etape, job["journee_fin"]) if recorder else nullcontext()
+            with contexte:
+                _FONCTIONS_ETAPES[etape](job)
+            _maj_job(job_id, etape=etape, progression=progression)
+    except Exception as e:
+        logger.error(f"[ROLLOVER] Job {job_id} en erreur a l'etape {etape} : {e}", exc_info=True)
+        print(f"   ❌ Erreur transition de saison ({etape}) : {e}")
+        # Tentatives epuisees : echec definitif, le job n'est plus repris
+        statut = "echec" if tentatives >= ROLLOVER_CONFIG["MAX_TENTATIVES"] else "erreur"
+        if statut == "echec":
+            logger.error(f"[ROLLOVER] Job {job_id} abandonne apres {tentatives} tentative(s)")
+        _maj_job(job_id, statut=statut, erreur=f"{etape}: {e}")
+        return False
+
+    _maj_job(job_id, statut="termine", progression=100.0)
+    logger.info(f"[ROLLOVER] Job {job_id} termine")
+    return True
+
+# ==================== WORKER ====================
+
+_reveil = threading.Event()
+_arret = threading.Event()
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
+_contextes = set()  # (base, ligue) servis par le worker (base None = base principale)
+
+
+def _boucle_worker(recorder):
+    """
+    Traite les jobs a chaque reveil (nouveau job planifie ou intervalle ecoule),
+    puis applique la retention des sessions.
+    Un seul worker sert toutes les bases et ligues : les entrainements ne se concurrencent pas.
+    """
+    while not _arret.is_set():
+        _reveil.clear()
+        for base, ligue in list(_contextes):
+            with utiliser_base(base), utiliser_ligue(ligue):
+                try:
+                    for job in lister_jobs_a_traiter():
+                        if _arret.is_set():
+                            break
+                        executer_job(job["id"], recorder)
+                    if not _arret.is_set():
+                        compacter_sessions()
+                except Exception as e:
+                    logger.error(f"[ROLLOVER] Erreur worker ({base or 'base principale'}, ligue {ligue}) : {e}", exc_info=True)
+        _reveil.wait(ROLLOVER_CONFIG["POLL_INTERVAL"])
+
+
+def demarrer_worker(recorder=None) -> threading.Thread:
+    """
+    Demarre le worker de transition (idempotent) et lui confie la base et la ligue actives.
+    Les jobs interrompus par un arret precedent sont repris immediatement.
+
+    Args:
+        recorder: Objet optionnel exposant phase(nom, journee)
+
+    Returns:
+        Thread du worker
+    """
+    global _worker
+    with _worker_lock:
+        _contextes.add((get_base_active(), get_ligue_active()))
+        if _worker is not None and _worker.is_alive():
+            _reveil.set()  # Reprise immediate des jobs de la ligue ajoutee
+        else:
+            _arret.clear()
+            _worker = threading.Thread(target=_boucle_worker, args=(recorder,), name="season-rollover", daemon=True)
+            _worker.start()
+    return _worker
+
+
+def arreter_worker(timeout: Optional[float] = None):
+    """Arrete le worker apres l'etape en cours. Un job interrompu sera repris au prochain demarrage."""
+    global _worker
+    with _worker_lock:
+        _arret.set()
+        _reveil.set()
+        if _worker is not None:
+            _worker.join(timeout)
+            _worker = None
+        _contextes.clear()
+
+
+def attendre_jobs(timeout: Optional[float] = None, league_id: Optional[int] = None) -> bool:
+    """
+    Attend que tous les jobs a traiter d'une ligue soient traites : en attente, en cours,
+    et en erreur avec des tentatives restantes (repris par le worker au reveil suivant)
+
+    Args:
+        timeout: Delai maximum en secondes (None = illimite)
+        league_id: Ligue attendue (ligue active par defaut)
+
+    Returns:
+        True si plus aucun job de la ligue n'est a traiter (termines ou en echec definitif)
+    """
+    ligue = get_ligue_active() if league_id is None else league_id
+    limite = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM jobs_saison WHERE league_id = ? AND {_A_TRAITER_SQL}",
+                           (ligue, *_parametres_a_traiter()))
+            restants = cursor.fetchone()[0]
+        if restants == 0:
+            return True
+        if limite is not None and time.monotonic() > limite:
+            return False
+        time.sleep(0.2)
+
+
+# ==================== TEST ====================
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    jobs = lister_jobs_a_traiter()
+    print(f"{len(jobs)} job(s) de transition a traiter")
+    for job in jobs:
+        print(f"   Job {job['id']} : {job['statut']} ({job['progression']}%) - etape {job['etape']}")
@@ -0,0 +1,508 @@
+"""
+Mode simulation acceleree de la surveillance API
+Rejoue une saison complete (J1 -> J38, transition de saison, J1/J2 suivantes)
+en quelques secondes grace a une horloge virtuelle et une source synthetique.
+
+Le pipeline reel est execute tel quel (start_monitoring, collect_full_data,
+reinitialiser_tables_session et le job de transition en arriere-plan : archivage,
+memoire ZEUS, entrainement flash) dans une base SQLite temporaire : seules l'horloge
+et la source de donnees sont simulees.
+
+Version: 2.2
+Date: Octobre 2026
+"""
+
+import importlib.util
+import logging
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# Ajouter le chemin du projet
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.core import config
+
+logger = logging.getLogger(__name__)
+
+# ==================== CONFIGURATION ====================
+
+SIMULATION_CONFIG = {
+    "ROUND_DURATION": 45,          # Duree virtuelle d'une journee (secondes)
+    "INTERSEASON_ROUNDS": 2,       # Duree de l'intersaison (en journees)
+    "NB_JOURNEES": 38,             # Journees par saison
+    "RETRAIN_STEPS": 256,          # Entrainement flash reduit pour la simulation
+    "STOP_ROUND_NEXT_SEASON": 2,   # Arret apres cette journee de la saison suivante
+    "JOB_TIMEOUT": 600,            # Attente max du job de transition en fin de simulation (secondes reelles)
+}
+
+# ==================== HORLOGE ====================
+
+class SimulatedClock:
+    """
+    Horloge virtuelle : sleep() avance le temps instantanement.
+    Compatible avec le parametre clock de start_monitoring.
+    """
+    def __init__(self, start: Optional[datetime] = None, limit: Optional[float] = None, stop_event=None):
+        self._elapsed = 0.0
+        self._start = start or datetime(2025, 1, 1, 12, 0, 0)
+        self.limit = limit
+        self.stop_event = stop_event
+
+    def sleep(self, seconds: float):
+        self._elapsed += seconds
+        # Garde-fou : on arrete la boucle si la simulation depasse la duree prevue
+        if self.limit is not None and self._elapsed > self.limit and self.stop_event:
+            logger.warning(f"[SIMULATION] Limite de temps virtuel atteinte ({self.limit}s)")
+            self.stop_event.set()
+
+    def now(self) -> datetime:
+        return self._start + timedelta(seconds=self._elapsed)
+
+    def elapsed(self) -> float:
+        return self._elapsed
+
+
+# ==================== SOURCE DE DONNEES ====================
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    """Tirage de Poisson (algorithme de Knuth, suffisant pour lam < 5)."""
+    seuil = math.exp(-lam)
+    k, p = 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= seuil:
+            return k
+        k += 1
+
+
+def _calendrier_aller_retour(nb_equipes: int) -> List[List[tuple]]:
+    """Calendrier aller-retour (methode du cercle) : 2 * (n - 1) journees."""
+    equipes = list(range(nb_equipes))
+    aller = []
+    for _ in range(nb_equipes - 1):
+        journee = []
+        for i in range(nb_equipes // 2):
+            a, b = equipes[i], equipes[nb_equipes - 1 - i]
+            journee.append((a, b) if len(aller) % 2 == 0 else (b, a))
+        aller.append(journee)
+        equipes = [equipes[0]] + [equipes[-1]] + equipes[1:-1]
+    retour = [[(b, a) for a, b in journee] for journee in aller]
+    return aller + retour
+
+
+class SimulatedSeasonSource:
+    """
+    Source de donnees synthetique au format de l'API (rounds / matches / teams).
+    La journee courante est deduite de l'horloge : une journee toutes les
+    ROUND_DURATION secondes, puis une intersaison ou seules les cotes de J1 existent.
+    """
+    def __init__(self, clock: SimulatedClock, seed: int = 42, equipes: Optional[List[str]] = None):
+        """
+        Args:
+            clock: Horloge virtuelle
+            seed: Graine de generation des scores et cotes
+            equipes: Equipes de la ligue simulee (config.EQUIPES par defaut) ; une saison
+                compte 2 * (n - 1) journees, plafonnees a NB_JOURNEES
+        """
+        self.clock = clock
+        self.seed = seed
+
+        # Noms tels que renvoyes par le site (alias inverses) pour exercer la normalisation
+        alias_inverse = {v: k for k, v in config.TEAM_ALIASES.items()}
+        self.equipes = [alias_inverse.get(nom, nom) for nom in (equipes or config.EQUIPES)]
+        self.calendrier = _calendrier_aller_retour(len(self.equipes))[:SIMULATION_CONFIG["NB_JOURNEES"]]
+        self.nb_journees = len(self.calendrier)
+        self.round_duration = SIMULATION_CONFIG["ROUND_DURATION"]
+        self.season_duration = (self.nb_journees + SIMULATION_CONFIG["INTERSEASON_ROUNDS"]) * self.round_duration
+        self._saisons = {}
+
+    # --- Etat temporel ---
+
+    def position(self):
+        """Retourne (index_saison, journees_jouees, en_intersaison)."""
+        elapsed = self.clock.elapsed()
+        saison = int(elapsed // self.season_duration)
+        t = elapsed - saison * self.season_duration
+        jouees = int(t // self.round_duration) + 1
+        if jouees > self.nb_journees:
+            return saison, self.nb_journees, True
+        return saison, jouees, False
+
+    def _saison(self, index: int) -> Dict:
+        """Genere (une seule fois) les scores et cotes d'une saison."""
+        if index in self._saisons:
+            return self._saisons[index]
+
+        rng = random.Random(self.seed * 1000 + index)
+        forces = [rng.uniform(0.6, 1.6) for _ in self.equipes]
+        journees = []
+        for num, rencontres in enumerate(self.calendrier, start=1):
+            matchs = []
+            for dom, ext in rencontres:
+                lam_dom = 1.45 * forces[dom] / forces[ext] ** 0.5
+                lam_ext = 1.10 * forces[ext] / forces[dom] ** 0.5
+                p1 = forces[dom] * 1.15 / (forces[dom] * 1.15 + forces[ext])
+                px = 0.26
+                p1, p2 = p1 * (1 - px), (1 - p1) * (1 - px)
+                marge = 1.06
+                matchs.append({
+                    "dom": dom,
+                    "ext": ext,
+                    "score": (_poisson(rng, lam_dom), _poisson(rng, lam_ext)),
+                    "odds": tuple(round(max(1.05, 1 / (p * marge)), 2) for p in (p1, px, p2)),
+                })
+            journees.append({"roundNumber": num, "matches": matchs})
+        self._saisons[index] = {"journees": journees}
+        return self._saisons[index]
+
+    # --- Format API ---
+
+    def _round_resultats(self, saison: int, num: int) -> Dict:
+        journee = self._saison(saison)["journees"][num - 1]
+        return {
+            "roundNumber": num,
+            "matches": [
+                {
+                    "id": f"sim_{saison}_{num}_{i}",
+                    "homeTeam": {"name": self.equipes[m["dom"]]},
+                    "awayTeam": {"name": self.equipes[m["ext"]]},
+                    "score": f"{m['score'][0]}:{m['score'][1]}",
+                }
+                for i, m in enumerate(journee["matches"])
+            ],
+        }
+
+    def _round_cotes(self, saison: int, num: int) -> Dict:
+        journee = self._saison(saison)["journees"][num - 1]
+        matches = []
+        for m in journee["matches"]:
+            dom, ext = self.equipes[m["dom"]], self.equipes[m["ext"]]
+            c1, cx, c2 = m["odds"]
+            matches.append({
+                "name": f"{dom} vs {ext}",
+                "homeTeam": {"name": dom},
+                "awayTeam": {"name": ext},
+                "eventBetTypes": [{
+                    "name": "1X2",
+                    "eventBetTypeItems": [
+                        {"shortName": "1", "odds": c1},
+                        {"shortName": "X", "odds": cx},
+                        {"shortName": "2", "odds": c2},
+                    ],
+                }],
+            })
+        debut = self.clock.now() + timedelta(seconds=self.round_duration)
+        return {"roundNumber": num, "expectedStart": debut.isoformat(), "matches": matches}
+
+    def get_recent_results(self, league_id: int = None, skip: int = 0, take: int = 5) -> Dict:
+        saison, jouees, intersaison = self.position()
+        if intersaison:
+            return {"rounds": []}
+        numeros = range(jouees - skip, max(jouees - skip - take, 0), -1)
+        return {"rounds": [self._round_resultats(saison, n) for n in numeros]}
+
+    def get_upcoming_matches(self, league_id: int = None) -> Dict:
+        saison, jouees, intersaison = self.position()
+        if intersaison:
+            return {"rounds": [self._round_cotes(saison + 1, n) for n in (1, 2)]}
+        numeros = [n for n in (jouees + 1, jouees + 2) if n <= self.nb_journees]
+        return {"rounds": [self._round_cotes(saison, n) for n in numeros]}
+
+    def get_ranking(self, league_id: int = None) -> List[Dict]:
+        saison, jouees, _ = self.position()
+        stats = defaultdict(lambda: {"points": 0, "bp": 0, "bc": 0, "won": 0, "draw": 0, "lost": 0, "history": []})
+        for journee in self._saison(saison)["journees"][:jouees]:
+            for m in journee["matches"]:
+                s_dom, s_ext = m["score"]
+                for equipe, bp, bc in ((m["dom"], s_dom, s_ext), (m["ext"], s_ext, s_dom)):
+                    st = stats[equipe]
+                    st["bp"] += bp
+                    st["bc"] += bc
+                    if bp > bc:
+                        st["points"] += 3
+                        st["won"] += 1
+                        st["history"].append("Won")
+                    elif bp == bc:
+                        st["points"] += 1
+                        st["draw"] += 1
+                        st["history"].append("Draw")
+                    else:
+                        st["lost"] += 1
+                        st["history"].append("Lost")
+
+        ordre = sorted(stats.items(), key=lambda x: (x[1]["points"], x[1]["bp"] - x[1]["bc"], x[1]["bp"]), reverse=True)
+        return [
+            {
+                "name": self.equipes[equipe],
+                "position": position,
+                "points": st["points"],
+                "won": st["won"],
+                "draw": st["draw"],
+                "lost": st["lost"],
+                "history": st["history"][-5:],
+            }
+            for position, (equipe, st) in enumerate(ordre, start=1)
+        ]
+
+
+# ==================== MESURES ====================
+
+class SimulationRecorder:
+    """
+    Enregistre la latence et le pic memoire (tracemalloc) de chaque phase.
+    Compatible avec le parametre recorder de start_monitoring.
+    """
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.mesures: List[Dict] = []
+
+    @contextmanager
+    def phase(self, nom: str, journee: int):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            mesure = {"phase": nom, "journee": journee, "duree_s": time.perf_counter() - debut}
+            if self.trace_memory:
+                mesure["pic_memoire_ko"] = (tracemalloc.get_traced_memory()[1] - base) / 1024
+            self.mesures.append(mesure)
+
+    def latences_par_journee(self) -> Dict[int, float]:
+        """Latence de traitement (collecte + callback) de chaque journee."""
+        latences = defaultdict(float)
+        for m in self.mesures:
+            if m["phase"] in ("collecte", "callback"):
+                latences[m["journee"]] += m["duree_s"]
+        return dict(latences)
+
+    def resume_phases(self) -> Dict[str, Dict]:
+        """Agregat par phase : nombre, duree totale/max, pic memoire max."""
+        resume = {}
+        for m in self.mesures:
+            r = resume.setdefault(m["phase"], {"nb": 0, "duree_totale_s": 0.0, "duree_max_s": 0.0, "pic_memoire_ko": 0.0})
+            r["nb"] += 1
+            r["duree_totale_s"] += m["duree_s"]
+            r["duree_max_s"] = max(r["duree_max_s"], m["duree_s"])
+            r["pic_memoire_ko"] = max(r["pic_memoire_ko"], m.get("pic_memoire_ko", 0.0))
+        return resume
+
+
+# ==================== SANDBOX ====================
+
+# Parametres de config jamais recharges pendant une simulation
+CONFIG_SANDBOX = ("DB_NAME", "TURSO_URL", "TURSO_TOKEN")
+
+
+def _rechargement_sandbox():
+    """
+    Remplace intelligence._reload_config dans le sandbox : config.py est relu dans un
+    module separe et seuls les parametres hors CONFIG_SANDBOX sont copies. Le module
+    config partage ne pointe a aucun moment vers la base de production (les threads
+    de transition de saison le lisent en parallele).
+    """
+    spec = importlib.util.find_spec(config.__name__)
+    frais = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(frais)
+    for nom, valeur in vars(frais).items():
+        if nom.isupper() and nom not in CONFIG_SANDBOX:
+            setattr(config, nom, valeur)
+
+
+@contextmanager
+def _sandbox(workdir: str, retrain_steps: int, modele_historique: Optional[str] = None):
+    """
+    Redirige la base, les archives et les modeles vers un dossier temporaire
+    et restaure la configuration a la sortie.
+
+    Le callback IA recharge config a chaque journee (intelligence._reload_config) :
+    pendant la simulation, le rechargement reprend les parametres de config.py
+    sauf la base (DB_NAME, Turso), qui reste celle du sandbox.
+    """
+    from src.core import archive, utils
+    from src.zeus import agent as zeus_agent, inference, registry
+    from src.api import season_rollover, payload_dedup
+    from src.analysis import intelligence
+
+    sauvegarde = {
+        "db": config.DB_NAME,
+        "turso": (config.TURSO_URL, config.TURSO_TOKEN),
+        "archives": archive.ARCHIVES_DIR,
+        "models": zeus_agent.MODELS_DIR,
+        "logs": zeus_agent.LOGS_DIR,
+        "rollover": dict(season_rollover.ROLLOVER_CONFIG),
+        "reload_config": intelligence._reload_config,
+    }
+    config.DB_NAME = os.path.join(workdir, "simulation.db")
+    config.TURSO_URL, config.TURSO_TOKEN = None, None
+    intelligence._reload_config = _rechargement_sandbox
+    archive.ARCHIVES_DIR = os.path.join(workdir, "archives")
+    zeus_agent.MODELS_DIR = os.path.join(workdir, "models", "zeus")
+    zeus_agent.LOGS_DIR = os.path.join(workdir, "logs", "zeus")
+    os.makedirs(zeus_agent.MODELS_DIR, exist_ok=True)
+    if modele_historique:
+        shutil.copy2(modele_historique, registry.chemin_legacy())
+    season_rollover.ROLLOVER_CONFIG["RETRAIN_STEPS"] = retrain_steps
+    utils.invalidate_equipe_cache()
+    payload_dedup.reinitialiser()
+    inference._zeus_agent, inference._version_chargee = None, None
+    try:
+        yield
+    finally:
+        config.DB_NAME = sauvegarde["db"]
+        config.TURSO_URL, config.TURSO_TOKEN = sauvegarde["turso"]
+        intelligence._reload_config = sauvegarde["reload_config"]
+        archive.ARCHIVES_DIR = sauvegarde["archives"]
+        zeus_agent.MODELS_DIR = sauvegarde["models"]
+        zeus_agent.LOGS_DIR = sauvegarde["logs"]
+        season_rollover.ROLLOVER_CONFIG.clear()
+        season_rollover.ROLLOVER_CONFIG.update(sauvegarde["rollover"])
+        utils.invalidate_equipe_cache()
+        payload_dedup.oublier()
+        inference._zeus_agent, inference._version_chargee = None, None
+
+
+# ==================== SIMULATION ====================
+
+def run_season_simulation(callback_on_new_journee=None, seed: int = 42, retrain_steps: Optional[int] = None,
+                          trace_memory: bool = True, workdir: Optional[str] = None, verbose: bool = False,
+                          modele_historique: Optional[str] = None) -> Dict:
+    """
+    Simule une saison complete + la transition vers la saison suivante.
+
+    Args:
+        callback_on_new_journee: Callback IA (ex: main.callback_predictions_ia), optionnel
+        seed: Graine de generation des scores et cotes
+        retrain_steps: Steps de l'entrainement flash (SIMULATION_CONFIG par defaut)
+        trace_memory: Mesurer le pic memoire de chaque phase (tracemalloc)
+        workdir: Dossier de travail (temporaire et supprime si None)
+        verbose: Afficher les messages de surveillance
+        modele_historique: Modele historique (.zip) servi au depart, registre vide
+            (aucun par defaut : la premiere version re-entrainee est promue d'office)
+
+    Returns:
+        Rapport : latences par journee, resume par phase, duree totale, journees traitees
+    """
+    from src.core import database
+    from src.api import season_rollover, payload_dedup
+    from src.api.api_monitor import start_monitoring
+    from src.zeus import registry, inference
+
+    retrain_steps = retrain_steps if retrain_steps is not None else SIMULATION_CONFIG["RETRAIN_STEPS"]
+    dossier = workdir or tempfile.mkdtemp(prefix="godmod_sim_")
+    os.makedirs(dossier, exist_ok=True)
+
+    stop_event = threading.Event()
+    clock = SimulatedClock(stop_event=stop_event)
+    source = SimulatedSeasonSource(clock, seed)
+    # Garde-fou : une saison + quelques journees de la suivante
+    clock.limit = source.season_duration + (SIMULATION_CONFIG["STOP_ROUND_NEXT_SEASON"] + 2) * source.round_duration
+    recorder = SimulationRecorder(trace_memory=trace_memory)
+    journees_traitees = []
+
+    def callback(journee):
+        saison, _, _ = source.position()
+        journees_traitees.append((saison, journee))
+        if callback_on_new_journee:
+            callback_on_new_journee(journee)
+        if saison >= 1 and journee >= SIMULATION_CONFIG["STOP_ROUND_NEXT_SEASON"]:
+            stop_event.set()
+
+    deja_trace = tracemalloc.is_tracing()
+    if trace_memory and not deja_trace:
+        tracemalloc.start()
+    debut = time.perf_counter()
+    try:
+        with _sandbox(dossier, retrain_steps, modele_historique):
+            database.initialiser_db()
+            start_monitoring(
+                callback_on_new_journee=callback,
+                verbose=verbose,
+                clock=clock,
+                source=source,
+                stop_event=stop_event,
+                recorder=recorder,
+            )
+            # La transition tourne en arriere-plan : on attend sa fin avant de quitter le sandbox
+            season_rollover.attendre_jobs(timeout=SIMULATION_CONFIG["JOB_TIMEOUT"])
+            season_rollover.arreter_worker()
+            version_active = registry.get_version_active()
+            version_servie = inference.get_version_chargee()
+            versions = registry.lister_versions()
+            with database.get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM jobs_saison ORDER BY id")
+                jobs = [database.row_to_dict(row, cursor) for row in cursor.fetchall()]
+            dedup = payload_dedup.get_statistiques()
+    finally:
+        duree = time.perf_counter() - debut
+        if trace_memory and not deja_trace:
+            tracemalloc.stop()
+        if workdir is None:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+    return {
+        "duree_totale_s": duree,
+        "temps_virtuel_s": clock.elapsed(),
+        "journees_traitees": journees_traitees,
+        "latences_par_journee": recorder.latences_par_journee(),
+        "phases": recorder.resume_phases(),
+        "mesures": recorder.mesures,
+        "jobs_saison": jobs,
+        "version_active": version_active,
+        "version_servie": version_servie,   # None : modele historique (ou aucun)
+        "versions": versions,
+        "dedup": dedup,
+    }
+
+
+def print_simulation_report(rapport: Dict):
+    """Affiche un resume lisible du rapport de simulation."""
+    latences = list(rapport["latences_par_journee"].values())
+    print("\n" + "=" * 60)
+    print("   [SIMULATION] RAPPORT DE SAISON")
+    print("=" * 60)
+    print(f"   Duree reelle   : {rapport['duree_totale_s']:.2f}s")
+    print(f"   Temps virtuel  : {rapport['temps_virtuel_s'] / 3600:.2f}h")
+    print(f"   Journees       : {len(rapport['journees_traitees'])} callbacks")
+    if latences:
+        latences.sort()
+        p95 = latences[min(len(latences) - 1, int(len(latences) * 0.95))]
+        print(f"   Latence/journee: moy {sum(latences) / len(latences) * 1000:.1f}ms | p95 {p95 * 1000:.1f}ms | max {latences[-1] * 1000:.1f}ms")
+    print("\n   Phase                 Nb   Total(s)   Max(s)   Pic memoire (Ko)")
+    for nom, r in rapport["phases"].items():
+        print(f"   {nom:<20} {r['nb']:>3} {r['duree_totale_s']:>10.3f} {r['duree_max_s']:>8.3f} {r['pic_memoire_ko']:>16.1f}")
+    if rapport.get("dedup"):
+        print("\n   Reponses API     Recues  Inchangees  Lignes evitees")
+        for endpoint, d in rapport["dedup"].items():
+            print(f"   {endpoint:<15} {d['recues']:>7} {d['inchangees']:>11} {d['ecritures_evitees']:>15}")
+    print("=" * 60 + "\n")
+
+
+# ==================== TEST ====================
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    callback = None
+    if "--ia" in sys.argv:
+        from main import callback_predictions_ia as callback
+
+    rapport = run_season_simulation(callback_on_new_journee=callback)
+    print_simulation_report(rapport)
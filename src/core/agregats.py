@@ -0,0 +1,172 @@
+"""
+Agrégats du dashboard, tenus à jour à l'écriture.
+
+- agregats_journee : par journée, prédictions validées, réussites et points, plus
+  les cumuls depuis le début de la session (score, prédictions, réussites). Les
+  indicateurs du dashboard sont la dernière ligne, la courbe de profit la colonne
+  score_cumule : une lecture bornée, quelle que soit la longueur de l'historique.
+- agregats_zeus : par tranche de confiance, essais, réussites et SKIPs des
+  prédictions ZEUS réglées.
+
+Les agrégats sont mis à jour par mettre_a_jour_scoring (validation des prédictions
+et règlement ZEUS), dans la même transaction que les lignes validées ; reconstruire()
+les recalcule depuis les tables sources (contrôle ; la migration 6 en garde une
+copie figée, cf migrations._AGREGATS_V6).
+"""
+import logging
+from collections import defaultdict
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tranches de confiance ZEUS : [0, 0.1[, [0.1, 0.2[, ... [0.9, 1]
+TRANCHES_CONFIANCE = 10
+
+# Actions ZEUS (zeus_predictions.prediction) : 0 = 1, 1 = N, 2 = 2, 3 = SKIP
+ACTION_SKIP = 3
+
+
+def tranche_confiance(confiance) -> int:
+    """Tranche d'une confiance ZEUS (même calcul que _TRANCHE_SQL)."""
+    return min(max(int((confiance or 0) * TRANCHES_CONFIANCE), 0), TRANCHES_CONFIANCE - 1)
+
+
+_TRANCHE_SQL = f"MIN(MAX(CAST(COALESCE(confiance, 0) * {TRANCHES_CONFIANCE} AS INTEGER), 0), {TRANCHES_CONFIANCE - 1})"
+
+
+def issue_match(score_dom: int, score_ext: int) -> int:
+    """Issue d'un match dans le codage des actions ZEUS (0 = 1, 1 = N, 2 = 2)."""
+    if score_dom > score_ext:
+        return 0
+    return 1 if score_dom == score_ext else 2
+
+
+def enregistrer_journee(cursor, partition: Tuple[int, int], journee: int,
+                        predictions: int, reussies: int, points: int):
+    """
+    Ajoute des prédictions validées d'une journée aux agrégats.
+    Utilise le curseur fourni (même transaction que la validation).
+
+    Les cumuls des journées suivantes sont décalés d'autant : une journée validée
+    en retard garde une courbe exacte.
+
+    Args:
+        cursor: Curseur d'une connexion ouverte
+        partition: (league_id, session_id)
+        journee: Journée des prédictions validées
+        predictions, reussies, points: Nombre de prédictions, réussites et points gagnés
+    """
+    if not predictions:
+        return
+    cle = tuple(partition) + (journee,)
+    cursor.execute("""
+        SELECT score_cumule, predictions_cumulees, reussies_cumulees FROM agregats_journee
+        WHERE league_id = ? AND session_id = ? AND journee < ?
+        ORDER BY journee DESC LIMIT 1
+    """, cle)
+    precedente = cursor.fetchone()
+    cursor.execute("""
+        INSERT OR IGNORE INTO agregats_journee
+            (league_id, session_id, journee, score_cumule, predictions_cumulees, reussies_cumulees)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, cle + (tuple(precedente) if precedente else (0, 0, 0)))
+    cursor.execute("""
+        UPDATE agregats_journee
+        SET predictions = predictions + ?, reussies = reussies + ?, points = points + ?
+        WHERE league_id = ? AND session_id = ? AND journee = ?
+    """, (predictions, reussies, points) + cle)
+    cursor.execute("""
+        UPDATE agregats_journee
+        SET score_cumule = score_cumule + ?,
+            predictions_cumulees = predictions_cumulees + ?,
+            reussies_cumulees = reussies_cumulees + ?
+        WHERE league_id = ? AND session_id = ? AND journee >= ?
+    """, (points, predictions, reussies) + cle)
+
+
+def regler_predictions_zeus(cursor, partition: Tuple[int, int]) -> int:
+    """
+    Règle les prédictions ZEUS de la session dont le résultat est connu (resultat, succes)
+    et les ajoute à agregats_zeus. Une prédiction réglée n'est plus réécrite.
+
+    Args:
+        cursor: Curseur d'une connexion ouverte
+        partition: (league_id, session_id)
+
+    Returns:
+        Nombre de prédictions réglées
+    """
+    cursor.execute("""
+        SELECT z.id, z.prediction, z.confiance, r.score_dom, r.score_ext
+        FROM zeus_predictions z
+        JOIN resultats r ON r.league_id = z.league_id AND r.session_id = z.session_id
+            AND r.journee = z.journee AND r.equipe_dom_id = z.equipe_dom_id AND r.equipe_ext_id = z.equipe_ext_id
+        WHERE z.league_id = ? AND z.session_id = ? AND z.resultat IS NULL
+            AND r.score_dom IS NOT NULL AND r.score_ext IS NOT NULL
+    """, tuple(partition))
+    reglements = []
+    tranches = defaultdict(lambda: [0, 0, 0])  # tranche -> [essais, réussites, skips]
+    for zid, action, confiance, score_dom, score_ext in cursor.fetchall():
+        issue = issue_match(score_dom, score_ext)
+        compteurs = tranches[tranche_confiance(confiance)]
+        if action == ACTION_SKIP:
+            succes = None
+            compteurs[2] += 1
+        else:
+            succes = 1 if action == issue else 0
+            compteurs[0] += 1
+            compteurs[1] += succes
+        reglements.append((issue, succes, zid))
+    if not reglements:
+        return 0
+
+    cursor.executemany("UPDATE zeus_predictions SET resultat = ?, succes = ? WHERE id = ?", reglements)
+    cursor.executemany("""
+        INSERT INTO agregats_zeus (league_id, session_id, tranche, essais, reussites, skips)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(league_id, session_id, tranche) DO UPDATE SET
+            essais = essais + excluded.essais,
+            reussites = reussites + excluded.reussites,
+            skips = skips + excluded.skips
+    """, [tuple(partition) + (tranche,) + tuple(c) for tranche, c in tranches.items()])
+    return len(reglements)
+
+
+def reconstruire(cursor) -> int:
+    """
+    Règle les prédictions ZEUS en attente puis recalcule tous les agrégats (toutes ligues
+    et sessions) depuis predictions et zeus_predictions.
+
+    Returns:
+        Nombre de lignes d'agrégats écrites
+    """
+    cursor.execute("SELECT DISTINCT league_id, session_id FROM zeus_predictions WHERE resultat IS NULL")
+    for partition in [tuple(row) for row in cursor.fetchall()]:
+        regler_predictions_zeus(cursor, partition)
+
+    cursor.execute("DELETE FROM agregats_journee")
+    cursor.execute("DELETE FROM agregats_zeus")
+    cursor.execute("""
+        INSERT INTO agregats_journee (league_id, session_id, journee, predictions, reussies, points,
+                                      score_cumule, predictions_cumulees, reussies_cumulees)
+        SELECT league_id, session_id, journee, predictions, reussies, points,
+               SUM(points) OVER session, SUM(predictions) OVER session, SUM(reussies) OVER session
+        FROM (
+            SELECT league_id, session_id, journee, COUNT(*) AS predictions,
+                   SUM(succes = 1) AS reussies, SUM(COALESCE(points_gagnes, 0)) AS points
+            FROM predictions WHERE succes IS NOT NULL
+            GROUP BY league_id, session_id, journee
+        )
+        WINDOW session AS (PARTITION BY league_id, session_id ORDER BY journee)
+    """)
+    lignes = max(cursor.rowcount, 0)
+    cursor.execute(f"""
+        INSERT INTO agregats_zeus (league_id, session_id, tranche, essais, reussites, skips)
+        SELECT league_id, session_id, {_TRANCHE_SQL}, SUM(prediction != {ACTION_SKIP}),
+               SUM(succes = 1), SUM(prediction = {ACTION_SKIP})
+        FROM zeus_predictions WHERE resultat IS NOT NULL
+        GROUP BY league_id, session_id, {_TRANCHE_SQL}
+    """)
+    lignes += max(cursor.rowcount, 0)
+    logger.info(f"Agrégats du dashboard reconstruits : {lignes} lignes")
+    return lignes
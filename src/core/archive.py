@@ -1,20 +1,39 @@
 """
 Module d'archivage des sessions GODMOD V2.
-Gère la détection des nouvelles sessions et l'export des données en CSV.
+Gère la détection des nouvelles sessions, l'export des données en CSV et la
+rétention : une nouvelle session incrémente session_id sans effacer la précédente,
+et les sessions au-delà de config.SESSIONS_CONSERVEES sont déplacées dans une
+base d'archive SQLite.
 """
 import csv
 import os
 import shutil
+import sqlite3
 import logging
 from datetime import datetime
 from . import config
-from .database import get_db_connection
+from .database import (get_db_connection, get_base_active, get_ligue_active, get_partition, lire_session,
+                       ouvrir_session_suivante, invalider_sessions, SCHEMA_TABLES, TABLES_SESSION)
+from . import utils
 
 logger = logging.getLogger(__name__)
 
 # Dossier d'archives
 ARCHIVES_DIR = os.path.join(os.path.dirname(config.DB_NAME), "archives")
 
+def _dossier_archives() -> str:
+    """
+    Dossier d'archives de la base et de la ligue actives : sous-dossier dédié pour une base
+    redirigée (cf utiliser_base) et pour toute ligue autre que la ligue par défaut.
+    """
+    dossier = ARCHIVES_DIR
+    base = get_base_active()
+    if base is not None:
+        dossier = os.path.join(dossier, os.path.splitext(os.path.basename(base))[0])
+    if get_ligue_active() != config.LEAGUE_ID:
+        dossier = os.path.join(dossier, f"league_{get_ligue_active()}")
+    return dossier
+
 def detecter_nouvelle_session(nouvelle_journee: int) -> bool:
     """
     Détecte si une nouvelle session a commencé.
@@ -37,11 +56,12 @@ def detecter_nouvelle_session(nouvelle_journee: int) -> bool:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT MAX(journee) FROM resultats")
+            partition = get_partition(conn)
+            cursor.execute("SELECT MAX(journee) FROM resultats WHERE league_id = ? AND session_id = ?", partition)
             derniere_j_db = cursor.fetchone()[0] or 0
             
             # PRIORITÉ 1 : Vérifier si la session a été archivée
-            cursor.execute("SELECT session_archived, derniere_maj FROM score_ia WHERE id = 1")
+            cursor.execute("SELECT session_archived, derniere_maj FROM score_ia WHERE league_id = ?", (partition[0],))
             res = cursor.fetchone()
             session_archived = res[0] if res else 0
             derniere_maj_str = res[1] if res and len(res) > 1 else None
@@ -101,30 +121,86 @@ def detecter_nouvelle_session(nouvelle_journee: int) -> bool:
     return False
 
 
-def archiver_session() -> str:
+def creer_snapshot_session() -> str:
     """
-    Archive toutes les données de la session actuelle dans un fichier CSV.
-    Crée un backup de sécurité avant l'archivage.
+    Fige la session actuelle dans une base SQLite autonome (snapshot cohérent).
+    Utilise l'API backup de SQLite en local, une copie table par table pour Turso.
+    Le snapshot sert de backup de sécurité et de source pour l'archivage et
+    le ré-entraînement ZEUS, qui peuvent ainsi tourner après le reset des tables.
     
     Returns:
-        Chemin du fichier CSV créé
+        Chemin du snapshot créé, None en cas d'erreur
     """
-    # ÉTAPE 1 : Backup de sécurité de la base de données
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_path = f"{config.DB_NAME}.backup_{timestamp}"
+    dossier = os.path.join(_dossier_archives(), "snapshots")
+    os.makedirs(dossier, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    snapshot_path = os.path.join(dossier, f"session_{timestamp}.db")
+    
     try:
-        shutil.copy2(config.DB_NAME, backup_path)
-        logger.info(f"📦 Backup créé : {backup_path}")
-        print(f"📦 Backup de sécurité créé : {backup_path}")
+        dest = sqlite3.connect(snapshot_path)
+        try:
+            if get_base_active() is None and config.TURSO_URL and config.TURSO_TOKEN:
+                with get_db_connection() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+                    for nom, ddl in cursor.fetchall():
+                        dest.execute(ddl)
+                        cursor.execute(f"SELECT * FROM {nom}")
+                        rows = cursor.fetchall()
+                        if rows:
+                            placeholders = ", ".join("?" * len(rows[0]))
+                            dest.executemany(f"INSERT INTO {nom} VALUES ({placeholders})", [tuple(r) for r in rows])
+            else:
+                source = sqlite3.connect(get_base_active() or config.DB_NAME)
+                try:
+                    source.backup(dest)
+                finally:
+                    source.close()
+            dest.commit()
+        finally:
+            dest.close()
     except Exception as e:
-        logger.error(f"Erreur lors du backup : {e}", exc_info=True)
-        print(f"⚠️ Échec du backup (on continue quand même) : {e}")
+        logger.error(f"Erreur lors du snapshot de session : {e}", exc_info=True)
+        print(f"❌ Échec du snapshot de session : {e}")
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+        return None
+    
+    logger.info(f"📦 Snapshot de session créé : {snapshot_path}")
+    return snapshot_path
+
+
+def archiver_session(db_path: str = None) -> str:
+    """
+    Archive toutes les données de la session actuelle de la ligue active dans un fichier CSV.
+    Crée un backup de sécurité avant l'archivage.
+    
+    Args:
+        db_path: Snapshot de session à archiver (cf creer_snapshot_session).
+                 Si None, archive la base principale après un backup de sécurité.
+    
+    Returns:
+        Chemin du fichier CSV créé
+    """
+    # ÉTAPE 1 : Backup de sécurité de la base de données (le snapshot en tient lieu)
+    if db_path is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = get_base_active() or config.DB_NAME
+        backup_path = f"{base}.backup_{timestamp}"
+        try:
+            shutil.copy2(base, backup_path)
+            logger.info(f"📦 Backup créé : {backup_path}")
+            print(f"📦 Backup de sécurité créé : {backup_path}")
+        except Exception as e:
+            logger.error(f"Erreur lors du backup : {e}", exc_info=True)
+            print(f"⚠️ Échec du backup (on continue quand même) : {e}")
     
     # ÉTAPE 2 : Créer le dossier archives si nécessaire
-    os.makedirs(ARCHIVES_DIR, exist_ok=True)
+    dossier = _dossier_archives()
+    os.makedirs(dossier, exist_ok=True)
     
     # Détermination du prochain ID de session
-    existing_files = [f for f in os.listdir(ARCHIVES_DIR) if f.startswith("archives_session_") and f.endswith(".csv")]
+    existing_files = [f for f in os.listdir(dossier) if f.startswith("archives_session_") and f.endswith(".csv")]
     max_id = 0
     for f in existing_files:
         try:
@@ -138,11 +214,14 @@ def archiver_session() -> str:
             
     next_id = max_id + 1
     filename = f"archives_session_{next_id}.csv"
-    filepath = os.path.join(ARCHIVES_DIR, filename)
+    filepath = os.path.join(dossier, filename)
     
     try:
-        with get_db_connection() as conn:
+        with get_db_connection(db_path) as conn:
             cursor = conn.cursor()
+            ligue = get_ligue_active()
+            # Session lue dans la base archivée elle-même (un snapshot garde la session terminée)
+            partition = (ligue, lire_session(cursor, ligue))
             
             with open(filepath, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
@@ -156,8 +235,9 @@ def archiver_session() -> str:
                     FROM resultats r
                     JOIN equipes e1 ON r.equipe_dom_id = e1.id
                     JOIN equipes e2 ON r.equipe_ext_id = e2.id
+                    WHERE r.league_id = ? AND r.session_id = ?
                     ORDER BY r.journee, r.id
-                """)
+                """, partition)
                 for row in cursor.fetchall():
                     writer.writerow(row)
                 
@@ -172,8 +252,9 @@ def archiver_session() -> str:
                     FROM predictions p
                     JOIN equipes e1 ON p.equipe_dom_id = e1.id
                     JOIN equipes e2 ON p.equipe_ext_id = e2.id
+                    WHERE p.league_id = ? AND p.session_id = ?
                     ORDER BY p.journee, p.id
-                """)
+                """, partition)
                 for row in cursor.fetchall():
                     writer.writerow(row)
                 
@@ -183,7 +264,7 @@ def archiver_session() -> str:
                 writer.writerow(["=== SCORE IA ==="])
                 writer.writerow(["Score_Final", "Predictions_Total", "Predictions_Reussies"])
                 
-                cursor.execute("SELECT score, predictions_total, predictions_reussies FROM score_ia WHERE id = 1")
+                cursor.execute("SELECT score, predictions_total, predictions_reussies FROM score_ia WHERE league_id = ?", (ligue,))
                 row = cursor.fetchone()
                 if row:
                     writer.writerow(row)
@@ -198,14 +279,16 @@ def archiver_session() -> str:
                     SELECT e.nom, c.points, c.forme
                     FROM classement c
                     JOIN equipes e ON c.equipe_id = e.id
+                    WHERE c.league_id = ? AND c.session_id = ?
                     ORDER BY c.points DESC
-                """)
+                """, partition)
                 for row in cursor.fetchall():
                     writer.writerow(row)
             
-            # ÉTAPE 3 : Marquer la session comme archivée
-            cursor.execute("UPDATE score_ia SET session_archived = 1 WHERE id = 1")
-            conn.commit()
+            # ÉTAPE 3 : Marquer la session comme archivée (inutile sur un snapshot, déjà réinitialisé)
+            if db_path is None:
+                cursor.execute("UPDATE score_ia SET session_archived = 1 WHERE league_id = ?", (ligue,))
+                conn.commit()
         
         # Vérification finale
         if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
@@ -223,20 +306,17 @@ def archiver_session() -> str:
 
 def reinitialiser_tables_session():
     """
-    Réinitialise les tables de données pour une nouvelle session.
+    Ouvre une nouvelle session pour la ligue active (incrément de session_id).
+    Les données de la session terminée restent en base (historique des confrontations,
+    entraînement ZEUS) mais ne sont plus vues par les requêtes courantes.
     Garde la table 'equipes' intacte et conserve le score IA.
     Réinitialise pause_until et session_archived pour la nouvelle session.
     """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            
-            # Suppression des données (pas des tables)
-            cursor.execute("DELETE FROM resultats")
-            cursor.execute("DELETE FROM predictions")
-            cursor.execute("DELETE FROM cotes")
-            cursor.execute("DELETE FROM classement")
-            cursor.execute("DELETE FROM zeus_predictions")
+            ligue = get_ligue_active()
+            session = ouvrir_session_suivante(cursor, ligue)
             
             # Réinitialisation pour nouvelle session (score IA conservé)
             cursor.execute("""
@@ -246,14 +326,91 @@ def reinitialiser_tables_session():
                     pause_until = 0,
                     session_archived = 0,
                     derniere_maj = NULL
-                WHERE id = 1
-            """)
+                WHERE league_id = ?
+            """, (ligue,))
+            utils.oublier_donnees(cursor)
     except Exception as e:
-        logger.error(f"Erreur lors de la réinitialisation des tables : {e}", exc_info=True)
+        logger.error(f"Erreur lors de l'ouverture de la nouvelle session : {e}", exc_info=True)
         print(f"❌ Erreur lors de la réinitialisation : {e}")
         return
+    finally:
+        invalider_sessions()
+    
+    print(f"🔄 Session {session} ouverte (session précédente conservée). Score IA conservé.")
+
+
+def chemin_archive_sessions() -> str:
+    """Base SQLite recevant les sessions anciennes de la base et de la ligue actives."""
+    return os.path.join(_dossier_archives(), "sessions_archive.db")
+
+
+def compacter_sessions(sessions_conservees: int = None, taille_lot: int = 1000) -> int:
+    """
+    Déplace les sessions anciennes de la ligue active dans la base d'archive
+    (cf chemin_archive_sessions) : copie par lots, commit de l'archive, puis suppression
+    dans la base principale. Idempotent : une copie interrompue est reprise sans doublon.
+    
+    Args:
+        sessions_conservees: Sessions gardées, courante comprise (config.SESSIONS_CONSERVEES par défaut)
+        taille_lot: Lignes copiées par lot
+    
+    Returns:
+        Nombre de lignes déplacées
+    """
+    sessions_conservees = sessions_conservees or config.SESSIONS_CONSERVEES
+    ligue, session = get_partition()
+    limite = session - sessions_conservees
+    if limite < 1:
+        return 0
+    
+    # Filtre des lignes à déplacer : les clés d'équipes situent cotes_historique dans la ligue
+    filtres = {table: ("league_id = ? AND session_id <= ?", (ligue, limite)) for table in TABLES_SESSION}
+    filtres["cotes_historique"] = ("session_id <= ? AND equipe_dom_id IN (SELECT id FROM equipes WHERE league_id = ?)",
+                                   (limite, ligue))
+    
+    deplacees = 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MIN(session_id) FROM resultats WHERE league_id = ?", (ligue,))
+        plus_ancienne = cursor.fetchone()[0]
+        if plus_ancienne is None or plus_ancienne > limite:
+            return 0
+        
+        chemin = chemin_archive_sessions()
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        archive = sqlite3.connect(chemin)
+        try:
+            for table in ("equipes",) + TABLES_SESSION:
+                archive.execute(SCHEMA_TABLES[table].format(nom=table, ligue=ligue))
+            for table, (condition, params) in [("equipes", ("league_id = ?", (ligue,)))] + list(filtres.items()):
+                cursor.execute(f"PRAGMA table_info({table})")
+                definitions = [(col[1], col[2]) for col in cursor.fetchall()]
+                # Archive créée avec un schéma antérieur : colonnes ajoutées depuis (ex: zeus_predictions.resultat)
+                archivees = {col[1] for col in archive.execute(f"PRAGMA table_info({table})")}
+                for nom, type_colonne in definitions:
+                    if nom not in archivees:
+                        archive.execute(f"ALTER TABLE {table} ADD COLUMN {nom} {type_colonne}")
+                colonnes = ", ".join(nom for nom, _ in definitions)
+                cursor.execute(f"SELECT {colonnes} FROM {table} WHERE {condition}", params)
+                while True:
+                    lot = cursor.fetchmany(taille_lot)
+                    if not lot:
+                        break
+                    marqueurs = ", ".join("?" * len(lot[0]))
+                    archive.executemany(f"INSERT OR IGNORE INTO {table} ({colonnes}) VALUES ({marqueurs})",
+                                        [tuple(row) for row in lot])
+            archive.commit()
+        finally:
+            archive.close()
+        
+        # Archive écrite : suppression dans la base principale (même transaction pour toutes les tables)
+        for table, (condition, params) in filtres.items():
+            cursor.execute(f"DELETE FROM {table} WHERE {condition}", params)
+            deplacees += max(cursor.rowcount, 0)
     
-    print("🔄 Tables réinitialisées pour la nouvelle session. Score IA conservé.")
+    logger.info(f"🗄️ Sessions <= {limite} de la ligue {ligue} archivées dans {chemin} ({deplacees} lignes)")
+    print(f"🗄️ Sessions <= {limite} archivées : {deplacees} lignes déplacées vers {chemin}")
+    return deplacees
 
 
 if __name__ == "__main__":
@@ -10,6 +10,13 @@ DB_NAME = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__)
 TURSO_URL = os.getenv("TURSO_URL")
 TURSO_TOKEN = os.getenv("TURSO_TOKEN")
 
+# Ligue par défaut (English Virtual League) : clé de partition des tables de données
+LEAGUE_ID = 8035
+
+# Sessions (saisons) gardées par ligue dans la base principale, session courante comprise ;
+# les plus anciennes sont déplacées dans la base d'archive (archive.compacter_sessions)
+SESSIONS_CONSERVEES = 3
+
 # Équipes de la English Virtual League (20)
 EQUIPES = [
     "London Reds", "Manchester Blue", "Manchester Red", "Wolverhampton", "N. Forest",
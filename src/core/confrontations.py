@@ -0,0 +1,207 @@
+"""
+Index des confrontations directes (table confrontations) : pour chaque paire
+(domicile, extérieur) d'une ligue, résumé glissant des N dernières rencontres,
+toutes sessions confondues (sessions archivées comprises).
+
+Une saison ne compte qu'une ou deux rencontres d'une même paire : l'index garde
+les rencontres des saisons précédentes, que la session courante ne voit plus.
+Il est mis à jour à l'ingestion des résultats (même transaction que `resultats`)
+et lu en une requête pour toute la ligue, puis servi depuis un dictionnaire :
+get_confrontation n'ouvre aucune connexion. La version en base (cf
+utils.lire_versions_donnees) est vérifiée une fois par sélection, avant la boucle
+des matchs (get_index_confrontations) : une ingestion d'un autre processus est vue
+à la sélection suivante, une écriture du processus oublie l'index chargé.
+"""
+import logging
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from . import utils
+from .database import get_db_connection, get_contexte, get_ligue_active
+
+logger = logging.getLogger(__name__)
+
+# Rencontres conservées par paire (fenêtre glissante)
+TAILLE_HISTORIQUE = 5
+
+# Index chargé par (base, ligue) : {contexte: (version, {(dom_id, ext_id): (nb, victoires_dom, nuls)})}
+_INDEX = {}
+
+
+def _decoder(rencontres: str) -> List[Tuple[int, int, int, int]]:
+    """"session:journee:score_dom:score_ext;..." -> liste de tuples (plus récente d'abord)."""
+    return [tuple(int(v) for v in r.split(":")) for r in rencontres.split(";") if r]
+
+
+def _encoder(rencontres) -> str:
+    return ";".join(":".join(str(v) for v in r) for r in rencontres)
+
+
+def _resumer(rencontres) -> Tuple[int, int, int]:
+    """(nb, victoires_dom, nuls) des rencontres."""
+    return (len(rencontres),
+            sum(1 for _, _, d, e in rencontres if d > e),
+            sum(1 for _, _, d, e in rencontres if d == e))
+
+
+def _fusionner(rencontres, session_id: int, journee: int, score_dom: int, score_ext: int,
+               taille: int = TAILLE_HISTORIQUE):
+    """Ajoute (ou corrige) une rencontre et ne garde que les `taille` plus récentes."""
+    autres = [r for r in rencontres if (r[0], r[1]) != (session_id, journee)]
+    autres.append((session_id, journee, score_dom, score_ext))
+    return sorted(autres, key=lambda r: (r[0], r[1]), reverse=True)[:taille]
+
+
+def enregistrer_confrontation(cursor, league_id: int, session_id: int, journee: int,
+                              dom_id: int, ext_id: int, score_dom, score_ext) -> bool:
+    """
+    Met à jour le résumé de la paire après un résultat.
+    Utilise le curseur fourni (même transaction que l'écriture de `resultats`).
+
+    Args:
+        cursor: Curseur d'une connexion ouverte
+        league_id, session_id, journee: Partition et journée du match
+        dom_id, ext_id: Équipes (l'ordre domicile/extérieur compte)
+        score_dom, score_ext: Score (ignoré si incomplet)
+
+    Returns:
+        True si le résumé a changé
+    """
+    if score_dom is None or score_ext is None:
+        return False
+    _oublier(league_id)
+    cursor.execute("""
+        SELECT rencontres FROM confrontations
+        WHERE league_id = ? AND equipe_dom_id = ? AND equipe_ext_id = ?
+    """, (league_id, dom_id, ext_id))
+    row = cursor.fetchone()
+    avant = row[0] if row else ""
+    rencontres = _fusionner(_decoder(avant), session_id, journee, score_dom, score_ext)
+    apres = _encoder(rencontres)
+    if apres == avant:
+        return False
+    nb, victoires, nuls = _resumer(rencontres)
+    cursor.execute("""
+        INSERT INTO confrontations (league_id, equipe_dom_id, equipe_ext_id, rencontres, nb, victoires_dom, nuls)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(league_id, equipe_dom_id, equipe_ext_id) DO UPDATE SET
+            rencontres = excluded.rencontres,
+            nb = excluded.nb,
+            victoires_dom = excluded.victoires_dom,
+            nuls = excluded.nuls
+    """, (league_id, dom_id, ext_id, apres, nb, victoires, nuls))
+    return True
+
+
+def _lire_resultats(cursor, league_id: int):
+    cursor.execute("""
+        SELECT session_id, journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext FROM resultats
+        WHERE league_id = ? AND score_dom IS NOT NULL AND score_ext IS NOT NULL
+    """, (league_id,))
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def reconstruire_index(taille: int = TAILLE_HISTORIQUE) -> int:
+    """
+    Reconstruit l'index de la ligue active depuis tous les résultats : sessions conservées
+    dans la base principale et sessions déplacées dans la base d'archive.
+
+    Returns:
+        Nombre de paires indexées
+    """
+    from .archive import chemin_archive_sessions
+
+    ligue = get_ligue_active()
+    resultats = []
+    chemin = chemin_archive_sessions()
+    if os.path.exists(chemin):
+        archive = sqlite3.connect(chemin)
+        try:
+            resultats += _lire_resultats(archive.cursor(), ligue)
+        except sqlite3.Error as e:
+            logger.warning(f"Archive des sessions illisible ({chemin}) : {e}")
+        finally:
+            archive.close()
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        resultats += _lire_resultats(cursor, ligue)
+
+        paires = {}
+        for session_id, journee, dom_id, ext_id, score_dom, score_ext in resultats:
+            paires.setdefault((dom_id, ext_id), []).append((session_id, journee, score_dom, score_ext))
+        lignes = []
+        for (dom_id, ext_id), rencontres in paires.items():
+            rencontres = sorted(set(rencontres), key=lambda r: (r[0], r[1]), reverse=True)[:taille]
+            lignes.append((ligue, dom_id, ext_id, _encoder(rencontres)) + _resumer(rencontres))
+
+        cursor.execute("DELETE FROM confrontations WHERE league_id = ?", (ligue,))
+        cursor.executemany("""
+            INSERT INTO confrontations (league_id, equipe_dom_id, equipe_ext_id, rencontres, nb, victoires_dom, nuls)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, lignes)
+        utils.marquer_donnees_modifiees(cursor, "confrontations")
+    _oublier(ligue)
+
+    logger.info(f"Index des confrontations reconstruit : {len(lignes)} paires ({len(resultats)} résultats)")
+    return len(lignes)
+
+
+def _version():
+    return utils.get_version_donnees("resultats", "confrontations")
+
+
+def _oublier(league_id: int):
+    """Oublie les index chargés de la ligue (écriture de ce processus)."""
+    for contexte in [c for c in _INDEX if c[1] == league_id]:
+        del _INDEX[contexte]
+
+
+def get_index_confrontations(version=None) -> Dict[Tuple[int, int], Tuple[int, int, int]]:
+    """
+    Index de la ligue active, lu en une requête et gardé en mémoire tant que
+    les résultats ne changent pas. Appelé une fois par sélection, avant la boucle des matchs.
+
+    Args:
+        version: Versions ("resultats", "confrontations", globale) déjà lues par l'appelant
+            (ex: empreinte de la journée) ; lues ici si None
+
+    Returns:
+        dict: {(dom_id, ext_id): (nb, victoires_dom, nuls)}
+    """
+    contexte = get_contexte()
+    if version is None:
+        version = _version()
+    en_cache = _INDEX.get(contexte)
+    if en_cache and en_cache[0] == version:
+        return en_cache[1]
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT equipe_dom_id, equipe_ext_id, nb, victoires_dom, nuls FROM confrontations
+            WHERE league_id = ?
+        """, (contexte[1],))
+        index = {(row[0], row[1]): (row[2], row[3], row[4]) for row in cursor.fetchall()}
+
+    _INDEX[contexte] = (version, index)
+    return index
+
+
+def get_confrontation(dom_id: int, ext_id: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Résumé des dernières rencontres d'une paire (domicile, extérieur), lu dans l'index
+    en mémoire (chargé au premier appel s'il ne l'est pas encore).
+
+    Returns:
+        tuple: (nb, victoires_dom, nuls), None si la paire ne s'est jamais rencontrée
+    """
+    en_cache = _INDEX.get(get_contexte())
+    index = en_cache[1] if en_cache else get_index_confrontations()
+    return index.get((dom_id, ext_id))
+
+
+def invalider_index():
+    """Oublie les index chargés (ex: changement de base active, tests)."""
+    _INDEX.clear()
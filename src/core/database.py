@@ -1,6 +1,7 @@
 import sqlite3
 import logging
 import os
+import contextvars
 try:
     import libsql
     HAS_LIBSQL = True
@@ -12,20 +13,149 @@ from . import config
 # Configuration du logging
 logger = logging.getLogger(__name__)
 
+# Base SQLite locale active pour le thread/la tâche courante (ex: base d'une ligue).
+# None = base principale (Turso si configuré, sinon config.DB_NAME).
+_BASE_ACTIVE = contextvars.ContextVar("base_active", default=None)
+
+@contextmanager
+def utiliser_base(db_path):
+    """
+    Redirige get_db_connection() vers une autre base SQLite dans le contexte courant
+    (thread ou tâche), sans toucher à config.DB_NAME ni aux autres threads.
+    
+    Args:
+        db_path: Chemin de la base, ou None pour la base principale
+    """
+    jeton = _BASE_ACTIVE.set(db_path)
+    try:
+        yield
+    finally:
+        _BASE_ACTIVE.reset(jeton)
+
+def get_base_active():
+    """Base redirigée par utiliser_base() dans le contexte courant (None = base principale)."""
+    return _BASE_ACTIVE.get()
+
+# Ligue active pour le thread/la tâche courante : clé de partition de toutes les tables
+# de données (equipes, resultats, cotes, classement, predictions, score_ia...).
+_LIGUE_ACTIVE = contextvars.ContextVar("ligue_active", default=None)
+
+@contextmanager
+def utiliser_ligue(league_id):
+    """
+    Restreint les lectures/écritures du contexte courant (thread ou tâche) à une ligue.
+    
+    Args:
+        league_id: ID de la ligue, ou None pour la ligue par défaut (config.LEAGUE_ID)
+    """
+    jeton = _LIGUE_ACTIVE.set(league_id)
+    try:
+        yield
+    finally:
+        _LIGUE_ACTIVE.reset(jeton)
+
+def get_ligue_active():
+    """Ligue du contexte courant (config.LEAGUE_ID par défaut)."""
+    ligue = _LIGUE_ACTIVE.get()
+    return config.LEAGUE_ID if ligue is None else ligue
+
+def get_contexte():
+    """Clé (base, ligue) du contexte courant, pour les caches de processus."""
+    return _BASE_ACTIVE.get(), get_ligue_active()
+
+# Session courante par (base effective, ligue), lue dans la table `sessions`
+_SESSIONS = {}
+
+def _cle_session():
+    base = _BASE_ACTIVE.get()
+    if base is None:
+        base = config.TURSO_URL if config.TURSO_URL and config.TURSO_TOKEN else config.DB_NAME
+    return base, get_ligue_active()
+
+def get_session_active(conn=None):
+    """
+    Session (saison) courante de la ligue active : seconde clé de partition des tables de données.
+    
+    Args:
+        conn: Connexion ouverte à réutiliser (optionnel)
+    
+    Returns:
+        int: Numéro de session (1 si la ligue n'a pas encore de session enregistrée)
+    """
+    cle = _cle_session()
+    if cle not in _SESSIONS:
+        if conn is None:
+            with get_db_connection() as conn:
+                return get_session_active(conn)
+        _SESSIONS[cle] = lire_session(conn.cursor(), cle[1])
+    return _SESSIONS[cle]
+
+def lire_session(cursor, league_id):
+    """Session courante d'une ligue lue dans la base du curseur (ex: snapshot), sans cache."""
+    cursor.execute("SELECT session_id FROM sessions WHERE league_id = ?", (league_id,))
+    row = cursor.fetchone()
+    return row[0] if row else 1
+
+def get_partition(conn=None):
+    """
+    (league_id, session_id) du contexte courant : paramètres des filtres
+    `league_id = ? AND session_id = ?` des requêtes sur les tables partitionnées.
+    """
+    return get_ligue_active(), get_session_active(conn)
+
+def lister_ligues():
+    """Ligues enregistrées dans la base active (une session ouverte par ligue), en lecture seule."""
+    with get_read_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT league_id FROM sessions ORDER BY league_id")
+        return [row[0] for row in cursor.fetchall()]
+
+def invalider_sessions():
+    """Oublie les sessions mémorisées (après changement de session ou de base)."""
+    _SESSIONS.clear()
+
+def ouvrir_session_suivante(cursor, league_id):
+    """
+    Passe une ligue à la session suivante (nouvelle saison) : les lignes de la session
+    terminée restent en base, les requêtes courantes ne voient plus que la nouvelle.
+    Appeler invalider_sessions() après le commit.
+    
+    Returns:
+        int: Numéro de la nouvelle session
+    """
+    cursor.execute("INSERT OR IGNORE INTO sessions (league_id, session_id) VALUES (?, 1)", (league_id,))
+    cursor.execute("""
+        UPDATE sessions SET session_id = session_id + 1, debut = CURRENT_TIMESTAMP
+        WHERE league_id = ?
+    """, (league_id,))
+    return lire_session(cursor, league_id)
+
+# Connexions d'écriture : attente du verrou d'écriture tenu par une autre connexion
+# (ingestion d'un autre processus, index en construction par une migration en ligne)
+ECRITURE_CONFIG = {
+    "BUSY_TIMEOUT": 30.0,  # Secondes (défaut sqlite3 : 5)
+}
+
 @contextmanager
-def get_db_connection():
+def get_db_connection(db_path=None):
     """
     Context manager pour les connexions DB.
     Gère automatiquement l'ouverture (SQLite ou libSQL), la configuration, le commit/rollback et la fermeture.
+    
+    Args:
+        db_path: Chemin d'une base SQLite locale explicite (ex: snapshot de fin de session).
+                 Si None, utilise la base active (cf utiliser_base), sinon la base principale
+                 (Turso si configuré, sinon config.DB_NAME).
     """
-    is_remote = config.TURSO_URL and config.TURSO_TOKEN
+    db_path = db_path or _BASE_ACTIVE.get()
+    is_remote = db_path is None and config.TURSO_URL and config.TURSO_TOKEN
     
     if is_remote:
         if not HAS_LIBSQL:
             raise ImportError("La bibliothèque 'libsql' est requise pour se connecter à Turso. Installez-la avec 'pip install libsql'.")
         conn = libsql.connect(config.TURSO_URL, auth_token=config.TURSO_TOKEN)
     else:
-        conn = sqlite3.connect(config.DB_NAME)
+        conn = sqlite3.connect(db_path or config.DB_NAME, timeout=ECRITURE_CONFIG["BUSY_TIMEOUT"])
         conn.execute("PRAGMA foreign_keys = ON")
         conn.execute("PRAGMA journal_mode = WAL")
         conn.execute("PRAGMA synchronous = NORMAL")
@@ -47,6 +177,59 @@ def get_db_connection():
     finally:
         conn.close()
 
+# Connexions de lecture seule (dashboard) : fichier projeté en mémoire et cache de pages
+LECTURE_CONFIG = {
+    "MMAP_SIZE": 256 * 1024 * 1024,  # Octets projetés en mémoire (0 = désactivé)
+    "CACHE_SIZE_KIB": 16 * 1024,     # Cache de pages par connexion (Kio)
+}
+
+@contextmanager
+def get_read_connection(db_path=None):
+    """
+    Context manager de lecture seule (dashboard) : toutes les requêtes du bloc lisent
+    le même instantané de la base, jamais une écriture en cours (journée à moitié insérée).
+
+    - SQLite : connexion URI mode=ro + PRAGMA query_only, mmap et cache dimensionnés
+      (LECTURE_CONFIG). Transaction de lecture ouverte d'entrée : en WAL, le lecteur garde
+      son instantané sans bloquer ni attendre les transactions d'ingestion.
+    - Turso : même connexion distante, dans une transaction annulée à la sortie.
+    Jamais de commit.
+
+    Args:
+        db_path: Chemin d'une base SQLite locale explicite, sinon la base active / principale
+    """
+    db_path = db_path or _BASE_ACTIVE.get()
+    is_remote = db_path is None and config.TURSO_URL and config.TURSO_TOKEN
+
+    if is_remote:
+        if not HAS_LIBSQL:
+            raise ImportError("La bibliothèque 'libsql' est requise pour se connecter à Turso. Installez-la avec 'pip install libsql'.")
+        conn = libsql.connect(config.TURSO_URL, auth_token=config.TURSO_TOKEN)
+    else:
+        chemin = os.path.abspath(db_path or config.DB_NAME)
+        if not os.path.exists(chemin):
+            raise FileNotFoundError(f"Base introuvable (non initialisée ?) : {chemin}")
+        conn = sqlite3.connect(f"file:{chemin}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {int(LECTURE_CONFIG['MMAP_SIZE'])}")
+        conn.execute(f"PRAGMA cache_size = -{int(LECTURE_CONFIG['CACHE_SIZE_KIB'])}")
+
+    try:
+        conn.row_factory = sqlite3.Row
+    except Exception:
+        pass
+
+    try:
+        # Instantané pris à la première lecture de la transaction : fixé tout de suite
+        conn.execute("BEGIN")
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        yield conn
+    finally:
+        try:
+            conn.rollback()
+        finally:
+            conn.close()
+
 def row_to_dict(row, cursor):
     """
     Convertit une ligne de résultat en dictionnaire de manière robuste.
@@ -67,45 +250,42 @@ def row_to_dict(row, cursor):
             return dict(zip(colnames, row))
         return row
 
-def initialiser_db():
-    """Initialise la base de données avec une structure normalisée."""
-    is_remote = config.TURSO_URL and config.TURSO_TOKEN
-    
-    if is_remote:
-        conn = libsql.connect(config.TURSO_URL, auth_token=config.TURSO_TOKEN)
-    else:
-        conn = sqlite3.connect(config.DB_NAME)
-    
-    cursor = conn.cursor()
-    
-    if not is_remote:
-        # Activation des clés étrangères pour SQLite uniquement
-        cursor.execute("PRAGMA foreign_keys = ON")
-    # 1. Table des équipes (Référence unique)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS equipes (
+# ==================== SCHÉMA ====================
+# Tables de données partitionnées par ligue (league_id) et, pour les données d'une saison,
+# par session (session_id). Les contraintes d'unicité et les index commencent par ces clés :
+# une requête d'une ligue ne parcourt que les lignes de cette ligue, quel que soit l'historique.
+# Gabarits : {nom} = nom de la table (reconstruction), {ligue} = ligue par défaut des lignes migrées.
+# Schéma courant (archives, transferts) : les migrations gardent leur propre DDL (cf migrations.py).
+SCHEMA_TABLES = {
+    # 1. Table des équipes (Référence unique par ligue)
+    "equipes": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nom TEXT UNIQUE NOT NULL
+            nom TEXT NOT NULL,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            UNIQUE(league_id, nom)
         )
-    ''')
+    ''',
     # 2. Table des résultats (Matchs joués ET à venir)
     # MODIFICATION : On autorise NULL pour les scores (matchs non joués)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS resultats (
+    "resultats": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             journee INTEGER NOT NULL,
             equipe_dom_id INTEGER NOT NULL,
             equipe_ext_id INTEGER NOT NULL,
             score_dom INTEGER,  -- Peut être NULL avant le match
             score_ext INTEGER,  -- Peut être NULL avant le match
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
             FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
             FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id),
-            UNIQUE(journee, equipe_dom_id, equipe_ext_id)
+            UNIQUE(league_id, session_id, journee, equipe_dom_id, equipe_ext_id)
         )
-    ''')
+    ''',
     # 3. Table des cotes (Liée au match)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS cotes (
+    "cotes": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             journee INTEGER NOT NULL,
             equipe_dom_id INTEGER NOT NULL,
@@ -113,14 +293,16 @@ def initialiser_db():
             cote_1 DECIMAL(5,2),
             cote_x DECIMAL(5,2),
             cote_2 DECIMAL(5,2),
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
             FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
             FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id),
-            UNIQUE(journee, equipe_dom_id, equipe_ext_id)
+            UNIQUE(league_id, session_id, journee, equipe_dom_id, equipe_ext_id)
         )
-    ''')
+    ''',
     # 4. Table du classement
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS classement (
+    "classement": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             journee INTEGER NOT NULL,
             equipe_id INTEGER NOT NULL,
@@ -129,13 +311,15 @@ def initialiser_db():
             forme TEXT,
             buts_pour INTEGER DEFAULT 0,
             buts_contre INTEGER DEFAULT 0,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
             FOREIGN KEY (equipe_id) REFERENCES equipes(id),
-            UNIQUE(journee, equipe_id)
+            UNIQUE(league_id, session_id, journee, equipe_id)
         )
-    ''')
+    ''',
     # 5. Table des prédictions
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS predictions (
+    "predictions": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             journee INTEGER NOT NULL,
             equipe_dom_id INTEGER NOT NULL,
@@ -145,26 +329,28 @@ def initialiser_db():
             fiabilite DECIMAL(5,2),
             succes INTEGER, -- 1 (Vrai) ou 0 (Faux), NULL si pas encore joué
             points_gagnes INTEGER,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
             FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
             FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id)
         )
-    ''')
-    # 6. Table des scores IA (Historique)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS score_ia (
+    ''',
+    # 6. Table des scores IA (une ligne par ligue)
+    "score_ia": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             score DECIMAL(10,2) DEFAULT 100.00,
             predictions_total INTEGER DEFAULT 0,
             predictions_reussies INTEGER DEFAULT 0,
             pause_until INTEGER DEFAULT 0,
             session_archived INTEGER DEFAULT 0,
-            derniere_maj TEXT
+            derniere_maj TEXT,
+            league_id INTEGER NOT NULL DEFAULT {ligue} UNIQUE
         )
-    ''')
-    
+    ''',
     # 7. Table des prédictions ZEUS (Shadow Mode)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS zeus_predictions (
+    "zeus_predictions": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             journee INTEGER NOT NULL,
             equipe_dom_id INTEGER NOT NULL,
@@ -172,15 +358,18 @@ def initialiser_db():
             prediction INTEGER NOT NULL, -- 0=1, 1=N, 2=2, 3=Skip
             confiance DECIMAL(5,2) DEFAULT 0,
             timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            resultat INTEGER, -- Issue réelle (même codage), NULL tant que la prédiction n'est pas réglée
+            succes INTEGER,   -- 1 ou 0, NULL si pas réglée ou SKIP
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
             FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
             FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id),
-            UNIQUE(journee, equipe_dom_id, equipe_ext_id)
+            UNIQUE(league_id, session_id, journee, equipe_dom_id, equipe_ext_id)
         )
-    ''')
-    
-    # 8. Table d'archive du classement pour ZEUS (Mémoire Photographique)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS zeus_classement_archive (
+    ''',
+    # 8. Table d'archive du classement pour ZEUS (Mémoire Photographique, toutes sessions confondues)
+    "zeus_classement_archive": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             journee INTEGER NOT NULL,
             equipe_id INTEGER NOT NULL,
@@ -190,52 +379,226 @@ def initialiser_db():
             buts_pour DECIMAL(4,2) DEFAULT 0,
             buts_contre DECIMAL(4,2) DEFAULT 0,
             timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
             FOREIGN KEY (equipe_id) REFERENCES equipes(id),
-            UNIQUE(journee, equipe_id)
+            UNIQUE(league_id, journee, equipe_id)
+        )
+    ''',
+    # 9. Table des jobs de transition de saison (archivage + ré-entraînement ZEUS en arrière-plan)
+    "jobs_saison": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            statut TEXT NOT NULL DEFAULT 'en_attente', -- en_attente, en_cours, termine, erreur, echec
+            etape TEXT,                                -- Dernière étape terminée
+            progression DECIMAL(5,2) DEFAULT 0,        -- 0 à 100
+            journee_fin INTEGER,
+            snapshot TEXT,                             -- Base figée de la session terminée
+            modele TEXT,
+            version TEXT,                              -- Version ZEUS enregistrée au registre
+            tentatives INTEGER DEFAULT 0,
+            erreur TEXT,
+            cree_le TEXT DEFAULT CURRENT_TIMESTAMP,
+            maj_le TEXT DEFAULT CURRENT_TIMESTAMP,
+            league_id INTEGER NOT NULL DEFAULT {ligue}
         )
-    ''')
+    ''',
+    # 10. Historique des cotes (append-only, une ligne par changement de cote d'un match)
+    # Compact : cotes en centièmes (INTEGER), horodatage Unix, table organisée par clé primaire.
+    # Les identifiants d'équipes étant propres à une ligue, la clé est déjà partitionnée par ligue.
+    "cotes_historique": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            session_id INTEGER NOT NULL DEFAULT 1,
+            journee INTEGER NOT NULL,
+            equipe_dom_id INTEGER NOT NULL,
+            equipe_ext_id INTEGER NOT NULL,
+            horodatage INTEGER NOT NULL,               -- Secondes Unix de la capture
+            cote_1 INTEGER,                            -- Centièmes (1.75 -> 175)
+            cote_x INTEGER,
+            cote_2 INTEGER,
+            PRIMARY KEY (session_id, journee, equipe_dom_id, equipe_ext_id, horodatage)
+        ) WITHOUT ROWID
+    ''',
+    # 11. Session courante de chaque ligue (une nouvelle saison incrémente session_id, sans effacer
+    # la précédente ; les sessions anciennes partent dans la base d'archive, cf archive.compacter_sessions)
+    "sessions": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            league_id INTEGER PRIMARY KEY,
+            session_id INTEGER NOT NULL DEFAULT 1,
+            debut TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    # 12. Index des confrontations directes : N dernières rencontres de chaque paire, toutes sessions
+    # confondues (cf confrontations.py), avec le résumé lu par l'analyse
+    "confrontations": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            equipe_dom_id INTEGER NOT NULL,
+            equipe_ext_id INTEGER NOT NULL,
+            rencontres TEXT NOT NULL,                  -- "session:journee:score_dom:score_ext;..." (récente d'abord)
+            nb INTEGER NOT NULL,
+            victoires_dom INTEGER NOT NULL,
+            nuls INTEGER NOT NULL,
+            PRIMARY KEY (league_id, equipe_dom_id, equipe_ext_id)
+        ) WITHOUT ROWID
+    ''',
+    # 13. Agrégats du dashboard par journée (cf agregats.py) : prédictions validées de la journée
+    # et cumuls depuis le début de la session, tenus à jour par la validation du scoring
+    "agregats_journee": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            journee INTEGER NOT NULL,
+            predictions INTEGER NOT NULL DEFAULT 0,
+            reussies INTEGER NOT NULL DEFAULT 0,
+            points INTEGER NOT NULL DEFAULT 0,
+            score_cumule INTEGER NOT NULL DEFAULT 0,
+            predictions_cumulees INTEGER NOT NULL DEFAULT 0,
+            reussies_cumulees INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (league_id, session_id, journee)
+        ) WITHOUT ROWID
+    ''',
+    # 14. Agrégats ZEUS par tranche de confiance (prédictions réglées, cf agregats.py)
+    "agregats_zeus": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            tranche INTEGER NOT NULL,                  -- 0 à 9 : confiance [0.0, 0.1[ ... [0.9, 1.0]
+            essais INTEGER NOT NULL DEFAULT 0,         -- Prédictions 1/N/2 réglées
+            reussites INTEGER NOT NULL DEFAULT 0,
+            skips INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (league_id, session_id, tranche)
+        ) WITHOUT ROWID
+    ''',
+    # 15. Versions des données d'une ligue (cf utils.marquer_donnees_modifiees) : incrémentées dans
+    # la transaction de l'écriture, elles invalident les caches dérivés de tous les processus
+    "versions_donnees": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            cle TEXT NOT NULL,                         -- ex: "classement", "cotes:12", "*" (toutes)
+            version INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (league_id, cle)
+        ) WITHOUT ROWID
+    ''',
+}
+
+# Tables dont les lignes appartiennent à une session (conservées puis archivées session par session)
+TABLES_SESSION = ("resultats", "cotes", "classement", "predictions", "zeus_predictions", "cotes_historique",
+                  "agregats_journee", "agregats_zeus")
+
+# Index composites : clés de partition en tête
+INDEX = [
+    "CREATE INDEX IF NOT EXISTS idx_resultats_equipe_dom ON resultats(league_id, session_id, equipe_dom_id, journee)",
+    "CREATE INDEX IF NOT EXISTS idx_resultats_equipe_ext ON resultats(league_id, session_id, equipe_ext_id, journee)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_journee ON predictions(league_id, session_id, journee)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_succes ON predictions(league_id, session_id, succes)",
+    "CREATE INDEX IF NOT EXISTS idx_classement_equipe ON classement(league_id, session_id, equipe_id, journee)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_saison_statut ON jobs_saison(league_id, statut)",
+    "CREATE INDEX IF NOT EXISTS idx_zeus_predictions_resultat ON zeus_predictions(league_id, session_id, resultat)",
+]
+
+
+def _partitionner_table(cursor, table: str, colonne: str, valeur: int, ddl: str) -> bool:
+    """
+    Reconstruit une table sans colonne de partition (league_id, session_id) selon le gabarit `ddl`
+    (procédure SQLite : nouvelle table, copie, suppression, renommage).
     
-    # --- MIGRATION : Ajout des colonnes manquantes si nécessaire ---
-    try:
-        cursor.execute("PRAGMA table_info(classement)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if "buts_pour" not in columns:
-            logger.info("Migration : Ajout de la colonne buts_pour à la table classement")
-            cursor.execute("ALTER TABLE classement ADD COLUMN buts_pour INTEGER DEFAULT 0")
-        if "buts_contre" not in columns:
-            logger.info("Migration : Ajout de la colonne buts_contre à la table classement")
-            cursor.execute("ALTER TABLE classement ADD COLUMN buts_contre INTEGER DEFAULT 0")
-    except Exception as e:
-        logger.warning(f"Erreur lors de la migration auto des colonnes : {e}")
+    Args:
+        colonne: Colonne de partition attendue
+        valeur: Valeur donnée aux lignes existantes
+        ddl: CREATE TABLE de la table partitionnée ({nom}, {ligue}), figé par la migration
+    
+    Returns:
+        True si la table a été reconstruite
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    colonnes = [col[1] for col in cursor.fetchall()]
+    if not colonnes or colonne in colonnes:
+        return False
+    temporaire = f"{table}_partitionnee"
+    cursor.execute(f"DROP TABLE IF EXISTS {temporaire}")
+    cursor.execute(ddl.format(nom=temporaire, ligue=config.LEAGUE_ID))
+    # Colonnes abandonnées par le gabarit (ex: score_ia.score_total) non recopiées
+    cursor.execute(f"PRAGMA table_info({temporaire})")
+    conservees = {col[1] for col in cursor.fetchall()}
+    liste = ", ".join(c for c in colonnes if c in conservees)
+    cursor.execute(f"INSERT INTO {temporaire} ({liste}, {colonne}) SELECT {liste}, ? FROM {table}", (valeur,))
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {temporaire} RENAME TO {table}")
+    logger.info(f"Migration : table {table} partitionnee ({colonne} des lignes existantes = {valeur})")
+    return True
+
+def initialiser_db(equipes=None, migrations_en_ligne=False):
+    """
+    Met la base de données (base active, cf utiliser_base) au schéma courant en n'appliquant
+    que les migrations en attente (cf src/core/migrations.py), et enregistre la ligue active
+    (équipes, score IA, session). Une base à jour ne rejoue aucune instruction DDL.
+    
+    Args:
+        equipes: Noms des équipes à enregistrer (par défaut config.EQUIPES)
+        migrations_en_ligne: True pour appliquer les migrations en ligne (index, remplissages)
+            dans un thread d'arrière-plan plutôt qu'avant de rendre la main
+    """
+    from . import migrations
+    
+    db_path = _BASE_ACTIVE.get()
+    ligue = get_ligue_active()
+    is_remote = db_path is None and config.TURSO_URL and config.TURSO_TOKEN
+    
+    if is_remote:
+        conn = libsql.connect(config.TURSO_URL, auth_token=config.TURSO_TOKEN)
+    else:
+        conn = sqlite3.connect(db_path or config.DB_NAME, timeout=ECRITURE_CONFIG["BUSY_TIMEOUT"])
+    
+    cursor = conn.cursor()
+    
+    # --- MIGRATIONS : seules les versions absentes de schema_version sont appliquées ---
+    en_attente = migrations.en_attente(cursor)
+    if any(not m.en_ligne for m in en_attente):
+        appliquees = migrations.appliquer_bloquantes(conn)
+        logger.info(f"Migrations appliquées : {appliquees}")
+    
+    if not is_remote:
+        # Activation des clés étrangères pour SQLite uniquement
+        cursor.execute("PRAGMA foreign_keys = ON")
 
-    # --- IMPORTANT : Initialisation des données de base ---
+    # --- IMPORTANT : Initialisation des données de base de la ligue active ---
     
     # 1. Insérer les équipes si elles n'existent pas
-    cursor.executemany('INSERT OR IGNORE INTO equipes (nom) VALUES (?)', [(e,) for e in config.EQUIPES])
-    
-    # 2. Initialiser le score IA si la table est vide
-    cursor.execute("SELECT COUNT(*) FROM score_ia")
-    if cursor.fetchone()[0] == 0:
-        cursor.execute('INSERT INTO score_ia (score, predictions_total, predictions_reussies, pause_until, session_archived, derniere_maj) VALUES (100, 0, 0, 0, 0, datetime("now"))')
-    
-    # 3. Création des index pour optimiser les performances
-    logger.info("Création des index SQL...")
-    indexes = [
-        "CREATE INDEX IF NOT EXISTS idx_resultats_journee ON resultats(journee)",
-        "CREATE INDEX IF NOT EXISTS idx_resultats_equipes ON resultats(equipe_dom_id, equipe_ext_id)",
-        "CREATE INDEX IF NOT EXISTS idx_predictions_journee ON predictions(journee)",
-        "CREATE INDEX IF NOT EXISTS idx_predictions_succes ON predictions(succes)",
-        "CREATE INDEX IF NOT EXISTS idx_cotes_journee ON cotes(journee)",
-        "CREATE INDEX IF NOT EXISTS idx_classement_equipe ON classement(equipe_id)",
-        "CREATE INDEX IF NOT EXISTS idx_classement_journee ON classement(journee)"
-    ]
-    
-    for index_sql in indexes:
-        cursor.execute(index_sql)
+    cursor.executemany('INSERT OR IGNORE INTO equipes (nom, league_id) VALUES (?, ?)',
+                       [(e, ligue) for e in (config.EQUIPES if equipes is None else equipes)])
+    
+    # 2. Initialiser le score IA de la ligue s'il n'existe pas
+    cursor.execute('''
+        INSERT INTO score_ia (score, predictions_total, predictions_reussies, pause_until, session_archived, derniere_maj, league_id)
+        SELECT 100, 0, 0, 0, 0, datetime("now"), ?
+        WHERE NOT EXISTS (SELECT 1 FROM score_ia WHERE league_id = ?)
+    ''', (ligue, ligue))
+    
+    # 3. Ouvrir la première session de la ligue
+    cursor.execute("INSERT OR IGNORE INTO sessions (league_id, session_id) VALUES (?, 1)", (ligue,))
+    _SESSIONS.pop(_cle_session(), None)
+    
+    # 4. Index des confrontations à construire (ligue ayant des résultats antérieurs à l'index)
+    cursor.execute("""
+        SELECT EXISTS (SELECT 1 FROM resultats WHERE league_id = ? AND score_dom IS NOT NULL)
+           AND NOT EXISTS (SELECT 1 FROM confrontations WHERE league_id = ?)
+    """, (ligue, ligue))
+    a_indexer = cursor.fetchone()[0]
     
     conn.commit()
     conn.close()
-    logger.info(f"{len(indexes)} index crees avec succes.")
-    print(f"Base de donnees '{config.DB_NAME}' mise a jour (Structure v2 avec index optimises).")
+    if en_attente:
+        print(f"Base de donnees '{db_path or config.DB_NAME}' migree (schema v{max(m.version for m in migrations.MIGRATIONS)}, ligue {ligue}).")
+    
+    # 5. Migrations en ligne (index SQL...) : par lots, en arrière-plan pour le moniteur
+    if any(m.en_ligne for m in en_attente):
+        if migrations_en_ligne:
+            migrations.lancer_migrations_en_ligne(db_path)
+        else:
+            migrations.appliquer_en_ligne(db_path)
+    
+    if a_indexer:
+        from .confrontations import reconstruire_index
+        reconstruire_index()
 if __name__ == "__main__":
-    initialiser_db()
\ No newline at end of file
+    initialiser_db()
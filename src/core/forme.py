@@ -0,0 +1,198 @@
+"""
+Noyau de calcul des chaînes de forme (ex: "VVNDD") partagé par l'intelligence et ZEUS.
+
+Toutes les grandeurs dérivées d'une forme ne dépendent que de ses 5 derniers
+caractères (intelligence) ou de ses 5 premiers résultats V/N/D (ZEUS). Il n'existe
+que 364 formes canoniques (longueur 0 à 5 sur l'alphabet V/N/D) : elles sont
+précalculées une fois pour toutes dans une table, indexée par code entier pour
+les traitements vectorisés (entraînement).
+"""
+from functools import lru_cache
+from itertools import product
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+VALEURS = {'V': 3, 'N': 1, 'D': 0}
+LONGUEUR_FORME = 5
+
+# Patterns d'instabilité à éviter (optimisation roadmap)
+PATTERNS_INSTABLES = (
+    'VDV',   # Victoire-Défaite-Victoire
+    'DVD',   # Défaite-Victoire-Défaite
+    'VNV',   # Victoire-Nul-Victoire avec nul instable
+    'DND',   # Défaite-Nul-Défaite
+    'VDVD',  # Pattern long d'alternance
+    'DVDV'   # Pattern long d'alternance
+)
+
+
+class FormeFeatures(NamedTuple):
+    """Grandeurs dérivées d'une forme (colonnes de la table)."""
+    points: int               # Somme V=3/N=1/D=0 sur les 5 derniers matchs
+    points_ponderes: float    # Idem, les 2 derniers matchs comptent 1.5×
+    instabilite: bool         # Fin de forme alternée (VDV, DVD, VNV, DND...)
+    momentum: float           # Série en cours : +3/+1.5 (VVV/VV), -3/-1.5 (DDD/DD)
+    score_zeus: float         # Score normalisé 0..1 (neutre 0.5 si vide), sur la clé ZEUS (cf score_forme_zeus)
+
+
+COLONNES = FormeFeatures._fields
+
+# ==================== CALCUL DE RÉFÉRENCE ====================
+
+def _points(forme):
+    return sum(VALEURS.get(c, 0) for c in forme)
+
+
+def _points_ponderes(forme):
+    if len(forme) < LONGUEUR_FORME:
+        # Si pas assez de données, méthode classique
+        return _points(forme)
+    total = 0
+    for i, resultat in enumerate(forme):
+        # Les 2 derniers matchs (indices 3 et 4) comptent 1.5× plus
+        multiplicateur = 1.5 if i >= 3 else 1.0
+        total += VALEURS.get(resultat, 0) * multiplicateur
+    return total
+
+
+def _instabilite(forme):
+    if len(forme) < 3:
+        return False
+    return any(forme.endswith(p) for p in PATTERNS_INSTABLES)
+
+
+def _momentum(forme):
+    if len(forme) < 3:
+        return 0
+    # Séries de victoires (priorité à la plus longue)
+    if forme.endswith('VVV'):
+        return 3.0
+    elif forme.endswith('VV'):
+        return 1.5
+    # Séries de défaites
+    elif forme.endswith('DDD'):
+        return -3.0
+    elif forme.endswith('DD'):
+        return -1.5
+    return 0
+
+
+def _score_zeus(tokens):
+    if not tokens:
+        return 0.5
+    return _points(tokens) / (3.0 * len(tokens))
+
+
+@lru_cache(maxsize=4096)
+def _calculer(cle):
+    """Calcule toutes les colonnes pour une clé (5 derniers caractères d'une forme)."""
+    tokens = [c for c in cle if c in VALEURS][:LONGUEUR_FORME]
+    return FormeFeatures(
+        points=_points(cle),
+        points_ponderes=_points_ponderes(cle),
+        instabilite=_instabilite(cle),
+        momentum=_momentum(cle),
+        score_zeus=_score_zeus(tokens),
+    )
+
+# ==================== TABLE PRÉCALCULÉE ====================
+
+FORMES_CANONIQUES = tuple(
+    "".join(p)
+    for longueur in range(LONGUEUR_FORME + 1)
+    for p in product("VND", repeat=longueur)
+)
+CODES = {forme: code for code, forme in enumerate(FORMES_CANONIQUES)}
+CODE_VIDE = CODES[""]
+
+_TABLE = {forme: _calculer(forme) for forme in FORMES_CANONIQUES}
+
+# Même table en matrice (une ligne par code, une colonne par grandeur) pour la version vectorisée
+TABLE_NUMPY = np.array([_TABLE[forme] for forme in FORMES_CANONIQUES], dtype=np.float32)
+TABLE_NUMPY.setflags(write=False)
+
+# Score ZEUS en float64 : les différences de scores sont calculées en double puis converties,
+# exactement comme le calcul scalaire
+SCORES_ZEUS = np.array([_TABLE[forme].score_zeus for forme in FORMES_CANONIQUES], dtype=np.float64)
+SCORES_ZEUS.setflags(write=False)
+
+# ==================== ACCÈS SCALAIRE ====================
+
+def analyser_forme(forme) -> FormeFeatures:
+    """
+    Grandeurs dérivées d'une forme, lues dans la table (5 derniers caractères).
+
+    Args:
+        forme: Chaîne de forme (ex: "VVNDD"), éventuellement vide ou None
+
+    Returns:
+        FormeFeatures
+    """
+    cle = forme[-LONGUEUR_FORME:] if forme else ""
+    features = _TABLE.get(cle)
+    if features is None:
+        # Caractères hors V/N/D : calcul direct, mémorisé
+        features = _calculer(cle)
+    return features
+
+
+@lru_cache(maxsize=4096)
+def cle_zeus(forme_str) -> str:
+    """
+    Normalise une forme pour ZEUS : majuscules, séparateurs "-"/" " ignorés,
+    uniquement les résultats V/N/D, 5 premiers conservés. Toujours une forme canonique.
+    """
+    s = forme_str.upper().strip().replace("-", "").replace(" ", "")
+    return "".join(c for c in s if c in VALEURS)[:LONGUEUR_FORME]
+
+
+def score_forme_zeus(forme_str) -> float:
+    """Score de forme ZEUS (0 à 1, 0.5 si forme absente ou illisible)."""
+    if not forme_str or not isinstance(forme_str, str):
+        return 0.5
+    return _TABLE[cle_zeus(forme_str)].score_zeus
+
+# ==================== ACCÈS VECTORISÉ ====================
+
+def encoder_formes(formes: Iterable) -> np.ndarray:
+    """
+    Encode des formes (5 derniers caractères) en codes de la table.
+    Les formes contenant des caractères hors V/N/D sont codées -1.
+    """
+    return np.fromiter(
+        (CODES.get(f[-LONGUEUR_FORME:] if f else "", -1) for f in formes),
+        dtype=np.int16,
+    )
+
+
+def encoder_formes_zeus(formes: Iterable) -> np.ndarray:
+    """Encode des formes selon la normalisation ZEUS (cf cle_zeus) ; formes absentes -> forme vide."""
+    return np.fromiter(
+        (CODES[cle_zeus(f)] if f and isinstance(f, str) else CODE_VIDE for f in formes),
+        dtype=np.int16,
+    )
+
+
+def matrice_formes(formes, out=None) -> np.ndarray:
+    """
+    Version vectorisée de analyser_forme : une ligne par forme, colonnes COLONNES.
+
+    Args:
+        formes: Séquence de formes
+        out: Tableau (N, len(COLONNES)) float32 optionnel à remplir
+
+    Returns:
+        np.ndarray float32 (N, len(COLONNES))
+    """
+    formes = list(formes)
+    codes = encoder_formes(formes)
+    out = np.take(TABLE_NUMPY, np.maximum(codes, 0), axis=0, out=out)
+    for i in np.flatnonzero(codes < 0):
+        out[i] = analyser_forme(formes[i])
+    return out
+
+
+def scores_formes_zeus(formes, out=None) -> np.ndarray:
+    """Version vectorisée de score_forme_zeus (float32)."""
+    return np.take(TABLE_NUMPY[:, COLONNES.index("score_zeus")], encoder_formes_zeus(formes), out=out)
@@ -0,0 +1,145 @@
+"""
+Historique des cotes (table cotes_historique) : série temporelle append-only des
+cotes 1/X/2 de chaque match.
+
+La table `cotes` ne garde que la dernière cote ; ici chaque capture n'ajoute une
+ligne que pour les matchs dont une cote a bougé depuis la capture précédente
+(encodage delta). Les cotes sont stockées en centièmes entiers et l'horodatage en
+secondes Unix, dans une table organisée par (session, journee, dom, ext, horodatage) :
+la série d'un match est contiguë sur disque et lue par simple parcours de clé.
+Les lectures portent sur la session courante de la ligue active.
+"""
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .database import get_db_connection, get_ligue_active, get_session_active
+
+logger = logging.getLogger(__name__)
+
+
+def horodatage_actuel() -> int:
+    """Horodatage Unix (secondes) des captures."""
+    return int(time.time())
+
+
+def _encoder(cote) -> Optional[int]:
+    """Cote décimale -> centièmes (None conservé)."""
+    return None if cote is None else int(round(float(cote) * 100))
+
+
+def _decoder(valeur) -> Optional[float]:
+    return None if valeur is None else valeur / 100
+
+
+def enregistrer_cotes(cursor, journee: int, dom_id: int, ext_id: int,
+                      cote_1, cote_x, cote_2, horodatage: Optional[int] = None,
+                      session_id: Optional[int] = None) -> bool:
+    """
+    Ajoute une capture des cotes d'un match si elles diffèrent de la dernière capture.
+    Utilise le curseur fourni (même transaction que l'écriture de `cotes`).
+
+    Args:
+        cursor: Curseur d'une connexion ouverte
+        journee, dom_id, ext_id: Identifiant du match
+        cote_1, cote_x, cote_2: Cotes décimales (None si absente)
+        horodatage: Secondes Unix (maintenant par défaut)
+        session_id: Session du match (session courante de la ligue active par défaut)
+
+    Returns:
+        True si une ligne a été ajoutée (ou la capture de la même seconde corrigée)
+    """
+    cotes = (_encoder(cote_1), _encoder(cote_x), _encoder(cote_2))
+    session_id = get_session_active() if session_id is None else session_id
+    match = (session_id, journee, dom_id, ext_id)
+    horodatage = horodatage_actuel() if horodatage is None else horodatage
+    # Dernière capture lue par la clé primaire (pas de scan) ; "IS" compare aussi les NULL
+    cursor.execute('''
+        INSERT INTO cotes_historique (session_id, journee, equipe_dom_id, equipe_ext_id, horodatage, cote_1, cote_x, cote_2)
+        SELECT ?, ?, ?, ?, ?, ?, ?, ?
+        WHERE NOT EXISTS (
+            SELECT 1 FROM (
+                SELECT cote_1, cote_x, cote_2 FROM cotes_historique
+                WHERE session_id = ? AND journee = ? AND equipe_dom_id = ? AND equipe_ext_id = ?
+                ORDER BY horodatage DESC LIMIT 1
+            ) AS derniere
+            WHERE derniere.cote_1 IS ? AND derniere.cote_x IS ? AND derniere.cote_2 IS ?
+        )
+        ON CONFLICT(session_id, journee, equipe_dom_id, equipe_ext_id, horodatage) DO UPDATE SET
+            cote_1 = excluded.cote_1,
+            cote_x = excluded.cote_x,
+            cote_2 = excluded.cote_2
+    ''', match + (horodatage,) + cotes + match + cotes)
+    return cursor.rowcount > 0
+
+
+def get_historique_cotes(journee: int, dom_id: int, ext_id: int,
+                         depuis: Optional[int] = None, jusqu_a: Optional[int] = None) -> List[Dict]:
+    """
+    Série des cotes d'un match, de la plus ancienne à la plus récente.
+
+    Args:
+        journee, dom_id, ext_id: Identifiant du match
+        depuis: Horodatage Unix minimal inclus (optionnel)
+        jusqu_a: Horodatage Unix maximal inclus (optionnel)
+
+    Returns:
+        list: [{"horodatage", "cote_1", "cote_x", "cote_2"}, ...]
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT horodatage, cote_1, cote_x, cote_2 FROM cotes_historique
+            WHERE session_id = ? AND journee = ? AND equipe_dom_id = ? AND equipe_ext_id = ?
+              AND horodatage >= ? AND horodatage <= ?
+            ORDER BY horodatage
+        ''', (get_session_active(conn), journee, dom_id, ext_id,
+              depuis if depuis is not None else 0,
+              jusqu_a if jusqu_a is not None else 2**62))
+        return [
+            {"horodatage": h, "cote_1": _decoder(c1), "cote_x": _decoder(cx), "cote_2": _decoder(c2)}
+            for h, c1, cx, c2 in cursor.fetchall()
+        ]
+
+
+def _derive(premiere, derniere):
+    return tuple(
+        None if a is None or b is None else round((b - a) / 100, 2)
+        for a, b in zip(premiere, derniere)
+    )
+
+
+def get_derive_cotes(journee: int, dom_id: int, ext_id: int) -> Optional[Tuple]:
+    """
+    Dérive des cotes d'un match depuis la première capture (dernière - première).
+
+    Returns:
+        tuple: (derive_1, derive_x, derive_2), None si aucune capture
+    """
+    serie = get_historique_cotes(journee, dom_id, ext_id)
+    if not serie:
+        return None
+    cles = ("cote_1", "cote_x", "cote_2")
+    return _derive([_encoder(serie[0][c]) for c in cles], [_encoder(serie[-1][c]) for c in cles])
+
+
+def get_derives_journee(journee: int) -> Dict[Tuple[int, int], Tuple]:
+    """
+    Dérive des cotes de tous les matchs d'une journée, en une seule lecture.
+
+    Returns:
+        dict: {(dom_id, ext_id): (derive_1, derive_x, derive_2)}
+    """
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2 FROM cotes_historique
+            WHERE session_id = ? AND journee = ?
+              AND equipe_dom_id IN (SELECT id FROM equipes WHERE league_id = ?)
+            ORDER BY equipe_dom_id, equipe_ext_id, horodatage
+        ''', (get_session_active(conn), journee, get_ligue_active()))
+        extremes = {}
+        for dom_id, ext_id, c1, cx, c2 in cursor.fetchall():
+            premiere = extremes.get((dom_id, ext_id), (None, None))[0]
+            extremes[(dom_id, ext_id)] = (premiere or (c1, cx, c2), (c1, cx, c2))
+    return {match: _derive(premiere, derniere) for match, (premiere, derniere) in extremes.items()}
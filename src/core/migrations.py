@@ -0,0 +1,587 @@
+"""
+Migrations de schéma versionnées.
+
+La table schema_version enregistre chaque migration appliquée : au démarrage,
+seules les migrations absentes de la table sont exécutées, et une base à jour
+ne rejoue aucune instruction DDL (une seule lecture de schema_version).
+
+Deux sortes de migrations :
+- bloquantes : appliquées par initialiser_db avant toute lecture (tables, colonnes) ;
+- en ligne : index et remplissages de données, exécutés par lots courts (un commit
+  par lot) pour ne pas bloquer la boucle de surveillance ; au démarrage du moniteur
+  ils tournent dans un thread d'arrière-plan (cf lancer_migrations_en_ligne).
+  Un remplissage avance par lots de TAILLE_LOT lignes ; un index ne se découpe pas
+  (SQLite le construit en une instruction) : son lot est l'index entier. Sur une table
+  de plus de TAILLE_LOT lignes, il n'est construit que dans une fenêtre d'inactivité
+  des autres connexions (moniteur entre deux relevés, cf INDEX_CONFIG), et les écritures
+  qui arrivent pendant la construction attendent le verrou (database.ECRITURE_CONFIG).
+  Le code ne doit pas dépendre d'une migration en ligne terminée (un index manquant
+  ralentit une requête sans la fausser).
+
+Les migrations sont idempotentes (gardes PRAGMA) : une base créée avant la table
+schema_version les exécute toutes une fois, sans effet sur ce qui existe déjà.
+Ajouter une migration = ajouter une entrée en fin de MIGRATIONS, avec son propre DDL
+(CREATE TABLE / ALTER TABLE / CREATE INDEX explicites), et reporter le changement dans
+database.SCHEMA_TABLES / INDEX (schéma courant). Une migration ne lit jamais le schéma
+courant : une base ancienne rejoue exactement ce que la version a livré.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Iterable, List, Optional
+
+from . import config
+from .database import _partitionner_table, get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# appliquer(cursor) pour une migration bloquante ;
+# appliquer(cursor, taille_lot) -> lignes traitées (0 = terminé) pour une migration en ligne
+Migration = namedtuple("Migration", "version nom appliquer en_ligne")
+
+TAILLE_LOT = 1000
+
+# Construction d'un index sur une grande table (verrou d'écriture tenu pendant toute l'instruction)
+INDEX_CONFIG = {
+    "FENETRE_INACTIVITE": 2.0,  # Secondes sans écriture d'une autre connexion avant de construire
+    "ATTENTE_MAX": 30.0,        # Attente d'une fenêtre par lot, puis nouveau lot (arrêt possible)
+}
+
+# ==================== OUTILS ====================
+
+def _colonnes(cursor, table: str) -> List[str]:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def ajouter_colonne(cursor, table: str, colonne: str, definition: str) -> bool:
+    """ALTER TABLE ADD COLUMN si la table existe et n'a pas la colonne."""
+    colonnes = _colonnes(cursor, table)
+    if not colonnes or colonne in colonnes:
+        return False
+    logger.info(f"Migration : ajout de la colonne {colonne} à la table {table}")
+    cursor.execute(f"ALTER TABLE {table} ADD COLUMN {colonne} {definition}")
+    return True
+
+
+def remplissage_par_lots(table: str, affectation: str, condition: str) -> Callable:
+    """
+    Migration en ligne remplissant une colonne par lots de `taille_lot` lignes.
+    `condition` doit devenir fausse pour les lignes traitées (ex: "colonne IS NULL").
+
+    Exemple : remplissage_par_lots("predictions", "points_gagnes = 0", "points_gagnes IS NULL")
+    """
+    def appliquer(cursor, taille_lot):
+        cursor.execute(f"""
+            UPDATE {table} SET {affectation}
+            WHERE rowid IN (SELECT rowid FROM {table} WHERE {condition} LIMIT ?)
+        """, (taille_lot,))
+        return max(cursor.rowcount, 0)
+    return appliquer
+
+# ==================== SCHÉMAS FIGÉS ====================
+# Chaque migration garde le DDL de sa version : database.SCHEMA_TABLES décrit le schéma courant
+# et peut évoluer sans changer ce qu'exécute une migration historique. Table ou colonne ajoutée
+# depuis = CREATE TABLE / ALTER TABLE explicite dans une nouvelle migration.
+
+# Tables de la migration 4 (tables_v3), gabarits des reconstructions des migrations 2 et 3
+_TABLES_V3 = {
+    "equipes": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nom TEXT NOT NULL,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            UNIQUE(league_id, nom)
+        )
+    ''',
+    "resultats": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            journee INTEGER NOT NULL,
+            equipe_dom_id INTEGER NOT NULL,
+            equipe_ext_id INTEGER NOT NULL,
+            score_dom INTEGER,  -- Peut être NULL avant le match
+            score_ext INTEGER,  -- Peut être NULL avant le match
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
+            FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id),
+            UNIQUE(league_id, session_id, journee, equipe_dom_id, equipe_ext_id)
+        )
+    ''',
+    "cotes": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            journee INTEGER NOT NULL,
+            equipe_dom_id INTEGER NOT NULL,
+            equipe_ext_id INTEGER NOT NULL,
+            cote_1 DECIMAL(5,2),
+            cote_x DECIMAL(5,2),
+            cote_2 DECIMAL(5,2),
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
+            FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id),
+            UNIQUE(league_id, session_id, journee, equipe_dom_id, equipe_ext_id)
+        )
+    ''',
+    "classement": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            journee INTEGER NOT NULL,
+            equipe_id INTEGER NOT NULL,
+            position INTEGER,
+            points INTEGER NOT NULL,
+            forme TEXT,
+            buts_pour INTEGER DEFAULT 0,
+            buts_contre INTEGER DEFAULT 0,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (equipe_id) REFERENCES equipes(id),
+            UNIQUE(league_id, session_id, journee, equipe_id)
+        )
+    ''',
+    "predictions": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            journee INTEGER NOT NULL,
+            equipe_dom_id INTEGER NOT NULL,
+            equipe_ext_id INTEGER NOT NULL,
+            prediction TEXT NOT NULL,
+            resultat TEXT,
+            fiabilite DECIMAL(5,2),
+            succes INTEGER, -- 1 (Vrai) ou 0 (Faux), NULL si pas encore joué
+            points_gagnes INTEGER,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
+            FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id)
+        )
+    ''',
+    "score_ia": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            score DECIMAL(10,2) DEFAULT 100.00,
+            predictions_total INTEGER DEFAULT 0,
+            predictions_reussies INTEGER DEFAULT 0,
+            pause_until INTEGER DEFAULT 0,
+            session_archived INTEGER DEFAULT 0,
+            derniere_maj TEXT,
+            league_id INTEGER NOT NULL DEFAULT {ligue} UNIQUE
+        )
+    ''',
+    "zeus_predictions": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            journee INTEGER NOT NULL,
+            equipe_dom_id INTEGER NOT NULL,
+            equipe_ext_id INTEGER NOT NULL,
+            prediction INTEGER NOT NULL, -- 0=1, 1=N, 2=2, 3=Skip
+            confiance DECIMAL(5,2) DEFAULT 0,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
+            FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id),
+            UNIQUE(league_id, session_id, journee, equipe_dom_id, equipe_ext_id)
+        )
+    ''',
+    "zeus_classement_archive": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            journee INTEGER NOT NULL,
+            equipe_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            points INTEGER NOT NULL,
+            forme TEXT,
+            buts_pour DECIMAL(4,2) DEFAULT 0,
+            buts_contre DECIMAL(4,2) DEFAULT 0,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            FOREIGN KEY (equipe_id) REFERENCES equipes(id),
+            UNIQUE(league_id, journee, equipe_id)
+        )
+    ''',
+    "jobs_saison": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            statut TEXT NOT NULL DEFAULT 'en_attente', -- en_attente, en_cours, termine, erreur
+            etape TEXT,                                -- Dernière étape terminée
+            progression DECIMAL(5,2) DEFAULT 0,        -- 0 à 100
+            journee_fin INTEGER,
+            snapshot TEXT,                             -- Base figée de la session terminée
+            modele TEXT,
+            version TEXT,                              -- Version ZEUS enregistrée au registre
+            tentatives INTEGER DEFAULT 0,
+            erreur TEXT,
+            cree_le TEXT DEFAULT CURRENT_TIMESTAMP,
+            maj_le TEXT DEFAULT CURRENT_TIMESTAMP,
+            league_id INTEGER NOT NULL DEFAULT {ligue}
+        )
+    ''',
+    "cotes_historique": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            session_id INTEGER NOT NULL DEFAULT 1,
+            journee INTEGER NOT NULL,
+            equipe_dom_id INTEGER NOT NULL,
+            equipe_ext_id INTEGER NOT NULL,
+            horodatage INTEGER NOT NULL,               -- Secondes Unix de la capture
+            cote_1 INTEGER,                            -- Centièmes (1.75 -> 175)
+            cote_x INTEGER,
+            cote_2 INTEGER,
+            PRIMARY KEY (session_id, journee, equipe_dom_id, equipe_ext_id, horodatage)
+        ) WITHOUT ROWID
+    ''',
+    "sessions": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            league_id INTEGER PRIMARY KEY,
+            session_id INTEGER NOT NULL DEFAULT 1,
+            debut TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    "confrontations": '''
+        CREATE TABLE IF NOT EXISTS {nom} (
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            equipe_dom_id INTEGER NOT NULL,
+            equipe_ext_id INTEGER NOT NULL,
+            rencontres TEXT NOT NULL,                  -- "session:journee:score_dom:score_ext;..." (récente d'abord)
+            nb INTEGER NOT NULL,
+            victoires_dom INTEGER NOT NULL,
+            nuls INTEGER NOT NULL,
+            PRIMARY KEY (league_id, equipe_dom_id, equipe_ext_id)
+        ) WITHOUT ROWID
+    ''',
+}
+
+# Tables créées avant le partitionnement par ligue (migration 2) : reconstruites (nouvelles contraintes
+# d'unicité) si la colonne league_id manque, les lignes existantes allant à la ligue par défaut.
+_TABLES_PARTITIONNEES = ("equipes", "resultats", "cotes", "classement", "predictions",
+                         "score_ia", "zeus_predictions", "zeus_classement_archive", "jobs_saison")
+# Les recherches par journée utilisent l'index d'unicité (league_id, session_id, journee, ...)
+_INDEX_OBSOLETES = ("idx_resultats_journee", "idx_resultats_equipes", "idx_cotes_journee", "idx_classement_journee")
+
+# Index de la migration 5 (index_partitions)
+_INDEX_V5 = (
+    "CREATE INDEX IF NOT EXISTS idx_resultats_equipe_dom ON resultats(league_id, session_id, equipe_dom_id, journee)",
+    "CREATE INDEX IF NOT EXISTS idx_resultats_equipe_ext ON resultats(league_id, session_id, equipe_ext_id, journee)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_journee ON predictions(league_id, session_id, journee)",
+    "CREATE INDEX IF NOT EXISTS idx_predictions_succes ON predictions(league_id, session_id, succes)",
+    "CREATE INDEX IF NOT EXISTS idx_classement_equipe ON classement(league_id, session_id, equipe_id, journee)",
+    "CREATE INDEX IF NOT EXISTS idx_jobs_saison_statut ON jobs_saison(league_id, statut)",
+)
+
+# Remplissage des agrégats de la migration 6 (agregats_dashboard) : règlement des prédictions ZEUS
+# (issue 0 = 1, 1 = N, 2 = 2 ; action 3 = SKIP) puis agrégats recalculés depuis l'historique,
+# tranches de confiance de 0.1 (0 à 9)
+_AGREGATS_V6 = (
+    """
+    UPDATE zeus_predictions SET resultat = (
+        SELECT CASE WHEN r.score_dom > r.score_ext THEN 0 WHEN r.score_dom = r.score_ext THEN 1 ELSE 2 END
+        FROM resultats r
+        WHERE r.league_id = zeus_predictions.league_id AND r.session_id = zeus_predictions.session_id
+            AND r.journee = zeus_predictions.journee AND r.equipe_dom_id = zeus_predictions.equipe_dom_id
+            AND r.equipe_ext_id = zeus_predictions.equipe_ext_id
+    )
+    WHERE resultat IS NULL AND EXISTS (
+        SELECT 1 FROM resultats r
+        WHERE r.league_id = zeus_predictions.league_id AND r.session_id = zeus_predictions.session_id
+            AND r.journee = zeus_predictions.journee AND r.equipe_dom_id = zeus_predictions.equipe_dom_id
+            AND r.equipe_ext_id = zeus_predictions.equipe_ext_id
+            AND r.score_dom IS NOT NULL AND r.score_ext IS NOT NULL
+    )
+    """,
+    """
+    UPDATE zeus_predictions SET succes = CASE WHEN prediction = 3 THEN NULL WHEN prediction = resultat THEN 1 ELSE 0 END
+    WHERE resultat IS NOT NULL
+    """,
+    "DELETE FROM agregats_journee",
+    "DELETE FROM agregats_zeus",
+    """
+    INSERT INTO agregats_journee (league_id, session_id, journee, predictions, reussies, points,
+                                  score_cumule, predictions_cumulees, reussies_cumulees)
+    SELECT league_id, session_id, journee, predictions, reussies, points,
+           SUM(points) OVER session, SUM(predictions) OVER session, SUM(reussies) OVER session
+    FROM (
+        SELECT league_id, session_id, journee, COUNT(*) AS predictions,
+               SUM(succes = 1) AS reussies, SUM(COALESCE(points_gagnes, 0)) AS points
+        FROM predictions WHERE succes IS NOT NULL
+        GROUP BY league_id, session_id, journee
+    )
+    WINDOW session AS (PARTITION BY league_id, session_id ORDER BY journee)
+    """,
+    """
+    INSERT INTO agregats_zeus (league_id, session_id, tranche, essais, reussites, skips)
+    SELECT league_id, session_id, MIN(MAX(CAST(COALESCE(confiance, 0) * 10 AS INTEGER), 0), 9),
+           SUM(prediction != 3), SUM(succes = 1), SUM(prediction = 3)
+    FROM zeus_predictions WHERE resultat IS NOT NULL
+    GROUP BY league_id, session_id, MIN(MAX(CAST(COALESCE(confiance, 0) * 10 AS INTEGER), 0), 9)
+    """,
+)
+
+# ==================== MIGRATIONS ====================
+
+def _colonnes_historiques(cursor):
+    """Colonnes ajoutées au fil des versions (ex scripts/migrate_db.py et initialiser_db)."""
+    colonnes = _colonnes(cursor, "score_ia")
+    for colonne, definition in (("score", "DECIMAL(10,2) DEFAULT 100.00"),
+                                ("predictions_total", "INTEGER DEFAULT 0"),
+                                ("predictions_reussies", "INTEGER DEFAULT 0"),
+                                ("pause_until", "INTEGER DEFAULT 0"),
+                                ("session_archived", "INTEGER DEFAULT 0"),
+                                ("derniere_maj", "TEXT")):
+        ajouter_colonne(cursor, "score_ia", colonne, definition)
+    if "score_total" in colonnes:
+        cursor.execute("UPDATE score_ia SET score = score_total WHERE score IS NULL OR score = 100.00")
+    if "date_maj" in colonnes:
+        cursor.execute("UPDATE score_ia SET derniere_maj = date_maj WHERE derniere_maj IS NULL")
+    ajouter_colonne(cursor, "predictions", "resultat", "TEXT")
+    ajouter_colonne(cursor, "classement", "buts_pour", "INTEGER DEFAULT 0")
+    ajouter_colonne(cursor, "classement", "buts_contre", "INTEGER DEFAULT 0")
+    ajouter_colonne(cursor, "jobs_saison", "version", "TEXT")
+
+
+def _partition_ligues(cursor):
+    """Tables reconstruites avec league_id (lignes existantes -> ligue par défaut)."""
+    for table in _TABLES_PARTITIONNEES:
+        _partitionner_table(cursor, table, "league_id", config.LEAGUE_ID, _TABLES_V3[table])
+    for index in _INDEX_OBSOLETES:
+        cursor.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+def _session_cotes_historique(cursor):
+    _partitionner_table(cursor, "cotes_historique", "session_id", 1, _TABLES_V3["cotes_historique"])
+
+
+def _tables_v3(cursor):
+    for table, ddl in _TABLES_V3.items():
+        cursor.execute(ddl.format(nom=table, ligue=config.LEAGUE_ID))
+
+
+def _attendre_inactivite(cursor) -> bool:
+    """
+    Attend que les autres connexions cessent d'écrire pendant INDEX_CONFIG["FENETRE_INACTIVITE"]
+    secondes (PRAGMA data_version : change à chaque commit d'une autre connexion).
+
+    Returns:
+        True si la fenêtre a été trouvée avant INDEX_CONFIG["ATTENTE_MAX"] secondes
+    """
+    limite = time.monotonic() + INDEX_CONFIG["ATTENTE_MAX"]
+    try:
+        cursor.execute("PRAGMA data_version")
+        version = cursor.fetchone()[0]
+    except Exception:
+        # Base distante (Turso) : pas de compteur, construction directe
+        return True
+    while time.monotonic() < limite:
+        time.sleep(INDEX_CONFIG["FENETRE_INACTIVITE"])
+        cursor.execute("PRAGMA data_version")
+        actuelle = cursor.fetchone()[0]
+        if actuelle == version:
+            return True
+        version = actuelle
+    return False
+
+
+def _creation_index(index: Iterable[str]) -> Callable:
+    """
+    Migration en ligne créant les index absents de la liste, un index par lot.
+
+    SQLite construit un index en une seule instruction CREATE INDEX (parcours complet
+    de la table) qui tient le verrou d'écriture jusqu'au bout. Sur une table de plus de
+    `taille_lot` lignes, la construction attend une fenêtre d'inactivité des écritures
+    (cf _attendre_inactivite) ; sans fenêtre, ou si le verrou est pris, le lot ne fait
+    rien et le suivant réessaie.
+    """
+    def appliquer(cursor, taille_lot):
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        existants = {row[0] for row in cursor.fetchall()}
+        for index_sql in index:
+            nom, cible = index_sql.split(" ON ")
+            nom, table = nom.split()[-1], cible.split("(")[0].strip()
+            if nom not in existants:
+                cursor.execute(f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} LIMIT ?)", (taille_lot + 1,))
+                if cursor.fetchone()[0] > taille_lot and not _attendre_inactivite(cursor):
+                    logger.info(f"Migration : index {nom} différé (écritures en cours)")
+                    return 1
+                debut = time.monotonic()
+                try:
+                    cursor.execute(index_sql)
+                except sqlite3.OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    logger.warning(f"Migration : index {nom} différé ({e})")
+                    return 1
+                logger.info(f"Migration : index {nom} créé en {time.monotonic() - debut:.2f}s")
+                return 1
+        return 0
+    return appliquer
+
+
+def _agregats_dashboard(cursor):
+    """Règlement des prédictions ZEUS et agrégats du dashboard, calculés depuis l'historique."""
+    ajouter_colonne(cursor, "zeus_predictions", "resultat", "INTEGER")
+    ajouter_colonne(cursor, "zeus_predictions", "succes", "INTEGER")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agregats_journee (
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            journee INTEGER NOT NULL,
+            predictions INTEGER NOT NULL DEFAULT 0,
+            reussies INTEGER NOT NULL DEFAULT 0,
+            points INTEGER NOT NULL DEFAULT 0,
+            score_cumule INTEGER NOT NULL DEFAULT 0,
+            predictions_cumulees INTEGER NOT NULL DEFAULT 0,
+            reussies_cumulees INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (league_id, session_id, journee)
+        ) WITHOUT ROWID
+    """.format(ligue=config.LEAGUE_ID))
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agregats_zeus (
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            session_id INTEGER NOT NULL DEFAULT 1,
+            tranche INTEGER NOT NULL,
+            essais INTEGER NOT NULL DEFAULT 0,
+            reussites INTEGER NOT NULL DEFAULT 0,
+            skips INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (league_id, session_id, tranche)
+        ) WITHOUT ROWID
+    """.format(ligue=config.LEAGUE_ID))
+    for requete in _AGREGATS_V6:
+        cursor.execute(requete)
+
+
+def _versions_donnees(cursor):
+    """Versions des données par ligue (caches dérivés partagés entre processus, cf utils)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS versions_donnees (
+            league_id INTEGER NOT NULL DEFAULT {ligue},
+            cle TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (league_id, cle)
+        ) WITHOUT ROWID
+    """.format(ligue=config.LEAGUE_ID))
+
+
+MIGRATIONS = [
+    Migration(1, "colonnes_historiques", _colonnes_historiques, False),
+    Migration(2, "partition_ligues", _partition_ligues, False),
+    Migration(3, "session_cotes_historique", _session_cotes_historique, False),
+    Migration(4, "tables_v3", _tables_v3, False),
+    Migration(5, "index_partitions", _creation_index(_INDEX_V5), True),
+    Migration(6, "agregats_dashboard", _agregats_dashboard, False),
+    Migration(7, "index_agregats", _creation_index([
+        "CREATE INDEX IF NOT EXISTS idx_zeus_predictions_resultat ON zeus_predictions(league_id, session_id, resultat)",
+    ]), True),
+    Migration(8, "versions_donnees", _versions_donnees, False),
+]
+
+# ==================== EXÉCUTION ====================
+
+def versions_appliquees(cursor) -> set:
+    """Versions enregistrées dans schema_version (vide si la table n'existe pas)."""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+    if cursor.fetchone() is None:
+        return set()
+    cursor.execute("SELECT version FROM schema_version")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _noter(cursor, migration: Migration):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            nom TEXT NOT NULL,
+            applique_le TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("INSERT OR IGNORE INTO schema_version (version, nom) VALUES (?, ?)",
+                   (migration.version, migration.nom))
+
+
+def en_attente(cursor, migrations: Iterable[Migration] = None) -> List[Migration]:
+    """Migrations non appliquées, dans l'ordre des versions."""
+    faites = versions_appliquees(cursor)
+    return sorted((m for m in (migrations or MIGRATIONS) if m.version not in faites), key=lambda m: m.version)
+
+
+def appliquer_bloquantes(conn, migrations: Iterable[Migration] = None) -> List[int]:
+    """
+    Applique les migrations bloquantes en attente, une transaction par migration.
+
+    Returns:
+        Versions appliquées
+    """
+    cursor = conn.cursor()
+    appliquees = []
+    for migration in en_attente(cursor, migrations):
+        if migration.en_ligne:
+            continue
+        migration.appliquer(cursor)
+        _noter(cursor, migration)
+        conn.commit()
+        appliquees.append(migration.version)
+        logger.info(f"Migration {migration.version} ({migration.nom}) appliquée")
+    return appliquees
+
+
+def appliquer_en_ligne(db_path: Optional[str] = None, migrations: Iterable[Migration] = None,
+                       taille_lot: Optional[int] = None, arret: Optional[threading.Event] = None) -> List[int]:
+    """
+    Applique les migrations en ligne en attente, par lots : chaque lot est une transaction
+    courte, les écritures du moniteur passent entre deux lots.
+
+    Args:
+        db_path: Base SQLite explicite (None = base principale)
+        taille_lot: Lignes par lot (TAILLE_LOT par défaut)
+        arret: Interrompt entre deux lots (reprise au prochain lancement)
+
+    Returns:
+        Versions terminées
+    """
+    taille_lot = taille_lot or TAILLE_LOT
+    with get_db_connection(db_path) as conn:
+        restantes = [m for m in en_attente(conn.cursor(), migrations) if m.en_ligne]
+    terminees = []
+    for migration in restantes:
+        while not (arret and arret.is_set()):
+            with get_db_connection(db_path) as conn:
+                cursor = conn.cursor()
+                if migration.appliquer(cursor, taille_lot) == 0:
+                    _noter(cursor, migration)
+                    terminees.append(migration.version)
+                    logger.info(f"Migration en ligne {migration.version} ({migration.nom}) terminée")
+                    break
+    return terminees
+
+
+_threads = {}
+_threads_lock = threading.Lock()
+
+
+def lancer_migrations_en_ligne(db_path: Optional[str] = None) -> threading.Thread:
+    """Applique les migrations en ligne dans un thread d'arrière-plan (un seul par base)."""
+    with _threads_lock:
+        thread = _threads.get(db_path)
+        if thread is None or not thread.is_alive():
+            def executer():
+                try:
+                    appliquer_en_ligne(db_path)
+                except Exception as e:
+                    logger.error(f"Migrations en ligne interrompues (reprises au prochain démarrage) : {e}", exc_info=True)
+            thread = threading.Thread(target=executer, name="migrations-en-ligne", daemon=True)
+            _threads[db_path] = thread
+            thread.start()
+    return thread
+
+
+def attendre_migrations_en_ligne(timeout: Optional[float] = None):
+    """Attend la fin des threads de migration en ligne."""
+    for thread in list(_threads.values()):
+        thread.join(timeout)
+
+
+def version_schema(cursor) -> int:
+    """Plus haute version appliquée (0 pour une base sans schema_version)."""
+    return max(versions_appliquees(cursor), default=0)
@@ -0,0 +1,136 @@
+"""
+Résultats paginés côté serveur pour le dashboard : filtres (session, journée,
+équipe) appliqués en SQL et pagination par clé (keyset) sur (journee, id)
+décroissants. Une page ne lit que ses lignes, quelle que soit la longueur de
+l'historique conservé.
+
+La pagination par clé descend l'index d'unicité de `resultats`
+(league_id, session_id, journee, ...), qui sert aussi les recherches par journée,
+et reste stable pendant l'ingestion : les nouvelles journées arrivent avant le
+curseur, les pages suivantes ne sautent ni ne répètent aucune ligne. L'ancien
+index idx_resultats_journee n'existe plus (supprimé par la migration 2, doublon
+de l'index d'unicité) : seul le tri par id dans une journée passe par un B-tree
+temporaire, borné aux matchs d'une journée. Le plan est vérifié par les tests
+(cf requete_page).
+
+Les fonctions prennent une connexion ouverte (cf database.get_read_connection) :
+le dashboard lit filtres, version et page dans le même instantané.
+"""
+from typing import Dict, List, Optional, Tuple
+
+PAGES_CONFIG = {
+    "TAILLE_PAGE": 10,   # Un match par équipe : une journée complète
+    "TAILLE_MAX": 100,
+}
+
+# Colonnes d'une page (dans l'ordre d'affichage)
+COLONNES = ("J", "Domicile", "Score", "Exterieur")
+
+# Curseur de pagination : (journee, id) de la dernière ligne de la page précédente
+Curseur = Tuple[int, int]
+
+
+def lister_sessions(conn, league_id: int) -> List[int]:
+    """Sessions de la ligue présentes dans la base (plus récente d'abord)."""
+    rows = conn.execute("SELECT DISTINCT session_id FROM resultats WHERE league_id = ? ORDER BY session_id DESC",
+                        (league_id,)).fetchall()
+    return [row[0] for row in rows]
+
+
+def lister_journees(conn, league_id: int, session_id: int) -> List[int]:
+    """Journées de la session (plus récente d'abord)."""
+    rows = conn.execute("""
+        SELECT DISTINCT journee FROM resultats WHERE league_id = ? AND session_id = ?
+        ORDER BY journee DESC
+    """, (league_id, session_id)).fetchall()
+    return [row[0] for row in rows]
+
+
+def lister_equipes(conn, league_id: int) -> List[Tuple[int, str]]:
+    """(id, nom) des équipes de la ligue, par nom."""
+    rows = conn.execute("SELECT id, nom FROM equipes WHERE league_id = ? ORDER BY nom", (league_id,)).fetchall()
+    return [tuple(row) for row in rows]
+
+
+def version_resultats(conn, league_id: int, session_id: int) -> Tuple[Optional[int], int, int]:
+    """
+    Version des résultats d'une session, pour la clé du cache des pages : dernière journée,
+    plus grand id de la session et version des résultats de la ligue (table versions_donnees,
+    incrémentée par chaque écriture qui change un score, cf db_integration.insert_result_rows,
+    y compris une correction 2-1 -> 1-1 sur une ancienne journée). Le plus grand id change à
+    chaque ligne insérée (matchs à venir compris). Une seule requête, sur l'index.
+
+    Returns:
+        (derniere_journee, max_id, version) ; (None, 0, version) pour une session vide
+    """
+    derniere, max_id, version = conn.execute("""
+        SELECT MAX(journee), MAX(id), (
+            SELECT COALESCE(SUM(version), 0) FROM versions_donnees WHERE league_id = ? AND cle IN ('resultats', '*')
+        )
+        FROM resultats WHERE league_id = ? AND session_id = ?
+    """, (league_id, league_id, session_id)).fetchone()
+    return derniere, max_id or 0, version
+
+
+def lire_page(conn, league_id: int, session_id: int, journee: Optional[int] = None,
+              equipe_id: Optional[int] = None, apres: Optional[Curseur] = None,
+              taille: Optional[int] = None) -> Tuple[List[Dict], Optional[Curseur]]:
+    """
+    Une page de résultats, de la journée la plus récente à la plus ancienne.
+
+    Args:
+        conn: Connexion ouverte
+        league_id, session_id: Partition lue
+        journee: Filtre sur une journée (None = toutes)
+        equipe_id: Filtre sur une équipe, à domicile ou à l'extérieur (None = toutes)
+        apres: Curseur renvoyé par la page précédente (None = première page)
+        taille: Lignes par page (TAILLE_PAGE par défaut, plafonnée à TAILLE_MAX)
+
+    Returns:
+        (lignes, suivant) : lignes au format COLONNES, curseur de la page suivante
+        ou None si c'est la dernière
+    """
+    taille = min(taille or PAGES_CONFIG["TAILLE_PAGE"], PAGES_CONFIG["TAILLE_MAX"])
+    rows = conn.execute(*requete_page(league_id, session_id, journee, equipe_id, apres, taille)).fetchall()
+
+    # Une ligne de plus que la page : indique s'il reste une page suivante
+    lignes = [dict(zip(COLONNES, (j, dom, score, ext))) for j, _, dom, score, ext in rows[:taille]]
+    suivant = (rows[taille - 1][0], rows[taille - 1][1]) if len(rows) > taille else None
+    return lignes, suivant
+
+
+def requete_page(league_id: int, session_id: int, journee: Optional[int], equipe_id: Optional[int],
+                 apres: Optional[Curseur], taille: int) -> Tuple[str, List]:
+    """
+    Requête d'une page (cf lire_page) : `taille` lignes + 1, descente de l'index d'unicité.
+
+    Returns:
+        (sql, paramètres)
+    """
+    conditions = ["r.league_id = ?", "r.session_id = ?"]
+    params = [league_id, session_id]
+    if journee is not None:
+        conditions.append("r.journee = ?")
+        params.append(journee)
+    if equipe_id is not None:
+        conditions.append("(r.equipe_dom_id = ? OR r.equipe_ext_id = ?)")
+        params += [equipe_id, equipe_id]
+    if apres is not None:
+        # (journee, id) < curseur, écrit pour que la borne sur journee reste une plage d'index
+        conditions.append("r.journee <= ? AND (r.journee < ? OR r.id < ?)")
+        params += [apres[0], apres[0], apres[1]]
+
+    return f"""
+        SELECT
+            r.journee,
+            r.id,
+            e1.nom,
+            COALESCE(r.score_dom, '?') || ' - ' || COALESCE(r.score_ext, '?'),
+            e2.nom
+        FROM resultats r
+        JOIN equipes e1 ON r.equipe_dom_id = e1.id
+        JOIN equipes e2 ON r.equipe_ext_id = e2.id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY r.journee DESC, r.id DESC
+        LIMIT ?
+    """, params + [taille + 1]
@@ -0,0 +1,297 @@
+"""
+Transfert en continu d'une base GODMOD vers une autre (SQLite locale <-> Turso).
+
+Chaque table est lue par lots bornés en pagination par clé (`WHERE pk > ?
+ORDER BY pk LIMIT n`, clé primaire `id` ou clé composite) : la mémoire ne dépend
+que de la taille d'un lot. Les tables sans dépendance de clé étrangère entre elles
+sont copiées en parallèle, niveau par niveau (equipes avant resultats...).
+La progression est enregistrée après chaque lot validé dans un fichier de reprise :
+un transfert interrompu repart du dernier lot, et les lots réécrits (INSERT OR
+REPLACE sur la clé primaire) ne créent pas de doublon. Le transfert se termine
+par une vérification du nombre de lignes et d'une somme de contrôle par table.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from . import config
+from .database import SCHEMA_TABLES, INDEX
+
+try:
+    import libsql
+    HAS_LIBSQL = True
+except ImportError:
+    HAS_LIBSQL = False
+
+logger = logging.getLogger(__name__)
+
+# Cible désignant la base Turso (config.TURSO_URL / TURSO_TOKEN) ; toute autre cible est un fichier SQLite
+TURSO = "turso"
+
+TRANSFERT_CONFIG = {
+    "TAILLE_LOT": 500,        # Lignes lues et écrites par lot
+    "PARALLELES": 4,          # Tables copiées en même temps (dans un même niveau de dépendances)
+}
+
+# ==================== CONNEXIONS ====================
+
+def _connecter(cible: str):
+    """Connexion à une cible : TURSO ou chemin d'une base SQLite."""
+    if cible == TURSO:
+        if not HAS_LIBSQL:
+            raise RuntimeError("Module libsql requis pour Turso")
+        if not (config.TURSO_URL and config.TURSO_TOKEN):
+            raise RuntimeError("TURSO_URL et TURSO_TOKEN doivent être définis")
+        return libsql.connect(config.TURSO_URL, auth_token=config.TURSO_TOKEN)
+    # Plusieurs tables peuvent écrire en parallèle dans le même fichier
+    conn = sqlite3.connect(cible, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _tables(cursor) -> List[str]:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    existantes = {row[0] for row in cursor.fetchall()}
+    return [t for t in SCHEMA_TABLES if t in existantes]
+
+
+def _colonnes(cursor, table: str):
+    """(colonnes, colonnes de la clé primaire dans l'ordre de la clé)."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    infos = cursor.fetchall()
+    colonnes = [col[1] for col in infos]
+    cle = [col[1] for col in sorted((c for c in infos if c[5]), key=lambda c: c[5])]
+    return colonnes, cle
+
+
+def _niveaux(cursor, tables: List[str]) -> List[List[str]]:
+    """Regroupe les tables par niveau : une table vient après les tables qu'elle référence."""
+    dependances = {}
+    for table in tables:
+        cursor.execute(f"PRAGMA foreign_key_list({table})")
+        dependances[table] = {row[2] for row in cursor.fetchall()} & set(tables) - {table}
+    niveaux, places = [], set()
+    while len(places) < len(tables):
+        niveau = [t for t in tables if t not in places and dependances[t] <= places]
+        if not niveau:  # Cycle : le reste en un seul niveau
+            niveau = [t for t in tables if t not in places]
+        niveaux.append(niveau)
+        places.update(niveau)
+    return niveaux
+
+
+def creer_schema(cible: str):
+    """Crée les tables et index GODMOD manquants sur la cible (sans données initiales)."""
+    conn = _connecter(cible)
+    try:
+        cursor = conn.cursor()
+        for table, ddl in SCHEMA_TABLES.items():
+            cursor.execute(ddl.format(nom=table, ligue=config.LEAGUE_ID))
+        for index_sql in INDEX:
+            cursor.execute(index_sql)
+        conn.commit()
+    finally:
+        conn.close()
+
+# ==================== REPRISE ====================
+
+class Reprise:
+    """Fichier de progression (JSON) partagé par les threads du transfert."""
+
+    def __init__(self, chemin: Optional[str], source: str, destination: str):
+        self.chemin = chemin
+        self._lock = threading.Lock()
+        self.etat = {"source": source, "destination": destination, "tables": {}}
+        if chemin and os.path.exists(chemin):
+            with open(chemin, encoding="utf-8") as f:
+                etat = json.load(f)
+            if (etat.get("source"), etat.get("destination")) == (source, destination):
+                self.etat = etat
+            else:
+                logger.warning(f"Fichier de reprise {chemin} d'un autre transfert : ignoré")
+
+    def table(self, nom: str) -> Dict:
+        with self._lock:
+            return dict(self.etat["tables"].get(nom, {"cle": None, "lignes": 0, "termine": False}))
+
+    def noter(self, nom: str, **valeurs):
+        with self._lock:
+            self.etat["tables"].setdefault(nom, {"cle": None, "lignes": 0, "termine": False}).update(valeurs)
+            if self.chemin:
+                temporaire = f"{self.chemin}.tmp"
+                with open(temporaire, "w", encoding="utf-8") as f:
+                    json.dump(self.etat, f)
+                os.replace(temporaire, self.chemin)
+
+# ==================== COPIE ====================
+
+def _requete_lot(table: str, colonnes: List[str], cle: List[str], apres) -> tuple:
+    """SELECT d'un lot en pagination par clé (valeur de clé du dernier lot ou None)."""
+    liste = ", ".join(colonnes)
+    ordre = ", ".join(cle)
+    if apres is None:
+        return f"SELECT {liste} FROM {table} ORDER BY {ordre} LIMIT ?", ()
+    if len(cle) == 1:
+        return f"SELECT {liste} FROM {table} WHERE {cle[0]} > ? ORDER BY {ordre} LIMIT ?", tuple(apres)
+    marqueurs = ", ".join("?" * len(cle))
+    return f"SELECT {liste} FROM {table} WHERE ({ordre}) > ({marqueurs}) ORDER BY {ordre} LIMIT ?", tuple(apres)
+
+
+def _parcourir(cursor, table: str, colonnes: List[str], cle: List[str], taille_lot: int, apres=None):
+    """Génère les lots d'une table dans l'ordre de sa clé primaire."""
+    positions = [colonnes.index(c) for c in cle]
+    while True:
+        sql, params = _requete_lot(table, colonnes, cle, apres)
+        cursor.execute(sql, params + (taille_lot,))
+        lot = [tuple(row) for row in cursor.fetchall()]
+        if not lot:
+            return
+        apres = [lot[-1][p] for p in positions]
+        yield lot, apres
+        if len(lot) < taille_lot:
+            return
+
+
+def _copier_table(source: str, destination: str, table: str, reprise: Reprise, taille_lot: int) -> int:
+    """Copie une table par lots à partir du dernier lot enregistré. Retourne les lignes copiées."""
+    etat = reprise.table(table)
+    if etat["termine"]:
+        return 0
+    conn_src, conn_dst = _connecter(source), _connecter(destination)
+    try:
+        cur_src, cur_dst = conn_src.cursor(), conn_dst.cursor()
+        colonnes_src, cle = _colonnes(cur_src, table)
+        colonnes_dst, _ = _colonnes(cur_dst, table)
+        colonnes = [c for c in colonnes_src if c in colonnes_dst]
+        if not cle:
+            raise RuntimeError(f"Table {table} sans clé primaire : pagination impossible")
+        insertion = (f"INSERT OR REPLACE INTO {table} ({', '.join(colonnes)}) "
+                     f"VALUES ({', '.join('?' * len(colonnes))})")
+
+        lignes = etat["lignes"]
+        copiees = 0
+        for lot, apres in _parcourir(cur_src, table, colonnes, cle, taille_lot, etat["cle"]):
+            cur_dst.executemany(insertion, lot)
+            conn_dst.commit()
+            lignes += len(lot)
+            copiees += len(lot)
+            reprise.noter(table, cle=apres, lignes=lignes)
+        reprise.noter(table, termine=True)
+        logger.info(f"[TRANSFERT] {table} : {lignes} lignes")
+        return copiees
+    finally:
+        conn_src.close()
+        conn_dst.close()
+
+# ==================== VÉRIFICATION ====================
+
+def somme_controle(cible: str, table: str, colonnes: Optional[List[str]] = None, taille_lot: int = None) -> tuple:
+    """
+    (nombre de lignes, SHA-256 des lignes dans l'ordre de la clé primaire), calculés par lots.
+    
+    Args:
+        colonnes: Colonnes prises en compte (toutes par défaut)
+    """
+    taille_lot = taille_lot or TRANSFERT_CONFIG["TAILLE_LOT"]
+    conn = _connecter(cible)
+    try:
+        cursor = conn.cursor()
+        toutes, cle = _colonnes(cursor, table)
+        colonnes = sorted(set(colonnes or toutes) | set(cle))
+        empreinte = hashlib.sha256()
+        lignes = 0
+        for lot, _ in _parcourir(cursor, table, colonnes, cle, taille_lot):
+            for row in lot:
+                empreinte.update(repr(row).encode("utf-8"))
+            lignes += len(lot)
+        return lignes, empreinte.hexdigest()
+    finally:
+        conn.close()
+
+
+def verifier(source: str, destination: str, tables: Optional[List[str]] = None,
+             paralleles: int = None) -> Dict[str, Dict]:
+    """
+    Compare le nombre de lignes et la somme de contrôle de chaque table,
+    sur les colonnes présentes des deux côtés.
+
+    Returns:
+        dict: {table: {"source": (lignes, somme), "destination": (lignes, somme), "ok": bool}}
+    """
+    conn_src, conn_dst = _connecter(source), _connecter(destination)
+    try:
+        cur_src, cur_dst = conn_src.cursor(), conn_dst.cursor()
+        tables = tables if tables is not None else _tables(cur_src)
+        communes = {t: [c for c in _colonnes(cur_src, t)[0] if c in _colonnes(cur_dst, t)[0]] for t in tables}
+    finally:
+        conn_src.close()
+        conn_dst.close()
+    paralleles = paralleles or TRANSFERT_CONFIG["PARALLELES"]
+    with ThreadPoolExecutor(max_workers=paralleles) as executeur:
+        src = {t: executeur.submit(somme_controle, source, t, communes[t]) for t in tables}
+        dst = {t: executeur.submit(somme_controle, destination, t, communes[t]) for t in tables}
+        rapport = {}
+        for t in tables:
+            a, b = src[t].result(), dst[t].result()
+            rapport[t] = {"source": a, "destination": b, "ok": a == b}
+    return rapport
+
+# ==================== TRANSFERT ====================
+
+def transferer(source: str, destination: str, fichier_reprise: Optional[str] = None,
+               taille_lot: int = None, paralleles: int = None, verification: bool = True) -> Dict:
+    """
+    Copie toutes les tables GODMOD de `source` vers `destination` (TURSO ou chemin SQLite).
+
+    Args:
+        source: Base lue
+        destination: Base écrite (schéma créé si nécessaire)
+        fichier_reprise: Fichier de progression ; un transfert interrompu y reprend
+        taille_lot: Lignes par lot (TRANSFERT_CONFIG par défaut)
+        paralleles: Tables copiées simultanément (TRANSFERT_CONFIG par défaut)
+        verification: Comparer nombres de lignes et sommes de contrôle à la fin
+
+    Returns:
+        dict: {"copiees": {table: lignes copiées par cet appel}, "verification": rapport ou None, "ok": bool}
+    """
+    taille_lot = taille_lot or TRANSFERT_CONFIG["TAILLE_LOT"]
+    paralleles = paralleles or TRANSFERT_CONFIG["PARALLELES"]
+    if source != TURSO and not os.path.exists(source):
+        raise FileNotFoundError(f"Base source introuvable : {source}")
+    creer_schema(destination)
+    reprise = Reprise(fichier_reprise, source, destination)
+
+    conn = _connecter(source)
+    try:
+        cursor = conn.cursor()
+        tables = _tables(cursor)
+        niveaux = _niveaux(cursor, tables)
+    finally:
+        conn.close()
+
+    copiees = {}
+    with ThreadPoolExecutor(max_workers=paralleles) as executeur:
+        for niveau in niveaux:
+            taches = {t: executeur.submit(_copier_table, source, destination, t, reprise, taille_lot)
+                      for t in niveau}
+            for table, tache in taches.items():
+                copiees[table] = tache.result()
+            print(f"[TRANSFERT] Niveau {', '.join(niveau)} : {sum(copiees[t] for t in niveau)} lignes")
+
+    rapport = verifier(source, destination, tables, paralleles) if verification else None
+    ok = rapport is None or all(r["ok"] for r in rapport.values())
+    if rapport:
+        for table, r in rapport.items():
+            if not r["ok"]:
+                logger.error(f"[TRANSFERT] {table} : source {r['source'][0]} lignes, "
+                             f"destination {r['destination'][0]} lignes, sommes différentes")
+                # Table recopiée entièrement au prochain lancement
+                reprise.noter(table, cle=None, lignes=0, termine=False)
+    if ok and fichier_reprise and os.path.exists(fichier_reprise):
+        os.remove(fichier_reprise)
+    return {"copiees": copiees, "verification": rapport, "ok": ok}
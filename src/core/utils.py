@@ -3,34 +3,41 @@ import re
 import sqlite3
 from . import config
 
-# Cache global pour les IDs d'équipes {nom: id}
+# Cache global pour les IDs d'équipes {((base, ligue), nom): id}
 _EQUIPE_ID_CACHE = {}
 
+def _contexte():
+    """(base, ligue) actives (cf database.utiliser_base/utiliser_ligue) : les caches de ce module leur sont propres."""
+    from .database import get_contexte
+    return get_contexte()
+
 def get_equipe_id(nom, conn=None):
     """Récupère l'ID d'une équipe par son nom, utilise le cache."""
     global _EQUIPE_ID_CACHE
-    if nom in _EQUIPE_ID_CACHE:
-        return _EQUIPE_ID_CACHE[nom]
+    contexte = _contexte()
+    cle = (contexte, nom)
+    if cle in _EQUIPE_ID_CACHE:
+        return _EQUIPE_ID_CACHE[cle]
     
     if conn is None:
         from .database import get_db_connection
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id FROM equipes WHERE nom = ?", (nom,))
+            cursor.execute("SELECT id FROM equipes WHERE league_id = ? AND nom = ?", (contexte[1], nom))
             res = cursor.fetchone()
             
             if res:
-                _EQUIPE_ID_CACHE[nom] = res[0]
+                _EQUIPE_ID_CACHE[cle] = res[0]
                 return res[0]
             return None
     else:
         # Utilisation de la connexion fournie
         cursor = conn.cursor()
-        cursor.execute("SELECT id FROM equipes WHERE nom = ?", (nom,))
+        cursor.execute("SELECT id FROM equipes WHERE league_id = ? AND nom = ?", (contexte[1], nom))
         res = cursor.fetchone()
         
         if res:
-            _EQUIPE_ID_CACHE[nom] = res[0]
+            _EQUIPE_ID_CACHE[cle] = res[0]
             return res[0]
         return None
 
@@ -39,6 +46,73 @@ def invalidate_equipe_cache():
     global _EQUIPE_ID_CACHE
     _EQUIPE_ID_CACHE.clear()
 
+# Versions des données d'une ligue, en base (table versions_donnees), pour les caches dérivés
+# (ex: sélections de prédictions). Chaque écriture qui change des données incrémente la version
+# de leur clé dans sa propre transaction : les écritures des autres processus (worker, dashboard,
+# scripts) sont vues, et une empreinte calculée avant un changement ne peut plus correspondre.
+
+def _cle_version(cle):
+    """Clé texte d'une donnée : "classement" -> "classement", ("cotes", 12) -> "cotes:12"."""
+    return ":".join(str(c) for c in cle) if isinstance(cle, tuple) else str(cle)
+
+def marquer_donnees_modifiees(cursor, cle):
+    """
+    Change la version de `cle` pour la ligue active, dans la transaction du curseur
+    (appeler dans le bloc de l'écriture : données et version sont validées ensemble).
+    
+    Args:
+        cursor: Curseur de la connexion qui écrit les données
+        cle: Donnée concernée (ex: "classement", ("cotes", 12))
+    """
+    from .database import get_ligue_active
+    cursor.execute("""
+        INSERT INTO versions_donnees (league_id, cle, version) VALUES (?, ?, 1)
+        ON CONFLICT(league_id, cle) DO UPDATE SET version = version + 1
+    """, (get_ligue_active(), _cle_version(cle)))
+
+def oublier_donnees(cursor, prefixe=None):
+    """
+    Marque des données comme modifiées hors suivi (DELETE, reset de session).
+    
+    Args:
+        cursor: Curseur de la connexion qui écrit les données
+        prefixe: Clé ou premier élément des clés tuple concernées (ex: "cotes"), None = toutes
+    """
+    from .database import get_ligue_active
+    ligue = get_ligue_active()
+    if prefixe is None:
+        cursor.execute("UPDATE versions_donnees SET version = version + 1 WHERE league_id = ?", (ligue,))
+    else:
+        prefixe = _cle_version(prefixe)
+        cursor.execute("""
+            UPDATE versions_donnees SET version = version + 1
+            WHERE league_id = ? AND (cle = ? OR substr(cle, 1, ?) = ?)
+        """, (ligue, prefixe, len(prefixe) + 1, prefixe + ":"))
+    # Les clés jamais écrites restent à 0 : on change aussi la version globale de la ligue
+    marquer_donnees_modifiees(cursor, "*")
+
+def lire_versions_donnees(cursor, cles):
+    """
+    Versions de `cles` pour la ligue active, lues en une requête (0 pour une clé jamais écrite).
+    
+    Returns:
+        tuple: Versions dans l'ordre de `cles`, suivies de la version globale de la ligue
+    """
+    from .database import get_ligue_active
+    textes = [_cle_version(cle) for cle in cles] + ["*"]
+    cursor.execute(f"""
+        SELECT cle, version FROM versions_donnees
+        WHERE league_id = ? AND cle IN ({", ".join("?" * len(textes))})
+    """, [get_ligue_active()] + textes)
+    versions = {row[0]: row[1] for row in cursor.fetchall()}
+    return tuple(versions.get(texte, 0) for texte in textes)
+
+def get_version_donnees(*cles):
+    """Versions de `cles` (cf lire_versions_donnees) lues dans un instantané de la base active."""
+    from .database import get_read_connection
+    with get_read_connection() as conn:
+        return lire_versions_donnees(conn.cursor(), cles)
+
 def _update_config_flag(flag_name, new_value):
     """
     Fonction générique pour mettre à jour un flag dans config.py.
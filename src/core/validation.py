@@ -3,31 +3,36 @@ Module de validation des données pour GODMOD V2.
 Vérifie la cohérence et l'intégrité des données scrapées.
 """
 import logging
-from .database import get_db_connection
+from .database import get_db_connection, get_partition
 
 logger = logging.getLogger(__name__)
 
 def valider_donnees_journee(journee):
     """
-    Vérifie qu'une journée a exactement 10 matchs.
+    Vérifie qu'une journée de la ligue active a exactement un match par paire d'équipes
+    (10 matchs pour une ligue de 20 équipes).
     
     Args:
         journee: Numéro de la journée à valider
     
     Returns:
-        True si valide (10 matchs), False sinon
+        True si valide, False sinon
     """
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM resultats WHERE journee = ?", (journee,))
+            partition = get_partition(conn)
+            cursor.execute("SELECT COUNT(*) FROM equipes WHERE league_id = ?", (partition[0],))
+            attendus = cursor.fetchone()[0] // 2
+            cursor.execute("SELECT COUNT(*) FROM resultats WHERE league_id = ? AND session_id = ? AND journee = ?",
+                           partition + (journee,))
             nb_matchs = cursor.fetchone()[0]
             
-            if nb_matchs != 10:
-                logger.warning(f"⚠️ Journée {journee} : {nb_matchs}/10 matchs détectés")
+            if attendus == 0 or nb_matchs != attendus:
+                logger.warning(f"⚠️ Journée {journee} : {nb_matchs}/{attendus} matchs détectés")
                 return False
             
-            logger.info(f"✅ Journée {journee} : validation OK (10 matchs)")
+            logger.info(f"✅ Journée {journee} : validation OK ({attendus} matchs)")
             return True
     except Exception as e:
         logger.error(f"Erreur lors de la validation J{journee}: {e}", exc_info=True)
@@ -49,9 +54,9 @@ def valider_scores(journee):
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT COUNT(*) FROM resultats 
-                WHERE journee = ? 
+                WHERE league_id = ? AND session_id = ? AND journee = ? 
                 AND (score_dom < 0 OR score_ext < 0)
-            """, (journee,))
+            """, get_partition(conn) + (journee,))
             nb_invalides = cursor.fetchone()[0]
             
             if nb_invalides > 0:
@@ -79,11 +84,11 @@ def valider_cotes(journee):
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT COUNT(*) FROM cotes 
-                WHERE journee = ? 
+                WHERE league_id = ? AND session_id = ? AND journee = ? 
                 AND (cote_1 < 1.01 OR cote_1 > 100 
                      OR cote_x < 1.01 OR cote_x > 100 
                      OR cote_2 < 1.01 OR cote_2 > 100)
-            """, (journee,))
+            """, get_partition(conn) + (journee,))
             nb_invalides = cursor.fetchone()[0]
             
             if nb_invalides > 0:
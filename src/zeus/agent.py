@@ -1,50 +1,62 @@
 import logging
 import os
-from stable_baselines3 import PPO, DQN
-from stable_baselines3.common.callbacks import CheckpointCallback
-from src.zeus.env import ZeusEnv
+
+# stable_baselines3 / torch / gymnasium importés à la première utilisation (entraînement,
+# chargement d'un modèle) : importer ce module (registre, moniteur) reste instantané.
 
 logger = logging.getLogger(__name__)
 
 MODELS_DIR = "models/zeus"
 LOGS_DIR = "logs/zeus"
 
-os.makedirs(MODELS_DIR, exist_ok=True)
-os.makedirs(LOGS_DIR, exist_ok=True)
+
+def _algorithme(algo):
+    """Classe SB3 de l'algorithme (import différé)."""
+    from stable_baselines3 import PPO, DQN
+    return DQN if algo == "DQN" else PPO
 
 class ZeusAgent:
     """
     Wrapper autour du modèle RL (PPO par défaut).
     Gère l'entraînement, la sauvegarde et l'inférence.
     """
-    def __init__(self, model_name="zeus_v2", algo="PPO"):
+    def __init__(self, model_name="zeus_v2", algo="PPO", db_path=None):
         self.model_name = model_name
         self.algo = algo
         self.model = None
-        self.env = ZeusEnv()
+        from src.zeus.env import ZeusEnv
+        self.env = ZeusEnv(db_path=db_path)
 
-    def train(self, total_timesteps=100000):
-        """Lance l'entraînement offline."""
+    def train(self, total_timesteps=100000, callback=None):
+        """
+        Lance l'entraînement offline.
+        
+        Args:
+            total_timesteps: Nombre de steps d'entraînement
+            callback: Callback SB3 additionnel (ex: suivi de progression)
+        """
         logger.info(f"Démarrage de l'entraînement {self.algo} pour {total_timesteps} steps.")
         
-        if self.algo == "PPO":
-            self.model = PPO("MlpPolicy", self.env, verbose=1, tensorboard_log=None)
-        elif self.algo == "DQN":
-            self.model = DQN("MlpPolicy", self.env, verbose=1, tensorboard_log=None)
+        from stable_baselines3.common.callbacks import CheckpointCallback
+        if self.algo in ("PPO", "DQN"):
+            self.model = _algorithme(self.algo)("MlpPolicy", self.env, verbose=1, tensorboard_log=None)
         
+        os.makedirs(MODELS_DIR, exist_ok=True)
         checkpoint_callback = CheckpointCallback(
             save_freq=10000, 
             save_path=MODELS_DIR,
             name_prefix=f"{self.model_name}"
         )
         
-        self.model.learn(total_timesteps=total_timesteps, callback=checkpoint_callback)
+        callbacks = [checkpoint_callback] + ([callback] if callback else [])
+        self.model.learn(total_timesteps=total_timesteps, callback=callbacks)
         self.save()
         logger.info("Entraînement terminé.")
 
     def save(self):
         path = os.path.join(MODELS_DIR, f"{self.model_name}.zip")
         if self.model:
+            os.makedirs(MODELS_DIR, exist_ok=True)
             self.model.save(path)
             logger.info(f"Modèle sauvegardé sous {path}")
 
@@ -53,10 +65,8 @@ class ZeusAgent:
             path = os.path.join(MODELS_DIR, f"{self.model_name}.zip")
         
         if os.path.exists(path):
-            if self.algo == "PPO":
-                self.model = PPO.load(path, env=self.env)
-            elif self.algo == "DQN":
-                self.model = DQN.load(path, env=self.env)
+            if self.algo in ("PPO", "DQN"):
+                self.model = _algorithme(self.algo).load(path, env=self.env)
             logger.info(f"Modèle chargé depuis {path}")
             return True
         else:
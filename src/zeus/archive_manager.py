@@ -1,11 +1,16 @@
 """
 Gestionnaire d'archive pour ZEUS - Mémoire Photographique
 Permet de conserver l'historique du classement pour analyses précises
+(une mémoire par ligue : toutes les requêtes sont limitées à la ligue active)
 """
 
 import logging
 from datetime import datetime
+
+import numpy as np
+
 from src.core import database
+from src.zeus.etat_ligue import ClassementLigue
 
 logger = logging.getLogger(__name__)
 
@@ -24,11 +29,12 @@ def prendre_snapshot_classement(journee):
             cursor = conn.cursor()
             
             # Récupérer le classement actuel (avant mise à jour)
+            partition = database.get_partition(conn)
             cursor.execute("""
                 SELECT equipe_id, position, points, forme, buts_pour, buts_contre
                 FROM classement
-                WHERE journee = ?
-            """, (journee,))
+                WHERE league_id = ? AND session_id = ? AND journee = ?
+            """, partition + (journee,))
             
             classement_actuel = cursor.fetchall()
             
@@ -41,9 +47,9 @@ def prendre_snapshot_classement(journee):
             for equipe_id, position, points, forme, bp, bc in classement_actuel:
                 cursor.execute("""
                     INSERT OR REPLACE INTO zeus_classement_archive 
-                    (journee, equipe_id, position, points, forme, buts_pour, buts_contre, timestamp)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (journee, equipe_id, position, points, forme, bp, bc, datetime.now().isoformat()))
+                    (journee, equipe_id, position, points, forme, buts_pour, buts_contre, timestamp, league_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (journee, equipe_id, position, points, forme, bp, bc, datetime.now().isoformat(), partition[0]))
                 archived_count += 1
             
             logger.info(f"📸 Snapshot J{journee}: {archived_count} équipes archivées")
@@ -68,20 +74,21 @@ def get_classement_archive(journee, equipe_id=None):
         with database.get_db_connection() as conn:
             cursor = conn.cursor()
             
+            ligue = database.get_ligue_active()
             if equipe_id:
                 cursor.execute("""
                     SELECT equipe_id, position, points, forme, buts_pour, buts_contre
                     FROM zeus_classement_archive
-                    WHERE journee = ? AND equipe_id = ?
-                """, (journee, equipe_id))
+                    WHERE league_id = ? AND journee = ? AND equipe_id = ?
+                """, (ligue, journee, equipe_id))
                 return cursor.fetchone()
             else:
                 cursor.execute("""
                     SELECT equipe_id, position, points, forme, buts_pour, buts_contre
                     FROM zeus_classement_archive
-                    WHERE journee = ?
+                    WHERE league_id = ? AND journee = ?
                     ORDER BY position ASC
-                """, (journee,))
+                """, (ligue, journee))
                 return cursor.fetchall()
                 
     except Exception as e:
@@ -99,8 +106,8 @@ def get_derniere_journee_archivee():
         with database.get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT MAX(journee) FROM zeus_classement_archive
-            """)
+                SELECT MAX(journee) FROM zeus_classement_archive WHERE league_id = ?
+            """, (database.get_ligue_active(),))
             result = cursor.fetchone()
             return result[0] if result and result[0] else 0
             
@@ -121,8 +128,9 @@ def lister_journees_archivees():
             cursor.execute("""
                 SELECT DISTINCT journee 
                 FROM zeus_classement_archive 
+                WHERE league_id = ?
                 ORDER BY journee DESC
-            """)
+            """, (database.get_ligue_active(),))
             return [row[0] for row in cursor.fetchall()]
             
     except Exception as e:
@@ -134,66 +142,64 @@ def calculate_points(score_dom, score_ext):
     if score_dom < score_ext: return 0, 3
     return 1, 1
 
-def rebuild_history_from_db():
+def rebuild_history_from_db(source_db=None):
     """
-    Reconstruit tout l'historique Zeus à partir de la table resultats.
+    Reconstruit tout l'historique Zeus de la ligue active à partir de la table resultats.
     Utilisé en fin de saison pour consolider la mémoire avant le reset.
+    
+    Args:
+        source_db (str, optional): Base SQLite d'où lire les résultats (ex: snapshot
+            de la session terminée). Les snapshots sont toujours écrits dans la base principale.
     """
     logger.info("Starting Zeus History Reconstruction...")
     print("[ZEUS] Reconstruction de la mémoire (Histoire)...")
     
     try:
-        with database.get_db_connection() as conn:
+        # 1. Récupérer TOUS les résultats ordonnés
+        ligue = database.get_ligue_active()
+        with database.get_db_connection(source_db) as conn:
             cursor = conn.cursor()
-            
-            # 1. Récupérer TOUS les résultats ordonnés
-            cursor.execute("SELECT journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext FROM resultats WHERE score_dom IS NOT NULL ORDER BY journee ASC")
+            # Session lue dans la source (un snapshot garde la session terminée)
+            cursor.execute("""
+                SELECT journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext FROM resultats
+                WHERE league_id = ? AND session_id = ? AND score_dom IS NOT NULL
+                ORDER BY journee ASC
+            """, (ligue, database.lire_session(cursor, ligue)))
             matchs = cursor.fetchall()
             
-            if not matchs:
-                logger.warning("Aucun match trouvé pour reconstruction.")
-                return 0
+        if not matchs:
+            logger.warning("Aucun match trouvé pour reconstruction.")
+            return 0
 
-            # 2. Rejouer la saison match par match
-            teams = {}
-            from collections import defaultdict
-            matchs_par_journee = defaultdict(list)
-            for m in matchs:
-                matchs_par_journee[m[0]].append(m)
-                
-            sorted_journees = sorted(matchs_par_journee.keys())
-            count_total = 0
+        # 2. Rejouer la saison journée par journée, en colonnes (une case par équipe, cf etat_ligue)
+        journees, dom_ids, ext_ids, scores_dom, scores_ext = (np.array(c) for c in zip(*matchs))
+        classement = ClassementLigue.depuis_matchs(dom_ids, ext_ids)
+        dom, ext = classement.indices(dom_ids), classement.indices(ext_ids)
+        debuts = np.flatnonzero(np.r_[True, journees[1:] != journees[:-1]])
+        fins = np.r_[debuts[1:], len(journees)]
+        
+        snapshots = []
+        horodatage = datetime.now().isoformat()
+        for debut, fin in zip(debuts, fins):
+            classement.jouer(dom[debut:fin], ext[debut:fin], scores_dom[debut:fin], scores_ext[debut:fin])
             
-            for journee in sorted_journees:
-                for _, d_id, e_id, s_d, s_e in matchs_par_journee[journee]:
-                    if d_id not in teams: teams[d_id] = {'pts': 0, 'bp': 0, 'bc': 0, 'forme': []}
-                    if e_id not in teams: teams[e_id] = {'pts': 0, 'bp': 0, 'bc': 0, 'forme': []}
-                    
-                    teams[d_id]['bp'] += s_d
-                    teams[d_id]['bc'] += s_e
-                    teams[e_id]['bp'] += s_e
-                    teams[e_id]['bc'] += s_d
-                    
-                    p_d, p_e = calculate_points(s_d, s_e)
-                    teams[d_id]['pts'] += p_d
-                    teams[e_id]['pts'] += p_e
-                    
-                    res_d = 'V' if s_d > s_e else ('N' if s_d == s_e else 'D')
-                    res_e = 'V' if s_e > s_d else ('N' if s_e == s_d else 'D')
-                    teams[d_id]['forme'].append(res_d)
-                    teams[e_id]['forme'].append(res_e)
-                
-                # Snapshot
-                sorted_teams = sorted(teams.items(), key=lambda x: (x[1]['pts'], x[1]['bp'] - x[1]['bc'], x[1]['bp']), reverse=True)
-                
-                for position, (tid, stats) in enumerate(sorted_teams, 1):
-                    forme_str = "".join(stats['forme'][-5:])
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO zeus_classement_archive 
-                        (journee, equipe_id, position, points, forme, buts_pour, buts_contre, timestamp)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (journee, tid, position, stats['pts'], forme_str, stats['bp'], stats['bc'], datetime.now().isoformat()))
-                    count_total += 1
+            # Snapshot
+            ordre = classement.ordre()
+            snapshots.extend(zip(
+                [int(journees[debut])] * len(ordre), classement.equipe_ids[ordre].tolist(),
+                range(1, len(ordre) + 1), classement.points[ordre].tolist(), classement.formes(ordre),
+                classement.buts_pour[ordre].tolist(), classement.buts_contre[ordre].tolist(),
+                [horodatage] * len(ordre), [ligue] * len(ordre),
+            ))
+        
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO zeus_classement_archive 
+                (journee, equipe_id, position, points, forme, buts_pour, buts_contre, timestamp, league_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, snapshots)
+            count_total = len(snapshots)
             
             conn.commit()
             logger.info(f"Reconstruction terminée ({count_total} entrées).")
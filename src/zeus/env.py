@@ -4,8 +4,9 @@ import sqlite3
 import logging
 from gymnasium import spaces
 from src.core import database
+from src.core.forme import CODES, cle_zeus
 from src.zeus import feature_engineering
-from src.zeus.archive_manager import get_classement_archive
+from src.zeus.etat_ligue import ArchiveClassement, MatchsSaison
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,7 @@ class ZeusEnv(gym.Env):
     """
     metadata = {'render.modes': ['human']}
 
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, matchs_joues=False):
         super(ZeusEnv, self).__init__()
         
         # Define Action Space: 4 actions
@@ -27,7 +28,10 @@ class ZeusEnv(gym.Env):
         # Valeurs continues entre -1 et 1 (environ)
         self.observation_space = spaces.Box(low=-5.0, high=5.0, shape=(10,), dtype=np.float32)
         
-        self.matches = []
+        self.db_path = db_path  # Base explicite (ex: snapshot de fin de session), sinon base principale
+        self.matchs_joues = matchs_joues  # Ne garder que les matchs avec résultat (validation)
+        self.matches = MatchsSaison.depuis_lignes([])
+        self.observations = np.zeros((0, 10), dtype=np.float32)
         self.current_step = 0
         self.total_reward = 0
         
@@ -44,20 +48,78 @@ class ZeusEnv(gym.Env):
                 c.cote_1, c.cote_x, c.cote_2,
                 r.score_dom, r.score_ext  -- NULL si match non joué
             FROM cotes c
-            LEFT JOIN resultats r ON c.journee = r.journee AND c.equipe_dom_id = r.equipe_dom_id AND c.equipe_ext_id = r.equipe_ext_id
-            WHERE c.journee >= 1  -- Toutes les journées disponibles
+            LEFT JOIN resultats r ON r.league_id = c.league_id AND r.session_id = c.session_id
+                AND c.journee = r.journee AND c.equipe_dom_id = r.equipe_dom_id AND c.equipe_ext_id = r.equipe_ext_id
+            WHERE c.league_id = ? AND c.session_id = ?
+            AND c.journee >= 1  -- Toutes les journées disponibles
             ORDER BY c.journee DESC, c.equipe_dom_id ASC
         """
         try:
-            with database.get_db_connection() as conn:
+            with database.get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                rows = cursor.execute(query).fetchall()
-                # Conversion sécurisée en dict via le helper
-                self.matches = [database.row_to_dict(row, cursor) for row in rows]
+                # Ligue active, session courante de la base lue (un snapshot garde la session terminée)
+                ligue = database.get_ligue_active()
+                rows = cursor.execute(query, (ligue, database.lire_session(cursor, ligue))).fetchall()
+                # Matchs en colonnes (cf etat_ligue), un `Match` par indexation
+                self.matches = MatchsSaison.depuis_lignes(tuple(row) for row in rows)
+                if self.matchs_joues:
+                    self.matches = self.matches.filtrer(self.matches.joues)
                 logger.info(f"ZeusEnv chargé avec {len(self.matches)} matchs historiques.")
         except Exception as e:
             logger.error(f"Erreur chargement données ZeusEnv: {e}")
-            self.matches = []
+            self.matches = MatchsSaison.depuis_lignes([])
+        
+        self._preparer_observations()
+
+    def _preparer_observations(self):
+        """
+        Précalcule la matrice (N, 10) des observations de tous les matchs en une passe :
+        classement archivé lu en une seule requête, recherché et complété en colonnes.
+        """
+        archive = ArchiveClassement([])
+        try:
+            with database.get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT journee, equipe_id, position, points, forme, buts_pour, buts_contre
+                    FROM zeus_classement_archive
+                    WHERE league_id = ?
+                """, (database.get_ligue_active(),))
+                archive = ArchiveClassement(cursor.fetchall())
+        except Exception as e:
+            logger.error(f"Erreur chargement archive classement ZeusEnv: {e}")
+        
+        m = self.matches
+        colonnes = {'journee': m.journee.astype(np.float64)}
+        for cote in ('cote_1', 'cote_x', 'cote_2'):
+            colonnes[cote] = np.nan_to_num(getattr(m, cote), nan=0.0)
+        for camp, equipes, (bp_defaut, bc_defaut) in (('dom', m.equipe_dom_id, (1.4, 1.1)),
+                                                      ('ext', m.equipe_ext_id, (1.1, 1.4))):
+            colonnes.update(self._classement_archive(archive, archive.rechercher(m.journee, equipes),
+                                                     camp, bp_defaut, bc_defaut))
+        self.observations = feature_engineering.construire_matrice_etats(**colonnes)
+
+    @staticmethod
+    def _classement_archive(archive, idx, camp, bp_defaut, bc_defaut):
+        """
+        Colonnes de classement d'un camp (dom/ext) pour construire_matrice_etats, à partir
+        des lignes d'archive trouvées (idx >= 0). Sans archive : 10e, forme VVNDD, buts par défaut ;
+        buts nuls ou absents remplacés par les valeurs par défaut.
+        """
+        n = len(idx)
+        trouve = idx >= 0
+        lignes = idx[trouve]
+        position = np.full(n, 10.0)
+        forme = np.full(n, CODES[cle_zeus('VVNDD')], dtype=np.int16)
+        bp = np.full(n, bp_defaut)
+        bc = np.full(n, bc_defaut)
+        
+        position[trouve] = np.nan_to_num(archive.position[lignes])
+        forme[trouve] = archive.forme[lignes]
+        for sortie, colonne in ((bp, archive.buts_pour), (bc, archive.buts_contre)):
+            v = colonne[lignes]
+            sortie[trouve] = np.where(np.isnan(v) | (v == 0), sortie[trouve], v)
+        return {f'pos_{camp}': position, f'forme_{camp}': forme, f'bp_{camp}': bp, f'bc_{camp}': bc}
 
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
@@ -89,50 +151,7 @@ class ZeusEnv(gym.Env):
     def _get_observation(self):
         if self.current_step >= len(self.matches):
             return np.zeros(10, dtype=np.float32)
-            
-        match = self.matches[self.current_step]
-        
-        # Récupérer le classement archivé pour cette journée
-        journee = match.get('journee')
-        dom_id = match.get('equipe_dom_id')
-        ext_id = match.get('equipe_ext_id')
-        
-        # Cloner les données du match et ajouter le classement archivé
-        match_data = dict(match)
-        
-        # Ajouter les données du classement depuis l'archive
-        classement_dom = get_classement_archive(journee, dom_id)
-        classement_ext = get_classement_archive(journee, ext_id)
-        
-        if classement_dom:
-            match_data['pos_dom'] = classement_dom[1]  # position
-            match_data['forme_dom'] = classement_dom[3]  # forme
-            match_data['pts_dom'] = classement_dom[2]  # points
-            match_data['bp_dom'] = classement_dom[4] or 1.4  # buts_pour
-            match_data['bc_dom'] = classement_dom[5] or 1.1  # buts_contre
-        else:
-            # Valeurs par défaut si pas d'archive
-            match_data['pos_dom'] = 10
-            match_data['forme_dom'] = 'VVNDD'
-            match_data['pts_dom'] = 30
-            match_data['bp_dom'] = 1.4
-            match_data['bc_dom'] = 1.1
-            
-        if classement_ext:
-            match_data['pos_ext'] = classement_ext[1]  # position
-            match_data['forme_ext'] = classement_ext[3]  # forme
-            match_data['pts_ext'] = classement_ext[2]  # points
-            match_data['bp_ext'] = classement_ext[4] or 1.1  # buts_pour
-            match_data['bc_ext'] = classement_ext[5] or 1.4  # buts_contre
-        else:
-            # Valeurs par défaut si pas d'archive
-            match_data['pos_ext'] = 10
-            match_data['forme_ext'] = 'VVNDD'
-            match_data['pts_ext'] = 30
-            match_data['bp_ext'] = 1.1
-            match_data['bc_ext'] = 1.4
-        
-        return feature_engineering.construire_vecteur_etat(match_data)
+        return self.observations[self.current_step].copy()
 
     def is_risky_match(self, match):
         """
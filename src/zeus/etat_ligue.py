@@ -0,0 +1,268 @@
+"""
+État de ligue compact pour ZEUS (entraînement, inférence, rejeu du classement).
+
+- Objets isolés (un match à prédire, un match de l'environnement) : dataclasses à
+  __slots__, sans dictionnaire par instance. Elles gardent l'accès `.get(clé)` des
+  anciens dicts (feature_engineering, démos).
+- Traitements de masse (matchs d'une saison, archive du classement, classement rejoué
+  journée par journée) : colonnes NumPy (struct-of-arrays) indexées par numéro de
+  match ou par équipe, au lieu d'une liste de dicts / lignes sqlite.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.core.forme import CODES, FORMES_CANONIQUES, LONGUEUR_FORME, encoder_formes_zeus
+
+SCORE_ABSENT = -1  # Score d'un match non joué dans les colonnes entières
+
+
+class _AccesCles:
+    """Accès par clé (compatibilité avec le code écrit pour des dicts)."""
+    __slots__ = ()
+
+    def get(self, cle, defaut=None):
+        return getattr(self, cle, defaut)
+
+    def __getitem__(self, cle):
+        try:
+            return getattr(self, cle)
+        except AttributeError:
+            raise KeyError(cle) from None
+
+# ==================== OBJETS ISOLÉS ====================
+
+@dataclass(slots=True)
+class Match(_AccesCles):
+    """Un match de l'environnement ZEUS (cotes et score None si absents)."""
+    journee: int
+    equipe_dom_id: int
+    equipe_ext_id: int
+    cote_1: Optional[float] = None
+    cote_x: Optional[float] = None
+    cote_2: Optional[float] = None
+    score_dom: Optional[int] = None
+    score_ext: Optional[int] = None
+
+
+@dataclass(slots=True)
+class EtatMatch(_AccesCles):
+    """
+    Données d'un match à prédire (entrée de construire_vecteur_etat).
+    Les valeurs par défaut sont celles de feature_engineering pour une clé absente.
+    """
+    journee: int = 1
+    pos_dom: Optional[int] = None
+    pos_ext: Optional[int] = None
+    forme_dom: str = ''
+    forme_ext: str = ''
+    pts_dom: Optional[int] = None
+    pts_ext: Optional[int] = None
+    bp_dom: float = 1.4
+    bc_dom: float = 1.1
+    bp_ext: float = 1.1
+    bc_ext: float = 1.4
+    cote_1: Optional[float] = None
+    cote_x: Optional[float] = None
+    cote_2: Optional[float] = None
+
+# ==================== MATCHS D'UNE SAISON ====================
+
+def _flottants(valeurs) -> np.ndarray:
+    """Colonne float64, None -> NaN."""
+    return np.array([np.nan if v is None else v for v in valeurs], dtype=np.float64)
+
+
+def _entiers(valeurs, dtype, absent=SCORE_ABSENT) -> np.ndarray:
+    """Colonne entière, None -> `absent`."""
+    return np.fromiter((absent if v is None else v for v in valeurs), dtype=dtype)
+
+
+class MatchsSaison:
+    """
+    Matchs en colonnes (une entrée par match, dans l'ordre de chargement).
+    Cotes absentes en NaN, scores absents en SCORE_ABSENT ; l'indexation rend un `Match`.
+    """
+    __slots__ = ("journee", "equipe_dom_id", "equipe_ext_id", "cote_1", "cote_x", "cote_2",
+                 "score_dom", "score_ext")
+    COLONNES = __slots__
+
+    def __init__(self, journee, equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2, score_dom, score_ext):
+        self.journee = journee
+        self.equipe_dom_id = equipe_dom_id
+        self.equipe_ext_id = equipe_ext_id
+        self.cote_1 = cote_1
+        self.cote_x = cote_x
+        self.cote_2 = cote_2
+        self.score_dom = score_dom
+        self.score_ext = score_ext
+
+    @classmethod
+    def depuis_lignes(cls, lignes: Iterable) -> "MatchsSaison":
+        """
+        Args:
+            lignes: Tuples (journee, equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2, score_dom, score_ext)
+        """
+        lignes = list(lignes)
+        colonnes = list(zip(*lignes)) if lignes else [()] * len(cls.COLONNES)
+        journee, dom, ext, c1, cx, c2, s_dom, s_ext = colonnes
+        return cls(
+            _entiers(journee, np.int16, 0), _entiers(dom, np.int32, 0), _entiers(ext, np.int32, 0),
+            _flottants(c1), _flottants(cx), _flottants(c2),
+            _entiers(s_dom, np.int16), _entiers(s_ext, np.int16),
+        )
+
+    def __len__(self):
+        return len(self.journee)
+
+    def __getitem__(self, i) -> Match:
+        def cote(c):
+            return None if np.isnan(c) else float(c)
+
+        def score(s):
+            return None if s == SCORE_ABSENT else int(s)
+
+        return Match(int(self.journee[i]), int(self.equipe_dom_id[i]), int(self.equipe_ext_id[i]),
+                     cote(self.cote_1[i]), cote(self.cote_x[i]), cote(self.cote_2[i]),
+                     score(self.score_dom[i]), score(self.score_ext[i]))
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def joues(self) -> np.ndarray:
+        """Masque des matchs avec résultat."""
+        return (self.score_dom != SCORE_ABSENT) & (self.score_ext != SCORE_ABSENT)
+
+    def filtrer(self, masque) -> "MatchsSaison":
+        return MatchsSaison(*(getattr(self, c)[masque] for c in self.COLONNES))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, c).nbytes for c in self.COLONNES)
+
+# ==================== ARCHIVE DU CLASSEMENT ====================
+
+def _cles(journees, equipe_ids) -> np.ndarray:
+    return (np.asarray(journees, dtype=np.int64) << 32) | np.asarray(equipe_ids, dtype=np.int64)
+
+
+class ArchiveClassement:
+    """
+    Lignes de zeus_classement_archive en colonnes, triées par (journee, equipe_id)
+    pour une recherche vectorisée. Valeurs absentes en NaN, formes en codes ZEUS.
+    """
+    __slots__ = ("cles", "position", "points", "forme", "buts_pour", "buts_contre")
+
+    def __init__(self, lignes: Iterable):
+        """
+        Args:
+            lignes: Tuples (journee, equipe_id, position, points, forme, buts_pour, buts_contre)
+        """
+        lignes = list(lignes)
+        journee, equipe, position, points, forme, bp, bc = list(zip(*lignes)) if lignes else [()] * 7
+        cles = _cles(journee, equipe)
+        ordre = np.argsort(cles, kind="stable")
+        self.cles = cles[ordre]
+        self.position = _flottants(position)[ordre]
+        self.points = _flottants(points)[ordre]
+        self.forme = encoder_formes_zeus(forme)[ordre]
+        self.buts_pour = _flottants(bp)[ordre]
+        self.buts_contre = _flottants(bc)[ordre]
+
+    def __len__(self):
+        return len(self.cles)
+
+    def rechercher(self, journees, equipe_ids) -> np.ndarray:
+        """Indice de la ligne de chaque (journee, equipe_id), -1 si non archivée."""
+        cles = _cles(journees, equipe_ids)
+        if not len(self.cles):
+            return np.full(len(cles), -1, dtype=np.intp)
+        idx = np.minimum(np.searchsorted(self.cles, cles), len(self.cles) - 1)
+        return np.where(self.cles[idx] == cles, idx, -1)
+
+# ==================== CLASSEMENT REJOUÉ ====================
+
+_RESULTATS = "VND"
+
+# Forme suivante (5 derniers résultats) pour chaque (code de forme, résultat V/N/D)
+FORME_SUIVANTE = np.array(
+    [[CODES[(forme + r)[-LONGUEUR_FORME:]] for r in _RESULTATS] for forme in FORMES_CANONIQUES],
+    dtype=np.int16,
+)
+FORME_SUIVANTE.setflags(write=False)
+
+
+class ClassementLigue:
+    """
+    Classement rejoué journée par journée, une case par équipe (ordre de première
+    apparition) : points, buts pour/contre et forme (code des 5 derniers résultats).
+    """
+    __slots__ = ("equipe_ids", "index", "vue", "points", "buts_pour", "buts_contre", "forme")
+
+    def __init__(self, equipe_ids):
+        """
+        Args:
+            equipe_ids: Équipes dans l'ordre de première apparition (départage des égalités)
+        """
+        self.equipe_ids = np.asarray(equipe_ids, dtype=np.int64)
+        self.index = {int(e): i for i, e in enumerate(self.equipe_ids)}
+        n = len(self.equipe_ids)
+        self.vue = np.zeros(n, dtype=bool)
+        self.points = np.zeros(n, dtype=np.int32)
+        self.buts_pour = np.zeros(n, dtype=np.int32)
+        self.buts_contre = np.zeros(n, dtype=np.int32)
+        self.forme = np.full(n, CODES[""], dtype=np.int16)
+
+    @classmethod
+    def depuis_matchs(cls, dom_ids, ext_ids) -> "ClassementLigue":
+        """Équipes d'une liste de matchs ordonnée, dans l'ordre de première apparition."""
+        alternees = np.column_stack((np.asarray(dom_ids), np.asarray(ext_ids))).ravel()
+        ids, premieres = np.unique(alternees, return_index=True)
+        return cls(ids[np.argsort(premieres)])
+
+    def indices(self, equipe_ids) -> np.ndarray:
+        return np.fromiter((self.index[int(e)] for e in equipe_ids), dtype=np.intp)
+
+    def jouer(self, dom, ext, score_dom, score_ext):
+        """
+        Applique les résultats d'une journée.
+
+        Args:
+            dom, ext: Cases des équipes (cf indices)
+            score_dom, score_ext: Scores
+        """
+        score_dom = np.asarray(score_dom, dtype=np.int32)
+        score_ext = np.asarray(score_ext, dtype=np.int32)
+        self.vue[dom] = True
+        self.vue[ext] = True
+        np.add.at(self.buts_pour, dom, score_dom)
+        np.add.at(self.buts_contre, dom, score_ext)
+        np.add.at(self.buts_pour, ext, score_ext)
+        np.add.at(self.buts_contre, ext, score_dom)
+        # Résultat : 0 = V, 1 = N, 2 = D (du point de vue de chaque équipe)
+        res_dom = np.sign(score_ext - score_dom) + 1
+        res_ext = 2 - res_dom
+        np.add.at(self.points, dom, np.array((3, 1, 0))[res_dom])
+        np.add.at(self.points, ext, np.array((3, 1, 0))[res_ext])
+
+        equipes = np.concatenate((dom, ext))
+        if len(np.unique(equipes)) == len(equipes):
+            self.forme[dom] = FORME_SUIVANTE[self.forme[dom], res_dom]
+            self.forme[ext] = FORME_SUIVANTE[self.forme[ext], res_ext]
+        else:
+            # Équipe présente deux fois dans la journée : ordre des matchs respecté
+            for d, e, rd, re in zip(dom, ext, res_dom, res_ext):
+                self.forme[d] = FORME_SUIVANTE[self.forme[d], rd]
+                self.forme[e] = FORME_SUIVANTE[self.forme[e], re]
+
+    def ordre(self) -> np.ndarray:
+        """Cases des équipes déjà vues, de la 1re à la dernière place (points, différence, buts pour)."""
+        vues = np.flatnonzero(self.vue)
+        bp = self.buts_pour[vues]
+        tri = np.lexsort((-bp, -(bp - self.buts_contre[vues]), -self.points[vues]))
+        return vues[tri]
+
+    def formes(self, cases) -> list:
+        return [FORMES_CANONIQUES[c] for c in self.forme[cases]]
@@ -1,4 +1,5 @@
 import numpy as np
+from src.core.forme import score_forme_zeus, encoder_formes_zeus, SCORES_ZEUS
 
 def get_stats_manquantes(match_data):
     """
@@ -37,33 +38,10 @@ def calculer_score_forme(forme_str):
     V=3, N=1, D=0.
     Retourne la somme normalisée sur 9 pts max (donc 0 à 1).
     """
-    if not forme_str or not isinstance(forme_str, str):
-        return 0.5 # Valeur neutre par défaut
-
     # Le projet stocke généralement la forme sous forme compacte "VVNDV" (sans séparateurs).
-    # Mais on accepte aussi "V-N-D" / "V N D" etc.
-    s = forme_str.upper().strip()
-    s = s.replace("-", "").replace(" ", "")
-
-    # On conserve uniquement les tokens valides.
-    tokens = [c for c in s if c in ("V", "N", "D")]
-
-    if not tokens:
-        return 0.5
-
-    # Prendre jusqu'à 5 matchs (cohérent avec le reste du projet) ; si tu veux 3, change ici.
-    recent = tokens[:5]
-
-    points = 0
-    for c in recent:
-        if c == "V":
-            points += 3
-        elif c == "N":
-            points += 1
-        else:  # "D"
-            points += 0
-
-    return points / (3.0 * len(recent))
+    # Mais on accepte aussi "V-N-D" / "V N D" etc. (normalisation + table : cf core.forme)
+    # Jusqu'à 5 matchs (cohérent avec le reste du projet), 0.5 si forme absente (valeur neutre).
+    return score_forme_zeus(forme_str)
 
 def normaliser_stats_buts(buts_pour_moy, buts_contre_moy):
     """
@@ -153,3 +131,92 @@ def construire_vecteur_etat(match_data):
     f10 = progression
     
     return np.array([f1, f2, f3, f4, f5, f6, f7, f8, f9, f10], dtype=np.float32)
+
+# ==================== VERSION VECTORISÉE (BATCH) ====================
+
+NB_FEATURES = 10
+
+def extraire_colonnes(matchs):
+    """
+    Convertit une liste de match_data (dicts) en colonnes numpy pour construire_matrice_etats.
+    Applique les mêmes conventions que la version scalaire : clé absente -> valeur par défaut,
+    valeur invalide -> 0, position absente -> 0 (différentiel neutre).
+    
+    Returns:
+        dict de colonnes (float64, formes encodées en int16)
+    """
+    n = len(matchs)
+    colonnes = {nom: np.empty(n, dtype=np.float64) for nom in (
+        'pos_dom', 'pos_ext', 'bp_dom', 'bc_dom', 'bp_ext', 'bc_ext', 'cote_1', 'cote_x', 'cote_2', 'journee'
+    )}
+    for i, m in enumerate(matchs):
+        colonnes['pos_dom'][i] = m.get('pos_dom') or 0
+        colonnes['pos_ext'][i] = m.get('pos_ext') or 0
+        stats = get_stats_manquantes(m)
+        for cle in ('bp_dom', 'bc_dom', 'bp_ext', 'bc_ext'):
+            colonnes[cle][i] = safe_float(stats[cle])
+        for cle in ('cote_1', 'cote_x', 'cote_2'):
+            colonnes[cle][i] = safe_float(m.get(cle))
+        colonnes['journee'][i] = m.get('journee', 1)
+    colonnes['forme_dom'] = encoder_formes_zeus([m.get('forme_dom', '') for m in matchs])
+    colonnes['forme_ext'] = encoder_formes_zeus([m.get('forme_ext', '') for m in matchs])
+    return colonnes
+
+def construire_matrice_etats(pos_dom, pos_ext, forme_dom, forme_ext, bp_dom, bc_dom, bp_ext, bc_ext,
+                             cote_1, cote_x, cote_2, journee, out=None, tmp=None):
+    """
+    Version vectorisée de construire_vecteur_etat : une ligne (10 features) par match.
+    Les calculs sont faits en float64 puis convertis, pour des résultats identiques au scalaire.
+    
+    Args:
+        pos_dom, pos_ext: Positions (0 = inconnue)
+        forme_dom, forme_ext: Codes de forme ZEUS (cf core.forme.encoder_formes_zeus)
+        bp_dom, bc_dom, bp_ext, bc_ext: Moyennes de buts pour/contre
+        cote_1, cote_x, cote_2: Cotes (<= 1 = manquante)
+        journee: Journée de chaque match
+        out: Tampon (N, 10) float32 préalloué à remplir (alloué si None)
+        tmp: Tampon de travail (N,) float64 préalloué (alloué si None)
+        
+    Returns:
+        np.ndarray float32 (N, 10) (out s'il est fourni)
+    """
+    pos_dom, pos_ext = np.asarray(pos_dom, dtype=np.float64), np.asarray(pos_ext, dtype=np.float64)
+    n = len(pos_dom)
+    if out is None:
+        out = np.empty((n, NB_FEATURES), dtype=np.float32)
+    if tmp is None:
+        tmp = np.empty(n, dtype=np.float64)
+    
+    # 1. Diff Classement (neutre si une position est inconnue)
+    np.subtract(pos_dom, pos_ext, out=tmp)
+    tmp /= 20.0
+    tmp[(pos_dom == 0) | (pos_ext == 0)] = 0.0
+    out[:, 0] = tmp
+    
+    # 2. Diff Forme (table des formes)
+    np.subtract(SCORES_ZEUS[forme_dom], SCORES_ZEUS[forme_ext], out=tmp)
+    out[:, 1] = tmp
+    
+    # 3-6. Attaque / Défense (clip à 4 buts)
+    for col, buts in enumerate((bp_dom, bc_dom, bp_ext, bc_ext), start=2):
+        np.minimum(buts, 4.0, out=tmp)
+        tmp /= 4.0
+        out[:, col] = tmp
+    
+    # 7-9. Probas implicites (0 si cote invalide/manquante)
+    for col, cote in enumerate((cote_1, cote_x, cote_2), start=6):
+        cote = np.asarray(cote, dtype=np.float64)
+        invalide = cote <= 1.0
+        np.divide(1.0, cote, out=tmp, where=~invalide)
+        tmp[invalide] = 0.0
+        out[:, col] = tmp
+    
+    # 10. Progression Session
+    np.divide(journee, 38.0, out=tmp)
+    out[:, 9] = tmp
+    
+    return out
+
+def construire_matrice_depuis_matchs(matchs, out=None, tmp=None):
+    """Raccourci : extraire_colonnes + construire_matrice_etats sur une liste de match_data."""
+    return construire_matrice_etats(**extraire_colonnes(matchs), out=out, tmp=tmp)
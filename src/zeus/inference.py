@@ -1,46 +1,108 @@
-from src.zeus.agent import ZeusAgent
-from src.zeus import feature_engineering, env
+from src.zeus import feature_engineering, registry
 import logging
+import threading
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
-# Singleton pour l'agent (éviter de recharger à chaque requête)
+# Singleton pour l'agent (éviter de recharger à chaque requête).
+# Remplacé d'un bloc par reload_model() : jamais remis à None pendant un rechargement.
 _zeus_agent = None
+_version_chargee = None
+_chargement_lock = threading.Lock()  # Sérialise les chargements, pas les prédictions
+_generation = 0  # Incrémenté à chaque agent mis en service (empreinte des caches de prédictions)
+
+def _preparer_agent(version=None):
+    """
+    Charge et préchauffe un agent hors ligne (sans toucher au singleton).
+    
+    Args:
+        version: Version du registre, ou None pour le modèle historique (zeus_v3)
+        
+    Returns:
+        ZeusAgent prêt à prédire, ou None si le chargement échoue
+    """
+    # Import différé : la pile ML (torch, stable_baselines3) n'est chargée qu'à la première prédiction
+    from src.zeus.agent import ZeusAgent
+    if version:
+        meta = registry.lire_meta(version) or {}
+        path = registry.chemin_modele(version)
+        agent = ZeusAgent(model_name=meta.get("nom", version), algo=meta.get("algo", "PPO"))
+    else:
+        path = registry.chemin_legacy()
+        agent = ZeusAgent(model_name=registry.REGISTRY_CONFIG["LEGACY_MODEL"])
+    
+    if not agent.load(path):
+        return None
+    
+    # Warm-up : première inférence (init torch, graphes) avant d'exposer l'agent
+    agent.predict_with_confidence(np.zeros(10, dtype=np.float32), deterministic=True)
+    return agent
 
 def get_agent():
-    global _zeus_agent
-    if _zeus_agent is None:
-        try:
-            # On instancie l'agent sans entraînement
-            # MODÈLE ACTIF : zeus_v3 (Profit-Driven)
-            _zeus_agent = ZeusAgent(model_name="zeus_v3")
-            success = _zeus_agent.load()
-            if not success:
-                logger.warning("Zeus: Impossible de charger le modèle zeus_v3.")
-                _zeus_agent = None
-        except Exception as e:
-            logger.error(f"Zeus: Erreur init agent: {e}")
-            return None
-    return _zeus_agent
+    global _zeus_agent, _version_chargee, _generation
+    agent = _zeus_agent
+    if agent is None:
+        with _chargement_lock:
+            if _zeus_agent is None:
+                try:
+                    # MODÈLE ACTIF : version pointée par le registre, sinon zeus_v3 (Profit-Driven)
+                    version = registry.get_version_active()
+                    nouvel_agent = _preparer_agent(version)
+                    if nouvel_agent is None:
+                        logger.warning(f"Zeus: Impossible de charger le modèle {version or registry.REGISTRY_CONFIG['LEGACY_MODEL']}.")
+                    else:
+                        _zeus_agent, _version_chargee = nouvel_agent, version
+                        _generation += 1
+                except Exception as e:
+                    logger.error(f"Zeus: Erreur init agent: {e}")
+            agent = _zeus_agent
+    return agent
+
+def get_version_chargee():
+    """Version du registre servie par l'inférence (None = modèle historique ou aucun)."""
+    return _version_chargee
 
-def reload_model():
+def get_empreinte_modele():
     """
-    Force le rechargement du modèle Zeus depuis le disque.
+    Empreinte du modèle servi, pour les caches de prédictions : change lorsque la
+    version active du registre change ou qu'un agent est (re)chargé.
     """
-    global _zeus_agent
+    return registry.get_version_active(), _generation
+
+def reload_model(version=None):
+    """
+    Recharge le modèle Zeus depuis le registre (hot-swap).
+    Le nouvel agent est chargé et préchauffé à côté de l'actuel, puis la référence
+    est remplacée d'un bloc : les prédictions en cours gardent l'ancien agent.
+    En cas d'échec, l'agent actuel reste en service.
+    
+    Args:
+        version: Version à charger (par défaut la version active du registre)
+    """
+    global _zeus_agent, _version_chargee, _generation
     logger.info("Zeus: Reloading model...")
-    _zeus_agent = None  # Force reset
-    success = get_agent() is not None
-    if success:
-         logger.info("Zeus: Model reloaded successfully.")
-    else:
-         logger.error("Zeus: Failed to reload model.")
-    return success
+    with _chargement_lock:
+        try:
+            cible = version or registry.get_version_active()
+            nouvel_agent = _preparer_agent(cible)
+        except Exception as e:
+            logger.error(f"Zeus: Erreur rechargement: {e}")
+            nouvel_agent = None
+        
+        if nouvel_agent is None:
+            logger.error("Zeus: Failed to reload model.")
+            return False
+        
+        _zeus_agent, _version_chargee = nouvel_agent, cible
+        _generation += 1
+    logger.info(f"Zeus: Model reloaded successfully ({cible or registry.REGISTRY_CONFIG['LEGACY_MODEL']}).")
+    return True
 
 def predire_match(match_data):
     """
     Effectue une prédiction pour un match donné.
-    match_data doit contenir:
+    match_data (EtatMatch ou dict) doit contenir:
      - pos_dom, pos_ext
      - forme_dom, forme_ext
      - cote_1, cote_x, cote_2
@@ -49,7 +111,7 @@ def predire_match(match_data):
     """
     agent = get_agent()
     if not agent:
-        return 3 # Skip par défaut si pas d'agent
+        return 3, 0.0 # Skip par défaut si pas d'agent
         
     try:
         # Construction du vecteur
@@ -0,0 +1,250 @@
+"""
+Registre des modeles ZEUS - Versions, pointeur actif et promotion
+Chaque version est figee dans models/zeus/versions/<version>/ (model.zip + meta.json).
+Le fichier ACTIVE designe la version servie par l'inference ; il est reecrit
+atomiquement (os.replace) et peut etre epingle pour bloquer les promotions auto.
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.zeus import agent as zeus_agent
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_CONFIG = {
+    "TOLERANCE_SCORE": 0.0,        # Promotion si score candidat >= score actif - tolerance
+    "LEGACY_MODEL": "zeus_v3",     # Modele servi tant qu'aucune version n'est active
+}
+
+FICHIER_MODELE = "model.zip"
+FICHIER_META = "meta.json"
+FICHIER_ACTIF = "ACTIVE"
+
+
+def _dossier_registre() -> str:
+    # Resolu a l'appel : MODELS_DIR peut etre redirige (simulation, tests)
+    return zeus_agent.MODELS_DIR
+
+
+def _dossier_versions() -> str:
+    return os.path.join(_dossier_registre(), "versions")
+
+
+def _ecrire_json_atomique(path: str, data: Dict):
+    """Ecrit un JSON via un fichier temporaire + os.replace (jamais de fichier partiel)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def chemin_modele(version: str) -> str:
+    """Chemin du fichier modele d'une version."""
+    return os.path.join(_dossier_versions(), version, FICHIER_MODELE)
+
+
+def chemin_legacy() -> str:
+    """Chemin du modele historique (hors registre)."""
+    return os.path.join(_dossier_registre(), f"{REGISTRY_CONFIG['LEGACY_MODEL']}.zip")
+
+
+def lire_meta(version: str) -> Optional[Dict]:
+    """
+    Lit les metadonnees d'une version.
+
+    Returns:
+        dict: Metadonnees ou None si la version n'existe pas
+    """
+    path = os.path.join(_dossier_versions(), version, FICHIER_META)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def lister_versions() -> List[Dict]:
+    """Liste les metadonnees de toutes les versions, de la plus ancienne a la plus recente."""
+    dossier = _dossier_versions()
+    if not os.path.isdir(dossier):
+        return []
+    metas = [lire_meta(v) for v in os.listdir(dossier) if not v.endswith(".tmp")]
+    return sorted((m for m in metas if m), key=lambda m: m["cree_le"])
+
+
+def lire_pointeur_actif() -> Dict:
+    """
+    Lit le pointeur ACTIVE.
+
+    Returns:
+        dict: {"version": str|None, "epingle": bool}
+    """
+    try:
+        with open(os.path.join(_dossier_registre(), FICHIER_ACTIF), encoding="utf-8") as f:
+            pointeur = json.load(f)
+        return {"version": pointeur.get("version"), "epingle": bool(pointeur.get("epingle"))}
+    except (OSError, ValueError):
+        return {"version": None, "epingle": False}
+
+
+def get_version_active() -> Optional[str]:
+    """Version actuellement designee par le pointeur ACTIVE (None si registre vide)."""
+    version = lire_pointeur_actif()["version"]
+    if version and os.path.exists(chemin_modele(version)):
+        return version
+    return None
+
+
+def enregistrer_version(chemin_source: str, nom: str, algo: str = "PPO", **meta) -> str:
+    """
+    Fige un modele entraine comme nouvelle version du registre.
+    La version est preparee dans un dossier temporaire puis renommee (apparition atomique).
+
+    Args:
+        chemin_source: Fichier .zip produit par ZeusAgent.save()
+        nom: Nom du modele (ex: zeus_v2)
+        algo: Algorithme (PPO, DQN)
+        **meta: Metadonnees additionnelles (steps, journee_fin, score_validation...)
+
+    Returns:
+        str: Identifiant de la version creee
+    """
+    maintenant = datetime.now()
+    version = f"{nom}-{maintenant.strftime('%Y%m%d%H%M%S%f')}"
+    final = os.path.join(_dossier_versions(), version)
+    tmp = f"{final}.tmp"
+    os.makedirs(tmp, exist_ok=True)
+
+    shutil.copy2(chemin_source, os.path.join(tmp, FICHIER_MODELE))
+    _ecrire_json_atomique(os.path.join(tmp, FICHIER_META), {
+        "version": version,
+        "nom": nom,
+        "algo": algo,
+        "cree_le": maintenant.isoformat(),
+        **meta,
+    })
+    os.replace(tmp, final)
+    logger.info(f"Zeus Registry: version {version} enregistrée")
+    return version
+
+
+def maj_meta(version: str, **champs):
+    """Complete les metadonnees d'une version (ex: score de validation)."""
+    meta = lire_meta(version)
+    if meta is None:
+        raise ValueError(f"Version inconnue : {version}")
+    meta.update(champs)
+    _ecrire_json_atomique(os.path.join(_dossier_versions(), version, FICHIER_META), meta)
+
+
+def activer_version(version: str, epingler: bool = False):
+    """
+    Fait pointer ACTIVE sur une version (ecriture atomique).
+    L'inference ne bascule qu'au prochain inference.reload_model().
+
+    Args:
+        version: Version a activer
+        epingler: Bloque les promotions automatiques suivantes
+    """
+    if not os.path.exists(chemin_modele(version)):
+        raise ValueError(f"Version inconnue : {version}")
+    os.makedirs(_dossier_registre(), exist_ok=True)
+    _ecrire_json_atomique(os.path.join(_dossier_registre(), FICHIER_ACTIF), {
+        "version": version,
+        "epingle": epingler,
+        "active_le": datetime.now().isoformat(),
+    })
+    logger.info(f"Zeus Registry: version active -> {version}{' (épinglée)' if epingler else ''}")
+
+
+def desepingler():
+    """Retire l'epinglage de la version active (les promotions auto reprennent)."""
+    version = get_version_active()
+    if version:
+        activer_version(version, epingler=False)
+
+
+def evaluer_modele(chemin: str, algo: str = "PPO", db_path: Optional[str] = None) -> Dict:
+    """
+    Score de validation d'un modele : recompense moyenne par match sur les matchs joues
+    (politique deterministe, recompenses de ZeusEnv).
+
+    Args:
+        chemin: Fichier .zip du modele
+        algo: Algorithme (PPO, DQN)
+        db_path: Base de validation (ex: snapshot de fin de session), base principale si None
+
+    Returns:
+        dict: {"score": float, "nb_matchs": int, "nb_paris": int}
+    """
+    from stable_baselines3 import PPO, DQN
+    from src.zeus.env import ZeusEnv
+
+    env = ZeusEnv(db_path=db_path, matchs_joues=True)
+    if not env.matches:
+        return {"score": 0.0, "nb_matchs": 0, "nb_paris": 0}
+
+    model = (DQN if algo == "DQN" else PPO).load(chemin)
+    obs, _ = env.reset()
+    total, nb_paris, termine = 0.0, 0, False
+    while not termine:
+        action, _ = model.predict(obs, deterministic=True)
+        action = int(action)
+        obs, reward, termine, _, _ = env.step(action)
+        total += reward
+        nb_paris += action != 3
+
+    nb = len(env.matches)
+    return {"score": round(total / nb, 4), "nb_matchs": nb, "nb_paris": nb_paris}
+
+
+def promouvoir_si_meilleure(version: str, db_path: Optional[str] = None) -> bool:
+    """
+    Evalue une version candidate et l'active si elle fait au moins aussi bien que
+    le modele servi sur le meme jeu de validation (tolerance REGISTRY_CONFIG) : la
+    version active, ou le modele historique tant qu'aucune version n'est active.
+    Une version active epinglee n'est jamais remplacee automatiquement.
+
+    Args:
+        version: Version candidate
+        db_path: Base de validation (snapshot de la session terminee)
+
+    Returns:
+        bool: True si la candidate est devenue active
+    """
+    meta = lire_meta(version)
+    if meta is None:
+        raise ValueError(f"Version inconnue : {version}")
+
+    validation = evaluer_modele(chemin_modele(version), meta.get("algo", "PPO"), db_path)
+    maj_meta(version, score_validation=validation["score"], validation=validation)
+
+    pointeur = lire_pointeur_actif()
+    active = get_version_active()
+    if active and pointeur["epingle"]:
+        logger.info(f"Zeus Registry: {version} non promue (version {active} épinglée)")
+        return False
+
+    # Modele servi actuellement : version active, sinon modele historique (s'il existe)
+    if active:
+        actuel, chemin_actuel, algo_actuel = active, chemin_modele(active), (lire_meta(active) or {}).get("algo", "PPO")
+    elif os.path.exists(chemin_legacy()):
+        actuel, chemin_actuel, algo_actuel = REGISTRY_CONFIG["LEGACY_MODEL"], chemin_legacy(), "PPO"
+    else:
+        actuel = None
+
+    if actuel:
+        score_actuel = evaluer_modele(chemin_actuel, algo_actuel, db_path)["score"]
+        if validation["score"] < score_actuel - REGISTRY_CONFIG["TOLERANCE_SCORE"]:
+            logger.info(f"Zeus Registry: {version} rejetée ({validation['score']} < {score_actuel} pour {actuel})")
+            return False
+
+    activer_version(version)
+    return True
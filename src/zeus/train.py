@@ -5,7 +5,8 @@ import logging
 # Add project root path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from src.zeus.agent import ZeusAgent
+from src.zeus.agent import ZeusAgent, MODELS_DIR
+from src.zeus import registry
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -30,6 +31,13 @@ def run_training(steps=50000, model_name="zeus_v2"):
         print("\n✅ Entraînement terminé avec succès !")
         print(f"   Modèle sauvegardé dans : models/zeus/{model_name}.zip")
         
+        # Enregistrement au registre + promotion si la validation est au moins aussi bonne
+        version = registry.enregistrer_version(os.path.join(MODELS_DIR, f"{model_name}.zip"), model_name, steps=steps)
+        if registry.promouvoir_si_meilleure(version):
+            print(f"   Version {version} activée (rechargée au prochain démarrage ou reload_model).")
+        else:
+            print(f"   Version {version} enregistrée, version active conservée.")
+        
     except Exception as e:
         print(f"\n❌ Erreur fatale pendant l'entraînement : {e}")
         logger.error(f"Training failed: {e}", exc_info=True)
@@ -0,0 +1,41 @@
+"""
+Fixtures partagées des tests d'intégration : base SQLite temporaire (dans le
+tmp_path de pytest, archives comprises) et caches de processus remis à zéro
+avant et après chaque test.
+"""
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pytest
+
+from src.core import archive, config, database, migrations, utils
+from src.api import payload_dedup, reconciliation
+
+
+def _reinitialiser_caches():
+    utils.invalidate_equipe_cache()
+    database.invalider_sessions()
+    payload_dedup.reinitialiser()
+    reconciliation._HISTORIQUE_VERIFIE.clear()
+
+
+@pytest.fixture
+def base_temporaire(tmp_path, monkeypatch):
+    """
+    Base principale dans tmp_path/test.db (jamais Turso), archives dans tmp_path/archives.
+
+    Returns:
+        Dossier temporaire du test (pathlib.Path)
+    """
+    monkeypatch.setattr(config, "DB_NAME", str(tmp_path / "test.db"))
+    monkeypatch.setattr(config, "TURSO_URL", None)
+    monkeypatch.setattr(config, "TURSO_TOKEN", None)
+    monkeypatch.setattr(archive, "ARCHIVES_DIR", str(tmp_path / "archives"))
+    _reinitialiser_caches()
+    yield tmp_path
+    # Migrations en ligne lancées par le test : terminées avant la restauration de config
+    migrations.attendre_migrations_en_ligne(10)
+    _reinitialiser_caches()
@@ -0,0 +1,98 @@
+"""
+Agrégats du dashboard tenus à jour à l'écriture (src/core/agregats.py) : la
+validation du scoring et le règlement ZEUS donnent les mêmes agrégats qu'un
+recalcul complet, y compris pour une journée validée en retard, sans double compte.
+"""
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import database, agregats, migrations
+from src.api import db_integration
+from src.api.results_filter import iter_result_rows
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+from src.analysis import intelligence
+
+
+def _agregats():
+    with database.get_db_connection() as conn:
+        journees = [tuple(r) for r in conn.execute("SELECT * FROM agregats_journee ORDER BY journee")]
+        zeus = [tuple(r) for r in conn.execute("SELECT * FROM agregats_zeus ORDER BY tranche")]
+    return journees, zeus
+
+
+def _pronostiquer(cursor, partition, journee, index_match, juste):
+    """Prédiction (et prédiction ZEUS) juste ou fausse sur le index_match-ième match de la journée."""
+    dom_id, ext_id, score_dom, score_ext = cursor.execute("""
+        SELECT equipe_dom_id, equipe_ext_id, score_dom, score_ext FROM resultats
+        WHERE league_id = ? AND session_id = ? AND journee = ? ORDER BY id LIMIT 1 OFFSET ?
+    """, partition + (journee, index_match)).fetchone()
+    issue = agregats.issue_match(score_dom, score_ext) if score_dom is not None else 0
+    action = issue if juste else (issue + 1) % 3
+    cursor.execute("INSERT INTO predictions (league_id, session_id, journee, equipe_dom_id, equipe_ext_id, prediction) "
+                   "VALUES (?, ?, ?, ?, ?, ?)", partition + (journee, dom_id, ext_id, ("1", "X", "2")[action]))
+    confiance = 0.35 + 0.1 * index_match
+    cursor.execute("INSERT INTO zeus_predictions (league_id, session_id, journee, equipe_dom_id, equipe_ext_id, prediction, confiance) "
+                   "VALUES (?, ?, ?, ?, ?, ?, ?)", partition + (journee, dom_id, ext_id, action, confiance))
+
+
+def test_agregats_ecriture(base_temporaire):
+    """Agrégats incrémentaux == recalcul complet, validation dans le désordre, idempotente."""
+    print("\n=== TEST: Agrégats du dashboard à l'écriture ===")
+    database.initialiser_db()
+
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 6.5)
+    lignes = list(iter_result_rows(SimulatedSeasonSource(clock).get_recent_results(skip=0, take=7)))
+    # J5 pas encore jouée : scores inconnus
+    db_integration.insert_result_rows([l if l[0] != 5 else l[:3] + (None, None) for l in lignes if l[0] <= 6])
+
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        partition = database.get_partition(conn)
+        for journee in (3, 4, 5, 6):
+            for index_match in range(3):
+                _pronostiquer(cursor, partition, journee, index_match, juste=(journee + index_match) % 2 == 0)
+        # SKIP ZEUS sur J6
+        cursor.execute("UPDATE zeus_predictions SET prediction = 3 WHERE journee = 6 AND confiance > 0.5")
+
+    # 1. J3, J4, J6 validées ; J5 en attente
+    intelligence.mettre_a_jour_scoring()
+    journees, zeus = _agregats()
+    assert [j[2] for j in journees] == [3, 4, 6]
+    assert sum(z[3] for z in zeus) == 8 and sum(z[5] for z in zeus) == 1
+
+    # 2. J5 jouée ensuite : cumuls de J6 décalés, identiques au recalcul complet
+    db_integration.insert_result_rows([l for l in lignes if l[0] == 5])
+    intelligence.mettre_a_jour_scoring()
+    incrementaux = _agregats()
+    with database.get_db_connection() as conn:
+        agregats.reconstruire(conn.cursor())
+    assert _agregats() == incrementaux
+
+    # Remplissage figé de la migration 6 (prédictions ZEUS non réglées) : mêmes agrégats
+    with database.get_db_connection() as conn:
+        reglees = conn.execute("SELECT id, resultat, succes FROM zeus_predictions ORDER BY id").fetchall()
+        conn.execute("UPDATE zeus_predictions SET resultat = NULL, succes = NULL")
+        migrations._agregats_dashboard(conn.cursor())
+        assert conn.execute("SELECT id, resultat, succes FROM zeus_predictions ORDER BY id").fetchall() == reglees
+    assert _agregats() == incrementaux
+
+    journees, zeus = incrementaux
+    with database.get_db_connection() as conn:
+        score, total, reussies = conn.execute(
+            "SELECT SUM(points_gagnes), COUNT(*), SUM(succes) FROM predictions WHERE succes IS NOT NULL").fetchone()
+        zeus_reussies = conn.execute("SELECT COUNT(*) FROM zeus_predictions WHERE succes = 1").fetchone()[0]
+    derniere = journees[-1]
+    assert [j[2] for j in journees] == [3, 4, 5, 6]
+    assert (derniere[6], derniere[7], derniere[8]) == (score, total, reussies) and total == 12
+    assert sum(z[4] for z in zeus) == zeus_reussies
+    assert {z[2] for z in zeus} == {agregats.tranche_confiance(c) for c in (0.35, 0.45, 0.55)}
+
+    # 3. Nouvelle validation sans nouveau résultat : aucun double compte
+    intelligence.mettre_a_jour_scoring()
+    assert _agregats() == incrementaux
+
+    print("[OK] Test reussi!")
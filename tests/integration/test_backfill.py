@@ -0,0 +1,83 @@
+"""
+Rattrapage de l'historique d'une saison (src/api/backfill.py) : pages recuperees
+en parallele sous un plafond de concurrence, page vide reessayee, insertion des
+seules journees manquantes, classement et snapshots ZEUS reconstruits une fois.
+"""
+import sys
+import os
+import threading
+import time
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database
+from src.api import backfill, db_integration
+from src.api.results_filter import extract_results_minimal
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+
+
+class SourceInstable:
+    """Source simulee : latence, page skip=20 vide au premier appel, concurrence mesuree."""
+
+    def __init__(self, source):
+        self.source = source
+        self.appels = []
+        self.en_vol = 0
+        self.max_en_vol = 0
+        self.echec_fait = False
+        self._lock = threading.Lock()
+
+    def get_recent_results(self, skip=0, take=5):
+        with self._lock:
+            self.appels.append(skip)
+            self.en_vol += 1
+            self.max_en_vol = max(self.max_en_vol, self.en_vol)
+            premier_echec = skip == 20 and not self.echec_fait
+            self.echec_fait = self.echec_fait or premier_echec
+        time.sleep(0.02)
+        with self._lock:
+            self.en_vol -= 1
+        return {"rounds": []} if premier_echec else self.source.get_recent_results(skip=skip, take=take)
+
+    def get_ranking(self):
+        return self.source.get_ranking()
+
+
+def test_rattrapage_saison(base_temporaire):
+    """30 journees jouees, J1-J10 deja en base : 20 journees inserees, classement et ZEUS reconstruits."""
+    print("\n=== TEST: Rattrapage d'une saison ===")
+    database.initialiser_db()
+
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 29.5)  # 30 journees jouees
+    source = SourceInstable(SimulatedSeasonSource(clock))
+    historique = extract_results_minimal(source.source.get_recent_results(skip=0, take=30))
+    db_integration.insert_api_results([r for r in historique if r["roundNumber"] <= 10])
+
+    bilan = backfill.rattraper_saison(source, taille_page=10, paralleles=2, requetes_par_seconde=100,
+                                      sleep=lambda s: None)
+    assert bilan["derniere"] == 30 and bilan["manquantes"] == []
+    assert bilan["journees_inserees"] == list(range(11, 31))
+    assert bilan["matchs_inseres"] == 200
+    assert sorted(source.appels) == [0, 10, 20, 20]
+    assert source.max_en_vol <= 2
+    assert bilan["requetes"] == 5  # 3 pages + 1 nouvel essai + classement
+
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM resultats WHERE score_dom IS NOT NULL")
+        assert cursor.fetchone()[0] == 300
+        cursor.execute("SELECT COUNT(*) FROM classement")
+        assert cursor.fetchone()[0] == len(config.EQUIPES)
+        cursor.execute("SELECT COUNT(DISTINCT journee) FROM zeus_classement_archive")
+        assert cursor.fetchone()[0] == 30
+    assert bilan["snapshots_zeus"] == 30 * len(config.EQUIPES)
+
+    # Base a jour : rien a inserer, aucune reconstruction
+    source.appels.clear()
+    bilan = backfill.rattraper_saison(source, taille_page=10, paralleles=2, requetes_par_seconde=100)
+    assert bilan["journees_inserees"] == [] and bilan["snapshots_zeus"] == 0
+    assert bilan["requetes"] == 3
+
+    print("[OK] Test reussi!")
@@ -0,0 +1,122 @@
+"""
+Journal de capture des réponses API (src/api/capture_log.py) : segments gzip
+avec rotation, index, réponses identiques non recopiées, rejeu dans la base.
+"""
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database
+from src.api import capture_log
+
+
+def _equipe(nom):
+    return {"name": nom}
+
+
+def _resultats(journee):
+    equipes = config.EQUIPES
+    return {"rounds": [{"roundNumber": journee, "matches": [
+        {"id": f"{journee}-{i}", "homeTeam": _equipe(equipes[i]), "awayTeam": _equipe(equipes[i + 1]),
+         "score": f"{i % 3}:{journee % 2}"}
+        for i in range(0, len(equipes), 2)
+    ]}]}
+
+
+def _matchs(journee):
+    equipes = config.EQUIPES
+    return {"rounds": [{"roundNumber": journee, "expectedStart": None, "matches": [
+        {"name": "x", "homeTeam": _equipe(equipes[i]), "awayTeam": _equipe(equipes[i + 1]),
+         "eventBetTypes": [{"name": "1X2", "eventBetTypeItems": [
+             {"shortName": "1", "odds": 1.8}, {"shortName": "X", "odds": 3.3}, {"shortName": "2", "odds": 4.1}]}]}
+        for i in range(0, len(equipes), 2)
+    ]}]}
+
+
+def _classement(journee):
+    return {"teams": [
+        {"name": nom, "position": i + 1, "points": 3 * journee - i, "won": journee, "draw": 0, "lost": 0,
+         "history": ["Won", "Draw"]}
+        for i, nom in enumerate(config.EQUIPES)
+    ]}
+
+
+def test_capture_et_rejeu(monkeypatch, base_temporaire):
+    """Capture de 3 journées (avec doublons), rotation, lecture filtrée puis rejeu en base."""
+    print("\n=== TEST: Journal de capture API ===")
+    journal_dir = str(base_temporaire / "capture")
+    monkeypatch.setitem(capture_log.CAPTURE_CONFIG, "SEGMENT_MAX_OCTETS", 4000)
+
+    journal = capture_log.JournalCapture(journal_dir)
+    t = 1000.0
+    for journee in (1, 2, 3):
+        for _ in range(3):  # Le moniteur interroge plusieurs fois la même journée
+            journal.ajouter("results", {"skip": 0, "take": 2}, _resultats(journee), t)
+            t += 15
+        journal.ajouter("ranking", {}, _classement(journee), t)
+        journal.ajouter("matches", {}, _matchs(journee + 1), t + 1)
+        t += 30
+    journal.fermer()
+
+    segments = [f for f in os.listdir(journal_dir) if f.endswith(".gz")]
+    assert len(segments) > 1, "rotation attendue"
+    assert journal.nb_enregistres == 15
+    assert journal.nb_identiques > 0
+
+    # Index : filtre par endpoint et par plage, sans décompression
+    index_resultats = capture_log.lister(journal_dir, endpoint="results")
+    assert len(index_resultats) == 9
+    assert all(1000 <= e["t"] <= 1105 for e in capture_log.lister(journal_dir, depuis=1000, jusqu_a=1105))
+
+    # Lecture : les réponses "identiques" sont restituées en entier
+    relus = list(capture_log.lire(journal_dir, endpoint="results"))
+    assert [r["d"] for r in relus] == [_resultats(j) for j in (1, 2, 3) for _ in range(3)]
+
+    # Rejeu dans une base vide
+    database.initialiser_db()
+    rapport = capture_log.rejouer(journal_dir)
+    assert rapport["results"]["reponses"] == 9
+    assert rapport["matches"]["lignes"] == 30
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM resultats WHERE score_dom IS NOT NULL")
+        assert cursor.fetchone()[0] == 30
+        cursor.execute("SELECT MAX(journee) FROM cotes")
+        assert cursor.fetchone()[0] == 4
+
+    # Source pour start_monitoring : réponses servies dans l'ordre d'origine
+    source = capture_log.SourceRejouee(journal_dir)
+    assert source.get_ranking() == _classement(1)["teams"]
+    assert source.get_upcoming_matches() == _matchs(2)
+    print("[OK] Test reussi!")
+
+
+def test_segment_non_ferme(tmp_path, monkeypatch):
+    """Arrêt brutal : lisible jusqu'au dernier vidage, les réponses suivantes sont perdues."""
+    print("\n=== TEST: Segment non fermé ===")
+    monkeypatch.setitem(capture_log.CAPTURE_CONFIG, "FLUSH_ENREGISTREMENTS", 2)
+    dossier = str(tmp_path)
+    journal = capture_log.JournalCapture(dossier)
+    journal.ajouter("results", {}, _resultats(1), 1001.0)
+    # Pas encore de vidage : ni segment lisible, ni entrée d'index
+    assert capture_log.lister(dossier) == [] and list(capture_log.lire(dossier)) == []
+    for journee in (2, 3):
+        journal.ajouter("results", {}, _resultats(journee), 1000.0 + journee)
+    # Pas de fermer() : le segment gzip n'a pas de marqueur de fin, J3 n'est pas encore vidée
+    relus = list(capture_log.lire(dossier))
+    assert [r["d"] for r in relus] == [_resultats(1), _resultats(2)]
+
+    # Vidage au-delà de l'intervalle, même sous le seuil d'enregistrements
+    monkeypatch.setitem(capture_log.CAPTURE_CONFIG, "FLUSH_INTERVALLE", 0)
+    journal.ajouter("results", {}, _resultats(4), 1004.0)
+    assert len(list(capture_log.lire(dossier))) == 4
+
+    # Une réouverture écrit dans un nouveau segment
+    suite = capture_log.JournalCapture(dossier)
+    suite.ajouter("results", {}, _resultats(5), 1005.0)
+    suite.fermer()
+    journal.fermer()
+    assert len(list(capture_log.lire(dossier))) == 5
+    print("[OK] Test reussi!")
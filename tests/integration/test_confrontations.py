@@ -0,0 +1,103 @@
+"""
+Index des confrontations directes (src/core/confrontations.py) : résumé glissant
+des dernières rencontres de chaque paire, toutes saisons confondues, tenu à jour
+à l'ingestion et identique après reconstruction depuis la base d'archive.
+"""
+import sqlite3
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import archive, config, confrontations, database, utils
+from src.api import db_integration
+from src.analysis import intelligence
+
+# Scores de la paire (equipes[0] à domicile contre equipes[1]) saison après saison
+SCORES = ["2:0", "1:1", "3:1", "2:1", "0:1", "4:0"]
+
+
+def _resultat(journee, score):
+    equipes = config.EQUIPES
+    return [{"roundNumber": journee, "matches": [
+        {"homeTeam": equipes[0], "awayTeam": equipes[1], "score": score},
+        {"homeTeam": equipes[2], "awayTeam": equipes[3], "score": "1:0"},
+    ]}]
+
+
+def test_index_toutes_saisons(base_temporaire):
+    """Une rencontre par saison : le facteur s'active dès la 3e saison, fenêtre de 5 rencontres."""
+    print("\n=== TEST: Index des confrontations directes ===")
+    confrontations.invalider_index()
+    database.initialiser_db()
+    dom, ext = utils.get_equipe_id(config.EQUIPES[0]), utils.get_equipe_id(config.EQUIPES[1])
+
+    for saison, score in enumerate(SCORES, 1):
+        if saison > 1:
+            archive.reinitialiser_tables_session()
+        db_integration.insert_api_results(_resultat(7, score))
+        db_integration.insert_api_results(_resultat(7, score))  # Ré-ingestion sans effet
+        if saison == 2:
+            assert confrontations.get_confrontation(dom, ext) == (2, 1, 1)
+            assert intelligence.analyser_confrontations_directes(dom, ext) == 0
+        if saison == 4:
+            # 3 victoires domicile sur 4 : bonus moyen
+            assert intelligence.analyser_confrontations_directes(dom, ext) == 1.5
+
+    # 5 dernières rencontres : 1:1, 3:1, 2:1, 0:1, 4:0
+    assert confrontations.get_confrontation(dom, ext) == (5, 3, 1)
+    assert confrontations.get_confrontation(ext, dom) is None
+
+    # Sessions anciennes archivées : la reconstruction lit aussi la base d'archive
+    archive.compacter_sessions(sessions_conservees=2)
+    index = dict(confrontations.get_index_confrontations())
+    assert confrontations.reconstruire_index() == 2
+    assert confrontations.get_index_confrontations() == index
+
+    # Base dont l'index n'existe pas encore : construit par initialiser_db
+    with database.get_db_connection() as conn:
+        conn.cursor().execute("DELETE FROM confrontations")
+    database.initialiser_db()
+    confrontations.invalider_index()
+    assert confrontations.get_confrontation(dom, ext) == (5, 3, 1)
+
+    print("[OK] Test reussi!")
+
+
+def test_lecture_sans_connexion(base_temporaire, monkeypatch):
+    """Version vérifiée une fois avant la boucle des matchs, puis lectures en mémoire sans connexion."""
+    print("\n=== TEST: Confrontations lues sans connexion par match ===")
+    database.initialiser_db()
+    dom, ext = utils.get_equipe_id(config.EQUIPES[0]), utils.get_equipe_id(config.EQUIPES[1])
+    db_integration.insert_api_results(_resultat(7, "2:0"))
+    version = confrontations._version()
+    assert confrontations.get_index_confrontations(version)[(dom, ext)] == (1, 1, 0)
+
+    connexions = []
+    connecter = sqlite3.connect
+    def connecter_trace(*args, **kwargs):
+        connexions.append(args)
+        return connecter(*args, **kwargs)
+    monkeypatch.setattr(sqlite3, "connect", connecter_trace)
+
+    # Versions déjà lues par l'appelant (empreinte de la journée) : ni lecture ni rechargement
+    confrontations.get_index_confrontations(version)
+    for _ in range(50):
+        assert confrontations.get_confrontation(dom, ext) == (1, 1, 0)
+        assert intelligence.analyser_confrontations_directes(ext, dom) == 0
+    assert connexions == []
+
+    # Écriture d'un autre processus : vue à la vérification suivante, un seul rechargement
+    monkeypatch.setattr(sqlite3, "connect", connecter)
+    with sqlite3.connect(config.DB_NAME) as conn:
+        conn.execute("UPDATE confrontations SET nb = 3, victoires_dom = 3 WHERE equipe_dom_id = ?", (dom,))
+        utils.marquer_donnees_modifiees(conn.cursor(), "confrontations")
+    conn.close()
+    monkeypatch.setattr(sqlite3, "connect", connecter_trace)
+    assert confrontations.get_confrontation(dom, ext) == (1, 1, 0)
+    confrontations.get_index_confrontations(confrontations._version())
+    assert confrontations.get_confrontation(dom, ext) == (3, 3, 0)
+    assert len(connexions) == 2
+
+    print("[OK] Test reussi!")
@@ -0,0 +1,103 @@
+"""
+Comparaison indexée de deux sources (src/api/data_comparator.py) : jointure sur
+(journee, domicile, exterieur) entre formats API, Scraper, base et archive CSV,
+tolérance sur les cotes, écarts complets et rapport écrit au fil de l'eau.
+"""
+import sys
+import os
+import csv
+import json
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import database
+from src.api import data_comparator, db_integration
+
+EQUIPES = [f"Equipe {i}" for i in range(20)]
+
+
+def _saison_api(journees=38):
+    """Saison complète au format API : 10 matchs par journée, scores déterministes."""
+    return [{"roundNumber": j, "matches": [
+        {"homeTeam": EQUIPES[i], "awayTeam": EQUIPES[(i + j) % 20 if (i + j) % 20 != i else (i + 1) % 20],
+         "score": f"{(i + j) % 4}:{j % 3}"}
+        for i in range(0, 20, 2)
+    ]} for j in range(1, journees + 1)]
+
+
+def test_resultats_saison_complete():
+    """380 matchs : écarts de score et matchs absents tous rapportés, journées seulement d'un côté ignorées."""
+    print("\n=== TEST: Comparaison des resultats d'une saison ===")
+    api = _saison_api()
+    # Scraper : format "journee" + score "d-e", une journée de moins, 12 scores différents, 1 match absent
+    scraper = [{"journee": r["roundNumber"], "matches": [
+        {"homeTeam": m["homeTeam"], "awayTeam": m["awayTeam"], "score": m["score"].replace(":", "-")}
+        for m in r["matches"]
+    ]} for r in api[:-1]]
+    for r in scraper[:12]:
+        r["matches"][0]["score"] = "9-9"
+    del scraper[20]["matches"][3]
+
+    flux = []
+    comp = data_comparator.compare_results(api, scraper, on_difference=flux.append)
+    assert comp["total_matches"] == 370
+    assert comp["matching"] == 357
+    assert comp["differences_count"] == len(comp["differences"]) == 13 == len(flux)
+    absent = [d for d in comp["differences"] if d["scraper"] == data_comparator.NOT_FOUND]
+    assert len(absent) == 1 and absent[0]["journee"] == 21
+    assert comp["differences"][0]["scraper"] == "9:9"
+    print("[OK] Test reussi!")
+
+
+def test_cotes_tolerance():
+    """Cotes API (par journée) contre cotes Scraper à plat : écart sous la tolérance accepté."""
+    print("\n=== TEST: Comparaison des cotes ===")
+    api = [{"roundNumber": 5, "matches": [
+        {"homeTeam": "A", "awayTeam": "B", "odds": [{"type": "1", "odds": 2.5}, {"type": "X", "odds": 3.2}, {"type": "2", "odds": 2.8}]},
+        {"homeTeam": "C", "awayTeam": "D", "odds": [{"type": "1", "odds": 1.5}, {"type": "X", "odds": 4.0}, {"type": "2", "odds": 6.0}]},
+    ]}]
+    scraper = [
+        {"homeTeam": "A", "awayTeam": "B", "cote_1": 2.505, "cote_x": 3.2, "cote_2": 2.8},
+        {"homeTeam": "C", "awayTeam": "D", "cote_1": 1.5, "cote_x": 4.1, "cote_2": 6.0},
+        {"homeTeam": "E", "awayTeam": "F", "cote_1": 1.9, "cote_x": 3.0, "cote_2": 4.0},
+    ]
+    comp = data_comparator.compare_odds(api, scraper)
+    assert (comp["total_matches"], comp["matching"], comp["differences_count"]) == (2, 1, 2)
+    assert {d["match"] for d in comp["differences"]} == {"C vs D", "E vs F"}
+    assert data_comparator.compare_odds(api, scraper, tolerance=0.2)["matching"] == 2
+    print("[OK] Test reussi!")
+
+
+def test_base_contre_archive(base_temporaire):
+    """Base (partition active) comparée à une archive CSV et à l'API, écarts écrits en JSON Lines."""
+    print("\n=== TEST: Comparaison base / archive ===")
+    dossier = base_temporaire
+    database.initialiser_db(equipes=EQUIPES)
+
+    api = _saison_api(journees=3)
+    db_integration.insert_api_results(api)
+    base = data_comparator.rows_from_db("resultats")
+    assert data_comparator.compare_results(api, base, labels=("api", "base"))["coherence"] == 100.0
+
+    archive = os.path.join(dossier, "archives_session_1.csv")
+    with open(archive, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["=== RESULTATS ==="])
+        writer.writerow(["Journee", "Equipe_Dom", "Equipe_Ext", "Score_Dom", "Score_Ext"])
+        for row in base:
+            ecart = 1 if row["journee"] == 2 and row["equipe_dom"] == EQUIPES[0] else 0
+            writer.writerow([row["journee"], row["equipe_dom"], row["equipe_ext"], row["score_dom"] + ecart, row["score_ext"]])
+        writer.writerow([])
+        writer.writerow(["=== PREDICTIONS ==="])
+
+    ecarts = [e for e in data_comparator.iter_comparison(
+        base, data_comparator.rows_from_archive_csv(archive), data_comparator.normalize_score) if e["status"] != "ok"]
+    assert [(e["journee"], e["home"], e["status"]) for e in ecarts] == [(2, EQUIPES[0], "different")]
+
+    sortie = os.path.join(dossier, "ecarts.jsonl")
+    assert data_comparator.save_differences(iter(ecarts), sortie) == 1
+    with open(sortie, encoding="utf-8") as f:
+        assert json.loads(f.readline())["journee"] == 2
+
+    print("[OK] Test reussi!")
@@ -0,0 +1,55 @@
+"""
+Demarrage a froid du moniteur : budget de temps d'import, pile ML (torch,
+stable_baselines3, gymnasium) non chargee tant que ZEUS ne predit ni ne
+s'entraine, aucun dossier cree a l'import.
+"""
+import sys
+import os
+import json
+import subprocess
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+RACINE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, RACINE)
+
+BUDGET_IMPORT_S = 1.0  # Import des points d'entree, interpreteur deja demarre
+ESSAIS = 3             # Meilleur de N demarrages (bruit des machines de CI)
+MODULES_ML = ("torch", "stable_baselines3", "gymnasium")
+
+_MESURE = """
+import json, sys, time
+debut = time.perf_counter()
+import {module}
+print(json.dumps({{"duree": time.perf_counter() - debut,
+                   "ml": [m for m in {ml!r} if m in sys.modules]}}))
+"""
+
+
+def _demarrer(module, cwd=RACINE):
+    """Importe `module` dans un interpreteur neuf : (duree d'import, modules ML charges)."""
+    env = dict(os.environ, PYTHONPATH=RACINE, PYTHONDONTWRITEBYTECODE="1")
+    sortie = subprocess.run([sys.executable, "-c", _MESURE.format(module=module, ml=MODULES_ML)],
+                            cwd=cwd, env=env, capture_output=True, text=True, timeout=120, check=True)
+    mesure = json.loads(sortie.stdout.strip().splitlines()[-1])
+    return mesure["duree"], mesure["ml"]
+
+
+def test_budget_import_moniteur():
+    """main / main_api_monitor / league_monitor s'importent sous le budget, sans la pile ML."""
+    print("\n=== TEST: Demarrage a froid du moniteur ===")
+    for module in ("main_api_monitor", "main", "src.api.league_monitor"):
+        mesures = [_demarrer(module) for _ in range(ESSAIS)]
+        duree = min(d for d, _ in mesures)
+        print(f"   {module} : {duree * 1000:.0f} ms")
+        assert mesures[0][1] == [], f"{module} charge {mesures[0][1]} a l'import"
+        assert duree < BUDGET_IMPORT_S, f"{module} : {duree:.2f}s > budget {BUDGET_IMPORT_S}s"
+    print("[OK] Test reussi!")
+
+
+def test_import_agent_sans_effet(tmp_path):
+    """Importer l'agent ZEUS ne charge pas la pile ML et ne cree pas models/ ni logs/."""
+    print("\n=== TEST: Import paresseux de l'agent ZEUS ===")
+    _, ml = _demarrer("src.zeus.agent, src.zeus.inference, src.zeus.registry", cwd=str(tmp_path))
+    assert ml == []
+    assert os.listdir(tmp_path) == []
+    print("[OK] Test reussi!")
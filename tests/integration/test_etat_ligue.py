@@ -0,0 +1,142 @@
+"""
+Etat de ligue compact (src/zeus/etat_ligue.py) : rejeu du classement en colonnes
+identique au rejeu par dicts, observations de ZeusEnv identiques au chemin
+match_data, dataclasses a __slots__ compatibles avec feature_engineering.
+"""
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+
+from src.core import config, database
+from src.api import db_integration
+from src.api.results_filter import iter_result_rows
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+from src.zeus import archive_manager, feature_engineering
+from src.zeus.env import ZeusEnv
+from src.zeus.etat_ligue import ClassementLigue, EtatMatch, MatchsSaison
+
+
+def _rejeu_reference(matchs):
+    """Rejeu par dicts (ancienne implementation de rebuild_history_from_db)."""
+    teams, lignes = {}, []
+    for journee in sorted({m[0] for m in matchs}):
+        for _, d_id, e_id, s_d, s_e in (m for m in matchs if m[0] == journee):
+            for tid in (d_id, e_id):
+                teams.setdefault(tid, {'pts': 0, 'bp': 0, 'bc': 0, 'forme': []})
+            teams[d_id]['bp'] += s_d
+            teams[d_id]['bc'] += s_e
+            teams[e_id]['bp'] += s_e
+            teams[e_id]['bc'] += s_d
+            p_d, p_e = archive_manager.calculate_points(s_d, s_e)
+            teams[d_id]['pts'] += p_d
+            teams[e_id]['pts'] += p_e
+            teams[d_id]['forme'].append('V' if s_d > s_e else ('N' if s_d == s_e else 'D'))
+            teams[e_id]['forme'].append('V' if s_e > s_d else ('N' if s_e == s_d else 'D'))
+        tri = sorted(teams.items(), key=lambda x: (x[1]['pts'], x[1]['bp'] - x[1]['bc'], x[1]['bp']), reverse=True)
+        for position, (tid, st) in enumerate(tri, 1):
+            lignes.append((journee, tid, position, st['pts'], "".join(st['forme'][-5:]), st['bp'], st['bc']))
+    return lignes
+
+
+def _archive():
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT journee, equipe_id, position, points, forme, buts_pour, buts_contre
+            FROM zeus_classement_archive ORDER BY journee, position
+        """)
+        return [tuple(r) for r in cursor.fetchall()]
+
+
+def test_rejeu_classement(base_temporaire):
+    """Snapshots ZEUS identiques au rejeu par dicts (egalites departagees pareil)."""
+    print("\n=== TEST: Rejeu du classement en colonnes ===")
+    database.initialiser_db()
+
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 24.5)
+    source = SimulatedSeasonSource(clock)
+    db_integration.insert_result_rows(iter_result_rows(source.get_recent_results(skip=0, take=25)))
+
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext FROM resultats "
+                       "WHERE score_dom IS NOT NULL ORDER BY journee ASC")
+        matchs = [tuple(r) for r in cursor.fetchall()]
+
+    assert archive_manager.rebuild_history_from_db() == 25 * len(config.EQUIPES)
+    assert _archive() == sorted(_rejeu_reference(matchs), key=lambda l: (l[0], l[2]))
+
+    # Equipe presente deux fois dans une journee, equipe apparue en cours de route
+    matchs = [(1, 1, 2, 1, 1), (1, 3, 1, 0, 2), (2, 2, 3, 2, 0), (2, 4, 1, 0, 0), (3, 3, 4, 1, 3)]
+    classement = ClassementLigue.depuis_matchs([m[1] for m in matchs], [m[2] for m in matchs])
+    obtenu = []
+    for journee in (1, 2, 3):
+        jour = [m for m in matchs if m[0] == journee]
+        classement.jouer(classement.indices([m[1] for m in jour]), classement.indices([m[2] for m in jour]),
+                         [m[3] for m in jour], [m[4] for m in jour])
+        ordre = classement.ordre()
+        obtenu += [(journee, int(classement.equipe_ids[c]), pos, int(classement.points[c]), forme,
+                    int(classement.buts_pour[c]), int(classement.buts_contre[c]))
+                   for pos, (c, forme) in enumerate(zip(ordre, classement.formes(ordre)), 1)]
+    assert obtenu == _rejeu_reference(matchs)
+
+    # ---- Observations de ZeusEnv : meme matrice que le chemin match_data (dicts) ----
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO cotes (league_id, session_id, journee, equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2)
+            SELECT league_id, session_id, journee, equipe_dom_id, equipe_ext_id,
+                   CASE WHEN id % 7 = 0 THEN NULL ELSE 1.5 + (id % 5) * 0.4 END, 3.2, 2.0 + (id % 3) * 0.7
+            FROM resultats
+        """)
+        # Journee sans archive et buts nuls : valeurs par defaut
+        cursor.execute("DELETE FROM zeus_classement_archive WHERE journee = 12")
+        cursor.execute("UPDATE zeus_classement_archive SET buts_pour = 0 WHERE journee = 3")
+
+    env = ZeusEnv(matchs_joues=True)
+    assert len(env.matches) == 250
+    archive = {(l[0], l[1]): l for l in _archive()}
+    matchs_data = []
+    for m in env.matches:
+        data = {c: m.get(c) for c in MatchsSaison.COLONNES}
+        for camp, equipe, defauts in (('dom', m.equipe_dom_id, (1.4, 1.1)), ('ext', m.equipe_ext_id, (1.1, 1.4))):
+            ligne = archive.get((m.journee, equipe))
+            data[f'pos_{camp}'] = ligne[2] if ligne else 10
+            data[f'forme_{camp}'] = ligne[4] if ligne else 'VVNDD'
+            data[f'bp_{camp}'] = (ligne[5] if ligne else None) or defauts[0]
+            data[f'bc_{camp}'] = (ligne[6] if ligne else None) or defauts[1]
+        matchs_data.append(data)
+    assert np.array_equal(env.observations, feature_engineering.construire_matrice_depuis_matchs(matchs_data))
+
+    # Recompenses inchangees (Match a __slots__ lu comme un dict)
+    assert env.matches[0]['score_dom'] == matchs_data[0]['score_dom']
+    env.reset()
+    _, recompense, _, _, info = env.step(0)
+    assert info["match_id"] == matchs_data[0]['equipe_dom_id']
+    assert recompense == env._calculate_reward(0, matchs_data[0])
+
+    # Colonnes plusieurs fois plus compactes qu'une liste de dicts
+    taille_dicts = sum(sys.getsizeof(d) + sum(sys.getsizeof(v) for v in d.values())
+                       for d in ({c: m.get(c) for c in MatchsSaison.COLONNES} for m in env.matches))
+    assert env.matches.nbytes * 4 < taille_dicts
+
+    print("[OK] Test reussi!")
+
+
+def test_etat_match():
+    """EtatMatch : meme vecteur qu'un dict, valeurs par defaut d'une cle absente, pas de __dict__."""
+    print("\n=== TEST: EtatMatch ===")
+    donnees = {'pos_dom': 3, 'pos_ext': 14, 'forme_dom': 'VVNDV', 'forme_ext': 'DDN', 'pts_dom': 30,
+               'pts_ext': 12, 'bp_dom': 1.8, 'bc_dom': 0.9, 'bp_ext': 1.0, 'bc_ext': 1.7,
+               'cote_1': 1.65, 'cote_x': 3.6, 'cote_2': 5.2, 'journee': 21}
+    assert np.array_equal(feature_engineering.construire_vecteur_etat(EtatMatch(**donnees)),
+                          feature_engineering.construire_vecteur_etat(donnees))
+    assert np.array_equal(feature_engineering.construire_vecteur_etat(EtatMatch()),
+                          feature_engineering.construire_vecteur_etat({}))
+    assert not hasattr(EtatMatch(), "__dict__")
+    print("[OK] Test reussi!")
@@ -0,0 +1,75 @@
+"""
+Parité de la construction vectorisée des états ZEUS (construire_matrice_etats)
+avec la version scalaire construire_vecteur_etat.
+"""
+import sys
+import os
+import random
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+
+from src.zeus import feature_engineering as fe
+
+
+def _matchs_aleatoires(n, seed=7):
+    """Matchs variés : valeurs manquantes, None, chaînes, cotes invalides, formes exotiques."""
+    rng = random.Random(seed)
+    formes = ["VVNDD", "DDV", "", None, "V-N-D", "vvv", "WLD", "NNNNNNN"]
+    matchs = []
+    for i in range(n):
+        m = {
+            'journee': rng.randint(1, 38),
+            'pos_dom': rng.choice([rng.randint(1, 20), None, 0]),
+            'pos_ext': rng.choice([rng.randint(1, 20), None]),
+            'forme_dom': rng.choice(formes),
+            'forme_ext': rng.choice(formes),
+            'cote_1': rng.choice([round(rng.uniform(1.01, 9), 2), None, 0, 1.0, "2.35"]),
+            'cote_x': rng.choice([round(rng.uniform(2.5, 5), 2), None]),
+            'cote_2': round(rng.uniform(0.5, 12), 2),
+        }
+        for cle in ('bp_dom', 'bc_dom', 'bp_ext', 'bc_ext'):
+            choix = rng.random()
+            if choix < 0.7:
+                m[cle] = rng.uniform(0, 6)
+            elif choix < 0.85:
+                m[cle] = None
+            # sinon clé absente -> valeur par défaut
+        if i % 11 == 0:
+            del m['forme_dom']
+        matchs.append(m)
+    return matchs
+
+
+def test_parite_matrice_etats():
+    """La matrice (N, 10) est identique, ligne par ligne, au vecteur scalaire."""
+    print("\n=== TEST: Parité construction vectorisée des états ===")
+    matchs = _matchs_aleatoires(2000)
+
+    attendu = np.stack([fe.construire_vecteur_etat(m) for m in matchs])
+    matrice = fe.construire_matrice_depuis_matchs(matchs)
+
+    assert matrice.shape == (len(matchs), fe.NB_FEATURES)
+    assert matrice.dtype == np.float32
+    assert np.array_equal(matrice, attendu)
+    print(f"[OK] {len(matchs)} matchs identiques")
+
+
+def test_tampons_preallouees():
+    """Les tampons fournis sont remplis en place et réutilisables."""
+    print("\n=== TEST: Tampons préalloués ===")
+    matchs = _matchs_aleatoires(300, seed=11)
+    out = np.full((len(matchs), fe.NB_FEATURES), np.nan, dtype=np.float32)
+    tmp = np.empty(len(matchs), dtype=np.float64)
+
+    resultat = fe.construire_matrice_depuis_matchs(matchs, out=out, tmp=tmp)
+    assert resultat is out
+    assert np.array_equal(out, fe.construire_matrice_depuis_matchs(matchs))
+
+    # Réutilisation du même tampon sur un autre lot
+    autres = _matchs_aleatoires(300, seed=12)
+    fe.construire_matrice_depuis_matchs(autres, out=out, tmp=tmp)
+    assert np.array_equal(out, np.stack([fe.construire_vecteur_etat(m) for m in autres]))
+    print("[OK] Test reussi!")
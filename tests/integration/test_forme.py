@@ -0,0 +1,115 @@
+"""
+Parité de la table des formes (src/core/forme.py) avec les implémentations historiques
+de pondere_forme, pondere_forme_amelioree, detecter_instabilite, calculer_momentum_internal
+et feature_engineering.calculer_score_forme.
+"""
+import sys
+import os
+from itertools import product
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+
+from src.core import forme as noyau
+from src.analysis.intelligence import (
+    pondere_forme_amelioree,
+    detecter_instabilite,
+    calculer_momentum_internal,
+)
+from src.zeus.feature_engineering import calculer_score_forme
+
+
+# --- Implémentations historiques (référence) ---
+
+def ref_pondere_forme(f):
+    valeurs = {'V': 3, 'N': 1, 'D': 0}
+    return sum(valeurs.get(c, 0) for c in (f[-5:] if f else ""))
+
+
+def ref_pondere_forme_amelioree(f):
+    valeurs = {'V': 3, 'N': 1, 'D': 0}
+    if not f or len(f) < 5:
+        return sum(valeurs.get(c, 0) for c in (f[-5:] if f else ""))
+    total = 0
+    for i, resultat in enumerate(f[-5:]):
+        total += valeurs.get(resultat, 0) * (1.5 if i >= 3 else 1.0)
+    return total
+
+
+def ref_detecter_instabilite(forme):
+    if not forme or len(forme) < 3:
+        return False
+    return any(forme.endswith(p) for p in ['VDV', 'DVD', 'VNV', 'DND', 'VDVD', 'DVDV'])
+
+
+def ref_momentum(forme):
+    if not forme or len(forme) < 3:
+        return 0
+    if forme.endswith('VVV'):
+        return 3.0
+    elif forme.endswith('VV'):
+        return 1.5
+    elif forme.endswith('DDD'):
+        return -3.0
+    elif forme.endswith('DD'):
+        return -1.5
+    return 0
+
+
+def ref_score_forme(forme_str):
+    if not forme_str or not isinstance(forme_str, str):
+        return 0.5
+    s = forme_str.upper().strip().replace("-", "").replace(" ", "")
+    tokens = [c for c in s if c in ("V", "N", "D")]
+    if not tokens:
+        return 0.5
+    recent = tokens[:5]
+    points = sum(3 if c == "V" else (1 if c == "N" else 0) for c in recent)
+    return points / (3.0 * len(recent))
+
+
+def _formes_test():
+    formes = ["".join(p) for n in range(8) for p in product("VND", repeat=n)]
+    formes += [None, "V-N-D", "v n d", "VVXDD", "WWLDL", "  VVNDV ", "VV-DD-NN", "?"]
+    return formes
+
+
+def test_parite_intelligence():
+    """Toutes les formes (longueur 0 à 7 + cas exotiques) donnent les mêmes valeurs."""
+    print("\n=== TEST: Parité table des formes / intelligence ===")
+    formes = _formes_test()
+    for f in formes:
+        assert noyau.analyser_forme(f).points == ref_pondere_forme(f), f
+        assert pondere_forme_amelioree(f) == ref_pondere_forme_amelioree(f), f
+        assert detecter_instabilite(f) == ref_detecter_instabilite(f), f
+        assert calculer_momentum_internal(f) == ref_momentum(f), f
+    print(f"[OK] {len(formes)} formes verifiees")
+
+
+def test_parite_zeus():
+    """Score de forme ZEUS identique, scalaire et vectorisé."""
+    print("\n=== TEST: Parité table des formes / ZEUS ===")
+    formes = _formes_test() + [12, ""]
+    attendus = [ref_score_forme(f) for f in formes]
+    for f, attendu in zip(formes, attendus):
+        assert calculer_score_forme(f) == attendu, f
+
+    vecteur = noyau.scores_formes_zeus(formes)
+    assert vecteur.dtype == np.float32
+    assert np.allclose(vecteur, attendus, atol=1e-6)
+    print(f"[OK] {len(formes)} formes verifiees")
+
+
+def test_matrice_formes():
+    """La version vectorisée reproduit analyser_forme ligne par ligne (y compris hors table)."""
+    print("\n=== TEST: Matrice vectorisée des formes ===")
+    formes = _formes_test()
+    out = np.empty((len(formes), len(noyau.COLONNES)), dtype=np.float32)
+    matrice = noyau.matrice_formes(formes, out=out)
+    assert matrice is out
+    attendu = np.array([noyau.analyser_forme(f) for f in formes], dtype=np.float32)
+    assert np.array_equal(matrice, attendu)
+    assert len(noyau.FORMES_CANONIQUES) == 364
+    print("[OK] Test reussi!")
@@ -0,0 +1,58 @@
+"""
+Historique des cotes (src/core/historique_cotes.py) : seules les cotes qui bougent
+sont historisées, séries et dérives lisibles par match et par journée.
+"""
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database, historique_cotes
+from src.api import db_integration
+
+JOURNEE = 20
+
+
+def _matchs(cote_1_premier):
+    equipes = config.EQUIPES
+    cotes = [(cote_1_premier, 3.4, 4.5), (2.1, 3.1, 3.3)]
+    return [{"roundNumber": JOURNEE, "matches": [
+        {"homeTeam": equipes[2 * i], "awayTeam": equipes[2 * i + 1],
+         "odds": [{"type": t, "odds": c} for t, c in zip(("1", "X", "2"), cotes[i])]}
+        for i in range(2)
+    ]}]
+
+
+def test_historique_delta(monkeypatch, base_temporaire):
+    """Trois captures, un seul match qui bouge : 2 lignes pour lui, 1 pour l'autre."""
+    print("\n=== TEST: Historique des cotes (delta) ===")
+    database.initialiser_db()
+
+    horloge = iter([1000, 1060, 1120])
+    monkeypatch.setattr(historique_cotes, "horodatage_actuel", lambda: next(horloge))
+    db_integration.insert_api_matches(_matchs(1.75))
+    db_integration.insert_api_matches(_matchs(1.62))
+    db_integration.insert_api_matches(_matchs(1.62))
+
+    serie = historique_cotes.get_historique_cotes(JOURNEE, 1, 2)
+    assert [(p["horodatage"], p["cote_1"]) for p in serie] == [(1000, 1.75), (1060, 1.62)]
+    assert len(historique_cotes.get_historique_cotes(JOURNEE, 3, 4)) == 1
+
+    # Requête par plage
+    assert [p["horodatage"] for p in historique_cotes.get_historique_cotes(JOURNEE, 1, 2, depuis=1001)] == [1060]
+
+    # Dérives
+    assert historique_cotes.get_derive_cotes(JOURNEE, 1, 2) == (-0.13, 0.0, 0.0)
+    assert historique_cotes.get_derives_journee(JOURNEE) == {
+        (1, 2): (-0.13, 0.0, 0.0),
+        (3, 4): (0.0, 0.0, 0.0),
+    }
+    assert historique_cotes.get_derive_cotes(JOURNEE, 5, 6) is None
+
+    # La table `cotes` garde la dernière valeur
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT cote_1 FROM cotes WHERE journee = ? AND equipe_dom_id = 1", (JOURNEE,))
+        assert cursor.fetchone()[0] == 1.62
+    print("[OK] Test reussi!")
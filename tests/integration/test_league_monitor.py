@@ -0,0 +1,123 @@
+"""
+Surveillance multi-ligues (src/api/league_monitor.py) : une base par ligue via
+database.utiliser_base, caches séparés par base, limiteur de débit partagé.
+"""
+import sys
+import os
+import threading
+import time
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import database, utils
+from src.api import api_client, api_monitor, db_integration, league_monitor, payload_dedup
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+
+
+def _resultats(equipes, journee):
+    return [{"roundNumber": journee, "matches": [
+        {"homeTeam": equipes[i], "awayTeam": equipes[i + 1], "score": f"{i}:1"}
+        for i in range(0, len(equipes), 2)
+    ]}]
+
+
+def test_bases_par_ligue(monkeypatch, base_temporaire):
+    """Deux ligues écrites en parallèle : chaque thread ne voit que sa base."""
+    print("\n=== TEST: Une base par ligue ===")
+    monkeypatch.setitem(league_monitor.MULTI_LEAGUE_CONFIG, "DATA_DIR", str(base_temporaire))
+    monkeypatch.setitem(league_monitor.MULTI_LEAGUE_CONFIG, "BASE_PAR_LIGUE", True)
+
+    assert league_monitor.chemin_base_ligue(api_client.LEAGUE_ID) is None
+    ligues = {
+        9001: ["Alpha", "Beta", "Gamma", "Delta"],
+        9002: ["Delta", "Gamma", "Beta", "Alpha", "Epsilon", "Zeta"],
+    }
+    depart = threading.Barrier(len(ligues))
+    bilan = {}
+
+    def ecrire(league_id, equipes):
+        chemin = league_monitor.chemin_base_ligue(league_id)
+        with database.utiliser_base(chemin):
+            database.initialiser_db(equipes=[])
+            depart.wait()
+            ajoutees = db_integration.insert_api_teams([{"name": nom} for nom in equipes])
+            db_integration.insert_api_results(_resultats(equipes, 1))
+            verification = payload_dedup.verifier("results", "take=4", {"ligue": 1})
+            payload_dedup.confirmer("results", "take=4", verification, lignes=1)
+            with database.get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM resultats")
+                bilan[league_id] = (ajoutees, utils.get_equipe_id("Alpha"), cursor.fetchone()[0],
+                                    database.get_base_active())
+
+    threads = [threading.Thread(target=ecrire, args=item) for item in ligues.items()]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Même nom d'équipe, identifiants différents selon la ligue (cache par base)
+    assert bilan[9001][:3] == (4, 1, 2)
+    assert bilan[9002][:3] == (6, 4, 3)
+    assert bilan[9001][3].endswith("league_9001.db")
+    assert database.get_base_active() is None
+
+    # Empreintes de dédup séparées par base : la base principale n'a rien vu
+    assert not payload_dedup.verifier("results", "take=4", {"ligue": 1}).inchange
+    with database.utiliser_base(league_monitor.chemin_base_ligue(9001)):
+        assert payload_dedup.verifier("results", "take=4", {"ligue": 1}).inchange
+    print("[OK] Test reussi!")
+
+
+def test_limiteur_debit():
+    """Le limiteur partagé plafonne le débit total, tous threads confondus."""
+    print("\n=== TEST: Limiteur de débit ===")
+    limiteur = api_client.LimiteurDebit(40, rafale=2)
+    debut = time.monotonic()
+    threads = [threading.Thread(target=lambda: [limiteur.acquerir() for _ in range(5)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 20 jetons dont 2 en rafale : au moins 18 / 40 s
+    assert time.monotonic() - debut >= 0.4
+    print("[OK] Test reussi!")
+
+
+def test_classement_vide_au_demarrage(monkeypatch, base_temporaire):
+    """Premier classement vide (maintenance) : les équipes sont enregistrées au classement suivant."""
+    print("\n=== TEST: Classement vide au démarrage ===")
+    monkeypatch.setitem(league_monitor.MULTI_LEAGUE_CONFIG, "DATA_DIR", str(base_temporaire))
+    monkeypatch.setitem(league_monitor.MULTI_LEAGUE_CONFIG, "BASE_PAR_LIGUE", True)
+
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 2.5)  # 3 journees jouees
+    simulee = SimulatedSeasonSource(clock, equipes=["Alpha", "Beta", "Gamma", "Delta"])
+    appels = []
+
+    def classement(league_id):
+        appels.append(league_id)
+        return [] if len(appels) == 1 else simulee.get_ranking(league_id)
+    monkeypatch.setattr(api_client, "get_ranking", classement)
+    monkeypatch.setattr(api_client, "get_recent_results", simulee.get_recent_results)
+    monkeypatch.setattr(api_client, "get_upcoming_matches", simulee.get_upcoming_matches)
+
+    bilan = {}
+
+    def surveillance(source, **kwargs):
+        # Une collecte, dans le contexte de la ligue
+        bilan["succes"] = api_monitor.collect_full_data(3, source)
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM equipes")
+            bilan["equipes"] = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM resultats WHERE score_dom IS NOT NULL")
+            bilan["resultats"] = cursor.fetchone()[0]
+    monkeypatch.setattr(league_monitor, "start_monitoring", surveillance)
+
+    league_monitor._surveiller_ligue(9001, None, threading.Event(), verbose=False)
+
+    assert appels[:2] == [9001, 9001]
+    assert bilan == {"succes": True, "equipes": 4, "resultats": 6}
+    print("[OK] Test reussi!")
@@ -0,0 +1,85 @@
+"""
+Connexions de lecture seule du dashboard (database.get_read_connection) : un seul
+instantane pour toutes les requetes, jamais de journee a moitie ingeree, aucune
+attente derriere une transaction d'ingestion, ecritures refusees.
+"""
+import sys
+import os
+import sqlite3
+import threading
+import time
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pytest
+
+from src.core import config, database
+from src.api import db_integration
+from src.api.results_filter import iter_result_rows
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+
+
+def _compter(conn, journee=None):
+    sql = "SELECT COUNT(*) FROM resultats WHERE score_dom IS NOT NULL"
+    if journee is not None:
+        return conn.execute(sql + " AND journee = ?", (journee,)).fetchone()[0]
+    return conn.execute(sql).fetchone()[0]
+
+
+def test_instantane_lecture(base_temporaire):
+    """Ingestion concurrente : le lecteur garde son instantane et n'attend jamais."""
+    print("\n=== TEST: Lecture seule sur instantane ===")
+    dossier = base_temporaire
+    database.initialiser_db()
+
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 6.5)
+    lignes = list(iter_result_rows(SimulatedSeasonSource(clock).get_recent_results(skip=0, take=7)))
+    db_integration.insert_result_rows([l for l in lignes if l[0] <= 5])
+    assert database.lister_ligues() == [config.LEAGUE_ID]
+
+    # 1. Une journee commitee entre deux requetes du lecteur reste invisible jusqu'a la fin du bloc
+    with database.get_read_connection() as conn:
+        avant = _compter(conn)
+        db_integration.insert_result_rows([l for l in lignes if l[0] == 6])
+        assert _compter(conn) == avant == 50
+        assert _compter(conn, 6) == 0
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM resultats")
+    with database.get_read_connection() as conn:
+        assert _compter(conn, 6) == 10
+
+    # 2. Journee a moitie ingeree (transaction ouverte) : invisible, et le lecteur n'attend pas
+    moitie, fin = threading.Event(), threading.Event()
+
+    def ingestion():
+        with database.get_db_connection() as conn:
+            partition = database.get_partition(conn)
+            conn.execute("UPDATE resultats SET score_dom = NULL, score_ext = NULL "
+                         "WHERE league_id = ? AND session_id = ? AND journee = 6 AND id % 2 = 0", partition)
+            moitie.set()
+            fin.wait(10)
+
+    ecrivain = threading.Thread(target=ingestion)
+    ecrivain.start()
+    try:
+        assert moitie.wait(10)
+        debut = time.monotonic()
+        with database.get_read_connection() as conn:
+            assert _compter(conn, 6) == 10
+        assert time.monotonic() - debut < 1.0
+    finally:
+        fin.set()
+        ecrivain.join()
+    with database.get_read_connection() as conn:
+        assert _compter(conn, 6) == 5
+
+    # 3. Base absente : erreur explicite (jamais creee par un lecteur)
+    absente = os.path.join(dossier, "absente.db")
+    with pytest.raises(FileNotFoundError):
+        with database.get_read_connection(absente):
+            pass
+    assert not os.path.exists(absente)
+
+    print("[OK] Test reussi!")
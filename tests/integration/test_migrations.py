@@ -0,0 +1,233 @@
+"""
+Migrations de schéma versionnées (src/core/migrations.py) : seules les versions
+absentes de schema_version sont appliquées, une base à jour ne rejoue aucun DDL,
+et les migrations en ligne avancent par lots (éventuellement en arrière-plan).
+"""
+import sys
+import os
+import sqlite3
+import threading
+import time
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import agregats, config, database, migrations
+from src.core.migrations import Migration
+
+
+def _index(chemin):
+    conn = sqlite3.connect(chemin)
+    noms = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    return noms
+
+
+def _versions(chemin):
+    conn = sqlite3.connect(chemin)
+    versions = migrations.versions_appliquees(conn.cursor())
+    conn.close()
+    return versions
+
+
+def test_base_neuve_puis_a_jour(monkeypatch, base_temporaire):
+    """Base neuve : toutes les versions ; redémarrage : aucune migration ni DDL rejoué."""
+    print("\n=== TEST: Migrations d'une base neuve ===")
+    chemin = config.DB_NAME
+    database.initialiser_db()
+
+    assert _versions(chemin) == {m.version for m in migrations.MIGRATIONS}
+    assert "idx_predictions_journee" in _index(chemin)
+
+    # Redémarrage : aucune migration appelée, aucune instruction DDL exécutée
+    appels = []
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        m._replace(appliquer=lambda *args, nom=m.nom: appels.append(nom) or 0) for m in migrations.MIGRATIONS
+    ])
+    instructions = []
+    connecter = sqlite3.connect
+
+    def connecter_trace(*args, **kwargs):
+        conn = connecter(*args, **kwargs)
+        conn.set_trace_callback(instructions.append)
+        return conn
+
+    monkeypatch.setattr(database.sqlite3, "connect", connecter_trace)
+    database.initialiser_db()
+    monkeypatch.setattr(database.sqlite3, "connect", connecter)
+
+    assert appels == []
+    assert instructions
+    assert not [i for i in instructions if i.lstrip().upper().startswith(("CREATE", "ALTER", "DROP"))]
+    print("[OK] Test reussi!")
+
+
+def test_base_ancienne(base_temporaire):
+    """Base sans schema_version ni colonnes récentes : migrée une fois, données conservées."""
+    print("\n=== TEST: Migration d'une base ancienne ===")
+    chemin = config.DB_NAME
+    conn = sqlite3.connect(chemin)
+    conn.executescript("""
+        CREATE TABLE score_ia (id INTEGER PRIMARY KEY AUTOINCREMENT, score_total DECIMAL(10,2), date_maj TEXT);
+        INSERT INTO score_ia (score_total, date_maj) VALUES (42.5, '2024-01-01');
+    """)
+    conn.commit()
+    conn.close()
+
+    database.initialiser_db()
+    assert _versions(chemin) == {m.version for m in migrations.MIGRATIONS}
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT score, derniere_maj, league_id FROM score_ia")
+        assert tuple(cursor.fetchone()) == (42.5, '2024-01-01', config.LEAGUE_ID)
+        cursor.execute("SELECT COUNT(*) FROM score_ia")
+        assert cursor.fetchone()[0] == 1
+    print("[OK] Test reussi!")
+
+
+def test_migration_en_ligne_par_lots(monkeypatch, base_temporaire):
+    """Nouvelle migration en ligne : remplissage par lots courts, en arrière-plan, version notée à la fin."""
+    print("\n=== TEST: Migration en ligne par lots ===")
+    chemin = config.DB_NAME
+    database.initialiser_db()
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM equipes LIMIT 2")
+        dom, ext = [row[0] for row in cursor.fetchall()]
+        cursor.executemany("""
+            INSERT INTO predictions (journee, equipe_dom_id, equipe_ext_id, prediction, succes, league_id, session_id)
+            VALUES (?, ?, ?, '1', 1, ?, 1)
+        """, [(j, dom, ext, config.LEAGUE_ID) for j in range(1, 26)])
+
+    lots = []
+    remplir = migrations.remplissage_par_lots("predictions", "points_gagnes = 3", "points_gagnes IS NULL")
+
+    def remplir_trace(cursor, taille_lot):
+        lots.append(remplir(cursor, taille_lot))
+        return lots[-1]
+
+    version = migrations.MIGRATIONS[-1].version + 1
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [
+        Migration(version, "points_gagnes", remplir_trace, True)])
+    monkeypatch.setattr(migrations, "TAILLE_LOT", 10)
+
+    database.initialiser_db(migrations_en_ligne=True)
+    migrations.attendre_migrations_en_ligne(timeout=10)
+
+    assert lots == [10, 10, 5, 0]
+    assert version in _versions(chemin)
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM predictions WHERE points_gagnes = 3")
+        assert cursor.fetchone()[0] == 25
+
+    # Redémarrage : migration déjà notée, plus de lot
+    database.initialiser_db(migrations_en_ligne=True)
+    migrations.attendre_migrations_en_ligne(timeout=10)
+    assert lots == [10, 10, 5, 0]
+    print("[OK] Test reussi!")
+
+
+
+def test_index_pendant_ecritures(monkeypatch, base_temporaire):
+    """Index sur une grande table : construit dans une pause du moniteur, ses écritures continuent."""
+    print("\n=== TEST: Index en ligne et écritures concurrentes ===")
+    database.initialiser_db()
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM equipes LIMIT 2")
+        dom, ext = [row[0] for row in cursor.fetchall()]
+        cursor.executemany("""
+            INSERT INTO predictions (journee, equipe_dom_id, equipe_ext_id, prediction, league_id, session_id)
+            VALUES (?, ?, ?, '1', ?, 1)
+        """, [(j % 38 + 1, dom, ext, config.LEAGUE_ID) for j in range(50000)])
+
+    version = migrations.MIGRATIONS[-1].version + 1
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [Migration(
+        version, "index_test",
+        migrations._creation_index(["CREATE INDEX IF NOT EXISTS idx_test ON predictions(prediction, journee)"]), True)])
+    monkeypatch.setitem(migrations.INDEX_CONFIG, "FENETRE_INACTIVITE", 0.2)
+    monkeypatch.setitem(migrations.INDEX_CONFIG, "ATTENTE_MAX", 0.5)
+    fenetres = []
+    attendre = migrations._attendre_inactivite
+    monkeypatch.setattr(migrations, "_attendre_inactivite", lambda cursor: fenetres.append(attendre(cursor)) or fenetres[-1])
+
+    # Moniteur : écritures continues 1.5 s, puis relevés de 0.5 s séparés de pauses de 0.5 s
+    arret, ecrites, erreurs = threading.Event(), [], []
+
+    def moniteur():
+        debut = time.monotonic()
+        while not arret.is_set():
+            if time.monotonic() - debut > 1.5 and int((time.monotonic() - debut) * 2) % 2:
+                time.sleep(0.05)
+                continue
+            try:
+                with database.get_db_connection() as conn:
+                    conn.execute("""
+                        INSERT INTO predictions (journee, equipe_dom_id, equipe_ext_id, prediction, league_id, session_id)
+                        VALUES (99, ?, ?, 'X', ?, 1)
+                    """, (dom, ext, config.LEAGUE_ID))
+                ecrites.append(time.monotonic())
+            except Exception as e:
+                erreurs.append(e)
+            time.sleep(0.02)
+
+    thread = threading.Thread(target=moniteur)
+    thread.start()
+    try:
+        while not ecrites:
+            time.sleep(0.01)
+        debut = time.monotonic()
+        assert migrations.appliquer_en_ligne() == [version]
+        fin = time.monotonic()
+        while ecrites[-1] < fin + 0.5 and not erreurs:
+            time.sleep(0.05)
+    finally:
+        arret.set()
+        thread.join()
+
+    # Pas de construction pendant les écritures continues, puis index construit dans une pause
+    assert fenetres[0] is False and fenetres[-1] is True
+    assert erreurs == []
+    assert [t for t in ecrites if debut < t < fin]
+    assert "idx_test" in _index(config.DB_NAME)
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM predictions WHERE journee = 99")
+        assert cursor.fetchone()[0] == len(ecrites)
+    print("[OK] Test reussi!")
+
+def _colonnes(conn):
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    return {t: {col[1] for col in conn.execute(f"PRAGMA table_info({t})")} for t in tables}
+
+
+def test_ddl_fige(monkeypatch, base_temporaire):
+    """Migrations rejouées sur le DDL de leur version : base neuve = schéma courant, quoi qu'il devienne."""
+    print("\n=== TEST: DDL figé des migrations ===")
+    # Schéma courant modifié sans nouvelle migration : aucune migration ne le lit
+    schema = dict(database.SCHEMA_TABLES)
+    monkeypatch.setitem(database.SCHEMA_TABLES, "resultats",
+                        schema["resultats"].replace("score_ext INTEGER,", "score_ext INTEGER, colonne_future TEXT,"))
+    monkeypatch.setitem(database.SCHEMA_TABLES, "table_future", "CREATE TABLE IF NOT EXISTS {nom} (id INTEGER)")
+    monkeypatch.setattr(database, "INDEX", database.INDEX + ["CREATE INDEX IF NOT EXISTS idx_futur ON equipes(nom)"])
+    # Code courant des agrégats : la migration 6 garde son propre remplissage
+    monkeypatch.setattr(agregats, "reconstruire", lambda cursor: 1 / 0)
+    database.initialiser_db()
+
+    conn = sqlite3.connect(config.DB_NAME)
+    migrees = _colonnes(conn)
+    conn.close()
+    assert "colonne_future" not in migrees["resultats"] and "table_future" not in migrees
+    assert "idx_futur" not in _index(config.DB_NAME)
+
+    # Migrations et schéma courant d'origine : mêmes tables, mêmes colonnes, mêmes index
+    courant = sqlite3.connect(":memory:")
+    for table, ddl in schema.items():
+        courant.execute(ddl.format(nom=table, ligue=config.LEAGUE_ID))
+    attendues = _colonnes(courant)
+    courant.close()
+    assert {t: c for t, c in migrees.items() if t != "schema_version"} == attendues
+    noms = {i.split(" ON ")[0].split()[-1] for i in database.INDEX}
+    assert noms - {"idx_futur"} <= _index(config.DB_NAME)
+    print("[OK] Test reussi!")
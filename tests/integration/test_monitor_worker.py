@@ -0,0 +1,208 @@
+"""
+Worker du moniteur dans son propre processus (src/api/monitor_worker.py) :
+battement, arret propre, relance par le superviseur d'un worker arrete, fige ou
+bloque (battement sans progres), limite elargie pendant un entrainement ZEUS.
+"""
+import sys
+import os
+import threading
+import time
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.api import monitor_worker
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+
+# Faux worker : note son lancement, bat une fois, puis s'arrete en erreur ou se fige (SIGTERM ignore) ;
+# en mode bloque / entrainement, il continue de battre sans jamais progresser
+_FAUX_WORKER = """
+import os, signal, sys, time
+from src.api.monitor_worker import ecrire_battement
+chemin, lancements, mode = sys.argv[1:4]
+with open(lancements, "a") as f:
+    f.write(f"{{os.getpid()}}\\n")
+debut = time.time()
+phases = ["entrainement_zeus"] if mode == "entrainement" else []
+ecrire_battement({{"pid": os.getpid(), "battement": debut, "progres": debut, "phases": phases}}, chemin)
+if mode == "erreur":
+    sys.exit(1)
+signal.signal(signal.SIGTERM, signal.SIG_IGN)
+fin = debut + 60
+while time.time() < fin:
+    time.sleep(0.05)
+    if mode in ("bloque", "entrainement"):
+        ecrire_battement({{"pid": os.getpid(), "battement": time.time(), "progres": debut, "phases": phases}}, chemin)
+"""
+
+
+def _attendre(condition, delai=10.0):
+    fin = time.monotonic() + delai
+    while time.monotonic() < fin:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def _lancements(chemin):
+    try:
+        with open(chemin) as f:
+            return [int(l) for l in f.read().split()]
+    except OSError:
+        return []
+
+
+def _vivant(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def _superviseur(dossier, mode, **options):
+    battement = os.path.join(dossier, "battement.json")
+    lancements = os.path.join(dossier, "lancements.txt")
+    commande = [sys.executable, "-c", _FAUX_WORKER.format(), battement, lancements, mode]
+    superviseur = monitor_worker.Superviseur(commande, battement, verification=0.05,
+                                             DELAI_REDEMARRAGE=0.05, DELAI_MAX=0.2, DELAI_ARRET=0.5, **options)
+    return superviseur, lancements
+
+
+def test_battement(tmp_path):
+    """Phase en cours publiee, arret signale, battement perime detecte."""
+    print("\n=== TEST: Battement du worker ===")
+    chemin = str(tmp_path / "battement.json")
+    assert monitor_worker.lire_battement(chemin) is None
+
+    battement = monitor_worker.Battement(chemin, intervalle=0.05)
+    battement.demarrer()
+    with battement.phase("collecte", 12):
+        assert _attendre(lambda: (monitor_worker.lire_battement(chemin) or {}).get("phase") == "collecte")
+    etat = monitor_worker.lire_battement(chemin)
+    assert etat["statut"] == "actif" and etat["journee"] == 12 and etat["pid"] == os.getpid()
+    battement.arreter()
+    assert monitor_worker.lire_battement(chemin)["statut"] == "arrete"
+
+    monitor_worker.ecrire_battement({"battement": time.time() - 3600}, chemin)
+    assert monitor_worker.lire_battement(chemin)["statut"] == "perime"
+    print("[OK] Test reussi!")
+
+
+def test_relance_worker_arrete(tmp_path):
+    """Un worker qui s'arrete est relance, avec un delai croissant."""
+    print("\n=== TEST: Relance d'un worker arrete ===")
+    superviseur, lancements = _superviseur(str(tmp_path), "erreur")
+    superviseur.demarrer()
+    try:
+        assert _attendre(lambda: len(_lancements(lancements)) >= 3)
+    finally:
+        superviseur.arreter()
+    assert superviseur.redemarrages >= 2
+    assert superviseur.processus.poll() is not None
+    print("[OK] Test reussi!")
+
+
+def test_relance_worker_fige(tmp_path):
+    """Un worker fige (battement perime, SIGTERM ignore) est tue puis relance."""
+    print("\n=== TEST: Relance d'un worker fige ===")
+    superviseur, lancements = _superviseur(str(tmp_path), "fige",
+                                           BATTEMENT_PERIME=0.5)
+    superviseur.demarrer()
+    try:
+        assert _attendre(lambda: len(_lancements(lancements)) >= 2)
+        premier = _lancements(lancements)[0]
+    finally:
+        superviseur.arreter()
+    assert superviseur.redemarrages >= 1
+    assert superviseur.processus.poll() is not None
+    # Le worker fige a bien ete tue (et attendu)
+    assert not _vivant(premier)
+    print("[OK] Test reussi!")
+
+
+def test_progres(tmp_path):
+    """Battement sans progres : fige ; attente annoncee et entrainement elargissent la limite."""
+    print("\n=== TEST: Progres du worker ===")
+    chemin = str(tmp_path / "battement.json")
+    battement = monitor_worker.Battement(chemin, intervalle=60)
+    limites = {"BATTEMENT_PERIME": 100, "PROGRES_ENTRAINEMENT": 1000}
+
+    def statut(recul, **etat):
+        """Statut avec un dernier progres vieux de `recul` secondes (battement frais)."""
+        return monitor_worker.statut_battement(
+            {"battement": time.time(), "progres": time.time() - recul, **etat}, limites)
+
+    assert statut(50) == "actif" and statut(150) == "fige"
+    assert statut(150, attente=80) == "actif"
+    assert statut(500, phases=["collecte", "entrainement_zeus"]) == "actif"
+    assert statut(1100, phases=["entrainement_zeus"]) == "fige"
+    assert monitor_worker.statut_battement({"battement": time.time() - 150, "progres": time.time()}, limites) == "perime"
+
+    # Phases imbriquees (moniteur et transition de saison) : chacune retiree a sa fin
+    with battement.phase("entrainement_zeus", 37):
+        with battement.phase("collecte", 1):
+            assert battement.etat["phases"] == ["entrainement_zeus", "collecte"]
+        assert battement.etat["phase"] == "entrainement_zeus"
+    assert battement.etat["phases"] == [] and battement.etat["phase"] == "surveillance"
+
+    # Chaque tour de boucle se termine par une attente de l'horloge du worker : progres signale
+    battement.etat["progres"] = 0
+    horloge = monitor_worker._HorlogeInterruptible(threading.Event(), battement)
+    horloge.sleep(0.01)
+    assert time.time() - battement.etat["progres"] < 5 and battement.etat["attente"] == 0.01
+    battement.battre()
+    assert monitor_worker.lire_battement(chemin)["statut"] == "actif"
+    print("[OK] Test reussi!")
+
+
+def test_relance_worker_bloque(tmp_path):
+    """Battement a jour mais aucun progres : relance ; pas pendant un entrainement ZEUS."""
+    print("\n=== TEST: Relance d'un worker bloque ===")
+    superviseur, lancements = _superviseur(str(tmp_path), "bloque", BATTEMENT_PERIME=0.5)
+    superviseur.demarrer()
+    try:
+        assert _attendre(lambda: len(_lancements(lancements)) >= 2)
+    finally:
+        superviseur.arreter()
+    assert superviseur.redemarrages >= 1
+
+    entrainement = tmp_path / "entrainement"
+    entrainement.mkdir()
+    superviseur, lancements = _superviseur(str(entrainement), "entrainement",
+                                           BATTEMENT_PERIME=0.5, PROGRES_ENTRAINEMENT=30)
+    superviseur.demarrer()
+    try:
+        assert _attendre(lambda: _lancements(lancements))
+        time.sleep(1.5)
+        assert len(_lancements(lancements)) == 1 and superviseur.redemarrages == 0
+    finally:
+        superviseur.arreter()
+    print("[OK] Test reussi!")
+
+
+def test_worker_surveillance(monkeypatch, base_temporaire):
+    """Le corps du worker collecte, publie sa phase et s'arrete des la demande."""
+    print("\n=== TEST: Corps du worker ===")
+    monkeypatch.setitem(monitor_worker.WORKER_CONFIG, "INTERVALLE_BATTEMENT", 0.05)
+
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 5.5)
+    journees = []
+    arret = threading.Event()
+    codes = []
+    thread = threading.Thread(target=lambda: codes.append(monitor_worker.executer_worker(
+        callback=journees.append, source=SimulatedSeasonSource(clock), arret=arret)))
+    thread.start()
+    try:
+        assert _attendre(lambda: journees)
+        assert _attendre(lambda: (monitor_worker.lire_battement() or {}).get("statut") == "actif")
+    finally:
+        arret.set()
+        thread.join(10)
+    assert not thread.is_alive() and codes == [0]
+    assert journees == [6]
+    assert monitor_worker.lire_battement()["statut"] == "arrete"
+    assert os.path.dirname(monitor_worker.chemin_battement()) == str(base_temporaire)
+    print("[OK] Test reussi!")
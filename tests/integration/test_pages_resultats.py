@@ -0,0 +1,113 @@
+"""
+Résultats paginés côté serveur (src/core/pages_resultats.py) : pagination par clé
+complète et sans doublon, filtres journée / équipe / session en SQL, pages stables
+pendant l'ingestion d'une nouvelle journée, lecture par l'index de `resultats`.
+"""
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database, pages_resultats
+from src.api import db_integration
+from src.api.results_filter import iter_result_rows
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+
+
+def _parcourir(conn, partition, taille, **filtres):
+    """Toutes les pages, dans l'ordre : (lignes, nombre de pages)."""
+    lignes, curseur, pages = [], None, 0
+    while True:
+        page, curseur = pages_resultats.lire_page(conn, *partition, apres=curseur, taille=taille, **filtres)
+        assert len(page) <= taille
+        lignes += page
+        pages += 1
+        if curseur is None:
+            return lignes, pages
+
+
+def _max_id(conn, partition):
+    return conn.execute("SELECT MAX(id) FROM resultats WHERE league_id = ? AND session_id = ?", partition).fetchone()[0]
+
+
+def test_pagination_resultats(base_temporaire):
+    """Pages par clé == requête complète ; filtres ; ingestion entre deux pages."""
+    print("\n=== TEST: Pagination des résultats ===")
+    database.initialiser_db()
+
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 6.5)
+    lignes = list(iter_result_rows(SimulatedSeasonSource(clock).get_recent_results(skip=0, take=7)))
+    db_integration.insert_result_rows([l for l in lignes if l[0] <= 5])
+
+    with database.get_read_connection() as conn:
+        partition = (config.LEAGUE_ID, database.lire_session(conn.cursor(), config.LEAGUE_ID))
+        attendu = [tuple(r) for r in conn.execute("""
+            SELECT r.journee, e1.nom, COALESCE(r.score_dom, '?') || ' - ' || COALESCE(r.score_ext, '?'), e2.nom
+            FROM resultats r JOIN equipes e1 ON r.equipe_dom_id = e1.id JOIN equipes e2 ON r.equipe_ext_id = e2.id
+            WHERE r.league_id = ? AND r.session_id = ? ORDER BY r.journee DESC, r.id DESC
+        """, partition)]
+        assert len(attendu) == 50
+
+        # 1. Toutes les pages (taille non multiple d'une journée) == requête complète, sans doublon
+        toutes, pages = _parcourir(conn, partition, 7)
+        assert [tuple(l[c] for c in pages_resultats.COLONNES) for l in toutes] == attendu
+        assert pages == 8
+
+        # 2. Filtres journée et équipe
+        journee, _ = _parcourir(conn, partition, 4, journee=3)
+        assert len(journee) == 10 and {l["J"] for l in journee} == {3}
+        equipe_id, nom = pages_resultats.lister_equipes(conn, config.LEAGUE_ID)[0]
+        equipe, _ = _parcourir(conn, partition, 2, equipe_id=equipe_id)
+        assert [l["J"] for l in equipe] == [5, 4, 3, 2, 1]
+        assert all(nom in (l["Domicile"], l["Exterieur"]) for l in equipe)
+        assert pages_resultats.lister_journees(conn, *partition) == [5, 4, 3, 2, 1]
+        assert pages_resultats.lister_sessions(conn, config.LEAGUE_ID) == [partition[1]]
+        assert pages_resultats.lister_journees(conn, config.LEAGUE_ID, partition[1] + 1) == []
+
+        # Requêtes réelles des pages : index d'unicité (league_id, session_id, journee, ...),
+        # jamais de parcours de table (idx_resultats_journee supprimé par la migration 2)
+        for filtres in ({}, {"journee": 3}, {"equipe_id": equipe_id}, {"apres": (3, 100)}):
+            sql, params = pages_resultats.requete_page(*partition, filtres.get("journee"), filtres.get("equipe_id"),
+                                                       filtres.get("apres"), 10)
+            plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+            assert plan[0].startswith("SEARCH r USING INDEX sqlite_autoindex_resultats_1 (league_id=? AND session_id=?"), plan
+            assert not [etape for etape in plan if etape.startswith("SCAN")], plan
+        version = pages_resultats.version_resultats(conn, *partition)
+        assert version[:2] == (5, _max_id(conn, partition))
+        assert pages_resultats.version_resultats(conn, config.LEAGUE_ID, partition[1] + 1)[:2] == (None, 0)
+
+    # Score corrigé sur une ancienne journée, d'une valeur connue à une autre (2-1 -> 1-1) : la version change
+    journee_1 = [l for l in lignes if l[0] == 1]
+    j, dom, ext, score_dom, score_ext = journee_1[0]
+    corrige = (j, dom, ext, score_dom + 1, score_ext)
+    db_integration.insert_result_rows([corrige])
+    with database.get_read_connection() as conn:
+        corrigee = pages_resultats.version_resultats(conn, *partition)
+        assert corrigee != version and corrigee[:2] == version[:2]
+        page, _ = pages_resultats.lire_page(conn, *partition, journee=1, taille=10)
+        assert f"{score_dom + 1} - {score_ext}" in [l["Score"] for l in page if l["Domicile"] == dom]
+    # Réécriture identique : version inchangée ; score d'origine rétabli : nouvelle version
+    db_integration.insert_result_rows([corrige])
+    with database.get_read_connection() as conn:
+        assert pages_resultats.version_resultats(conn, *partition) == corrigee
+    db_integration.insert_result_rows(journee_1)
+    with database.get_read_connection() as conn:
+        version = pages_resultats.version_resultats(conn, *partition)
+        assert version != corrigee and version[:2] == corrigee[:2]
+
+    # 3. Une journée ingérée entre deux pages : la suite du parcours ne saute ni ne répète rien
+    with database.get_read_connection() as conn:
+        premiere, curseur = pages_resultats.lire_page(conn, *partition, taille=10)
+    db_integration.insert_result_rows([l for l in lignes if l[0] == 6])
+    with database.get_read_connection() as conn:
+        suite, suivant = [], curseur
+        while suivant is not None:
+            page, suivant = pages_resultats.lire_page(conn, *partition, apres=suivant, taille=10)
+            suite += page
+        assert [l["J"] for l in premiere + suite] == [j for j, *_ in attendu]
+        # La version change : les pages en cache du dashboard sont relues
+        assert pages_resultats.version_resultats(conn, *partition) != version
+
+    print("[OK] Test reussi!")
@@ -0,0 +1,105 @@
+"""
+Partitionnement des tables par ligue (league_id) et session (session_id) :
+plusieurs ligues dans une même base, isolées via database.utiliser_ligue,
+et migration d'une base antérieure au partitionnement.
+"""
+import sys
+import os
+import sqlite3
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database, utils, validation
+from src.api import db_integration
+
+
+def _resultats(equipes, journee):
+    return [{"roundNumber": journee, "matches": [
+        {"homeTeam": equipes[i], "awayTeam": equipes[i + 1], "score": f"{i}:1"}
+        for i in range(0, len(equipes), 2)
+    ]}]
+
+
+def _classement(equipes):
+    return [{"name": nom, "position": i + 1, "points": 3, "won": 1, "draw": 0, "lost": 0,
+             "history": ["Won"]} for i, nom in enumerate(equipes)]
+
+
+def _compter(table, league_id):
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE league_id = ?", (league_id,))
+        return cursor.fetchone()[0]
+
+
+def test_deux_ligues_meme_base(base_temporaire):
+    """Mêmes noms d'équipes dans deux ligues : identifiants, résultats et classements séparés."""
+    print("\n=== TEST: Deux ligues dans une base ===")
+    ligues = {9101: ["Alpha", "Beta", "Gamma", "Delta"],
+              9102: ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zeta"]}
+    ids_alpha = {}
+
+    for league_id, equipes in ligues.items():
+        with database.utiliser_ligue(league_id):
+            database.initialiser_db(equipes=[])
+            assert db_integration.insert_api_teams([{"name": nom} for nom in equipes]) == len(equipes)
+            db_integration.insert_api_results(_resultats(equipes, 1))
+            db_integration.insert_api_ranking(_classement(equipes))
+            ids_alpha[league_id] = utils.get_equipe_id("Alpha")
+            assert database.get_partition() == (league_id, 1)
+
+    assert ids_alpha[9101] != ids_alpha[9102]
+    assert _compter("resultats", 9101) == 2 and _compter("resultats", 9102) == 3
+
+    # Le classement d'une ligue ne remplace pas celui de l'autre
+    with database.utiliser_ligue(9101):
+        db_integration.insert_api_ranking(_classement(ligues[9101]))
+        # Journée complète = nombre d'équipes de la ligue / 2
+        assert validation.valider_donnees_journee(1)
+    assert _compter("classement", 9101) == 4 and _compter("classement", 9102) == 6
+    assert sorted(database.lister_ligues()) == [9101, 9102]
+    assert database.get_ligue_active() == config.LEAGUE_ID
+
+    print("[OK] Test reussi!")
+
+
+def test_migration_base_existante(base_temporaire):
+    """Une base sans league_id est reconstruite : données conservées dans la ligue par défaut."""
+    print("\n=== TEST: Migration vers le schéma partitionné ===")
+    conn = sqlite3.connect(config.DB_NAME)
+    conn.executescript("""
+        CREATE TABLE equipes (id INTEGER PRIMARY KEY AUTOINCREMENT, nom TEXT UNIQUE NOT NULL);
+        CREATE TABLE resultats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, journee INTEGER NOT NULL,
+            equipe_dom_id INTEGER NOT NULL, equipe_ext_id INTEGER NOT NULL,
+            score_dom INTEGER, score_ext INTEGER,
+            FOREIGN KEY (equipe_dom_id) REFERENCES equipes(id),
+            FOREIGN KEY (equipe_ext_id) REFERENCES equipes(id),
+            UNIQUE(journee, equipe_dom_id, equipe_ext_id)
+        );
+        INSERT INTO equipes (nom) VALUES ('Alpha'), ('Beta');
+        INSERT INTO resultats (journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext) VALUES (1, 1, 2, 2, 0);
+    """)
+    conn.commit()
+    conn.close()
+
+    database.initialiser_db(equipes=[])
+    database.initialiser_db(equipes=[])  # Idempotent
+
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT league_id, session_id, score_dom FROM resultats")
+        assert [tuple(r) for r in cursor.fetchall()] == [(config.LEAGUE_ID, 1, 2)]
+        cursor.execute("SELECT id, league_id FROM equipes ORDER BY id")
+        assert [tuple(r) for r in cursor.fetchall()] == [(1, config.LEAGUE_ID), (2, config.LEAGUE_ID)]
+        cursor.execute("PRAGMA foreign_key_check")
+        assert cursor.fetchall() == []
+
+    # Même nom dans une autre ligue : autorisé par UNIQUE(league_id, nom)
+    with database.utiliser_ligue(9103):
+        database.initialiser_db(equipes=[])
+        assert db_integration.insert_api_teams([{"name": "Alpha"}]) == 1
+    assert utils.get_equipe_id("Alpha") == 1
+
+    print("[OK] Test reussi!")
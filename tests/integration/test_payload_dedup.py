@@ -0,0 +1,52 @@
+"""
+Deduplication des reponses API (src/api/payload_dedup.py) : une reponse identique
+n'est plus filtree ni inseree, un echec n'est jamais memorise.
+"""
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.api import payload_dedup, api_monitor
+
+
+def _matchs(cote):
+    return {"rounds": [{"roundNumber": 5, "matches": [
+        {"homeTeam": {"name": "A"}, "awayTeam": {"name": "B"},
+         "eventBetTypes": [{"name": "1X2", "eventBetTypeItems": [{"shortName": "1", "odds": cote}]}]}
+    ]}]}
+
+
+def test_reponses_inchangees(monkeypatch):
+    """Seule une reponse nouvelle (ou non confirmee) atteint le filtrage et la base."""
+    print("\n=== TEST: Deduplication des reponses API ===")
+    payload_dedup.reinitialiser()
+    insertions = []
+    monkeypatch.setattr(api_monitor, "insert_match_rows", lambda m: insertions.append(m) or len(m))
+
+    assert api_monitor._traiter_matchs(_matchs(1.8)) == (1, False)
+    # Meme contenu, autre objet (ordre des cles different) : court-circuite
+    assert api_monitor._traiter_matchs(dict(reversed(list(_matchs(1.8).items())))) == (1, True)
+    assert api_monitor._traiter_matchs(_matchs(1.9)) == (1, False)
+    assert len(insertions) == 2
+
+    # Un echec d'insertion n'est pas memorise : la meme reponse est retraitee
+    def _echec(m):
+        raise RuntimeError("base indisponible")
+    monkeypatch.setattr(api_monitor, "insert_match_rows", _echec)
+    try:
+        api_monitor._traiter_matchs(_matchs(2.0))
+    except RuntimeError:
+        pass
+    monkeypatch.setattr(api_monitor, "insert_match_rows", lambda m: insertions.append(m) or 1)
+    assert api_monitor._traiter_matchs(_matchs(2.0)) == (1, False)
+
+    stats = payload_dedup.get_statistiques()["matches"]
+    assert stats == {"recues": 5, "inchangees": 1, "ecritures_evitees": 1}
+
+    # Reinitialisation de session : tout est oublie
+    payload_dedup.oublier()
+    assert api_monitor._traiter_matchs(_matchs(2.0)) == (1, False)
+    payload_dedup.reinitialiser()
+    print("[OK] Test reussi!")
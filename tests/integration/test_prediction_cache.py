@@ -0,0 +1,127 @@
+"""
+Cache des sélections par journée (intelligence.selectionner_meilleurs_matchs_ameliore) :
+une relance à entrées identiques ne lit que les versions des données (une requête),
+n'écrit pas la base et n'appelle pas ZEUS ; un changement de cotes, y compris écrit
+par un autre processus, invalide le cache, borné en taille ; les prédictions ne sont
+jamais dupliquées.
+"""
+import sys
+import os
+import json
+import subprocess
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database
+from src.api import db_integration
+from src.analysis import intelligence
+
+RACINE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+JOURNEE = 12
+
+# Ingestion des cotes par un autre processus (worker du moniteur) sur la même base
+_AUTRE_PROCESSUS = """
+import json, sys
+from src.core import config
+from src.api import db_integration
+config.DB_NAME, config.TURSO_URL, config.TURSO_TOKEN = sys.argv[1], None, None
+db_integration.insert_api_matches(json.loads(sys.argv[2]))
+"""
+
+
+def _classement():
+    historiques = [["Won", "Won", "Won", "Draw", "Won"], ["Lost", "Lost", "Draw", "Lost", "Lost"]]
+    return [
+        {"name": nom, "position": i + 1, "points": 40 - 2 * i, "won": 7, "draw": 2, "lost": 2,
+         "history": historiques[i % 2]}
+        for i, nom in enumerate(config.EQUIPES)
+    ]
+
+
+def _matchs(cote_1=1.75):
+    equipes = config.EQUIPES
+    matchs = [
+        {"homeTeam": equipes[i], "awayTeam": equipes[i + 1],
+         "odds": [{"type": "1", "odds": cote_1}, {"type": "X", "odds": 3.4}, {"type": "2", "odds": 4.5}]}
+        for i in range(0, len(equipes), 2)
+    ]
+    return [{"roundNumber": JOURNEE, "matches": matchs}]
+
+
+def _doublons():
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM predictions GROUP BY journee, equipe_dom_id, equipe_ext_id HAVING COUNT(*) > 1
+            )
+        """)
+        return cursor.fetchone()[0]
+
+
+def test_cache_predictions_journee(monkeypatch, base_temporaire):
+    """Relance sans changement servie par le cache ; cotes modifiées -> nouvelle analyse."""
+    print("\n=== TEST: Cache des sélections par journée ===")
+    # Le rechargement de config ramènerait la base principale
+    monkeypatch.setattr(intelligence, "_reload_config", lambda: None)
+    intelligence.invalidate_predictions_cache()
+
+    appels_zeus = []
+    monkeypatch.setattr(intelligence.zeus_inference, "predire_match",
+                        lambda match_data: appels_zeus.append(match_data) or (0, 0.9))
+
+    try:
+        database.initialiser_db()
+        db_integration.insert_api_ranking(_classement())
+        db_integration.insert_api_matches(_matchs())
+
+        premiere = intelligence.selectionner_meilleurs_matchs_ameliore(JOURNEE)
+        nb_appels = len(appels_zeus)
+        assert nb_appels == len(config.EQUIPES) // 2
+
+        # Entrées identiques : versions relues, aucune autre lecture/écriture, aucun appel au modèle
+        def _interdit(*args, **kwargs):
+            raise AssertionError("Accès base inattendu")
+        connexion = intelligence.get_db_connection
+        monkeypatch.setattr(intelligence, "get_db_connection", _interdit)
+        assert intelligence.selectionner_meilleurs_matchs_ameliore(JOURNEE) == premiere
+        assert len(appels_zeus) == nb_appels
+
+        # Cotes réécrites à l'identique (rafraîchissement proactif) : toujours en cache
+        db_integration.insert_api_matches(_matchs())
+        assert intelligence.selectionner_meilleurs_matchs_ameliore(JOURNEE) == premiere
+        assert len(appels_zeus) == nb_appels
+
+        # Cotes modifiées : nouvelle analyse, sans doublon en base
+        monkeypatch.setattr(intelligence, "get_db_connection", connexion)
+        db_integration.insert_api_matches(_matchs(cote_1=1.95))
+        intelligence.selectionner_meilleurs_matchs_ameliore(JOURNEE)
+        assert len(appels_zeus) == 2 * nb_appels
+
+        # Cotes modifiées par un autre processus : vues par les versions en base
+        subprocess.run([sys.executable, "-c", _AUTRE_PROCESSUS, config.DB_NAME, json.dumps(_matchs(cote_1=2.1))],
+                       cwd=RACINE, check=True)
+        intelligence.selectionner_meilleurs_matchs_ameliore(JOURNEE)
+        assert len(appels_zeus) == 3 * nb_appels
+        intelligence.selectionner_meilleurs_matchs_ameliore(JOURNEE)
+        assert len(appels_zeus) == 3 * nb_appels
+
+        # Cache borné : la journée la moins récemment servie est évincée
+        monkeypatch.setitem(intelligence.PREDICTIONS_CACHE_CONFIG, "MAX_JOURNEES", 1)
+        intelligence.selectionner_meilleurs_matchs_ameliore(JOURNEE + 1)
+        assert [cle[-1] for cle in intelligence._PREDICTIONS_CACHE] == [JOURNEE + 1]
+
+        # Réenregistrement d'une sélection déjà en base : mise à jour, pas de doublon
+        selection = [{"equipe_dom_id": 1, "equipe_ext_id": 2, "prediction": "1"}]
+        assert intelligence._enregistrer_predictions(JOURNEE, selection)
+        selection[0]["prediction"] = "X"
+        assert intelligence._enregistrer_predictions(JOURNEE, selection)
+        assert _doublons() == 0
+        with database.get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT prediction FROM predictions WHERE journee = ?", (JOURNEE,))
+            assert [r[0] for r in cursor.fetchall()] == ["X"]
+    finally:
+        intelligence.invalidate_predictions_cache()
+    print("[OK] Test reussi!")
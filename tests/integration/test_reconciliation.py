@@ -0,0 +1,84 @@
+"""
+Reconciliation base / API (src/api/reconciliation.py) : empreintes par journee,
+reparation des seules journees divergentes (polls manques, score corrompu, cotes)
+et budget de requetes borne.
+"""
+import sys
+import os
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import database
+from src.api import data_comparator, db_integration, reconciliation
+from src.api.matches_filter import extract_matches_with_local_ids
+from src.api.results_filter import extract_results_minimal
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+
+
+class SourceComptee:
+    """Source simulee comptant les requetes de resultats et de cotes."""
+
+    def __init__(self, source):
+        self.source = source
+        self.requetes = []
+
+    def get_recent_results(self, skip=0, take=5):
+        self.requetes.append(("results", skip, take))
+        return self.source.get_recent_results(skip=skip, take=take)
+
+    def get_upcoming_matches(self):
+        self.requetes.append(("matches",))
+        return self.source.get_upcoming_matches()
+
+
+def _executer(sql, params=()):
+    with database.get_db_connection() as conn:
+        conn.cursor().execute(sql, params)
+
+
+def test_reparation_derive(base_temporaire):
+    """J15-J22 manquees, un score corrompu en J5 et une cote faussee : seules ces journees sont reecrites."""
+    print("\n=== TEST: Reconciliation base / API ===")
+    database.initialiser_db()
+
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 24.5)  # 25 journees jouees
+    source = SourceComptee(SimulatedSeasonSource(clock))
+    historique = extract_results_minimal(source.source.get_recent_results(skip=0, take=25))
+    db_integration.insert_api_results([r for r in historique if not 15 <= r["roundNumber"] <= 22])
+    db_integration.insert_api_matches(extract_matches_with_local_ids(source.source.get_upcoming_matches(), limit=2))
+    _executer("UPDATE resultats SET score_dom = score_dom + 1 WHERE journee = 5 AND id = "
+              "(SELECT MIN(id) FROM resultats WHERE journee = 5)")
+    _executer("UPDATE cotes SET cote_x = cote_x + 0.5 WHERE journee = 27")
+
+    # Budget trop court : une page seulement, reprise au prochain passage
+    bilan = reconciliation.reconcilier(source, budget=2)
+    assert bilan["budget_epuise"] and bilan["requetes"] == 2
+    assert bilan["journees_reparees"] == list(range(16, 23))
+    assert bilan["cotes_reparees"] == [27]
+
+    # Passage suivant : page recente conforme, mais historique pas encore verifie jusqu'a J1
+    source.requetes.clear()
+    bilan = reconciliation.reconcilier(source)
+    assert bilan["journees_reparees"] == [5, 15]
+    assert bilan["cotes_reparees"] == []
+    assert not bilan["budget_epuise"]
+    assert source.requetes == [("results", 0, 10), ("results", 10, 10), ("results", 20, 10), ("matches",)]
+
+    # Base conforme : une page de resultats + les cotes, aucune ecriture
+    source.requetes.clear()
+    bilan = reconciliation.reconcilier(source)
+    assert (bilan["journees_reparees"], bilan["cotes_reparees"], bilan["requetes"]) == ([], [], 2)
+
+    # Base identique a l'API sur toute la saison (noms API normalises comme a l'insertion)
+    api = extract_results_minimal(source.source.get_recent_results(skip=0, take=25))
+    for r in api:
+        for m in r["matches"]:
+            m["homeTeam"] = db_integration.normalize_team_name(m["homeTeam"])
+            m["awayTeam"] = db_integration.normalize_team_name(m["awayTeam"])
+    comparaison = data_comparator.compare_results(api, data_comparator.rows_from_db("resultats"),
+                                                  labels=("api", "base"))
+    assert comparaison["coherence"] == 100.0 and comparaison["total_matches"] == 250
+
+    print("[OK] Test reussi!")
@@ -0,0 +1,186 @@
+"""
+Registre des modeles ZEUS (src/zeus/registry.py) et rechargement a chaud
+(src/zeus/inference.py) : version epinglee jamais remplacee, candidate moins
+bonne rejetee sans toucher au pointeur ni au modele servi, pointeur ACTIVE
+jamais ecrit a moitie, agent precedent conserve si le chargement echoue.
+"""
+import sys
+import os
+import json
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import pytest
+
+from src.api import season_rollover
+from src.zeus import agent as zeus_agent, inference, registry
+
+
+@pytest.fixture
+def registre(tmp_path, monkeypatch):
+    """Registre vide dans tmp_path ; scores de validation fixes par fichier modele."""
+    monkeypatch.setattr(zeus_agent, "MODELS_DIR", str(tmp_path / "zeus"))
+    os.makedirs(zeus_agent.MODELS_DIR)
+    scores = {}
+
+    def evaluation(chemin, algo="PPO", db_path=None):
+        with open(chemin, encoding="utf-8") as f:
+            return {"score": scores[f.read()], "nb_matchs": 10, "nb_paris": 5}
+    monkeypatch.setattr(registry, "evaluer_modele", evaluation)
+
+    def version(nom, score):
+        source = tmp_path / f"{nom}.zip"
+        source.write_text(nom, encoding="utf-8")
+        scores[nom] = score
+        return registry.enregistrer_version(str(source), "zeus_v2")
+    version.scores = scores
+    return version
+
+
+def _pointeur():
+    with open(os.path.join(zeus_agent.MODELS_DIR, registry.FICHIER_ACTIF), "rb") as f:
+        return f.read()
+
+
+def test_version_epinglee(registre):
+    """Une version epinglee n'est jamais remplacee, meme par une candidate meilleure."""
+    print("\n=== TEST: Version épinglée ===")
+    v1 = registre("v1", 1.0)
+    registry.activer_version(v1, epingler=True)
+    avant = _pointeur()
+
+    v2 = registre("v2", 5.0)
+    assert not registry.promouvoir_si_meilleure(v2)
+    assert registry.get_version_active() == v1 and _pointeur() == avant
+    # La candidate est evaluee et son score conserve
+    assert registry.lire_meta(v2)["score_validation"] == 5.0
+
+    # Desepinglee, la meme candidate est promue
+    registry.desepingler()
+    assert registry.promouvoir_si_meilleure(v2)
+    assert registry.get_version_active() == v2
+
+    print("[OK] Test reussi!")
+
+
+def test_candidate_moins_bonne(registre, monkeypatch):
+    """Candidate moins bonne que le modele servi : pointeur et modele servi inchanges."""
+    print("\n=== TEST: Candidate moins bonne rejetée ===")
+    # 1. Registre vide : comparaison avec le modele historique
+    legacy = registry.chemin_legacy()
+    with open(legacy, "w", encoding="utf-8") as f:
+        f.write("historique")
+    registre.scores["historique"] = 2.0
+    v1 = registre("v1", 1.0)
+    assert not registry.promouvoir_si_meilleure(v1)
+    assert registry.get_version_active() is None
+    assert not os.path.exists(os.path.join(zeus_agent.MODELS_DIR, registry.FICHIER_ACTIF))
+
+    # Sans version active, le hot reload ne recharge pas le modele historique
+    with monkeypatch.context() as m:
+        m.setattr(inference, "reload_model", lambda version=None: pytest.fail("rechargement inattendu"))
+        season_rollover._etape_hot_reload({"id": 1})
+
+    # 2. Version active : la candidate moins bonne est rejetee, egale (tolerance 0) acceptee
+    v2 = registre("v2", 3.0)
+    assert registry.promouvoir_si_meilleure(v2)
+    avant = _pointeur()
+    v3 = registre("v3", 2.5)
+    assert not registry.promouvoir_si_meilleure(v3)
+    assert registry.get_version_active() == v2 and _pointeur() == avant
+
+    # Le hot reload de fin de job ne recharge rien : l'agent servi reste en place
+    servi = object()
+    monkeypatch.setattr(inference, "_zeus_agent", servi)
+    monkeypatch.setattr(inference, "_version_chargee", v2)
+    monkeypatch.setattr(inference, "reload_model", lambda version=None: pytest.fail("rechargement inattendu"))
+    season_rollover._etape_hot_reload({"id": 1})
+    assert inference.get_agent() is servi and inference.get_version_chargee() == v2
+
+    v4 = registre("v4", 3.0)
+    assert registry.promouvoir_si_meilleure(v4)
+    assert registry.get_version_active() == v4
+
+    print("[OK] Test reussi!")
+
+
+def test_pointeur_atomique(registre, monkeypatch):
+    """ACTIVE remplace d'un bloc par os.replace ; une ecriture interrompue le laisse intact."""
+    print("\n=== TEST: Pointeur ACTIVE atomique ===")
+    v1, v2 = registre("v1", 1.0), registre("v2", 2.0)
+    registry.activer_version(v1)
+    actif = os.path.join(zeus_agent.MODELS_DIR, registry.FICHIER_ACTIF)
+    avant = _pointeur()
+
+    # 1. Au moment du remplacement : ACTIVE encore intact, fichier temporaire complet
+    remplacer, remplacements = os.replace, []
+
+    def remplacement(source, cible):
+        if cible == actif:
+            assert _pointeur() == avant
+            with open(source, encoding="utf-8") as f:
+                assert json.load(f)["version"] == v2
+            remplacements.append(source)
+        remplacer(source, cible)
+    monkeypatch.setattr(registry.os, "replace", remplacement)
+    registry.activer_version(v2)
+    assert remplacements == [f"{actif}.tmp"] and registry.get_version_active() == v2
+    monkeypatch.setattr(registry.os, "replace", remplacer)
+
+    # 2. Ecriture interrompue en plein JSON : ACTIVE inchange et toujours lisible
+    avant, dump = _pointeur(), json.dump
+
+    def dump_interrompu(data, f, **kwargs):
+        f.write('{"version": "v')
+        raise OSError("disque plein")
+    monkeypatch.setattr(registry.json, "dump", dump_interrompu)
+    with pytest.raises(OSError):
+        registry.activer_version(v1)
+    monkeypatch.setattr(registry.json, "dump", dump)
+    assert _pointeur() == avant
+    assert registry.lire_pointeur_actif()["version"] == v2
+
+    print("[OK] Test reussi!")
+
+
+class _AgentTemoin:
+    """ZeusAgent de substitution : chargement et warm-up pilotes par le test."""
+    charge, prechauffe = True, True
+
+    def __init__(self, model_name="zeus_v2", algo="PPO", db_path=None):
+        self.model_name = model_name
+
+    def load(self, path=None):
+        return _AgentTemoin.charge
+
+    def predict_with_confidence(self, observation, deterministic=True):
+        if not _AgentTemoin.prechauffe:
+            raise RuntimeError("warm-up impossible")
+        return 0, 0.9
+
+
+def test_rechargement_echoue(registre, monkeypatch):
+    """reload_model garde l'agent precedent si le chargement ou le warm-up echoue."""
+    print("\n=== TEST: Rechargement à chaud en échec ===")
+    v1, v2 = registre("v1", 1.0), registre("v2", 2.0)
+    precedent = object()
+    monkeypatch.setattr(inference, "_zeus_agent", precedent)
+    monkeypatch.setattr(inference, "_version_chargee", v1)
+    monkeypatch.setattr(inference, "_generation", 1)
+    monkeypatch.setattr(zeus_agent, "ZeusAgent", _AgentTemoin)
+
+    for charge, prechauffe in ((False, True), (True, False)):
+        monkeypatch.setattr(_AgentTemoin, "charge", charge)
+        monkeypatch.setattr(_AgentTemoin, "prechauffe", prechauffe)
+        assert not inference.reload_model(v2)
+        assert inference.get_agent() is precedent
+        assert inference.get_version_chargee() == v1 and inference._generation == 1
+
+    # Chargement et warm-up reussis : bascule d'un bloc
+    monkeypatch.setattr(_AgentTemoin, "prechauffe", True)
+    assert inference.reload_model(v2)
+    assert isinstance(inference.get_agent(), _AgentTemoin)
+    assert inference.get_version_chargee() == v2 and inference._generation == 2
+
+    print("[OK] Test reussi!")
@@ -0,0 +1,69 @@
+"""
+Rétention par session (src/core/archive.py) : une nouvelle saison incrémente
+session_id au lieu de vider les tables, et les sessions au-delà de la rétention
+sont déplacées dans la base d'archive.
+"""
+import sys
+import os
+import sqlite3
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import archive, config, database, historique_cotes
+from src.api import db_integration
+
+
+def _matchs(journee, cote_1):
+    equipes = config.EQUIPES
+    return [{"roundNumber": journee, "matches": [
+        {"homeTeam": equipes[i], "awayTeam": equipes[i + 1],
+         "odds": [{"type": "1", "odds": cote_1}, {"type": "X", "odds": 3.2}, {"type": "2", "odds": 4.1}]}
+        for i in range(0, 4, 2)
+    ]}]
+
+
+def _compter(cursor, table, **filtres):
+    condition = " AND ".join(f"{col} = ?" for col in filtres) or "1"
+    cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE {condition}", tuple(filtres.values()))
+    return cursor.fetchone()[0]
+
+
+def test_sessions_conservees_puis_archivees(base_temporaire):
+    """Trois saisons : aucune donnée effacée au changement, la plus ancienne part en archive."""
+    print("\n=== TEST: Rétention des sessions ===")
+    database.initialiser_db()
+
+    # Même journée, mêmes matchs, d'une saison à l'autre
+    for saison, cote_1 in enumerate((1.5, 1.8, 2.2), 1):
+        if saison > 1:
+            archive.reinitialiser_tables_session()
+        assert database.get_session_active() == saison
+        db_integration.insert_api_matches(_matchs(1, cote_1))
+        serie = historique_cotes.get_historique_cotes(1, 1, 2)
+        assert [p["cote_1"] for p in serie] == [cote_1]
+
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        assert _compter(cursor, "resultats") == 6
+        assert _compter(cursor, "cotes", session_id=3) == 2
+        assert _compter(cursor, "cotes_historique", session_id=1) == 2
+
+    # Rétention de 2 sessions : la session 1 quitte la base principale
+    assert archive.compacter_sessions(sessions_conservees=2) == 6
+    assert archive.compacter_sessions(sessions_conservees=2) == 0
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        assert _compter(cursor, "resultats", session_id=1) == 0
+        assert _compter(cursor, "resultats", session_id=2) == 2
+        assert _compter(cursor, "cotes_historique") == 4
+
+    base_archive = sqlite3.connect(archive.chemin_archive_sessions())
+    cursor = base_archive.cursor()
+    assert _compter(cursor, "resultats", session_id=1) == 2
+    assert _compter(cursor, "cotes", session_id=1) == 2
+    assert _compter(cursor, "cotes_historique", session_id=1) == 2
+    assert _compter(cursor, "equipes") == len(config.EQUIPES)
+    base_archive.close()
+
+    print("[OK] Test reussi!")
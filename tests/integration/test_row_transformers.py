@@ -0,0 +1,82 @@
+"""
+Transformateurs reponse API -> lignes typees (results_filter.iter_result_rows,
+matches_filter.iter_match_rows) : memes lignes que le chemin filtre + insertion,
+JSON brut accepte (parseur incremental si ijson est installe), meme contenu en base.
+"""
+import sys
+import os
+import json
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database
+from src.api import db_integration
+from src.api.matches_filter import extract_matches_with_local_ids, iter_match_rows, rows_from_matches
+from src.api.results_filter import extract_results_minimal, iter_result_rows, parse_score, rows_from_results
+from src.api.simulation import SIMULATION_CONFIG, SimulatedClock, SimulatedSeasonSource
+
+
+def _contenu():
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT journee, equipe_dom_id, equipe_ext_id, score_dom, score_ext FROM resultats ORDER BY 1, 2")
+        resultats = cursor.fetchall()
+        cursor.execute("SELECT journee, equipe_dom_id, equipe_ext_id, cote_1, cote_x, cote_2 FROM cotes ORDER BY 1, 2")
+        return resultats, cursor.fetchall()
+
+
+def test_lignes_identiques_au_filtre():
+    """Reponse decodee, bytes ou str : memes lignes que filtre + conversion."""
+    print("\n=== TEST: Transformateurs JSON -> lignes ===")
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 24.5)
+    source = SimulatedSeasonSource(clock)
+
+    results_raw = source.get_recent_results(skip=0, take=25)
+    attendu = list(rows_from_results(extract_results_minimal(results_raw)))
+    assert len(attendu) == 250
+    assert list(iter_result_rows(results_raw)) == attendu
+    assert list(iter_result_rows(json.dumps(results_raw).encode("utf-8"))) == attendu
+    assert list(iter_result_rows(json.dumps(results_raw))) == attendu
+    # Noms API ramenes aux noms de la base
+    assert {r[1] for r in attendu} <= set(config.EQUIPES)
+
+    matches_raw = source.get_upcoming_matches()
+    for limite in (1, 2):
+        attendu = list(rows_from_matches(extract_matches_with_local_ids(matches_raw, limit=limite)))
+        assert attendu and list(iter_match_rows(matches_raw, limit=limite)) == attendu
+        assert list(iter_match_rows(json.dumps(matches_raw).encode("utf-8"), limit=limite)) == attendu
+    assert all(None not in r[3:] for r in attendu)
+
+    assert parse_score("2:1") == (2, 1) and parse_score("0 - 3") == (0, 3)
+    assert parse_score("") == (None, None) and parse_score("abc") == (None, None)
+    assert list(iter_result_rows(None)) == [] and list(iter_match_rows({"rounds": []})) == []
+    print("[OK] Test reussi!")
+
+
+def test_insertion_par_lignes(base_temporaire):
+    """Insertion par lignes typees : meme contenu en base que insert_api_results / insert_api_matches."""
+    print("\n=== TEST: Insertion par lignes typees ===")
+    clock = SimulatedClock()
+    clock.sleep(SIMULATION_CONFIG["ROUND_DURATION"] * 24.5)
+    source = SimulatedSeasonSource(clock)
+    results_raw = source.get_recent_results(skip=0, take=25)
+    matches_raw = source.get_upcoming_matches()
+
+    database.initialiser_db()
+    assert db_integration.insert_api_results(extract_results_minimal(results_raw)) == 250
+    assert db_integration.insert_api_matches(extract_matches_with_local_ids(matches_raw, limit=2)) == 20
+    reference = _contenu()
+
+    with database.utiliser_base(str(base_temporaire / "lignes.db")):
+        database.initialiser_db()
+        assert db_integration.insert_result_rows(iter_result_rows(json.dumps(results_raw).encode("utf-8"))) == 250
+        assert db_integration.insert_match_rows(iter_match_rows(matches_raw, limit=2)) == 20
+        assert _contenu() == reference
+
+        # Equipe inconnue : ignoree, le reste est insere
+        lignes = list(iter_result_rows(results_raw))[:3] + [(1, "Inconnue FC", config.EQUIPES[0], 1, 0)]
+        assert db_integration.insert_result_rows(lignes) == 3
+
+    print("[OK] Test reussi!")
@@ -0,0 +1,180 @@
+"""
+Jobs de transition de saison (src/api/season_rollover.py) : reprise a l'etape
+suivant la derniere terminee, plafond de tentatives, attente et progression,
+isolation des jobs entre ligues. Les etapes sont remplacees par des fonctions
+temoins : ni archivage reel, ni entrainement.
+"""
+import sys
+import os
+import threading
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database
+from src.api import season_rollover
+
+AUTRE_LIGUE = config.LEAGUE_ID + 1
+
+
+def _temoins(monkeypatch, **remplacements):
+    """Remplace chaque etape par un temoin ; renvoie la liste des etapes executees."""
+    executees = []
+    for nom, _ in season_rollover.ETAPES:
+        def etape(job, nom=nom):
+            executees.append(nom)
+            if nom in remplacements:
+                remplacements[nom](job)
+        monkeypatch.setitem(season_rollover._FONCTIONS_ETAPES, nom, etape)
+    return executees
+
+
+def _creer_job(league_id=None, statut="en_attente", etape=None, progression=0):
+    with database.get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO jobs_saison (statut, etape, progression, journee_fin, snapshot, modele, league_id)
+            VALUES (?, ?, ?, 37, 'snapshot.db', 'zeus_v2', ?)
+        """, (statut, etape, progression, league_id or config.LEAGUE_ID))
+        return cursor.lastrowid
+
+
+def test_reprise_apres_entrainement(base_temporaire, monkeypatch):
+    """Job interrompu apres l'entrainement : reprise a la validation, sans re-entrainer."""
+    print("\n=== TEST: Reprise d'un job interrompu ===")
+    database.initialiser_db()
+    executees = _temoins(monkeypatch)
+
+    # Arret du processus pendant la validation : statut en_cours, derniere etape terminee = entrainement
+    job_id = _creer_job(statut="en_cours", etape="entrainement_zeus", progression=90.0)
+    assert [j["id"] for j in season_rollover.lister_jobs_a_traiter()] == [job_id]
+
+    assert season_rollover.executer_job(job_id)
+    assert executees == ["validation_zeus", "hot_reload"]
+    job = season_rollover.get_job(job_id)
+    assert (job["statut"], job["etape"], job["progression"], job["tentatives"]) == ("termine", "hot_reload", 100, 1)
+
+    # Job termine : plus rien a executer
+    assert season_rollover.executer_job(job_id)
+    assert executees == ["validation_zeus", "hot_reload"]
+    assert season_rollover.lister_jobs_a_traiter() == []
+
+    print("[OK] Test reussi!")
+
+
+def test_plafond_tentatives(base_temporaire, monkeypatch):
+    """Une etape toujours en erreur : MAX_TENTATIVES executions, puis echec definitif."""
+    print("\n=== TEST: Plafond de tentatives ===")
+    database.initialiser_db()
+
+    def panne(job):
+        raise RuntimeError("disque plein")
+    executees = _temoins(monkeypatch, memoire_zeus=panne)
+    job_id = _creer_job()
+
+    # Le worker reprend les jobs en erreur tant qu'il reste des tentatives
+    tours = 0
+    while season_rollover.lister_jobs_a_traiter():
+        for job in season_rollover.lister_jobs_a_traiter():
+            assert not season_rollover.executer_job(job["id"])
+        tours += 1
+        assert tours <= 10
+        # Tentatives restantes : le job compte encore comme a traiter
+        assert season_rollover.attendre_jobs(timeout=0) == (tours == season_rollover.ROLLOVER_CONFIG["MAX_TENTATIVES"])
+
+    maximum = season_rollover.ROLLOVER_CONFIG["MAX_TENTATIVES"]
+    job = season_rollover.get_job(job_id)
+    assert tours == maximum and job["tentatives"] == maximum
+    assert job["statut"] == "echec" and job["erreur"] == "memoire_zeus: disque plein"
+    # L'archivage reussi n'est pas rejoue : chaque tentative reprend a l'etape en erreur
+    assert executees == ["archivage"] + ["memoire_zeus"] * maximum
+    assert job["etape"] == "archivage" and job["progression"] == 5
+
+    # Un job en echec n'est plus execute, meme appele directement
+    assert not season_rollover.executer_job(job_id)
+    assert len(executees) == 1 + maximum
+
+    print("[OK] Test reussi!")
+
+
+def test_attente_et_progression(base_temporaire, monkeypatch):
+    """Worker en arriere-plan : progression visible etape par etape, attendre_jobs borne."""
+    print("\n=== TEST: Attente des jobs et progression ===")
+    database.initialiser_db()
+    entree, sortie = threading.Event(), threading.Event()
+
+    def entrainement(job):
+        entree.set()
+        assert sortie.wait(10)
+    _temoins(monkeypatch, entrainement_zeus=entrainement)
+    job_id = _creer_job()
+
+    season_rollover.demarrer_worker()
+    try:
+        assert entree.wait(10)
+        # Entrainement en cours : job en_cours, progression de la derniere etape terminee
+        assert not season_rollover.attendre_jobs(timeout=0.3)
+        job = season_rollover.get_job(job_id)
+        assert (job["statut"], job["etape"], job["progression"]) == ("en_cours", "memoire_zeus", 15)
+
+        sortie.set()
+        assert season_rollover.attendre_jobs(timeout=10)
+        job = season_rollover.get_job(job_id)
+        assert (job["statut"], job["progression"]) == ("termine", 100)
+    finally:
+        sortie.set()
+        season_rollover.arreter_worker(timeout=10)
+
+    print("[OK] Test reussi!")
+
+
+
+def test_attente_reprise_apres_erreur(base_temporaire, monkeypatch):
+    """Job en erreur avec des tentatives restantes : attendre_jobs attend sa reprise par le worker."""
+    print("\n=== TEST: Attente d'un job repris apres erreur ===")
+    database.initialiser_db()
+    monkeypatch.setitem(season_rollover.ROLLOVER_CONFIG, "POLL_INTERVAL", 0.5)
+    pannes = []
+
+    def panne_unique(job):
+        if not pannes:
+            pannes.append(job["id"])
+            raise RuntimeError("coupure reseau")
+    _temoins(monkeypatch, memoire_zeus=panne_unique)
+    job_id = _creer_job()
+
+    season_rollover.demarrer_worker()
+    try:
+        assert season_rollover.attendre_jobs(timeout=10)
+        job = season_rollover.get_job(job_id)
+        assert pannes == [job_id]
+        assert (job["statut"], job["tentatives"], job["progression"]) == ("termine", 2, 100)
+    finally:
+        season_rollover.arreter_worker(timeout=10)
+
+    print("[OK] Test reussi!")
+
+def test_isolation_ligues(base_temporaire, monkeypatch):
+    """Deux ligues dans la meme base : chacune ne voit, n'attend et n'execute que ses jobs."""
+    print("\n=== TEST: Jobs isoles par ligue ===")
+    database.initialiser_db()
+    with database.utiliser_ligue(AUTRE_LIGUE):
+        database.initialiser_db()
+    executees = _temoins(monkeypatch)
+
+    job_principal = _creer_job()
+    job_autre = _creer_job(AUTRE_LIGUE)
+    assert [j["id"] for j in season_rollover.lister_jobs_a_traiter()] == [job_principal]
+    with database.utiliser_ligue(AUTRE_LIGUE):
+        assert [j["id"] for j in season_rollover.lister_jobs_a_traiter()] == [job_autre]
+
+    # Le job de la ligue principale est termine ; celui de l'autre ligue reste en attente
+    assert season_rollover.executer_job(job_principal)
+    assert season_rollover.attendre_jobs(timeout=0)
+    assert not season_rollover.attendre_jobs(timeout=0, league_id=AUTRE_LIGUE)
+    with database.utiliser_ligue(AUTRE_LIGUE):
+        assert not season_rollover.attendre_jobs(timeout=0)
+    assert season_rollover.get_job(job_autre)["statut"] == "en_attente"
+    assert len(executees) == len(season_rollover.ETAPES)
+
+    print("[OK] Test reussi!")
@@ -0,0 +1,144 @@
+"""
+Test du mode simulation : une saison complete + transition, sans reseau.
+Verifie le saut de J38, l'archivage, l'entrainement flash, le rejet d'une version
+moins bonne que le modele historique servi et la reprise a J1.
+"""
+import sys
+import os
+import sqlite3
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from stable_baselines3 import PPO
+
+from src.api import api_monitor, season_rollover
+from src.api.simulation import SimulatedClock, SimulatedSeasonSource, run_season_simulation, print_simulation_report
+from src.analysis import intelligence
+from src.core import config, database
+from src.zeus import registry
+from src.zeus.env import ZeusEnv
+
+_reload_config = intelligence._reload_config
+
+
+def test_simulation_saison_complete(base_temporaire, monkeypatch):
+    """Une saison simulee traverse toutes les phases de transition."""
+    print("\n=== TEST: Simulation d'une saison complete ===")
+
+    # Modele historique servi au depart (politique non entrainee)
+    database.initialiser_db()
+    historique = str(base_temporaire / "historique.zip")
+    PPO("MlpPolicy", ZeusEnv(), seed=0).save(historique)
+
+    # Evaluation reelle des deux modeles ; le modele historique est declare meilleur
+    evaluer_modele, evalues = registry.evaluer_modele, []
+
+    def evaluation(chemin, algo="PPO", db_path=None):
+        resultat = evaluer_modele(chemin, algo, db_path)
+        evalues.append(chemin)
+        if chemin == registry.chemin_legacy():
+            resultat["score"] += 1000.0
+        return resultat
+    monkeypatch.setattr(registry, "evaluer_modele", evaluation)
+
+    rapport = run_season_simulation(trace_memory=False, workdir=str(base_temporaire / "simulation"),
+                                    modele_historique=historique)
+    print_simulation_report(rapport)
+
+    journees = rapport["journees_traitees"]
+    premiere_saison = [j for s, j in journees if s == 0]
+
+    # J1 -> J37 traitees, J38 ignoree (transition)
+    assert list(range(1, 38)) == premiere_saison[:37]
+    assert 38 not in premiere_saison
+
+    # Transition de saison executee une seule fois (snapshot synchrone, le reste en arriere-plan)
+    phases = rapport["phases"]
+    for nom in ("snapshot", "archivage", "memoire_zeus", "entrainement_zeus", "validation_zeus",
+                "hot_reload", "reinitialisation"):
+        assert phases[nom]["nb"] == 1, nom
+
+    jobs = rapport["jobs_saison"]
+    assert len(jobs) == 1
+    assert jobs[0]["statut"] == "termine" and jobs[0]["etape"] == "hot_reload"
+    assert jobs[0]["journee_fin"] == 37
+
+    # Registre vide au depart : la version re-entrainee est comparee au modele historique,
+    # moins bonne elle est enregistree (score de validation) mais ni activee ni servie
+    assert jobs[0]["version"]
+    assert [v["version"] for v in rapport["versions"]] == [jobs[0]["version"]]
+    assert "score_validation" in rapport["versions"][0]
+    assert len(evalues) == 2 and evalues[1].endswith(f"{registry.REGISTRY_CONFIG['LEGACY_MODEL']}.zip")
+    assert rapport["version_active"] is None and rapport["version_servie"] is None
+
+    # Le moniteur re-interroge l'API a chaque cycle : les reponses identiques sont court-circuitees
+    dedup = rapport["dedup"]
+    assert dedup["results"]["inchangees"] > 0
+
+    # Reprise sur la saison suivante
+    assert journees[-1] == (1, 2)
+    assert len(rapport["latences_par_journee"]) >= 37
+    print("[OK] Test reussi!")
+
+
+def test_fin_de_saison_ligue_courte(base_temporaire, monkeypatch):
+    """Ligue de 6 equipes : saison de 10 journees, J10 ignoree, transition apres J9."""
+    print("\n=== TEST: Fin de saison d'une ligue de 6 equipes ===")
+    equipes = config.EQUIPES[:6]
+    database.initialiser_db(equipes=equipes)
+    assert api_monitor.get_derniere_journee_saison() == 10
+
+    # Transition sans job d'arriere-plan (ni entrainement) : archivage synchrone de secours
+    fins = []
+    monkeypatch.setattr(season_rollover, "planifier_transition", lambda journee_fin, modele=None: fins.append(journee_fin))
+
+    arret = threading.Event()
+    clock = SimulatedClock(stop_event=arret)
+    source = SimulatedSeasonSource(clock, equipes=equipes)
+    clock.limit = source.season_duration + 4 * source.round_duration
+    journees = []
+
+    def callback(journee):
+        saison = source.position()[0]
+        journees.append((saison, journee))
+        if saison >= 1 and journee >= 2:
+            arret.set()
+
+    try:
+        api_monitor.start_monitoring(callback_on_new_journee=callback, verbose=False, clock=clock,
+                                     source=source, stop_event=arret)
+    finally:
+        season_rollover.arreter_worker()
+
+    premiere_saison = [j for s, j in journees if s == 0]
+    assert premiere_saison[:9] == list(range(1, 10)) and 10 not in premiere_saison
+    assert fins == [9]
+    assert journees[-1] == (1, 2)
+    print("[OK] Test reussi!")
+
+
+def test_simulation_callback_ia(base_temporaire, monkeypatch):
+    """Callback IA reel (rechargement de config a chaque journee) : la base de production n'est jamais ouverte."""
+    print("\n=== TEST: Simulation avec le callback IA ===")
+    from main import callback_predictions_ia
+
+    production = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'godmod_v2.db'))
+    connecter, ouvertes = sqlite3.connect, []
+
+    def connecter_trace(base, *args, **kwargs):
+        ouvertes.append(os.path.abspath(str(base).split("?")[0].replace("file:", "", 1)))
+        return connecter(base, *args, **kwargs)
+    monkeypatch.setattr(sqlite3, "connect", connecter_trace)
+
+    workdir = str(base_temporaire / "simulation")
+    rapport = run_season_simulation(callback_on_new_journee=callback_predictions_ia, trace_memory=False,
+                                    workdir=workdir)
+
+    assert rapport["phases"]["callback"]["nb"] >= 37
+    assert production not in ouvertes
+    assert os.path.join(workdir, "simulation.db") in ouvertes
+    # Sandbox quitte : rechargement de config d'origine et base du test restaures
+    assert intelligence._reload_config is _reload_config
+    assert config.DB_NAME == str(base_temporaire / "test.db")
+    print("[OK] Test reussi!")
@@ -0,0 +1,74 @@
+"""
+Transfert de base par lots (src/core/transfert_bases.py) : copie en pagination
+par clé, reprise après interruption sans doublon, vérification des lignes et
+sommes de contrôle, dans les deux sens (testé entre deux bases SQLite).
+"""
+import sys
+import os
+
+import pytest
+
+# Ajouter le répertoire racine du projet au path (remonter 2 niveaux: integration -> tests -> racine)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.core import config, database, transfert_bases
+from src.api import db_integration
+
+
+def _remplir():
+    equipes = config.EQUIPES
+    for journee in range(1, 6):
+        db_integration.insert_api_results([{"roundNumber": journee, "matches": [
+            {"homeTeam": equipes[(i + journee) % 20], "awayTeam": equipes[(i + journee + 10) % 20],
+             "score": f"{i % 3}:{journee % 2}"}
+            for i in range(10)
+        ]}])
+    db_integration.insert_api_matches([{"roundNumber": 6, "matches": [
+        {"homeTeam": equipes[i], "awayTeam": equipes[i + 1],
+         "odds": [{"type": "1", "odds": 1.5 + i / 10}, {"type": "X", "odds": 3.3}, {"type": "2", "odds": 4.2}]}
+        for i in range(0, 20, 2)
+    ]}])
+
+
+def test_transfert_reprise_et_verification(monkeypatch, base_temporaire):
+    """Transfert interrompu puis repris : destination identique à la source, dans les deux sens."""
+    print("\n=== TEST: Transfert de base par lots ===")
+    dossier = base_temporaire
+    source = config.DB_NAME
+    database.initialiser_db()
+    _remplir()
+
+    destination = os.path.join(dossier, "destination.db")
+    reprise = os.path.join(dossier, "reprise.json")
+
+    # Interruption après quelques lots
+    noter = transfert_bases.Reprise.noter
+    appels = {"n": 0}
+
+    def noter_puis_couper(self, nom, **valeurs):
+        noter(self, nom, **valeurs)
+        appels["n"] += 1
+        if appels["n"] == 6:
+            raise RuntimeError("coupure simulée")
+
+    monkeypatch.setattr(transfert_bases.Reprise, "noter", noter_puis_couper)
+    with pytest.raises(RuntimeError):
+        transfert_bases.transferer(source, destination, reprise, taille_lot=7, paralleles=3)
+    assert os.path.exists(reprise)
+    monkeypatch.setattr(transfert_bases.Reprise, "noter", noter)
+
+    bilan = transfert_bases.transferer(source, destination, reprise, taille_lot=7, paralleles=3)
+    assert bilan["ok"], bilan["verification"]
+    assert bilan["verification"]["resultats"]["destination"][0] == 60
+    assert bilan["verification"]["equipes"]["destination"][0] == 20
+    assert not os.path.exists(reprise)
+    # Reprise : les lots déjà validés ne sont pas recopiés
+    assert sum(bilan["copiees"].values()) < sum(r["source"][0] for r in bilan["verification"].values())
+
+    # Sens inverse vers une base neuve
+    retour = os.path.join(dossier, "retour.db")
+    assert transfert_bases.transferer(destination, retour, taille_lot=50)["ok"]
+    assert transfert_bases.somme_controle(retour, "cotes_historique") == \
+        transfert_bases.somme_controle(source, "cotes_historique")
+
+    print("[OK] Test reussi!")